@@ -0,0 +1,207 @@
+#!/usr/bin/env python
+
+# -*- coding: utf-8 -*-
+
+# nagios-check-hddtemp
+# benchmarks/parser.py
+
+
+from __future__ import unicode_literals
+
+import os
+import sys
+import time
+import random
+from argparse import ArgumentParser
+
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from check_hddtemp import CheckHDDTemp  # noqa: E402
+
+
+__all__ = [
+    "count",
+    "generate",
+    "main",
+    "measure",
+]
+
+
+MODELS = [
+    "ST4000NM0035-1V4107",
+    "WDC WD40EFRX-68N32N0",
+    "HGST HUS726040ALE610",
+    "Samsung SSD 860 EVO 500GB",
+]
+
+
+def generate(count, separator, corrupt, seed=0):
+    """
+    Create hddtemp server response with partially corrupted devices records.
+
+    :param count: devices count
+    :type count: int
+    :param separator: hddtemp separator
+    :type separator: str
+    :param corrupt: probability of device record to have separator in model name
+    :type corrupt: float
+    :param seed: random seed
+    :type seed: int
+    :return: hddtemp server response
+    :rtype: str
+    """
+
+    generator = random.Random(seed)  # nosec: B311
+    records = []
+
+    for index in range(count):
+        model = generator.choice(MODELS)
+        if generator.random() < corrupt:
+            model = "{model}{separator}REV".format(model=model, separator=separator)
+        records.append(
+            separator.join(
+                [
+                    "",
+                    "/dev/sd{index}".format(index=index),
+                    model,
+                    str(generator.randint(25, 70)),
+                    "C",
+                    "",
+                ]
+            )
+        )
+
+    return "".join(records)
+
+
+def count(devices):
+    """
+    Count valid devices skipping malformed devices records.
+
+    :param devices: devices names and devices info
+    :type devices: Iterable[Tuple[str, Dict[str, str]]]
+    :return: valid devices count
+    :rtype: int
+    """
+
+    return sum(1 for _, info in devices if "error" not in info)
+
+
+def measure(parse, response, runs):
+    """
+    Parse response several times and measure best parsing time.
+
+    :param parse: parsing function returning parsed devices count
+    :type parse: Callable[[str], int]
+    :param response: hddtemp server response
+    :type response: str
+    :param runs: runs count
+    :type runs: int
+    :return: parsed devices count and best parsing time in seconds
+    :rtype: Tuple[int, float]
+    """
+
+    timings, count = [], 0
+
+    for _ in range(runs):
+        start = time.time()
+        count = parse(response)
+        timings.append(time.time() - start)
+
+    return count, min(timings)
+
+
+def main():
+    """
+    Measure server response parsing stage throughput.
+    """
+
+    parser = ArgumentParser(description="Server response parsing throughput benchmark")
+    parser.add_argument(
+        "-n",
+        "--devices",
+        action="store",
+        type=int,
+        dest="devices",
+        default=100000,
+        metavar="COUNT",
+        help="devices count in response",
+    )
+    parser.add_argument(
+        "-r",
+        "--runs",
+        action="store",
+        type=int,
+        dest="runs",
+        default=5,
+        metavar="RUNS",
+        help="runs count",
+    )
+    parser.add_argument(
+        "-c",
+        "--corrupt",
+        action="store",
+        type=float,
+        dest="corrupt",
+        default=0.01,
+        metavar="PROBABILITY",
+        help="probability of device record to be corrupted in tolerant modes",
+    )
+    parser.add_argument(
+        "-S",
+        "--separator",
+        action="store",
+        type=str,
+        dest="separator",
+        default="|",
+        metavar="SEPARATOR",
+        help="hddtemp separator",
+    )
+    options = parser.parse_args()
+    args = ["-s", "127.0.0.1", "-S", options.separator]
+    strict = CheckHDDTemp(args=args)  # type: ignore
+    tolerant = CheckHDDTemp(args=args + ["-T"])  # type: ignore
+    valid = generate(count=options.devices, separator=options.separator, corrupt=0.0)  # type: ignore  # noqa: E501
+    corrupted = generate(  # type: ignore
+        count=options.devices, separator=options.separator, corrupt=options.corrupt
+    )
+
+    def stream(response):
+        """
+        Parse response by chunks as memory-bounded mode does.
+
+        :param response: hddtemp server response
+        :type response: str
+        :return: parsed devices count
+        :rtype: int
+        """
+
+        size = CheckHDDTemp.CHUNK_SIZE
+        chunks = [
+            response[offset : offset + size]  # noqa: E203
+            for offset in range(0, len(response), size)
+        ]
+        records = tolerant._iter_records(chunks=chunks)  # type: ignore
+
+        return count(devices=tolerant._iter_parsed(records=records))  # type: ignore
+
+    for name, parse, response in [
+        ("strict", lambda response: count(devices=strict._parse(data=response).items()), valid),  # type: ignore  # noqa: E501
+        ("tolerant", lambda response: count(devices=tolerant._parse(data=response).items()), corrupted),  # type: ignore  # noqa: E501
+        ("streaming", stream, corrupted),
+    ]:
+        parsed, best = measure(parse=parse, response=response, runs=options.runs)  # type: ignore  # noqa: E501
+        sys.stdout.write(
+            "{name}: {parsed} of {devices} devices valid, {rate:.0f} records/s\n".format(  # noqa: E501
+                name=name,
+                parsed=parsed,
+                devices=options.devices,
+                rate=options.devices / max(best, 1e-9),
+            )
+        )
+
+
+if __name__ == "__main__":
+
+    main()
@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+
+# nagios-check-hddtemp
+# benchmarks/parser.pyi
+
+
+from typing import Dict, List, Tuple, Callable, Iterable  # pylint: disable=W0611
+
+
+__all__: List[str] = ...
+
+MODELS: List[str] = ...
+
+
+def count(devices: Iterable[Tuple[str, Dict[str, str]]]) -> int: ...
+def generate(count: int, separator: str, corrupt: float, seed: int = ...) -> str: ...
+def measure(parse: Callable[[str], int], response: str, runs: int) -> Tuple[int, float]: ...
+def main() -> None: ...
@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+
+# -*- coding: utf-8 -*-
+
+# nagios-check-hddtemp
+# benchmarks/poller.py
+
+
+import os
+import sys
+from argparse import ArgumentParser
+
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from check_hddtemp import CheckHDDTemp  # noqa: E402
+from check_hddtemp_server import FakeHDDTempServer  # noqa: E402
+from check_hddtemp_poller import (  # noqa: E402
+    LOOPS,
+    Scheduler,
+    get_loop,
+    get_concurrency,
+    raise_files_limit,
+)
+
+
+__all__ = [
+    "main",
+    "measure",
+]
+
+
+def measure(name, servers, concurrency):
+    """
+    Poll all servers once with event loop implementation and measure polling rate.
+
+    :param name: event loop implementation name
+    :type name: str
+    :param servers: comma separated servers list
+    :type servers: str
+    :param concurrency: maximum count of servers polled concurrently
+    :type concurrency: int
+    :return: polling errors count and polled servers per second
+    :rtype: Tuple[int, float]
+    """
+
+    scheduler = Scheduler(  # type: ignore
+        checker=CheckHDDTemp(args=["-s", servers]),  # type: ignore
+        concurrency=concurrency,
+    )
+    loop = get_loop(name=name)  # type: ignore
+
+    try:
+        loop.run_until_complete(scheduler.sweep())  # type: ignore
+    finally:
+        loop.close()
+
+    return scheduler.stats["errors"], scheduler.get_rate()  # type: ignore
+
+
+def main():
+    """
+    Measure multiple servers polling rate with available event loops.
+    """
+
+    parser = ArgumentParser(description="Multiple servers polling rate benchmark")
+    parser.add_argument(
+        "-n",
+        "--hosts",
+        action="store",
+        type=int,
+        dest="hosts",
+        default=1000,
+        metavar="COUNT",
+        help="fake hddtemp servers count",
+    )
+    parser.add_argument(
+        "-d",
+        "--devices",
+        action="store",
+        type=int,
+        dest="devices",
+        default=4,
+        metavar="COUNT",
+        help="devices count per server",
+    )
+    parser.add_argument(
+        "-l",
+        "--latency",
+        action="store",
+        type=float,
+        dest="latency",
+        default=0.01,
+        metavar="SECONDS",
+        help="fake hddtemp servers response latency",
+    )
+    parser.add_argument(
+        "-c",
+        "--concurrency",
+        action="store",
+        type=int,
+        dest="concurrency",
+        default=None,
+        metavar="COUNT",
+        help="maximum count of servers polled concurrently, sized by open files limit by default",  # noqa: E501
+    )
+    options = parser.parse_args()
+    limit = raise_files_limit()  # type: ignore
+    # fake servers listening sockets and both connections ends share the limit
+    concurrency = get_concurrency(  # type: ignore
+        limit=(limit - options.hosts) // 2 if limit is not None else None,
+        concurrency=options.concurrency,
+    )
+    server = FakeHDDTempServer(devices=options.devices, latency=options.latency)  # type: ignore  # noqa: E501
+    hosts = server.start_in_thread(count=options.hosts)  # type: ignore
+    servers = ",".join(["{0}:{1}".format(*host) for host in hosts])
+
+    try:
+        for name in LOOPS[1:]:
+            try:
+                errors, rate = measure(  # type: ignore
+                    name=name, servers=servers, concurrency=concurrency
+                )
+            except ImportError as error:
+                sys.stdout.write("{name}: {error}\n".format(name=name, error=error))
+                continue
+            sys.stdout.write(
+                "{name}: {hosts} hosts, {errors} errors, concurrency {concurrency}, {rate:.0f} hosts/s\n".format(  # noqa: E501
+                    name=name,
+                    hosts=options.hosts,
+                    errors=errors,
+                    concurrency=concurrency,
+                    rate=rate,
+                )
+            )
+    finally:
+        server.stop_in_thread()
+
+
+if __name__ == "__main__":
+
+    main()
@@ -0,0 +1,14 @@
+# -*- coding: utf-8 -*-
+
+# nagios-check-hddtemp
+# benchmarks/poller.pyi
+
+
+from typing import List, Tuple  # pylint: disable=W0611
+
+
+__all__: List[str] = ...
+
+
+def measure(name: str, servers: str, concurrency: int) -> Tuple[int, float]: ...
+def main() -> None: ...
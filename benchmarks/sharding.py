@@ -0,0 +1,195 @@
+#!/usr/bin/env python
+
+# -*- coding: utf-8 -*-
+
+# nagios-check-hddtemp
+# benchmarks/sharding.py
+
+
+import os
+import sys
+import asyncio
+import multiprocessing
+from argparse import ArgumentParser
+
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from check_hddtemp import CheckHDDTemp  # noqa: E402
+from check_hddtemp_server import FakeHDDTempServer  # noqa: E402
+from check_hddtemp_poller import (  # noqa: E402
+    Scheduler,
+    ShardedScheduler,
+    get_concurrency,
+    raise_files_limit,
+)
+
+
+__all__ = [
+    "main",
+    "measure",
+    "serve",
+]
+
+
+def serve(count, devices, queue):
+    """
+    Run fake hddtemp servers in own process, so they don't share poller cores.
+
+    :param count: fake hddtemp servers count
+    :type count: int
+    :param devices: devices count per server
+    :type devices: int
+    :param queue: queue to put fake hddtemp servers addresses and ports to
+    :type queue: multiprocessing.Queue
+    """
+
+    server = FakeHDDTempServer(devices=devices)  # type: ignore
+    loop = asyncio.new_event_loop()
+    queue.put(loop.run_until_complete(server.start(count=count)))  # type: ignore
+
+    loop.run_forever()
+
+
+def measure(args, processes, concurrency, runs):
+    """
+    Poll all servers once several times and measure best polling rate.
+
+    :param args: check options
+    :type args: List[str]
+    :param processes: worker processes count, or 1 to poll in current process
+    :type processes: int
+    :param concurrency: maximum count of servers polled concurrently by worker
+    :type concurrency: int
+    :param runs: runs count
+    :type runs: int
+    :return: best polled servers per second
+    :rtype: float
+    """
+
+    rates = []
+
+    for _ in range(runs):
+        checker = CheckHDDTemp(args=args)  # type: ignore
+        scheduler = (
+            ShardedScheduler(  # type: ignore
+                checker=checker,
+                args=args,
+                processes=processes,
+                concurrency=concurrency,
+            )
+            if processes > 1
+            else Scheduler(checker=checker, concurrency=concurrency)  # type: ignore
+        )
+        loop = asyncio.new_event_loop()
+        try:
+            loop.run_until_complete(scheduler.sweep())  # type: ignore
+        finally:
+            loop.close()
+        rates.append(scheduler.get_rate())  # type: ignore
+
+    return max(rates)
+
+
+def main():
+    """
+    Measure multiple servers polling rate scaling with worker processes count.
+    """
+
+    parser = ArgumentParser(description="Sharded multiple servers polling benchmark")
+    parser.add_argument(
+        "-n",
+        "--hosts",
+        action="store",
+        type=int,
+        dest="hosts",
+        default=2000,
+        metavar="COUNT",
+        help="fake hddtemp servers count",
+    )
+    parser.add_argument(
+        "-d",
+        "--devices",
+        action="store",
+        type=int,
+        dest="devices",
+        default=64,
+        metavar="COUNT",
+        help="devices count per server",
+    )
+    parser.add_argument(
+        "-p",
+        "--processes",
+        action="store",
+        type=int,
+        dest="processes",
+        default=multiprocessing.cpu_count(),
+        metavar="COUNT",
+        help="maximum worker processes count",
+    )
+    parser.add_argument(
+        "-s",
+        "--servers",
+        action="store",
+        type=int,
+        dest="servers",
+        default=2,
+        metavar="COUNT",
+        help="fake hddtemp servers processes count",
+    )
+    parser.add_argument(
+        "-r",
+        "--runs",
+        action="store",
+        type=int,
+        dest="runs",
+        default=3,
+        metavar="RUNS",
+        help="runs count",
+    )
+    options = parser.parse_args()
+    limit = raise_files_limit()  # type: ignore
+    concurrency = get_concurrency(  # type: ignore
+        limit=limit // 2 if limit is not None else None, concurrency=256
+    )
+    queue = multiprocessing.Queue()  # type: ignore
+    servers = [
+        multiprocessing.Process(
+            target=serve,
+            args=(options.hosts // options.servers, options.devices, queue),
+            daemon=True,
+        )
+        for _ in range(options.servers)
+    ]
+    for server in servers:
+        server.start()
+    hosts = [host for _ in servers for host in queue.get()]
+    args = ["-s", ",".join(["{0}:{1}".format(*host) for host in hosts])]
+    processes, baseline = 1, None
+
+    try:
+        while processes <= options.processes:
+            rate = measure(  # type: ignore
+                args=args,
+                processes=processes,
+                concurrency=concurrency,
+                runs=options.runs,
+            )
+            baseline = baseline or rate
+            sys.stdout.write(
+                "{processes} processes: {hosts} hosts, {rate:.0f} hosts/s, {speedup:.2f}x\n".format(  # noqa: E501
+                    processes=processes,
+                    hosts=len(hosts),
+                    rate=rate,
+                    speedup=rate / baseline,
+                )
+            )
+            processes *= 2
+    finally:
+        for server in servers:
+            server.terminate()
+
+
+if __name__ == "__main__":
+
+    main()
@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+
+# nagios-check-hddtemp
+# benchmarks/sharding.pyi
+
+
+import multiprocessing
+from typing import List, Tuple  # pylint: disable=W0611
+
+
+__all__: List[str] = ...
+
+
+def serve(
+    count: int, devices: int, queue: multiprocessing.Queue[List[Tuple[str, int]]]
+) -> None: ...
+def measure(args: List[str], processes: int, concurrency: int, runs: int) -> float: ...
+def main() -> None: ...
@@ -0,0 +1,185 @@
+#!/usr/bin/env python
+
+# -*- coding: utf-8 -*-
+
+# nagios-check-hddtemp
+# benchmarks/snapshot.py
+
+
+from __future__ import unicode_literals
+
+import io
+import os
+import sys
+import time
+import shutil
+import tempfile
+from argparse import ArgumentParser
+
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from check_hddtemp_state import Snapshot  # noqa: E402
+from check_hddtemp import CheckHDDTemp, json_dumps  # noqa: E402
+
+
+try:
+    import ujson as json
+except ImportError:
+    import json
+
+
+__all__ = [
+    "generate",
+    "main",
+    "measure",
+]
+
+
+def generate(hosts, devices):
+    """
+    Create servers devices states.
+
+    :param hosts: servers count
+    :type hosts: int
+    :param devices: devices count per server
+    :type devices: int
+    :return: servers labels and devices states info
+    :rtype: List[Tuple[str, Dict[str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]]]  # noqa: E501
+    """
+
+    checker = CheckHDDTemp(args=["-s", "127.0.0.1"])  # type: ignore
+
+    return [
+        (
+            "nas{host}".format(host=host),
+            checker._check_response(  # type: ignore
+                label="nas{host}".format(host=host),
+                response="".join(
+                    [
+                        "|/dev/sd{device}|HARD DRIVE|{temperature}|C|".format(
+                            device=device, temperature=25 + (host + device) % 30
+                        )
+                        for device in range(devices)
+                    ]
+                ),
+            ),
+        )
+        for host in range(hosts)
+    ]
+
+
+def measure(lookup, runs):
+    """
+    Look up server devices states several times and measure best lookup time.
+
+    :param lookup: lookup function
+    :type lookup: Callable[[], Any]
+    :param runs: runs count
+    :type runs: int
+    :return: best lookup time in microseconds
+    :rtype: float
+    """
+
+    timings = []
+
+    for _ in range(runs):
+        start = time.time()
+        lookup()
+        timings.append(time.time() - start)
+
+    return min(timings) * 1000000
+
+
+def main():
+    """
+    Compare single server lookup latency in binary snapshot and JSON document.
+    """
+
+    parser = ArgumentParser(description="Snapshot single server lookup benchmark")
+    parser.add_argument(
+        "-n",
+        "--hosts",
+        action="store",
+        type=int,
+        dest="hosts",
+        default=10000,
+        metavar="COUNT",
+        help="servers count",
+    )
+    parser.add_argument(
+        "-d",
+        "--devices",
+        action="store",
+        type=int,
+        dest="devices",
+        default=8,
+        metavar="COUNT",
+        help="devices count per server",
+    )
+    parser.add_argument(
+        "-r",
+        "--runs",
+        action="store",
+        type=int,
+        dest="runs",
+        default=20,
+        metavar="RUNS",
+        help="runs count",
+    )
+    options = parser.parse_args()
+    results = generate(hosts=options.hosts, devices=options.devices)  # type: ignore
+    label = results[len(results) // 2][0]
+    directory = tempfile.mkdtemp()
+    binary = os.path.join(directory, "snapshot.bin")
+    document = os.path.join(directory, "snapshot.json")
+
+    try:
+        Snapshot.dump(path=binary, results=results)  # type: ignore
+        with io.open(document, "w", encoding="utf8") as snapshot:
+            snapshot.write(json_dumps(dict(results)))  # type: ignore
+
+        def lookup_binary():
+            """
+            Look up server in binary snapshot as fresh check process does.
+
+            :return: devices states info
+            :rtype: Optional[Dict[str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]]  # noqa: E501
+            """
+
+            snapshot = Snapshot(path=binary)  # type: ignore
+
+            try:
+                return snapshot.get(label=label)  # type: ignore
+            finally:
+                snapshot.close()  # type: ignore
+
+        def lookup_json():
+            """
+            Look up server in JSON document as fresh check process does.
+
+            :return: devices states info
+            :rtype: Optional[Dict[str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]]  # noqa: E501
+            """
+
+            with io.open(document, encoding="utf8") as snapshot:
+                return json.loads(snapshot.read()).get(label)
+
+        for name, path, lookup in [
+            ("binary", binary, lookup_binary),
+            ("json", document, lookup_json),
+        ]:
+            sys.stdout.write(
+                "{name}: {size} bytes, {latency:.1f}us lookup\n".format(
+                    name=name,
+                    size=os.path.getsize(path),
+                    latency=measure(lookup=lookup, runs=options.runs),  # type: ignore
+                )
+            )
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+
+    main()
@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+
+# nagios-check-hddtemp
+# benchmarks/snapshot.pyi
+
+
+from typing import (  # pylint: disable=W0611
+    Any,
+    Dict,
+    List,
+    Tuple,
+    Union,
+    Callable,
+)
+
+
+__all__: List[str] = ...
+
+
+def generate(
+    hosts: int, devices: int
+) -> List[
+    Tuple[
+        str, Dict[str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]
+    ]
+]: ...
+def measure(lookup: Callable[[], Any], runs: int) -> float: ...
+def main() -> None: ...
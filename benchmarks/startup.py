@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+
+# -*- coding: utf-8 -*-
+
+# nagios-check-hddtemp
+# benchmarks/startup.py
+
+
+from __future__ import unicode_literals
+
+import os
+import sys
+import glob
+import time
+import subprocess  # nosec: B404
+from argparse import ArgumentParser
+
+
+__all__ = [
+    "main",
+    "measure",
+]
+
+
+def measure(command, runs):
+    """
+    Run command several times and measure its wall clock latency.
+
+    :param command: command to run
+    :type command: List[str]
+    :param runs: runs count
+    :type runs: int
+    :return: sorted latencies in milliseconds
+    :rtype: List[float]
+    """
+
+    latencies = []
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+
+    for _ in range(runs):
+        start = time.time()
+        subprocess.check_call(  # nosec: B603
+            command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=env
+        )
+        latencies.append((time.time() - start) * 1000)
+
+    return sorted(latencies)
+
+
+def main():
+    """
+    Compare plain script and zipapp cold start latency.
+    """
+
+    parser = ArgumentParser(description="Plain script vs zipapp cold start benchmark")
+    parser.add_argument(
+        "-n",
+        "--runs",
+        action="store",
+        type=int,
+        dest="runs",
+        default=50,
+        metavar="RUNS",
+        help="runs count",
+    )
+    parser.add_argument(
+        "-z",
+        "--zipapp",
+        action="store",
+        type=str,
+        dest="zipapp",
+        default=(sorted(glob.glob("dist/check_hddtemp-*.pyz")) or [""])[-1],
+        metavar="ZIPAPP",
+        help="zipapp built with 'python setup.py bdist_zipapp'",
+    )
+    options = parser.parse_args()
+
+    if not os.path.exists(options.zipapp):
+        parser.error(message="Zipapp not found, build it with 'make zipapp'")
+
+    for name, command in [
+        ("script", [sys.executable, "check_hddtemp.py", "--version"]),
+        ("zipapp", [sys.executable, options.zipapp, "--version"]),
+    ]:
+        latencies = measure(command=command, runs=options.runs)
+        sys.stdout.write(
+            "{name}: min {min:.2f}ms, median {median:.2f}ms, max {max:.2f}ms\n".format(
+                name=name,
+                min=latencies[0],
+                median=latencies[len(latencies) // 2],
+                max=latencies[-1],
+            )
+        )
+
+
+if __name__ == "__main__":
+
+    main()
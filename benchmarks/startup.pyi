@@ -0,0 +1,14 @@
+# -*- coding: utf-8 -*-
+
+# nagios-check-hddtemp
+# benchmarks/startup.pyi
+
+
+from typing import List  # pylint: disable=W0611
+
+
+__all__: List[str] = ...
+
+
+def measure(command: List[str], runs: int) -> List[float]: ...
+def main() -> None: ...
@@ -26,16 +26,55 @@
 
 from __future__ import unicode_literals
 
+import io
+import os
 import sys
+import time
+import zlib
+import errno
+import heapq
+import codecs
+import select
 import socket
+import struct
+import fnmatch
+import tempfile
+import importlib
 import telnetlib
+import threading
+from functools import partial
 from argparse import ArgumentParser
-from collections import OrderedDict
+from collections import Counter, OrderedDict
+
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None  # type: ignore
+try:
+    import orjson
+except ImportError:
+    ORJSON = False
+else:
+    ORJSON = True
+try:
+    import ujson as json
+except ImportError:
+    import json
 
 
 __all__ = [
     "CheckHDDTemp",
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "HDDTempSource",
+    "LatencyTracker",
+    "Source",
+    "get_sources",
+    "json_dumps",
+    "load_source",
     "main",
+    "update_json_file",
 ]
 
 
@@ -44,6 +83,136 @@ VERSION = (1, 5, 1)
 __version__ = ".".join(map(str, VERSION))
 
 
+def json_dumps(obj):
+    """
+    Serialize object to compact JSON string using fastest available encoder.
+
+    :param obj: object to serialize
+    :type obj: Any
+    :return: JSON string
+    :rtype: str
+    """
+
+    if ORJSON:
+        return orjson.dumps(obj).decode("utf8")
+    if getattr(json, "__name__", "") == "ujson":  # pragma: no cover
+        return json.dumps(obj, ensure_ascii=False, escape_forward_slashes=False)
+
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def update_json_file(path, merge):
+    """
+    Update JSON state file shared by concurrent plugin invocations.
+
+    State file is re-read under exclusive lock of its lock file and merged
+    with invocation changes, then atomically replaced, so concurrent
+    invocations don't lose each other changes. Without fcntl (Windows)
+    lock isn't taken.
+
+    :param path: state file path
+    :type path: str
+    :param merge: function merging changes into state file contents (None if broken)
+    :type merge: Callable[[Any], Any]
+    :raises EnvironmentError: state file can't be locked or written
+    """
+
+    with io.open("{path}.lock".format(path=path), "ab") as lock:
+        if fcntl is not None:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX)  # released on closing
+        try:
+            with io.open(path, encoding="utf8") as state:
+                contents = json.loads(state.read())
+        except (EnvironmentError, ValueError):  # missing or broken state file
+            contents = None
+        temporary = "{path}.{pid}".format(path=path, pid=os.getpid())
+        with io.open(temporary, "w", encoding="utf8") as state:
+            state.write(json_dumps(merge(contents)))  # type: ignore
+        os.rename(temporary, path)  # atomic replace for lock-free readers
+
+
+SOURCES_ENTRY_POINTS_GROUP = "check_hddtemp.sources"
+# built-in sources are referenced by import paths to not import them until used
+SOURCES = {
+    "hddtemp": "check_hddtemp:HDDTempSource",
+    "file": "check_hddtemp_sources:FileSource",
+    "sysfs": "check_hddtemp_sources:SysfsSource",
+    "cache": "check_hddtemp_sources:CacheSource",
+    "fanout": "check_hddtemp_sources:FanOutSource",
+}
+
+
+def get_sources():
+    """
+    Discover built-in and installed sources without importing them.
+
+    Third-party sources are registered in "check_hddtemp.sources" entry points group.
+
+    :return: sources names and import paths ("module:attribute")
+    :rtype: Dict[str, str]
+    """
+
+    try:
+        from importlib import metadata  # pylint: disable=C0415
+    except ImportError:  # pragma: no cover
+        try:
+            import pkg_resources  # pylint: disable=C0415
+        except ImportError:
+            entry_points = []
+        else:
+            entry_points = [
+                (
+                    entry_point.name,
+                    "{module}:{attribute}".format(
+                        module=entry_point.module_name,
+                        attribute=".".join(entry_point.attrs),
+                    ),
+                )
+                for entry_point in pkg_resources.iter_entry_points(
+                    SOURCES_ENTRY_POINTS_GROUP
+                )
+            ]
+    else:
+        installed = metadata.entry_points()
+        entry_points = [
+            (entry_point.name, entry_point.value)
+            for entry_point in (
+                installed.select(group=SOURCES_ENTRY_POINTS_GROUP)
+                if hasattr(installed, "select")
+                else installed.get(SOURCES_ENTRY_POINTS_GROUP, [])  # type: ignore
+            )
+        ]
+
+    sources = dict(entry_points)
+    sources.update(SOURCES)  # built-in sources can't be overridden
+
+    return sources
+
+
+def load_source(name):
+    """
+    Import source class by its name.
+
+    :param name: source name
+    :type name: str
+    :return: source class
+    :rtype: Type[Source]
+    :raises KeyError: unknown source
+    :raises ImportError: source can't be imported
+    :raises AttributeError: source can't be found in its module
+    """
+
+    # skip entry points discovery for built-in sources
+    path = SOURCES[name] if name in SOURCES else get_sources()[name]  # type: ignore
+    module, _, attribute = path.partition(":")
+    source = importlib.import_module(module)
+
+    for part in attribute.split("."):
+        source = getattr(source, part)
+
+    return source
+
+
 class CheckHDDTemp(object):
     """
     Check HDD temperature Nagios plugin.
@@ -72,6 +241,13 @@ class CheckHDDTemp(object):
         PRIORITY_OK: STATUS_OK,
         PRIORITY_SLEEPING: STATUS_SLEEPING,
     }
+    STATUS_TO_PRIORITY = dict(
+        (status, priority) for priority, status in PRIORITY_TO_STATUS.items()
+    )
+    TEMPLATE_ERROR = "error"
+    TEMPLATE_MALFORMED = "malformed"
+    TEMPLATE_NEW, TEMPLATE_REPLACED, TEMPLATE_REMOVED = ["new", "replaced", "removed"]
+    TEMPLATE_PEER = "peer"
     OUTPUT_TEMPLATES = {
         STATUS_CRITICAL: {
             "text": "device {device} temperature {temperature}{scale} exceeds critical temperature threshold {critical}{scale}",  # noqa: E501
@@ -93,6 +269,30 @@ class CheckHDDTemp(object):
             "text": "device {device} is sleeping",
             "priority": PRIORITY_SLEEPING,
         },
+        TEMPLATE_ERROR: {
+            "text": "server {host} check failed: {error}",
+            "priority": PRIORITY_UNKNOWN,
+        },
+        TEMPLATE_MALFORMED: {
+            "text": "device {device} record can't be parsed: {error}",
+            "priority": PRIORITY_UNKNOWN,
+        },
+        TEMPLATE_NEW: {
+            "text": "device {device} {model} is new",
+            "priority": PRIORITY_WARNING,
+        },
+        TEMPLATE_REPLACED: {
+            "text": "device {device} {previous} was replaced by {model}",
+            "priority": PRIORITY_WARNING,
+        },
+        TEMPLATE_REMOVED: {
+            "text": "device {device} {model} was removed",
+            "priority": PRIORITY_WARNING,
+        },
+        TEMPLATE_PEER: {
+            "text": "device {device} temperature {temperature}{scale} deviates from host median {median:g}{scale} by {deviation:g}{scale}",  # noqa: E501
+            "priority": PRIORITY_WARNING,
+        },
     }
     DEFAULT_EXIT_CODE = 3
     EXIT_CODES = {
@@ -102,20 +302,52 @@ class CheckHDDTemp(object):
         STATUS_CRITICAL: 2,
         STATUS_UNKNOWN: 3,
     }
+    # keeps peers with equal temperatures from flagging any deviation
+    PEER_MAD_MIN = 1.0
+    # devices states templates replaced by devices inventory changes
+    INVENTORY_OVERRIDES = [STATUS_OK, STATUS_SLEEPING, STATUS_UNKNOWN]
+    HOST_TEMPLATE = "{host}: {text}"
     PERFORMANCE_DATA_TEMPLATE = "{device}={temperature}"
-
-    def __init__(self):
+    NAGIOS_PERFORMANCE_DATA_TEMPLATE = "{label}={value};{warning};{critical}"
+    PERFORMANCE_LABEL_TEMPLATE = "{host}:{name}"
+    PERFORMANCE_PLAIN, PERFORMANCE_NAGIOS, PERFORMANCE_SUMMARY = [
+        "plain",
+        "nagios",
+        "summary",
+    ]
+    PERFORMANCE_FORMATS = [PERFORMANCE_PLAIN, PERFORMANCE_NAGIOS, PERFORMANCE_SUMMARY]
+    PERFORMANCE_UNKNOWN = "U"  # Nagios performance data unknown value
+    TRUNCATED_TEMPLATE = "{count} more"
+    COUNTER_TEMPLATE = "{count} {status}"
+    TIMING_TEMPLATE = "{stage}={seconds:.6f}s"
+    FORMAT_TEXT, FORMAT_JSON, FORMAT_NDJSON = ["text", "json", "ndjson"]
+    FORMATS = [FORMAT_TEXT, FORMAT_JSON, FORMAT_NDJSON]
+    CHUNK_SIZE = 65536  # server response receiving and spool reading chunk size
+    RECORD_SIZE_MAX = 4096  # server response device record size limit
+    SPOOL_SIZE = 1048576  # spool size limit to keep in memory before writing to disk
+
+    def __init__(self, args=None):
         """
         Get command line args.
+
+        :param args: command line args, or None to use "sys.argv"
+        :type args: Optional[List[str]]
         """
 
-        self.options = self._get_options()  # type: ignore
+        self.options = self._get_options(args=args)  # type: ignore
+        self.code = self.DEFAULT_EXIT_CODE
+        self.timings = OrderedDict()
+        self.started = time.time()
+        self.performance_file = None
+        self.performance_lock = threading.Lock()
 
     @staticmethod
-    def _get_options():
+    def _get_options(args=None):
         """
         Parse commandline options arguments.
 
+        :param args: command line args, or None to use "sys.argv"
+        :type args: Optional[List[str]]
         :return: parsed command line arguments
         :rtype: Namespace
         """
@@ -129,7 +361,7 @@ class CheckHDDTemp(object):
             type=str,
             default="",
             metavar="SERVER",
-            help="server name or address",
+            help="server name or address, or comma separated servers list (SERVER[:PORT]) for aggregated check",  # noqa: E501
         )
         parser.add_argument(
             "-p",
@@ -161,6 +393,14 @@ class CheckHDDTemp(object):
             metavar="SEPARATOR",
             help="hddtemp separator",
         )
+        parser.add_argument(
+            "-T",
+            "--tolerant",
+            action="store_true",
+            default=False,
+            dest="tolerant",
+            help="report malformed devices records as unknown devices and replace undecodable bytes in server response instead of failing",  # noqa: E501
+        )
         parser.add_argument(
             "-w",
             "--warning",
@@ -181,15 +421,230 @@ class CheckHDDTemp(object):
             metavar="TEMPERATURE",
             help="critical temperature",
         )
+        parser.add_argument(
+            "--peer-deviation",
+            action="store",
+            type=float,
+            dest="peer_deviation",
+            default=0.0,
+            metavar="DEGREES",
+            help="report devices with temperature deviating from server devices median by more than DEGREES, or 0 to disable",  # noqa: E501
+        )
+        parser.add_argument(
+            "--peer-mad",
+            action="store",
+            type=float,
+            dest="peer_mad",
+            default=0.0,
+            metavar="K",
+            help="report devices with temperature deviating from server devices median by more than K median absolute deviations, or 0 to disable",  # noqa: E501
+        )
+        parser.add_argument(
+            "--peer-minimum",
+            action="store",
+            type=int,
+            dest="peer_minimum",
+            default=3,
+            metavar="COUNT",
+            help="minimum server devices count with same temperature scale to compare them with each other",  # noqa: E501
+        )
+        parser.add_argument(
+            "--model-threshold",
+            action="append",
+            type=str,
+            dest="model_thresholds",
+            default=[],
+            metavar="PATTERN:WARNING:CRITICAL",
+            help="warning and critical temperatures for devices with model matching shell-style PATTERN, first matching option is used (can be repeated)",  # noqa: E501
+        )
         parser.add_argument(
             "-t",
             "--timeout",
             action="store",
-            type=int,
+            type=float,
             dest="timeout",
-            default=1,
+            default=1.0,
             metavar="TIMEOUT",
-            help="receiving data from hddtemp operation network timeout",
+            help="receiving data from hddtemp operation network timeout in seconds",
+        )
+        parser.add_argument(
+            "--adaptive-timeout",
+            action="store_true",
+            default=False,
+            dest="adaptive_timeout",
+            help="choose every server timeout from its observed response latency kept in state directory, timeout option value is used for servers without history",  # noqa: E501
+        )
+        parser.add_argument(
+            "--min-timeout",
+            action="store",
+            type=float,
+            dest="min_timeout",
+            default=0.1,
+            metavar="SECONDS",
+            help="minimum adaptive timeout",
+        )
+        parser.add_argument(
+            "--max-timeout",
+            action="store",
+            type=float,
+            dest="max_timeout",
+            default=10.0,
+            metavar="SECONDS",
+            help="maximum adaptive timeout",
+        )
+        parser.add_argument(
+            "--source",
+            action="store",
+            type=str,
+            dest="source",
+            default="hddtemp",
+            metavar="SOURCE",
+            help="devices data source, hddtemp server by default (see --list-sources)",
+        )
+        parser.add_argument(
+            "--list-sources",
+            action="store_true",
+            default=False,
+            dest="list_sources",
+            help="show available devices data sources and exit",
+        )
+        parser.add_argument(
+            "--state-dir",
+            action="store",
+            type=str,
+            dest="state_dir",
+            default=tempfile.gettempdir(),
+            metavar="PATH",
+            help="directory to keep state files in",
+        )
+        parser.add_argument(
+            "--cache-ttl",
+            action="store",
+            type=float,
+            dest="cache_ttl",
+            default=60.0,
+            metavar="SECONDS",
+            help="cached server response lifetime for cache source",
+        )
+        parser.add_argument(
+            "--result-cache",
+            action="store",
+            type=int,
+            dest="result_cache",
+            default=0,
+            metavar="COUNT",
+            help="keep devices states and rendered output of COUNT most recently checked responses in state directory, or 0 to disable",  # noqa: E501
+        )
+        parser.add_argument(
+            "--snapshot",
+            action="store",
+            type=str,
+            dest="snapshot",
+            default="",
+            metavar="PATH",
+            help="look up servers devices in collector binary snapshot before connecting to them",  # noqa: E501
+        )
+        parser.add_argument(
+            "--snapshot-age",
+            action="store",
+            type=float,
+            dest="snapshot_age",
+            default=300.0,
+            metavar="SECONDS",
+            help="maximum collector snapshot age",
+        )
+        parser.add_argument(
+            "--inventory",
+            action="store_true",
+            default=False,
+            dest="inventory",
+            help="keep servers devices inventory in state directory and report new, replaced and removed devices",  # noqa: E501
+        )
+        parser.add_argument(
+            "--inventory-hold",
+            action="store",
+            type=float,
+            dest="inventory_hold",
+            default=86400.0,
+            metavar="SECONDS",
+            help="report devices inventory changes for SECONDS after they happen",
+        )
+        parser.add_argument(
+            "--board",
+            action="store",
+            type=str,
+            dest="board",
+            default="",
+            metavar="PATH",
+            help="share servers responses with concurrent checks and collector through memory mapped result board file",  # noqa: E501
+        )
+        parser.add_argument(
+            "--board-age",
+            action="store",
+            type=float,
+            dest="board_age",
+            default=10.0,
+            metavar="SECONDS",
+            help="maximum result board server response age",
+        )
+        parser.add_argument(
+            "--board-slots",
+            action="store",
+            type=int,
+            dest="board_slots",
+            default=1024,
+            metavar="COUNT",
+            help="servers slots count of new result board file",
+        )
+        parser.add_argument(
+            "--record",
+            action="store",
+            type=str,
+            dest="record",
+            default="",
+            metavar="PATH",
+            help="append raw servers responses with timestamps to compressed capture file for replay",  # noqa: E501
+        )
+        parser.add_argument(
+            "--breaker-threshold",
+            action="store",
+            type=int,
+            dest="breaker_threshold",
+            default=0,
+            metavar="COUNT",
+            help="stop connecting to server after COUNT consecutive failures, or 0 to always connect",  # noqa: E501
+        )
+        parser.add_argument(
+            "--breaker-cooldown",
+            action="store",
+            type=float,
+            dest="breaker_cooldown",
+            default=300.0,
+            metavar="SECONDS",
+            help="time to report failed server unknown without connecting before next probe",  # noqa: E501
+        )
+        parser.add_argument(
+            "--resolve",
+            action="store_true",
+            default=False,
+            dest="resolve",
+            help="resolve all servers names concurrently before checking and connect to their addresses in happy eyeballs order",  # noqa: E501
+        )
+        parser.add_argument(
+            "--dns-ttl",
+            action="store",
+            type=float,
+            dest="dns_ttl",
+            default=300.0,
+            metavar="SECONDS",
+            help="resolved servers addresses cache lifetime, or 0 to not cache",
+        )
+        parser.add_argument(
+            "--timings",
+            action="store_true",
+            default=False,
+            dest="timings",
+            help="show check stages timings",
         )
         parser.add_argument(
             "-P",
@@ -199,6 +654,182 @@ class CheckHDDTemp(object):
             dest="performance",
             help="return performance data",
         )
+        parser.add_argument(
+            "--performance-format",
+            action="store",
+            type=str,
+            dest="performance_format",
+            choices=CheckHDDTemp.PERFORMANCE_FORMATS,
+            default=CheckHDDTemp.PERFORMANCE_PLAIN,
+            metavar="FORMAT",
+            help="performance data format: plain (DEVICE=TEMPERATURE), nagios (host-qualified LABEL=VALUE;WARNING;CRITICAL) or summary (per-host minimum, average and maximum in nagios format)",  # noqa: E501
+        )
+        parser.add_argument(
+            "--output-limit",
+            action="store",
+            type=int,
+            dest="output_limit",
+            default=0,
+            metavar="BYTES",
+            help="keep text output within BYTES dropping performance data and then least important devices, or 0 for no limit",  # noqa: E501
+        )
+        parser.add_argument(
+            "--performance-file",
+            action="store",
+            type=str,
+            dest="performance_file",
+            default="",
+            metavar="PATH",
+            help="write every checked device state as NDJSON to PATH regardless of output limit and worst devices count",  # noqa: E501
+        )
+        parser.add_argument(
+            "-f",
+            "--format",
+            action="store",
+            type=str,
+            dest="format",
+            choices=CheckHDDTemp.FORMATS,
+            default=CheckHDDTemp.FORMAT_TEXT,
+            metavar="FORMAT",
+            help="output format: text, json or ndjson (one JSON document per line)",
+        )
+        parser.add_argument(
+            "-W",
+            "--worst",
+            action="store",
+            type=int,
+            dest="worst",
+            default=0,
+            metavar="COUNT",
+            help="show only COUNT worst devices in aggregated check output, or 0 for all devices",  # noqa: E501
+        )
+        parser.add_argument(
+            "-B",
+            "--bounded",
+            action="store_true",
+            default=False,
+            dest="bounded",
+            help="memory-bounded aggregated check: stream servers responses keeping only statuses counters and worst devices",  # noqa: E501
+        )
+        parser.add_argument(
+            "-j",
+            "--jobs",
+            action="store",
+            type=int,
+            dest="jobs",
+            default=16,
+            metavar="JOBS",
+            help="count of servers checked concurrently in aggregated check",
+        )
+        parser.add_argument(
+            "-m",
+            "--sink",
+            action="append",
+            type=str,
+            dest="sinks",
+            default=[],
+            metavar="URL",
+            help="push devices temperatures to metrics server: statsd://HOST[:PORT], graphite://HOST[:PORT] or influx://HOST[:PORT], can be repeated",  # noqa: E501
+        )
+        parser.add_argument(
+            "--sink-prefix",
+            action="store",
+            type=str,
+            dest="sink_prefix",
+            default="hddtemp",
+            metavar="PREFIX",
+            help="metrics names prefix (InfluxDB measurement name)",
+        )
+        parser.add_argument(
+            "--sink-timeout",
+            action="store",
+            type=float,
+            dest="sink_timeout",
+            default=0.1,
+            metavar="SECONDS",
+            help="time budget for pushing metrics to all sinks",
+        )
+        parser.add_argument(
+            "--icinga",
+            action="store",
+            type=str,
+            dest="icinga",
+            default="",
+            metavar="URL",
+            help="submit devices states to Icinga 2 API as passive check results: http[s]://HOST[:PORT]",  # noqa: E501
+        )
+        parser.add_argument(
+            "--icinga-user",
+            action="store",
+            type=str,
+            dest="icinga_user",
+            default="",
+            metavar="USER",
+            help="Icinga 2 API user name",
+        )
+        parser.add_argument(
+            "--icinga-password",
+            action="store",
+            type=str,
+            dest="icinga_password",
+            default="",
+            metavar="PASSWORD",
+            help="Icinga 2 API user password",
+        )
+        parser.add_argument(
+            "--icinga-service",
+            action="store",
+            type=str,
+            dest="icinga_service",
+            default="{host}!hddtemp-{name}",
+            metavar="TEMPLATE",
+            help="Icinga 2 service object name template with {host}, {device} and {name} (device name without path) placeholders",  # noqa: E501
+        )
+        parser.add_argument(
+            "--icinga-ca",
+            action="store",
+            type=str,
+            dest="icinga_ca",
+            default=None,
+            metavar="PATH",
+            help="Icinga 2 API CA certificate file, system CA certificates are used by default",  # noqa: E501
+        )
+        parser.add_argument(
+            "--icinga-concurrency",
+            action="store",
+            type=int,
+            dest="icinga_concurrency",
+            default=8,
+            metavar="COUNT",
+            help="maximum count of concurrent Icinga 2 API requests over keep-alive connections",  # noqa: E501
+        )
+        parser.add_argument(
+            "--icinga-retries",
+            action="store",
+            type=int,
+            dest="icinga_retries",
+            default=3,
+            metavar="COUNT",
+            help="failed Icinga 2 API request retries count",
+        )
+        parser.add_argument(
+            "--icinga-queue",
+            action="store",
+            type=int,
+            dest="icinga_queue",
+            default=10000,
+            metavar="COUNT",
+            help="maximum count of buffered check results, oldest ones are dropped",  # noqa: E501
+        )
+        parser.add_argument(
+            "--icinga-timeout",
+            action="store",
+            type=float,
+            dest="icinga_timeout",
+            default=10.0,
+            metavar="SECONDS",
+            help="time budget for submitting all check results to Icinga 2 API",
+        )
         parser.add_argument(
             "-q",
             "--quiet",
@@ -214,260 +845,2952 @@ class CheckHDDTemp(object):
             version="{version}".format(version=__version__),
         )
 
-        options = parser.parse_args()
+        options = parser.parse_args(args=args)
+
+        if options.list_sources:
+            parser.exit(
+                message="".join(
+                    [
+                        "{name}\n".format(name=name)
+                        for name in sorted(get_sources().keys())  # type: ignore
+                    ]
+                )
+            )
 
         # check mandatory command line options supplied
         if not options.server:
             parser.error(message="Required server address option missing")
 
-        # check if waning temperature in args less than critical
-        if options.warning >= options.critical:
+        try:
+            options.servers = CheckHDDTemp._get_servers(  # type: ignore
+                servers=options.server, port=options.port
+            )
+        except ValueError as error:
             parser.error(
-                message="Warning temperature option value must be less than critical option value"  # noqa: E501
+                message="Server address option can't be parsed: {error}".format(
+                    error=error
+                )
             )
 
-        return options
-
-    def _get_data(self):
-        """
-        Get and return data from hddtemp server.
-
-        :return: data from hddtemp server
-        :rtype: str
-        """
-
         try:
-            connection = telnetlib.Telnet(
-                self.options.server, self.options.port, self.options.timeout
-            )
-            response = connection.read_all()
-            connection.close()
-
-            return response.decode("utf8")
-
-        except (EOFError, socket.error) as error:
-            if not self.options.quiet:
-                sys.stdout.write(
-                    "ERROR: Server communication problem. {error}\n".format(error=error)
+            options.source = load_source(name=options.source)(options=options)  # type: ignore  # noqa: E501
+        except (KeyError, ImportError, AttributeError) as error:
+            parser.error(message="Source can't be loaded: {error}".format(error=error))
+
+        if options.sinks:
+            # sinks and state stores modules are imported only when enabled
+            from check_hddtemp_sinks import MetricsSink  # pylint: disable=C0415
+
+            try:
+                options.sinks = [
+                    MetricsSink.from_url(url=url, prefix=options.sink_prefix)  # type: ignore  # noqa: E501
+                    for url in options.sinks
+                ]
+            except ValueError as error:
+                parser.error(
+                    message="Sink option can't be parsed: {error}".format(error=error)
                 )
 
-            sys.exit(self.DEFAULT_EXIT_CODE)
-
+        if any(
+            [
+                options.icinga_concurrency < 1,
+                options.icinga_retries < 0,
+                options.icinga_queue < 1,
+            ]
+        ):
+            parser.error(
+                message="Icinga 2 API concurrency and queue options values must be positive and retries option value must not be negative"  # noqa: E501
+            )
+        if options.icinga:
+            from check_hddtemp_sinks import IcingaSink  # pylint: disable=C0415
+
+            try:
+                options.icinga = IcingaSink(  # type: ignore
+                    url=options.icinga,
+                    user=options.icinga_user,
+                    password=options.icinga_password,
+                    service=options.icinga_service,
+                    concurrency=options.icinga_concurrency,
+                    retries=options.icinga_retries,
+                    queue=options.icinga_queue,
+                    ca=options.icinga_ca,
+                )
+            except (ValueError, EnvironmentError) as error:
+                parser.error(
+                    message="Icinga 2 API option can't be parsed: {error}".format(
+                        error=error
+                    )
+                )
+        else:
+            options.icinga = None
+
+        options.breaker = (
+            CircuitBreaker(  # type: ignore
+                path=os.path.join(options.state_dir, CircuitBreaker.FILENAME),
+                threshold=options.breaker_threshold,
+                cooldown=options.breaker_cooldown,
+            )
+            if options.breaker_threshold > 0
+            else None
+        )
+        options.latency = (
+            LatencyTracker(  # type: ignore
+                path=os.path.join(options.state_dir, LatencyTracker.FILENAME),
+                minimum=options.min_timeout,
+                maximum=options.max_timeout,
+            )
+            if options.adaptive_timeout
+            else None
+        )
+        options.addresses = {}  # filled by resolving stage
+        if options.result_cache > 0:
+            from check_hddtemp_state import ResultCache  # pylint: disable=C0415
+
+            options.results = ResultCache(  # type: ignore
+                path=os.path.join(options.state_dir, ResultCache.FILENAME),
+                size=options.result_cache,
+            )
+        else:
+            options.results = None
+        if options.snapshot:
+            from check_hddtemp_state import Snapshot  # pylint: disable=C0415
+
+            options.snapshot = Snapshot(path=options.snapshot)  # type: ignore
+        else:
+            options.snapshot = None
+        if options.board:
+            from check_hddtemp_state import ResultBoard  # pylint: disable=C0415
+
+            options.board = ResultBoard(path=options.board, slots=options.board_slots)  # type: ignore  # noqa: E501
+        else:
+            options.board = None
+        if options.inventory:
+            from check_hddtemp_state import Inventory  # pylint: disable=C0415
+
+            options.inventory = Inventory(  # type: ignore
+                path=os.path.join(options.state_dir, Inventory.FILENAME),
+                hold=options.inventory_hold,
+            )
+        else:
+            options.inventory = None
+        if options.record:
+            from check_hddtemp_state import Capture  # pylint: disable=C0415
+
+            options.capture = Capture(path=options.record)  # type: ignore
+        else:
+            options.capture = None
+
+        # check concurrency options have sane values
+        if options.worst < 0 or options.jobs < 1:
+            parser.error(
+                message="Worst devices count must not be negative and jobs count must be positive"  # noqa: E501
+            )
+
+        # check memory-bounded mode has worst devices to show
+        if all(
+            [
+                options.bounded,
+                not options.worst,
+                options.format != CheckHDDTemp.FORMAT_NDJSON,
+            ]
+        ):
+            parser.error(
+                message="Memory-bounded mode requires worst devices count option value"  # noqa: E501
+            )
+
+        # check timeouts have sane values
+        if min(options.timeout, options.min_timeout) <= 0:
+            parser.error(message="Timeout options values must be positive")
+        if options.min_timeout > options.max_timeout:
+            parser.error(
+                message="Minimum timeout option value must not be greater than maximum timeout option value"  # noqa: E501
+            )
+
+        # check peers comparison options have sane values
+        if any(
+            [
+                min(options.peer_deviation, options.peer_mad) < 0,
+                options.peer_minimum < 2,
+            ]
+        ):
+            parser.error(
+                message="Peer deviation options values must not be negative and peer minimum option value must be at least 2"  # noqa: E501
+            )
+        # NumPy is slow to import, so it's imported only for peers comparison
+        options.numpy = None
+        if options.peer_deviation or options.peer_mad:
+            try:
+                options.numpy = importlib.import_module("numpy")
+            except ImportError:
+                pass
+
+        # check result board has slots
+        if options.board_slots < 1:
+            parser.error(message="Result board slots count must be positive")
+
+        # check output limit has sane value
+        if options.output_limit < 0:
+            parser.error(message="Output limit option value must not be negative")
+
+        # check separator can split server response
+        if not options.separator:
+            parser.error(message="Separator option value must not be empty")
+
+        # check if waning temperature in args less than critical
+        if options.warning >= options.critical:
+            parser.error(
+                message="Warning temperature option value must be less than critical option value"  # noqa: E501
+            )
+
+        try:
+            options.model_thresholds = CheckHDDTemp._get_model_thresholds(  # type: ignore  # noqa: E501
+                rules=options.model_thresholds
+            )
+        except ValueError as error:
+            parser.error(
+                message="Model threshold option can't be parsed: {error}".format(
+                    error=error
+                )
+            )
+
+        return options
+
+    @staticmethod
+    def _get_model_thresholds(rules):
+        """
+        Split model threshold options to models patterns and thresholds.
+
+        :param rules: model threshold options (PATTERN:WARNING:CRITICAL)
+        :type rules: List[str]
+        :return: models patterns with warning and critical temperatures
+        :rtype: List[Tuple[str, int, int]]
+        :raises ValueError: model threshold option can't be parsed
+        """
+
+        result = []
+
+        for rule in rules:
+            parts = rule.rsplit(":", 2)
+            if len(parts) != 3 or not parts[0]:
+                raise ValueError(
+                    "{rule} is not PATTERN:WARNING:CRITICAL".format(rule=rule)
+                )
+            pattern, warning, critical = parts[0], int(parts[1]), int(parts[2])
+            if warning >= critical:
+                raise ValueError(
+                    "{rule} warning temperature must be less than critical".format(
+                        rule=rule
+                    )
+                )
+            result.append((pattern, warning, critical))
+
+        return result
+
+    @staticmethod
+    def _get_servers(servers, port):
+        """
+        Split servers option to servers list.
+
+        :param servers: comma separated servers list (SERVER[:PORT])
+        :type servers: str
+        :param port: default port number
+        :type port: int
+        :return: servers list with labels, addresses and ports
+        :rtype: List[Tuple[str, str, int]]
+        :raises ValueError: port number can't be parsed
+        """
+
+        result = []
+
+        for label in [server.strip() for server in servers.split(",")]:
+            if not label:
+                continue
+            host, server_port = label, port
+            if label.startswith("["):  # IPv6 address in brackets
+                host, _, tail = label[1:].partition("]")
+                if tail.startswith(":"):
+                    server_port = int(tail[1:])
+            elif label.count(":") == 1:
+                host, server_port = label.split(":")
+                server_port = int(server_port)
+            result.append((label, host, server_port))
+
+        if not result:
+            raise ValueError("empty servers list")
+
+        return result
+
+    def _fetch(self, server, port):
+        """
+        Get and return data from result board or devices data source.
+
+        :param server: server name or address
+        :type server: str
+        :param port: port number
+        :type port: int
+        :return: data in hddtemp server response format
+        :rtype: str
+        """
+
+        board = self.options.board
+
+        if board is None:
+            return self._fetch_source(server=server, port=port)  # type: ignore
+
+        response = board.get(server=server, port=port, age=self.options.board_age)
+
+        if response is None:  # missing, stale or torn
+            response = self._fetch_source(server=server, port=port)  # type: ignore
+            board.put(server=server, port=port, response=response)
+
+        return response
+
+    def _fetch_source(self, server, port):
+        """
+        Get and return data from devices data source.
+
+        :param server: server name or address
+        :type server: str
+        :param port: port number
+        :type port: int
+        :return: data in hddtemp server response format
+        :rtype: str
+        """
+
+        breaker = self.options.breaker
+
+        if breaker is None and self.options.latency is None:
+            return self.options.source.fetch(server=server, port=port)
+        if breaker is not None:
+            breaker.allow(server=server, port=port)
+
+        started = time.time()
+
+        try:
+            response = self.options.source.fetch(server=server, port=port)
+        except (EOFError, socket.error) as error:
+            self._observe(server=server, port=port, started=started, error=error)  # type: ignore  # noqa: E501
+
+            raise
+
+        self._observe(server=server, port=port, started=started)  # type: ignore
+
+        return response
+
+    def _observe(self, server, port, started, error=None):
+        """
+        Feed server fetching outcome to circuit breaker and latency tracker.
+
+        :param server: server name or address
+        :type server: str
+        :param port: port number
+        :type port: int
+        :param started: fetching start time
+        :type started: float
+        :param error: fetching error, or None on success
+        :type error: Optional[Exception]
+        """
+
+        breaker, latency = self.options.breaker, self.options.latency
+
+        if breaker is not None:
+            if error is None:
+                breaker.success(server=server, port=port)
+            else:
+                breaker.failure(server=server, port=port)
+        if latency is not None:
+            latency.observe(
+                server=server,
+                port=port,
+                latency=time.time() - started,
+                timeout=isinstance(error, socket.timeout),
+            )
+
+    def _iter_fetch(self, server, port):
+        """
+        Get and yield data from devices data source by chunks.
+
+        :param server: server name or address
+        :type server: str
+        :param port: port number
+        :type port: int
+        :return: data in hddtemp server response format chunks
+        :rtype: Iterator[str]
+        """
+
+        if self.options.breaker is None and self.options.latency is None:
+            return self.options.source.iter_fetch(server=server, port=port)
+
+        return self._iter_fetch_guarded(server=server, port=port)  # type: ignore
+
+    def _iter_fetch_guarded(self, server, port):
+        """
+        Get and yield data from devices data source by chunks observing outcome.
+
+        :param server: server name or address
+        :type server: str
+        :param port: port number
+        :type port: int
+        :return: data in hddtemp server response format chunks
+        :rtype: Iterator[str]
+        """
+
+        if self.options.breaker is not None:
+            self.options.breaker.allow(server=server, port=port)
+
+        started = time.time()
+
+        try:
+            for chunk in self.options.source.iter_fetch(server=server, port=port):
+                yield chunk
+        except (EOFError, socket.error) as error:
+            self._observe(server=server, port=port, started=started, error=error)  # type: ignore  # noqa: E501
+
+            raise
+
+        self._observe(server=server, port=port, started=started)  # type: ignore
+
+    def _get_data(self):
+        """
+        Get and return data from hddtemp server.
+
+        :return: data from hddtemp server
+        :rtype: str
+        """
+
+        label, server, port = self.options.servers[0]
+
+        try:
+            response = self._fetch(server=server, port=port)  # type: ignore
+        # decoding errors are value errors too, as sources options errors are
+        except (EOFError, socket.error, ValueError) as error:
+            if not self.options.quiet:
+                sys.stdout.write(
+                    "ERROR: Server communication problem. {error}\n".format(error=error)
+                )
+            # failure is already fed to circuit breaker and latency tracker
+            for state in [self.options.breaker, self.options.latency]:
+                if state is not None:
+                    state.save()
+
+            sys.exit(self.DEFAULT_EXIT_CODE)
+
+        if self.options.capture is not None:
+            self.options.capture.add(host=label, response=response)
+
+        return response
+
+    def _parse(self, data):
+        """
+        Search for device and get HDD info from server response.
+
+        :param data: hddtemp server response
+        :type data: str
+        :return: structured data parsed from hddtemp server response
+        :rtype: Dict[str, Dict[str, str]]
+        :raises ValueError: server response can't be parsed
+        """
+
+        data = data.split(self.options.separator * 2)
+
+        if data == [""]:
+            raise ValueError("Server response too short")
+
+        info = {}
+
+        for dev, device in self._iter_parsed(records=data):  # type: ignore
+            # malformed record name is not reliable, so it can't replace valid one
+            if dev not in info or "error" not in device:
+                info[dev] = device
+
+        return info
+
+    def _iter_records(self, chunks):
+        """
+        Split server response chunks to devices records.
+
+        :param chunks: hddtemp server response chunks
+        :type chunks: Iterable[str]
+        :return: devices records
+        :rtype: Iterator[str]
+        :raises ValueError: server response can't be split to devices records
+        """
+
+        separator = self.options.separator * 2
+        tail, count = "", 0
+
+        for chunk in chunks:
+            records = (tail + chunk).split(separator)
+            tail = records.pop()  # incomplete record, wait for next chunk
+            if len(tail) > self.RECORD_SIZE_MAX:
+                raise ValueError("Server response device record too long")
+            for record in records:
+                count += 1
+
+                yield record
+
+        if not (tail or count):
+            raise ValueError("Server response too short")
+
+        yield tail
+
+    def _parse_record(self, record):
+        """
+        Get HDD info from single device record of server response.
+
+        :param record: device record of hddtemp server response
+        :type record: str
+        :return: device name and device info
+        :rtype: Tuple[str, Dict[str, str]]
+        :raises ValueError: device record can't be parsed
+        """
+
+        device = record.strip(self.options.separator).split(self.options.separator)
+
+        if len(device) != 4:  # 4 data items in server response for device
+            raise ValueError(
+                "Server response for device '{dev}' parsing error".format(dev=device)
+            )
+        dev, model, temperature, scale = device
+
+        return dev, {"model": model, "temperature": temperature, "scale": scale}
+
+    def _iter_parsed(self, records):
+        """
+        Parse devices records.
+
+        In tolerant mode malformed record is yielded as device info with parsing
+        error named by record first data item, empty records are skipped.
+
+        :param records: devices records of hddtemp server response
+        :type records: Iterable[str]
+        :return: device name and device info
+        :rtype: Iterator[Tuple[str, Dict[str, str]]]
+        :raises ValueError: device record can't be parsed or no valid records found
+        """
+
+        separator = self.options.separator
+        count = 0
+
+        for record in records:
+            try:
+                dev, device = self._parse_record(record=record)  # type: ignore
+            except ValueError:
+                if not self.options.tolerant:
+                    raise
+                items = record.strip(separator).split(separator)
+                if not items[0]:
+                    continue
+                dev, device = items[0], {
+                    "error": "{count} data items instead of 4".format(count=len(items))
+                }
+            else:
+                count += 1
+
+            yield dev, device
+
+        if not count:
+            raise ValueError("Server response has no valid devices records")
+
+    @staticmethod
+    def _get_fingerprint(response):
+        """
+        Create cheap non-cryptographic server response fingerprint.
+
+        Response length is mixed into checksum to make collisions less likely.
+
+        :param response: hddtemp server response
+        :type response: str
+        :return: server response fingerprint
+        :rtype: int
+        """
+
+        data = response.encode("utf8")
+
+        return len(data) << 32 | zlib.crc32(data) & 0xFFFFFFFF
+
     def _parse_data(self, data):
         """
-        Search for device and get HDD info from server response.
+        Search for device and get HDD info from server response.
+
+        :param data: hddtemp server response
+        :type data: str
+        :return: structured data parsed from hddtemp server response
+        :rtype: Dict[str, Dict[str, str]]
+        """
+
+        try:
+
+            return self._parse(data=data)  # type: ignore
+
+        except ValueError as error:
+            if not self.options.quiet:
+                sys.stdout.write("ERROR: {error}\n".format(error=error))
+
+            sys.exit(self.DEFAULT_EXIT_CODE)
+
+    def _check_data(self, data):
+        """
+        Create devices states info.
+
+        :param data: structured data parsed from hddtemp server response
+        :type data: Dict[str, Dict[str, str]]
+        :return: devices states info
+        :rtype: Dict[str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]
+        """
+
+        states = {}
+        devices = (
+            map(lambda dev: dev.strip(), self.options.devices.strip().split(","))
+            if self.options.devices
+            else data.keys()
+        )
+
+        for device in devices:
+            if device:  # not empty string
+                states.update(
+                    {
+                        device: self._get_device_state(  # type: ignore
+                            device=device, info=data.get(device)
+                        )
+                    }
+                )
+
+        return self._check_peers(data=data, states=states)  # type: ignore
+
+    def _check_peers(self, data, states):
+        """
+        Report devices with temperature deviating from server devices median.
+
+        All server devices are compared with each other, even if devices
+        subset is requested, only ok devices states are replaced.
+
+        :param data: structured data parsed from hddtemp server response
+        :type data: Dict[str, Dict[str, str]]
+        :param states: devices states info
+        :type states: Dict[str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]  # noqa: E501
+        :return: devices states info with peers deviations
+        :rtype: Dict[str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]
+        """
+
+        if not (self.options.peer_deviation or self.options.peer_mad):
+            return states
+
+        scales = {}  # type: ignore
+
+        for device, info in data.items():
+            if "error" not in info and info["temperature"].isdigit():
+                devices, temperatures = scales.setdefault(info["scale"], ([], []))
+                devices.append(device)
+                temperatures.append(int(info["temperature"]))
+
+        for devices, temperatures in scales.values():
+            if len(devices) < self.options.peer_minimum:
+                continue
+            median, deviations, outliers = self._get_peer_outliers(  # type: ignore
+                temperatures=temperatures
+            )
+            for device, deviation, outlier in zip(devices, deviations, outliers):
+                state = states.get(device)
+                if not outlier or state is None:
+                    continue
+                if state["template"] != self.STATUS_OK:  # already reported
+                    continue
+                info = dict(state["data"])
+                info.update({"median": median, "deviation": deviation})
+                states[device] = {
+                    "template": self.TEMPLATE_PEER,
+                    "priority": self.OUTPUT_TEMPLATES[self.TEMPLATE_PEER]["priority"],
+                    "data": info,
+                }
+
+        return states
+
+    def _get_peer_outliers(self, temperatures):
+        """
+        Find temperatures deviating from their median, vectorized if possible.
+
+        :param temperatures: server devices temperatures
+        :type temperatures: List[int]
+        :return: median, absolute deviations from median and outliers flags
+        :rtype: Tuple[float, List[float], List[bool]]
+        """
+
+        numpy = self.options.numpy
+
+        if numpy is not None:
+            values = numpy.array(temperatures, dtype=float)
+            median = numpy.median(values)
+            deviations = numpy.abs(values - median)
+            limit = self._get_peer_limit(mad=float(numpy.median(deviations)))  # type: ignore  # noqa: E501
+
+            return float(median), deviations.tolist(), (deviations > limit).tolist()
+
+        median = self._get_median(values=temperatures)  # type: ignore
+        deviations = [abs(value - median) for value in temperatures]
+        limit = self._get_peer_limit(mad=self._get_median(values=deviations))  # type: ignore  # noqa: E501
+
+        return median, deviations, [deviation > limit for deviation in deviations]
+
+    @staticmethod
+    def _get_median(values):
+        """
+        Get values median.
+
+        :param values: values
+        :type values: List[Union[int, float]]
+        :return: median
+        :rtype: float
+        """
+
+        ordered = sorted(values)
+        middle = len(ordered) // 2
+
+        if len(ordered) % 2:
+            return float(ordered[middle])
+
+        return (ordered[middle - 1] + ordered[middle]) / 2.0
+
+    def _get_peer_limit(self, mad):
+        """
+        Get maximum allowed deviation from median.
+
+        :param mad: median absolute deviation
+        :type mad: float
+        :return: maximum allowed deviation
+        :rtype: float
+        """
+
+        limits = []
+
+        if self.options.peer_deviation:
+            limits.append(self.options.peer_deviation)
+        if self.options.peer_mad:
+            limits.append(self.options.peer_mad * max(mad, self.PEER_MAD_MIN))
+
+        return min(limits)
+
+    def _get_device_state(self, device, info):
+        """
+        Create device state info.
+
+        :param device: device name
+        :type device: str
+        :param info: device info parsed from hddtemp server response, or None
+        :type info: Optional[Dict[str, str]]
+        :return: device state info
+        :rtype: Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]
+        """
+
+        if info is None:  # device not found in hddtemp response
+            return {
+                "template": self.STATUS_UNKNOWN,
+                "priority": self.OUTPUT_TEMPLATES[self.STATUS_UNKNOWN]["priority"],
+                "data": {
+                    "device": device,
+                    "temperature": None,
+                    "scale": None,
+                    "warning": self.options.warning,
+                    "critical": self.options.critical,
+                },
+            }
+        if "error" in info:  # malformed device record in tolerant mode
+            return {
+                "template": self.TEMPLATE_MALFORMED,
+                "priority": self.OUTPUT_TEMPLATES[self.TEMPLATE_MALFORMED]["priority"],
+                "data": {
+                    "device": device,
+                    "temperature": None,
+                    "scale": None,
+                    "warning": self.options.warning,
+                    "critical": self.options.critical,
+                    "error": info["error"],
+                },
+            }
+
+        # checking temperature
+        # sometime getting "SLP" or "UNK" instead of temperature
+        try:
+            temperature = int(info["temperature"])
+        except ValueError:
+            temperature = info["temperature"]
+
+        warning, critical = self._get_thresholds(model=info.get("model"))  # type: ignore  # noqa: E501
+
+        if temperature == self.HDDTEMP_SLEEPING:  # type: ignore
+            template = self.STATUS_SLEEPING
+        elif temperature == self.HDDTEMP_UNKNOWN:  # type: ignore
+            template = self.STATUS_UNKNOWN
+        elif temperature > critical:
+            template = self.STATUS_CRITICAL
+        elif all(
+            [
+                temperature > warning,
+                temperature < critical,
+            ]
+        ):
+            template = self.STATUS_WARNING
+        else:
+            template = self.STATUS_OK
+
+        return {
+            "template": template,
+            "priority": self.OUTPUT_TEMPLATES[template]["priority"],
+            "data": {
+                "device": device,
+                "temperature": temperature,
+                "scale": info["scale"],
+                "warning": warning,
+                "critical": critical,
+            },
+        }
+
+    def _get_thresholds(self, model):
+        """
+        Get device warning and critical temperatures by its model.
+
+        :param model: device model, or None if unknown
+        :type model: Optional[str]
+        :return: warning and critical temperatures
+        :rtype: Tuple[int, int]
+        """
+
+        if model is not None:
+            for pattern, warning, critical in self.options.model_thresholds:
+                if fnmatch.fnmatchcase(model, pattern):
+                    return warning, critical
+
+        return self.options.warning, self.options.critical
+
+    def _get_status(self, data):
+        """
+        Create main status.
+
+        :param data: devices states info
+        :type data: Dict[str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]  # noqa: E501
+        :return: main check status
+        :rtype: str
+        """
+
+        # for multiple check need to get main status by priority
+        priority = min(  # noqa: C407
+            [info["priority"] for device, info in data.items()]
+        )
+        status = self.PRIORITY_TO_STATUS.get(priority, self.PRIORITY_CRITICAL)
+
+        return status
+
+    def _get_code(self, status):
+        """
+        Create exit code.
+
+        :param status: main check status
+        :type status: str
+        :return: exit code
+        :rtype: int
+        """
+
+        return self.EXIT_CODES.get(status, self.DEFAULT_EXIT_CODE)
+
+    def _set_code(self, status):
+        """
+        Set exit code and finish check stage timing.
+
+        :param status: main check status
+        :type status: str
+        """
+
+        self.code = self._get_code(status=status)  # type: ignore
+        self.timings["check"] = time.time() - self.started
+
+    def _get_timings(self):
+        """
+        Create check stages timings suitable for serialization.
+
+        :return: check stages names and durations in seconds
+        :rtype: Dict[str, float]
+        """
+
+        return OrderedDict(
+            [(stage, round(seconds, 6)) for stage, seconds in self.timings.items()]
+        )
+
+    def _get_performance_timings(self):
+        """
+        Create check stages timings performance data if requested.
+
+        :return: check stages timings performance data
+        :rtype: List[str]
+        """
+
+        if not self.options.timings:
+            return []
+
+        return [
+            self.TIMING_TEMPLATE.format(stage=stage, seconds=seconds)
+            for stage, seconds in self.timings.items()
+        ]
+
+    def _resolve(self):
+        """
+        Resolve all servers names concurrently before checking them.
+        """
+
+        from check_hddtemp_state import Resolver  # pylint: disable=C0415
+
+        started = time.time()
+        resolver = Resolver(  # type: ignore
+            path=os.path.join(self.options.state_dir, Resolver.FILENAME),
+            ttl=self.options.dns_ttl,
+            jobs=self.options.jobs,
+        )
+        self.options.addresses = resolver.resolve(  # type: ignore
+            servers=[(host, port) for _, host, port in self.options.servers]
+        )
+        self.timings["resolve"] = time.time() - started
+
+    def _get_output(self, data, status):
+        """
+        Create plugin output in requested format.
+
+        :param data: devices states info
+        :type data: Dict[str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]  # noqa: E501
+        :param status: main check status
+        :type status: str
+        :return: plugin output
+        :rtype: str
+        """
+
+        return "".join(self._iter_output(data=data, status=status))  # type: ignore
+
+    def _iter_output(self, data, status):
+        """
+        Yield plugin output chunks in requested format.
+
+        :param data: devices states info
+        :type data: Dict[str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]  # noqa: E501
+        :param status: main check status
+        :type status: str
+        :return: plugin output chunks
+        :rtype: Iterator[str]
+        """
+
+        if self.options.format == self.FORMAT_JSON:
+            yield self._get_output_json(data=data, status=status)  # type: ignore
+        elif self.options.format == self.FORMAT_NDJSON:
+            lines = self._iter_output_ndjson(data=data, status=status)  # type: ignore
+            for line in lines:
+                yield line
+        else:
+            yield self._get_output_text(data=data, status=status)  # type: ignore
+
+    def _get_output_text(self, data, status):
+        """
+        Create human readable HDD's statuses.
+
+        :param data: devices states info
+        :type data: Dict[str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]  # noqa: E501
+        :param status: main check status
+        :type status: str
+        :return: human readable HDD's statuses
+        :rtype: str
+        """
+
+        # sort devices data by priority
+        data = OrderedDict(
+            sorted(data.items(), key=lambda item: (item[1]["priority"], item[0]))
+        )
+
+        # create output
+        devices = [self._get_text(info=data[device]) for device in data.keys()]  # type: ignore  # noqa: E501
+
+        if not self.options.performance:
+            performance = []
+        elif self.options.performance_format == self.PERFORMANCE_SUMMARY:
+            statistics = OrderedDict()  # type: ignore
+            for info in data.values():
+                self._add_statistics(  # type: ignore
+                    statistics=statistics, host=self.options.servers[0][0], info=info
+                )
+            performance = self._get_performance_summary(statistics=statistics)  # type: ignore  # noqa: E501
+        else:
+            performance = [
+                self._get_performance(info=data[device])  # type: ignore
+                for device in data.keys()
+            ]
+
+        # create full status string with main status for multiple devices
+        # and all devices states with performance data (optional)
+        return self._get_limited(  # type: ignore
+            head="{status}: ".format(status=status.upper()),
+            texts=devices,
+            performance=performance + self._get_performance_timings(),  # type: ignore  # noqa: E501
+        )
+
+    def _get_limited(self, head, texts, performance):
+        """
+        Join text output fragments keeping output within output limit.
+
+        Performance data items are dropped first, then devices texts,
+        so output keeps most important devices. Fragments are ordered
+        from most to least important.
+
+        :param head: main status and summary
+        :type head: str
+        :param texts: devices states human readable texts
+        :type texts: List[str]
+        :param performance: performance data items
+        :type performance: List[str]
+        :return: text output
+        :rtype: str
+        """
+
+        separator = (
+            "; " if self.options.performance_format == self.PERFORMANCE_PLAIN else " "
+        )
+        text = "{head}{texts}".format(head=head, texts=", ".join(texts))
+        limit = self.options.output_limit
+
+        if not limit:
+            kept = performance
+        else:
+            kept, used = [], len(text.encode("utf8")) + len(" | \n")
+            for item in performance:
+                used += len(item.encode("utf8")) + (len(separator) if kept else 0)
+                if used > limit:
+                    break
+                kept.append(item)
+
+        if kept:
+            return "{text} | {performance}\n".format(
+                text=text, performance=separator.join(kept)
+            )
+        if not limit or len(text.encode("utf8")) < limit:
+            return "{text}\n".format(text=text)
+
+        # devices texts are dropped with reserve for truncation marker
+        reserve = len(self.TRUNCATED_TEMPLATE.format(count=len(texts))) + 3
+        text, used = head, len(head.encode("utf8"))
+
+        for index, fragment in enumerate(texts):
+            fragment = "{separator}{text}".format(
+                separator=", " if index else "", text=fragment
+            )
+            used += len(fragment.encode("utf8"))
+            if used + reserve > limit:
+                text += "{separator}{truncated}".format(
+                    separator=", " if index else "",
+                    truncated=self.TRUNCATED_TEMPLATE.format(count=len(texts) - index),
+                )
+                break
+            text += fragment
+
+        return "{text}\n".format(
+            text=text.encode("utf8")[: limit - 1].decode("utf8", "ignore")
+        )
+
+    def _get_text(self, info):
+        """
+        Get device state human readable text, rendered before or fresh.
+
+        :param info: device state info
+        :type info: Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]
+        :return: device state human readable text
+        :rtype: str
+        """
+
+        if "text" in info:
+            return info["text"]
+
+        return str(self.OUTPUT_TEMPLATES[info["template"]]["text"]).format(
+            **info["data"]
+        )
+
+    def _get_performance(self, info):
+        """
+        Get device state performance data, rendered before or fresh.
+
+        :param info: device state info
+        :type info: Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]
+        :return: device state performance data
+        :rtype: str
+        """
+
+        if "performance" in info:
+            return info["performance"]
+
+        data = info["data"]
+
+        if self.options.performance_format == self.PERFORMANCE_PLAIN:
+            # aggregated servers devices names collide without server label
+            return self.PERFORMANCE_DATA_TEMPLATE.format(
+                device=(
+                    data["device"]
+                    if data.get("host") is None
+                    else self.PERFORMANCE_LABEL_TEMPLATE.format(
+                        host=data["host"], name=data["device"]
+                    )
+                ),
+                temperature=data["temperature"],
+            )
+
+        return self._get_performance_item(  # type: ignore
+            label=self._get_performance_label(  # type: ignore
+                host=data.get("host"), name=data["device"]
+            ),
+            value=data["temperature"],
+            warning=data["warning"],
+            critical=data["critical"],
+        )
+
+    def _get_performance_label(self, host, name):
+        """
+        Create Nagios performance data label qualified by server label.
+
+        :param host: server label, or None for single server check
+        :type host: Optional[str]
+        :param name: device name or summary value name
+        :type name: str
+        :return: performance data label, quoted if required
+        :rtype: str
+        """
+
+        label = (
+            name
+            if host is None
+            else self.PERFORMANCE_LABEL_TEMPLATE.format(host=host, name=name)
+        )
+
+        if any(char in label for char in " '="):
+            return "'{label}'".format(label=label.replace("'", "''"))
+
+        return label
+
+    def _get_performance_item(self, label, value, warning, critical):
+        """
+        Create Nagios performance data item.
+
+        :param label: performance data label
+        :type label: str
+        :param value: temperature, None or not numeric if unknown
+        :type value: Union[None, int, float, str]
+        :param warning: warning temperature
+        :type warning: int
+        :param critical: critical temperature
+        :type critical: int
+        :return: performance data item
+        :rtype: str
+        """
+
+        if isinstance(value, float):
+            value = "{value:.1f}".format(value=value)
+        elif not isinstance(value, int):
+            value = self.PERFORMANCE_UNKNOWN
+
+        return self.NAGIOS_PERFORMANCE_DATA_TEMPLATE.format(
+            label=label, value=value, warning=warning, critical=critical
+        )
+
+    @staticmethod
+    def _add_statistics(statistics, host, info):
+        """
+        Count device temperature in server temperatures statistics.
+
+        Devices may have own model thresholds, so minimum and maximum temperatures
+        keep thresholds of their devices and average one keeps the lowest of them.
+
+        :param statistics: servers temperatures minimum, maximum, total, count and minimum, maximum and average temperatures thresholds
+        :type statistics: Dict[str, List[Any]]
+        :param host: server label
+        :type host: str
+        :param info: device state info
+        :type info: Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]
+        """  # noqa: E501
+
+        values = statistics.setdefault(host, [None, None, 0, 0, None, None, None])
+        data = info["data"]
+        temperature = data["temperature"]
+        thresholds = (data["warning"], data["critical"])
+
+        if isinstance(temperature, int):  # skip sleeping and unknown devices
+            if values[3] == 0 or temperature < values[0]:
+                values[0], values[4] = temperature, thresholds
+            if values[3] == 0 or temperature > values[1]:
+                values[1], values[5] = temperature, thresholds
+            values[6] = (
+                thresholds
+                if values[3] == 0
+                else (
+                    min(values[6][0], thresholds[0]),
+                    min(values[6][1], thresholds[1]),
+                )
+            )
+            values[2] += temperature
+            values[3] += 1
+
+    def _get_performance_summary(self, statistics):
+        """
+        Create servers minimum, average and maximum temperatures performance data.
+
+        :param statistics: servers temperatures minimum, maximum, total, count and minimum, maximum and average temperatures thresholds
+        :type statistics: Dict[str, List[Any]]
+        :return: performance data items
+        :rtype: List[str]
+        """  # noqa: E501
+
+        performance = []
+        default = (self.options.warning, self.options.critical)
+
+        for host in sorted(statistics.keys()):
+            low, high, total, count, lows, highs, averages = statistics[host]
+            for name, value, (warning, critical) in [
+                ("min", low, lows or default),
+                ("avg", float(total) / count if count else None, averages or default),
+                ("max", high, highs or default),
+            ]:
+                performance.append(
+                    self._get_performance_item(  # type: ignore
+                        label=self._get_performance_label(host=host, name=name),  # type: ignore  # noqa: E501
+                        value=value,
+                        warning=warning,
+                        critical=critical,
+                    )
+                )
+
+        return performance
+
+    def _render(self, info):
+        """
+        Add rendered human readable text and performance data to device state.
+
+        :param info: device state info
+        :type info: Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]
+        :return: device state info with rendered output fragments
+        :rtype: Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]
+        """
+
+        info["text"] = self._get_text(info=info)  # type: ignore
+        info["performance"] = self._get_performance(info=info)  # type: ignore
+
+        return info
+
+    def _check_cached(self, response, label=None, data=None):
+        """
+        Parse server response and check it reusing cached devices states.
+
+        All response devices states are cached with rendered output fragments,
+        so checks with other devices subset and same thresholds reuse them.
+        Server response is parsed only if it isn't parsed yet and its devices
+        states aren't cached.
+
+        :param response: hddtemp server response
+        :type response: str
+        :param label: server label in aggregated mode, or None for single server check
+        :type label: Optional[str]
+        :param data: structured data parsed from server response, or None
+        :type data: Optional[Dict[str, Dict[str, str]]]
+        :return: devices states info
+        :rtype: Dict[str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]
+        :raises ValueError: server response can't be parsed in aggregated mode
+        """
+
+        def parse():
+            """
+            Get structured data parsed from server response.
+
+            :return: structured data parsed from hddtemp server response
+            :rtype: Dict[str, Dict[str, str]]
+            """
+
+            if data is not None:
+                return data
+            if label is None:  # single server check exits on parsing error
+                return self._parse_data(data=response)  # type: ignore
+
+            return self._parse(data=response)  # type: ignore
+
+        cache = self.options.results
+
+        if cache is None:
+            return self._check_data(data=parse())  # type: ignore
+
+        key = cache.get_key(
+            fingerprint=self._get_fingerprint(response=response),  # type: ignore
+            options=self.options,
+            host=label,
+        )
+        cached = cache.get(key=key)
+
+        if cached is None:
+            parsed = parse()  # type: ignore
+            states = self._check_peers(  # type: ignore
+                data=parsed,
+                states={
+                    device: self._get_device_state(device=device, info=info)  # type: ignore  # noqa: E501
+                    for device, info in parsed.items()
+                },
+            )
+            if label is not None:  # rendered performance data is qualified by it
+                for info in states.values():
+                    info["data"]["host"] = label
+            cached = {
+                device: self._render(info=info)  # type: ignore
+                for device, info in states.items()
+            }
+            cache.put(key=key, states=cached)
+
+        if not self.options.devices:
+            return cached
+
+        states = {}
+
+        for device in [dev.strip() for dev in self.options.devices.strip().split(",")]:
+            if device in cached:
+                states[device] = cached[device]
+            elif device:  # not empty string
+                states[device] = self._get_device_state(device=device, info=None)  # type: ignore  # noqa: E501
+
+        return states
+
+    def _get_record(self, info):
+        """
+        Create device state record suitable for serialization.
+
+        :param info: device state info
+        :type info: Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]
+        :return: device state record
+        :rtype: Dict[str, Union[None, int, str]]
+        """
+
+        record = {
+            "template": info["template"],
+            "status": self.PRIORITY_TO_STATUS.get(
+                info["priority"], self.STATUS_CRITICAL
+            ),
+            "priority": info["priority"],
+        }
+        record.update(info["data"])
+
+        return record
+
+    def _get_output_json(self, data, status):
+        """
+        Create JSON document with main status, exit code and devices states.
+
+        :param data: devices states info
+        :type data: Dict[str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]  # noqa: E501
+        :param status: main check status
+        :type status: str
+        :return: JSON document
+        :rtype: str
+        """
+
+        document = {
+            "status": status,
+            "code": self._get_code(status=status),  # type: ignore
+            "devices": [
+                self._get_record(info=data[device])  # type: ignore
+                for device in sorted(
+                    data.keys(),
+                    key=lambda device: (data[device]["priority"], device),
+                )
+            ],
+        }
+        if self.options.timings:
+            document["timings"] = self._get_timings()  # type: ignore
+
+        return "{document}\n".format(document=json_dumps(document))  # type: ignore
+
+    def _iter_output_ndjson(self, data, status):
+        """
+        Yield one JSON document per device line and the main status line.
+
+        :param data: devices states info
+        :type data: Dict[str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]  # noqa: E501
+        :param status: main check status
+        :type status: str
+        :return: JSON lines
+        :rtype: Iterator[str]
+        """
+
+        for device in sorted(
+            data.keys(), key=lambda device: (data[device]["priority"], device)
+        ):
+            record = self._get_record(info=data[device])  # type: ignore
+            record.update({"type": "device"})
+
+            yield "{document}\n".format(document=json_dumps(record))  # type: ignore
+
+        document = {
+            "type": "status",
+            "status": status,
+            "code": self._get_code(status=status),  # type: ignore
+        }
+        if self.options.timings:
+            document["timings"] = self._get_timings()  # type: ignore
+
+        yield "{document}\n".format(document=json_dumps(document))  # type: ignore
+
+    def _get_error_states(self, label, error):
+        """
+        Create server error state info.
+
+        :param label: server label
+        :type label: str
+        :param error: server communication or response parsing error
+        :type error: Exception
+        :return: devices states info with single server error state
+        :rtype: Dict[str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]
+        """
+
+        return {
+            "": {
+                "template": self.TEMPLATE_ERROR,
+                "priority": self.OUTPUT_TEMPLATES[self.TEMPLATE_ERROR]["priority"],
+                "data": {
+                    "device": "",
+                    "temperature": None,
+                    "scale": None,
+                    "warning": self.options.warning,
+                    "critical": self.options.critical,
+                    "error": str(error) or error.__class__.__name__,
+                    "host": label,
+                },
+            }
+        }
+
+    def _check_response(self, label, response):
+        """
+        Parse server response and check it.
+
+        :param label: server label
+        :type label: str
+        :param response: hddtemp server response
+        :type response: str
+        :return: devices states info
+        :rtype: Dict[str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]
+        """
+
+        # inventory needs parsed response even if its devices states are cached
+        parse = self.options.results is None or self.options.inventory is not None
+
+        try:
+            parsed = self._parse(data=response) if parse else None  # type: ignore
+            data = self._check_cached(  # type: ignore
+                response=response, label=label, data=parsed
+            )
+        except ValueError as error:
+            return self._get_error_states(label=label, error=error)  # type: ignore
+
+        if self.options.inventory is not None:
+            data = self._check_inventory(label=label, data=parsed, states=data)  # type: ignore  # noqa: E501
+
+        for info in data.values():
+            info["data"]["host"] = label
+
+        return data
+
+    def _check_inventory(self, label, data, states):
+        """
+        Update server devices inventory and report devices changes.
+
+        During inventory hold time device change is reported instead of ok,
+        sleeping or unknown device state. Removed devices missing in devices
+        states are reported only if devices subset isn't requested.
+
+        :param label: server label
+        :type label: str
+        :param data: structured data parsed from hddtemp server response
+        :type data: Dict[str, Dict[str, str]]
+        :param states: devices states info
+        :type states: Dict[str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]  # noqa: E501
+        :return: devices states info with devices changes
+        :rtype: Dict[str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]
+        """
+
+        changes = self.options.inventory.update(
+            host=label,
+            models={
+                device: info["model"]
+                for device, info in data.items()
+                if "error" not in info
+            },
+            # malformed records keep their devices from being reported removed
+            seen=[device for device, info in data.items() if "error" in info],
+        )
+        states = dict(states)  # cached devices states must be kept intact
+
+        for device, (template, model, previous) in changes.items():
+            state = states.get(device)
+            if state is None and self.options.devices:  # not requested
+                continue
+            if state is not None and state["template"] not in self.INVENTORY_OVERRIDES:
+                continue
+            if state is None:
+                state = self._get_device_state(device=device, info=None)  # type: ignore  # noqa: E501
+            info = dict(state["data"])
+            info.update({"model": model, "previous": previous})
+            states[device] = {
+                "template": template,
+                "priority": self.OUTPUT_TEMPLATES[template]["priority"],
+                "data": info,
+            }
+
+        return states
+
+    def _check_snapshot(self, label):
+        """
+        Check server devices found in collector snapshot.
+
+        Devices states are evaluated again with current thresholds. Snapshot
+        doesn't keep devices models, so server is checked directly when model
+        thresholds or inventory are used.
+
+        :param label: server label
+        :type label: str
+        :return: devices states info, or None if server isn't in fresh snapshot
+        :rtype: Optional[Dict[str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]]  # noqa: E501
+        """
+
+        if self.options.model_thresholds or self.options.inventory is not None:
+            return None
+
+        snapshot = self.options.snapshot
+
+        try:
+            states = snapshot.get(label=label)
+        except (EnvironmentError, ValueError, struct.error):  # missing or broken
+            return None
+
+        if states is None or "" in states:  # not polled or polling failed
+            return None
+        if self.options.snapshot_age and (
+            time.time() - snapshot.timestamp > self.options.snapshot_age
+        ):
+            return None
+
+        data = {}
+
+        for device, info in states.items():
+            if "error" in info["data"]:
+                data[device] = {"error": info["data"]["error"]}
+            elif info["data"]["temperature"] is not None:
+                data[device] = {
+                    "model": "",
+                    "temperature": str(info["data"]["temperature"]),
+                    "scale": info["data"]["scale"],
+                }
+
+        return self._check_data(data=data)  # type: ignore
+
+    def _check_host(self, server):
+        """
+        Get data from server, parse server response and check it.
+
+        :param server: server label, address and port
+        :type server: Tuple[str, str, int]
+        :return: server label and devices states info
+        :rtype: Tuple[str, Dict[str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]]  # noqa: E501
+        """
+
+        label, host, port = server
+        data = self._check_snapshot(label=label) if self.options.snapshot else None  # type: ignore  # noqa: E501
+
+        if data is not None:
+            for info in data.values():
+                info["data"]["host"] = label
+
+            return label, data
+
+        try:
+            response = self._fetch(server=host, port=port)  # type: ignore
+        except (EOFError, socket.error, ValueError) as error:
+            return label, self._get_error_states(label=label, error=error)  # type: ignore  # noqa: E501
+
+        if self.options.capture is not None:
+            self.options.capture.add(host=label, response=response)
+
+        return label, self._check_response(label=label, response=response)  # type: ignore  # noqa: E501
+
+    def _check_hosts(self, check=None):
+        """
+        Concurrently check all servers.
+
+        :param check: server check function, or None to use "_check_host"
+        :type check: Optional[Callable[[Tuple[str, str, int]], Any]]
+        :return: servers check results in completion order
+        :rtype: Iterator[Any]
+        """
+
+        # slow to import and not needed for single server checks
+        from multiprocessing.pool import ThreadPool  # pylint: disable=C0415
+
+        pool = ThreadPool(processes=min(self.options.jobs, len(self.options.servers)))
+
+        try:
+            for result in pool.imap_unordered(
+                check or self._check_host, self.options.servers
+            ):
+                yield result
+        finally:
+            pool.terminate()
+
+    def _iter_host_states(self, server):
+        """
+        Get data from server by chunks and yield its devices states as they parsed.
+
+        Server communication or response parsing error is yielded as last state,
+        devices states yielded before error are kept.
+
+        :param server: server label, address and port
+        :type server: Tuple[str, str, int]
+        :return: server label, device and device state info
+        :rtype: Iterator[Tuple[str, str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]]  # noqa: E501
+        """
+
+        label, host, port = server
+        devices = OrderedDict(
+            (device.strip(), False)
+            for device in (self.options.devices or "").split(",")
+            if device.strip()
+        )
+
+        try:
+            chunks = self._iter_fetch(server=host, port=port)  # type: ignore
+            records = self._iter_records(chunks=chunks)  # type: ignore
+            for device, info in self._iter_parsed(records=records):  # type: ignore
+                if devices:
+                    if device not in devices:
+                        continue
+                    devices[device] = True
+                state = self._get_device_state(device=device, info=info)  # type: ignore
+                state["data"]["host"] = label
+
+                yield label, device, state
+        except (EOFError, socket.error, ValueError) as error:
+            states = self._get_error_states(label=label, error=error)  # type: ignore
+
+            yield label, "", states[""]
+
+            return
+
+        for device, found in devices.items():
+            if not found:
+                state = self._get_device_state(device=device, info=None)  # type: ignore
+                state["data"]["host"] = label
+
+                yield label, device, state
+
+    def _iter_spooled(self, states, counter, spool, lock):
+        """
+        Count devices statuses and write devices output fragments to spool.
+
+        :param states: server label, device and device state info
+        :type states: Iterable[Tuple[str, str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]]  # noqa: E501
+        :param counter: devices statuses counter to update
+        :type counter: Counter[str]
+        :param spool: devices output fragments spool shared by all servers
+        :type spool: IO[bytes]
+        :param lock: spool lock
+        :type lock: threading.Lock
+        :return: server label, device and device state info
+        :rtype: Iterator[Tuple[str, str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]]  # noqa: E501
+        """
+
+        statistics = OrderedDict()  # type: ignore
+        summarized = all(
+            [
+                self.options.performance,
+                self.options.format == self.FORMAT_TEXT,
+                self.options.performance_format == self.PERFORMANCE_SUMMARY,
+            ]
+        )
+
+        for host, device, info in states:
+            counter[self.PRIORITY_TO_STATUS[info["priority"]]] += 1
+            self._forward(host=host, data={device: info})  # type: ignore
+            self._write_performance(host=host, info=info)  # type: ignore
+            if self.options.format == self.FORMAT_NDJSON:
+                record = self._get_record(info=info)  # type: ignore
+                record.update({"type": "device"})
+                fragments = ["{document}\n".format(document=json_dumps(record))]  # type: ignore  # noqa: E501
+            elif summarized:
+                self._add_statistics(statistics=statistics, host=host, info=info)  # type: ignore  # noqa: E501
+                fragments = []
+            elif self.options.performance and self.options.format == self.FORMAT_TEXT:
+                fragments = [self._get_performance(info=info)]  # type: ignore
+            else:
+                fragments = []
+            self._spool(fragments=fragments, spool=spool, lock=lock)  # type: ignore
+
+            yield host, device, info
+
+        if summarized:
+            self._spool(  # type: ignore
+                fragments=self._get_performance_summary(statistics=statistics),  # type: ignore  # noqa: E501
+                spool=spool,
+                lock=lock,
+            )
+
+    def _spool(self, fragments, spool, lock):
+        """
+        Write devices output fragments to spool.
+
+        Performance data items are written one per line,
+        so they are limited by whole items when spool is read.
+
+        :param fragments: devices output fragments
+        :type fragments: List[str]
+        :param spool: devices output fragments spool shared by all servers
+        :type spool: IO[bytes]
+        :param lock: spool lock
+        :type lock: threading.Lock
+        """
+
+        with lock:
+            for fragment in fragments:
+                spool.write(fragment.encode("utf8"))
+                if self.options.format == self.FORMAT_TEXT:
+                    spool.write(b"\n")
+
+    def _get_worst(self, states):
+        """
+        Consume all devices states keeping only worst devices.
+
+        :param states: server label, device and device state info
+        :type states: Iterable[Tuple[str, str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]]  # noqa: E501
+        :return: worst devices states info
+        :rtype: List[Tuple[str, str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]]  # noqa: E501
+        """
+
+        if self.options.worst:
+            # keeps only "worst" count of devices states in memory
+            return heapq.nsmallest(self.options.worst, states, key=self._get_worst_key)
+
+        for _ in states:
+            continue
+
+        return []
+
+    def _check_host_bounded(self, server, spool, lock):
+        """
+        Stream server response through parsing and checking keeping only worst devices.
+
+        :param server: server label, address and port
+        :type server: Tuple[str, str, int]
+        :param spool: devices output fragments spool shared by all servers
+        :type spool: IO[bytes]
+        :param lock: spool lock
+        :type lock: threading.Lock
+        :return: server label, devices statuses counter and worst devices states info
+        :rtype: Tuple[str, Counter[str], List[Tuple[str, str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]]]  # noqa: E501
+        """
+
+        counter = Counter()  # type: ignore
+        states = self._iter_spooled(  # type: ignore
+            states=self._iter_host_states(server=server),  # type: ignore
+            counter=counter,
+            spool=spool,
+            lock=lock,
+        )
+        worst = self._get_worst(states=states)  # type: ignore
+
+        return server[0], counter, worst
+
+    def _iter_merged(self, results, summary):
+        """
+        Yield servers worst devices states and merge statuses counters on the way.
+
+        :param results: servers labels, devices statuses counters and worst devices
+        :type results: Iterable[Tuple[str, Counter[str], List[Tuple[str, str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]]]]  # noqa: E501
+        :param summary: servers and devices statuses counters to update
+        :type summary: Dict[str, Counter[str]]
+        :return: server label, device and device state info
+        :rtype: Iterator[Tuple[str, str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]]  # noqa: E501
+        """
+
+        for _, counter, worst in results:
+            summary["hosts"][self._get_summary_status(summary={"devices": counter})] += 1  # type: ignore  # noqa: E501
+            summary["devices"].update(counter)
+            for item in worst:
+
+                yield item
+
+    def _iter_spool(self, spool):
+        """
+        Read spool from the beginning and yield its content by chunks.
+
+        :param spool: devices output fragments spool
+        :type spool: IO[bytes]
+        :return: spool content chunks
+        :rtype: Iterator[str]
+        """
+
+        decoder = codecs.getincrementaldecoder("utf8")()
+        spool.seek(0)
+        chunk = spool.read(self.CHUNK_SIZE)
+
+        while chunk:
+            yield decoder.decode(chunk)
+            chunk = spool.read(self.CHUNK_SIZE)
+
+    def _iter_spool_performance(self, spool, limit):
+        """
+        Read performance data items from spool and yield performance data line chunks.
+
+        Items which don't fit into limit are dropped with all following ones,
+        nothing is yielded if no item fits.
+
+        :param spool: performance data items spool, one item per line
+        :type spool: IO[bytes]
+        :param limit: performance data line size limit in bytes, or 0 for no limit
+        :type limit: int
+        :return: performance data line chunks
+        :rtype: Iterator[str]
+        """
+
+        separator = (
+            b"; " if self.options.performance_format == self.PERFORMANCE_PLAIN else b" "
+        )
+        chunk, size, count, used = [], 0, 0, len(b"| \n")
+        spool.seek(0)
+
+        for line in spool:
+            item = line[:-1]
+            used += len(item) + (len(separator) if count else 0)
+            if limit and used > limit:
+                break
+            chunk.extend([separator if count else b"| ", item])
+            size += len(item)
+            count += 1
+            if size >= self.CHUNK_SIZE:
+                yield b"".join(chunk).decode("utf8")
+                chunk, size = [], 0
+        if count:
+            chunk.append(b"\n")
+
+            yield b"".join(chunk).decode("utf8")
+
+    def _iter_bounded(self):
+        """
+        Check all servers in memory-bounded mode and yield aggregated output chunks.
+
+        Only statuses counters and worst devices are kept in memory,
+        NDJSON devices lines and performance data are written to spool
+        which is kept on disk after reaching "SPOOL_SIZE" limit.
+
+        :return: plugin output chunks
+        :rtype: Iterator[str]
+        """
+
+        summary = {"hosts": Counter(), "devices": Counter()}  # type: ignore
+        spool = tempfile.SpooledTemporaryFile(max_size=self.SPOOL_SIZE)
+
+        try:
+            results = self._check_hosts(  # type: ignore
+                check=partial(
+                    self._check_host_bounded, spool=spool, lock=threading.Lock()
+                )
+            )
+            worst = self._get_worst(  # type: ignore
+                states=self._iter_merged(results=results, summary=summary)  # type: ignore  # noqa: E501
+            )
+            status = self._get_summary_status(summary=summary)  # type: ignore
+            self._set_code(status=status)  # type: ignore
+
+            if self.options.format == self.FORMAT_NDJSON:
+                for chunk in self._iter_spool(spool=spool):  # type: ignore
+                    yield chunk
+            used = 0
+            for chunk in self._iter_output_aggregated(  # type: ignore
+                worst=worst, summary=summary, status=status, spooled=True
+            ):
+                used += len(chunk.encode("utf8"))
+                yield chunk
+            if self.options.format == self.FORMAT_TEXT and self.options.performance:
+                # performance data continues on next line after plugin output
+                limit = self.options.output_limit
+                for chunk in self._iter_spool_performance(  # type: ignore
+                    spool=spool, limit=max(limit - used, 1) if limit else 0
+                ):
+                    yield chunk
+        finally:
+            spool.close()
+
+    def _iter_states(self, results, summary):
+        """
+        Yield every device state from servers results and count statuses on the way.
+
+        :param results: servers labels and devices states info
+        :type results: Iterable[Tuple[str, Dict[str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]]]  # noqa: E501
+        :param summary: servers and devices statuses counters to update
+        :type summary: Dict[str, Counter[str]]
+        :return: server label, device and device state info
+        :rtype: Iterator[Tuple[str, str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]]  # noqa: E501
+        """
+
+        for host, data in results:
+            self._forward(host=host, data=data)  # type: ignore
+            summary["hosts"][self._get_status(data=data)] += 1  # type: ignore
+            for device, info in data.items():
+                status = self.PRIORITY_TO_STATUS[info["priority"]]
+                summary["devices"][status] += 1
+                self._add_statistics(  # type: ignore
+                    statistics=summary["temperatures"], host=host, info=info
+                )
+                self._write_performance(host=host, info=info)  # type: ignore
+
+                yield host, device, info
+
+    @staticmethod
+    def _get_worst_key(item):
+        """
+        Create device state sorting key: by priority, hottest first.
+
+        :param item: server label, device and device state info
+        :type item: Tuple[str, str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]  # noqa: E501
+        :return: sorting key
+        :rtype: Tuple[int, int, str, str]
+        """
+
+        host, device, info = item
+        temperature = info["data"]["temperature"]
+
+        return (
+            info["priority"],
+            -temperature if isinstance(temperature, int) else 0,
+            host,
+            device,
+        )
+
+    def _get_summary_status(self, summary):
+        """
+        Create main status from devices statuses counters.
+
+        :param summary: servers and devices statuses counters
+        :type summary: Dict[str, Counter[str]]
+        :return: main check status
+        :rtype: str
+        """
+
+        return self.PRIORITY_TO_STATUS[
+            min(self.STATUS_TO_PRIORITY[status] for status in summary["devices"].keys())
+        ]
+
+    def _get_counters(self, counter):
+        """
+        Create human readable statuses counters ordered by priority.
+
+        :param counter: statuses counter
+        :type counter: Counter[str]
+        :return: human readable statuses counters
+        :rtype: str
+        """
+
+        return ", ".join(
+            [
+                self.COUNTER_TEMPLATE.format(
+                    count=counter[status], status=status.upper()
+                )
+                for status in sorted(
+                    counter.keys(),
+                    key=lambda status: self.STATUS_TO_PRIORITY[status],
+                )
+            ]
+        )
+
+    def _iter_aggregated(self):
+        """
+        Check all servers and yield aggregated plugin output chunks.
+
+        :return: plugin output chunks
+        :rtype: Iterator[str]
+        """
+
+        summary = {
+            "hosts": Counter(),
+            "devices": Counter(),
+            "temperatures": OrderedDict(),
+        }  # type: ignore
+        states = self._iter_states(results=self._check_hosts(), summary=summary)  # type: ignore  # noqa: E501
+
+        if self.options.format == self.FORMAT_NDJSON:
+            for _, _, info in states:
+                record = self._get_record(info=info)  # type: ignore
+                record.update({"type": "device"})
+
+                yield "{document}\n".format(document=json_dumps(record))  # type: ignore  # noqa: E501
+            worst = []
+        elif self.options.worst:
+            # O(n log k) instead of sorting all devices of all servers
+            worst = heapq.nsmallest(self.options.worst, states, key=self._get_worst_key)
+        else:
+            worst = sorted(
+                states, key=lambda item: (item[2]["priority"], item[0], item[1])
+            )
+
+        status = self._get_summary_status(summary=summary)  # type: ignore
+        self._set_code(status=status)  # type: ignore
+
+        for chunk in self._iter_output_aggregated(  # type: ignore
+            worst=worst, summary=summary, status=status
+        ):
+            yield chunk
+
+    def _iter_output_aggregated(self, worst, summary, status, spooled=False):
+        """
+        Yield aggregated plugin output chunks in requested format.
+
+        :param worst: worst servers devices states info
+        :type worst: List[Tuple[str, str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]]  # noqa: E501
+        :param summary: servers and devices statuses counters
+        :type summary: Dict[str, Counter[str]]
+        :param status: main check status
+        :type status: str
+        :param spooled: performance data is written to spool instead of output
+        :type spooled: bool
+        :return: plugin output chunks
+        :rtype: Iterator[str]
+        """
+
+        if self.options.format == self.FORMAT_NDJSON:
+            document = {
+                "type": "status",
+                "status": status,
+                "code": self.code,
+                "hosts": dict(summary["hosts"]),
+                "devices": dict(summary["devices"]),
+            }
+        elif self.options.format == self.FORMAT_JSON:
+            document = {
+                "status": status,
+                "code": self.code,
+                "hosts": dict(summary["hosts"]),
+                "summary": dict(summary["devices"]),
+                "devices": [
+                    self._get_record(info=info) for _, _, info in worst  # type: ignore
+                ],
+            }
+        else:
+            yield self._get_output_aggregated(  # type: ignore
+                worst=worst, summary=summary, status=status, spooled=spooled
+            )
+
+            return
+
+        if self.options.timings:
+            document["timings"] = self._get_timings()  # type: ignore
+
+        yield "{document}\n".format(document=json_dumps(document))  # type: ignore
+
+    def _get_output_aggregated(self, worst, summary, status, spooled=False):
+        """
+        Create human readable aggregated servers and HDD's statuses.
+
+        :param worst: worst servers devices states info
+        :type worst: List[Tuple[str, str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]]  # noqa: E501
+        :param summary: servers and devices statuses counters
+        :type summary: Dict[str, Counter[str]]
+        :param status: main check status
+        :type status: str
+        :param spooled: performance data is written to spool instead of output
+        :type spooled: bool
+        :return: human readable aggregated statuses
+        :rtype: str
+        """
+
+        devices = [
+            self.HOST_TEMPLATE.format(
+                host=host,
+                text=str(self.OUTPUT_TEMPLATES[info["template"]]["text"]).format(
+                    **info["data"]
+                ),
+            )
+            for host, _, info in worst
+        ]
+        head = "{status}: {devices} devices on {hosts} hosts; ".format(
+            status=status.upper(),
+            devices=self._get_counters(counter=summary["devices"]),  # type: ignore
+            hosts=self._get_counters(counter=summary["hosts"]),  # type: ignore
+        )
+
+        if not self.options.performance or spooled:
+            performance = []
+        elif self.options.performance_format == self.PERFORMANCE_SUMMARY:
+            performance = self._get_performance_summary(  # type: ignore
+                statistics=summary["temperatures"]
+            )
+        else:
+            performance = [
+                self._get_performance(info=info) for _, _, info in worst  # type: ignore
+            ]
+
+        return self._get_limited(  # type: ignore
+            head=head,
+            texts=devices,
+            performance=performance + self._get_performance_timings(),  # type: ignore  # noqa: E501
+        )
+
+    def _open_performance_file(self):
+        """
+        Open temporary performance file if requested.
+
+        Performance file errors are ignored: it must never affect check result.
+        """
+
+        if not self.options.performance_file:
+            return
+
+        try:
+            self.performance_file = io.open(
+                "{path}.{pid}".format(
+                    path=self.options.performance_file, pid=os.getpid()
+                ),
+                "w",
+                encoding="utf8",
+            )
+        except EnvironmentError:
+            self.performance_file = None
+
+    def _write_performance(self, host, info):
+        """
+        Write device state record to performance file.
+
+        :param host: server label
+        :type host: str
+        :param info: device state info
+        :type info: Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]
+        """
+
+        if self.performance_file is None:
+            return
+
+        record = self._get_record(info=info)  # type: ignore
+        record.update({"host": host, "timestamp": int(self.started)})
+
+        with self.performance_lock:
+            try:
+                self.performance_file.write(
+                    "{document}\n".format(document=json_dumps(record))  # type: ignore
+                )
+            except (EnvironmentError, ValueError):  # failed or closed on error
+                self.performance_file.close()
+
+    def _close_performance_file(self):
+        """
+        Close performance file replacing previous one.
+        """
+
+        if self.performance_file is None:
+            return
+
+        performance, self.performance_file = self.performance_file, None
+
+        try:
+            if performance.closed:  # closed on writing error
+                os.remove(performance.name)
+            else:
+                performance.close()
+                # atomic replace for concurrent readers
+                os.rename(performance.name, self.options.performance_file)
+        except EnvironmentError:
+            return
+
+    def _forward(self, host, data):
+        """
+        Buffer server devices temperatures in metrics sinks.
+
+        :param host: server label
+        :type host: str
+        :param data: devices states info
+        :type data: Dict[str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]  # noqa: E501
+        """
+
+        if self.options.icinga is not None:
+            for device, info in data.items():
+                if device:  # server error has no device service
+                    self._submit(host=host, device=device, info=info)  # type: ignore
+
+        if not self.options.sinks:
+            return
+
+        timestamp = int(time.time())
+
+        for device, info in data.items():
+            temperature = info["data"]["temperature"]
+            if isinstance(temperature, int):  # skip sleeping and unknown devices
+                for sink in self.options.sinks:
+                    sink.add(
+                        host=host,
+                        device=device,
+                        temperature=temperature,
+                        scale=info["data"]["scale"],
+                        timestamp=timestamp,
+                    )
+
+    def _submit(self, host, device, info):
+        """
+        Buffer device state in Icinga 2 API sink as passive check result.
+
+        :param host: server label
+        :type host: str
+        :param device: device name
+        :type device: str
+        :param info: device state info
+        :type info: Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]
+        """
+
+        data = info["data"]
+
+        self.options.icinga.add(
+            host=host,
+            device=device,
+            code=self._get_code(  # type: ignore
+                status=self.PRIORITY_TO_STATUS.get(
+                    info["priority"], self.STATUS_CRITICAL
+                )
+            ),
+            text=self._get_text(info=info),  # type: ignore
+            performance=self._get_performance_item(  # type: ignore
+                label="temperature",
+                value=data["temperature"],
+                warning=data["warning"],
+                critical=data["critical"],
+            ),
+        )
+
+    def _flush_sinks(self):
+        """
+        Push buffered devices temperatures to metrics sinks within time budget.
+
+        Sinks errors are ignored: metrics pushing must never affect check result.
+        """
+
+        deadline = time.time() + self.options.sink_timeout
+
+        for sink in self.options.sinks:
+            timeout = deadline - time.time()
+            if timeout <= 0:
+                break
+            try:
+                sink.flush(timeout=timeout)
+            except (EOFError, socket.error):
+                continue
+
+    def stream(self):
+        """
+        Check and yield plugin output chunks as soon as they are ready.
+
+        Exit code is available in "code" attribute after all chunks consumed.
+
+        :return: plugin output chunks
+        :rtype: Iterator[str]
+        """
+
+        if self.options.resolve:
+            self._resolve()  # type: ignore
+        self.started = time.time()
+        self._open_performance_file()  # type: ignore
+
+        if self.options.bounded:
+            for chunk in self._iter_bounded():  # type: ignore
+                yield chunk
+        elif len(self.options.servers) > 1:
+            for chunk in self._iter_aggregated():  # type: ignore
+                yield chunk
+        else:
+            label = self.options.servers[0][0]
+            data = self._check_snapshot(label=label) if self.options.snapshot else None  # type: ignore  # noqa: E501
+            if data is None:
+                response = self._get_data()  # type: ignore
+                # inventory needs parsed response even if its devices states are cached
+                parsed = (
+                    self._parse_data(data=response)  # type: ignore
+                    if self.options.inventory is not None
+                    else None
+                )
+                data = self._check_cached(response=response, data=parsed)  # type: ignore  # noqa: E501
+                if parsed is not None:
+                    data = self._check_inventory(  # type: ignore
+                        label=label, data=parsed, states=data
+                    )
+            self._forward(host=label, data=data)  # type: ignore
+            for info in data.values():
+                self._write_performance(host=label, info=info)  # type: ignore
+            status = self._get_status(data=data)  # type: ignore
+            self._set_code(status=status)  # type: ignore
+
+            for chunk in self._iter_output(data=data, status=status):  # type: ignore
+                yield chunk
+
+        # results submission budget includes states saving and metrics pushing
+        deadline = time.time() + self.options.icinga_timeout
+        self._close_performance_file()  # type: ignore
+        if self.options.breaker is not None:
+            self.options.breaker.save()
+        if self.options.latency is not None:
+            self.options.latency.save()
+        if self.options.results is not None:
+            self.options.results.save()
+        if self.options.capture is not None:
+            self.options.capture.save()
+        # metrics are pushed after plugin output to not delay it
+        self._flush_sinks()  # type: ignore
+        timeout = deadline - time.time()
+        if self.options.icinga is not None and timeout > 0:
+            self.options.icinga.flush(timeout=timeout)
+
+    def check(self):
+        """
+        Get data from server, parse server response, check and create plugin output.
 
-        :param data: hddtemp server response
-        :type data: str
-        :return: structured data parsed from hddtemp server response
-        :rtype: Dict[str, Dict[str, str]]
+        :return: plugin output and exit code
+        :rtype: Tuple[str, int]
         """
 
-        info = {}
-        data = data.split(self.options.separator * 2)
+        output = "".join(self.stream())  # type: ignore
 
-        if data != [""]:
-            for device in data:
-                device = device.strip(self.options.separator).split(
-                    self.options.separator
-                )
-                if len(device) != 4:  # 4 data items in server response for device
-                    if not self.options.quiet:
-                        sys.stdout.write(
-                            "ERROR: Server response for device '{dev}' parsing error\n".format(  # noqa: E501
-                                dev=device
-                            )
-                        )
-                    sys.exit(self.DEFAULT_EXIT_CODE)
-                dev, model, temperature, scale = device
-                info.update(
-                    {dev: {"model": model, "temperature": temperature, "scale": scale}}
-                )
-        else:
-            if not self.options.quiet:
-                sys.stdout.write("ERROR: Server response too short\n")
-            sys.exit(self.DEFAULT_EXIT_CODE)
+        return output, self.code
 
-        return info
 
-    def _check_data(self, data):
+class Source(object):
+    """
+    Devices data source base.
+
+    Sources return data in hddtemp server response format,
+    subclasses must implement "fetch" method.
+    """
+
+    def __init__(self, options):
         """
-        Create devices states info.
+        Set up source.
 
-        :param data: structured data parsed from hddtemp server response
-        :type data: Dict[str, Dict[str, str]]
-        :return: devices states info
-        :rtype: Dict[str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]
+        :param options: parsed command line arguments
+        :type options: Namespace
         """
 
-        states = {}
-        devices = (
-            map(lambda dev: dev.strip(), self.options.devices.strip().split(","))
-            if self.options.devices
-            else data.keys()
+        self.options = options
+
+    def fetch(self, server, port):
+        """
+        Get and return devices data.
+
+        :param server: server name or address
+        :type server: str
+        :param port: port number
+        :type port: int
+        :return: data in hddtemp server response format
+        :rtype: str
+        :raises NotImplementedError: must be implemented by subclasses
+        """
+
+        raise NotImplementedError
+
+    def _get_timeout(self, server, port):
+        """
+        Choose server network timeout.
+
+        :param server: server name or address
+        :type server: str
+        :param port: port number
+        :type port: int
+        :return: network timeout in seconds
+        :rtype: float
+        """
+
+        if self.options.latency is None:
+            return self.options.timeout
+
+        return self.options.latency.get_timeout(
+            server=server, port=port, default=self.options.timeout
         )
 
-        for device in devices:
-            if device:  # not empty string
-                try:
-                    info = data[device]
-                except KeyError:  # device not found in hddtemp response
-                    states.update(
-                        {
-                            device: {
-                                "template": self.STATUS_UNKNOWN,
-                                "priority": self.OUTPUT_TEMPLATES[self.STATUS_UNKNOWN][
-                                    "priority"
-                                ],
-                                "data": {
-                                    "device": device,
-                                    "temperature": None,
-                                    "scale": None,
-                                    "warning": self.options.warning,
-                                    "critical": self.options.critical,
-                                },
-                            }
-                        }
-                    )
-                    continue
+    def iter_fetch(self, server, port):
+        """
+        Get and yield devices data by chunks.
+
+        :param server: server name or address
+        :type server: str
+        :param port: port number
+        :type port: int
+        :return: data in hddtemp server response format chunks
+        :rtype: Iterator[str]
+        """
 
-                # checking temperature
-                # sometime getting "SLP" or "UNK" instead of temperature
-                try:
-                    temperature = int(info["temperature"])
-                except ValueError:
-                    temperature = info["temperature"]
-
-                if temperature == self.HDDTEMP_SLEEPING:  # type: ignore
-                    template = self.STATUS_SLEEPING
-                elif temperature == self.HDDTEMP_UNKNOWN:  # type: ignore
-                    template = self.STATUS_UNKNOWN
-                elif temperature > self.options.critical:
-                    template = self.STATUS_CRITICAL
-                elif all(
-                    [
-                        temperature > self.options.warning,
-                        temperature < self.options.critical,
-                    ]
-                ):
-                    template = self.STATUS_WARNING
-                else:
-                    template = self.STATUS_OK
+        yield self.fetch(server=server, port=port)  # type: ignore
 
-                states.update(
-                    {
-                        device: {
-                            "template": template,
-                            "priority": self.OUTPUT_TEMPLATES[template]["priority"],
-                            "data": {
-                                "device": device,
-                                "temperature": temperature,
-                                "scale": info["scale"],
-                                "warning": self.options.warning,
-                                "critical": self.options.critical,
-                            },
-                        }
-                    }
-                )
 
-        return states
+class HDDTempSource(Source):
+    """
+    Get devices data from hddtemp server.
+    """
 
-    def _get_status(self, data):
+    ATTEMPT_DELAY = 0.25  # RFC 8305 recommended connection attempt delay
+
+    def _get_errors(self):
         """
-        Create main status.
+        Choose server response decoding errors handling.
 
-        :param data: devices states info
-        :type data: Dict[str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]  # noqa: E501
-        :return: main check status
+        :return: decoding errors handling scheme
         :rtype: str
         """
 
-        # for multiple check need to get main status by priority
-        priority = min(  # noqa: C407
-            [info["priority"] for device, info in data.items()]
+        return "replace" if self.options.tolerant else "strict"
+
+    def _connect(self, server, port):
+        """
+        Connect to server using its resolved addresses if any.
+
+        :param server: server name or address
+        :type server: str
+        :param port: port number
+        :type port: int
+        :return: connected socket
+        :rtype: socket.socket
+        :raises socket.error: server name can't be resolved or connected
+        """
+
+        addresses = self.options.addresses.get((server, port))
+        timeout = self._get_timeout(server=server, port=port)  # type: ignore
+
+        if addresses is None:  # not resolved before checking
+            return socket.create_connection((server, port), timeout)
+        if isinstance(addresses, Exception):
+            raise addresses
+
+        return self._race(addresses=addresses, timeout=timeout)  # type: ignore
+
+    def _race(self, addresses, timeout):
+        """
+        Connect to first address accepting connection ("happy eyeballs").
+
+        Next address connection attempt starts after "ATTEMPT_DELAY" seconds
+        or right after previous attempt failure, without waiting for its timeout,
+        pending attempts are closed after first successful one.
+
+        :param addresses: addresses families and socket addresses in preferred order
+        :type addresses: List[Tuple[int, Tuple[Any, ...]]]
+        :param timeout: connection and receiving data timeout in seconds
+        :type timeout: float
+        :return: connected socket
+        :rtype: socket.socket
+        :raises socket.error: no address can be connected
+        """
+
+        deadline = time.time() + timeout
+        queue = list(addresses)
+        pending = []  # type: ignore
+        connection = None
+        error = socket.error("server has no addresses")
+
+        try:
+            while connection is None and (queue or pending):
+                if queue:
+                    family, address = queue.pop(0)
+                    attempt = socket.socket(family, socket.SOCK_STREAM)
+                    attempt.setblocking(False)
+                    code = attempt.connect_ex(address)
+                    if code not in (0, errno.EINPROGRESS, errno.EWOULDBLOCK):
+                        attempt.close()
+                        error = socket.error(code, os.strerror(code))
+                        continue
+                    pending.append(attempt)
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    error = socket.timeout("timed out")
+                    break
+                _, ready, _ = select.select(
+                    [],
+                    pending,
+                    [],
+                    min(remaining, self.ATTEMPT_DELAY) if queue else remaining,
+                )
+                for attempt in ready:
+                    pending.remove(attempt)
+                    code = attempt.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                    if code or connection is not None:
+                        attempt.close()
+                        error = socket.error(code, os.strerror(code)) if code else error
+                    else:
+                        connection = attempt
+        finally:
+            for attempt in pending:
+                attempt.close()
+
+        if connection is None:
+            raise error
+
+        connection.settimeout(timeout)
+
+        return connection
+
+    def fetch(self, server, port):
+        """
+        Get and return data from hddtemp server.
+
+        :param server: server name or address
+        :type server: str
+        :param port: port number
+        :type port: int
+        :return: data from hddtemp server
+        :rtype: str
+        """
+
+        if (server, port) in self.options.addresses:
+            return "".join(self.iter_fetch(server=server, port=port))  # type: ignore
+
+        connection = telnetlib.Telnet(
+            server, port, self._get_timeout(server=server, port=port)  # type: ignore
         )
-        status = self.PRIORITY_TO_STATUS.get(priority, self.PRIORITY_CRITICAL)
+        response = connection.read_all()
+        connection.close()
 
-        return status
+        return response.decode("utf8", self._get_errors())  # type: ignore
 
-    def _get_code(self, status):
+    def iter_fetch(self, server, port):
+        """
+        Get and yield data from hddtemp server by chunks.
+
+        :param server: server name or address
+        :type server: str
+        :param port: port number
+        :type port: int
+        :return: data from hddtemp server chunks
+        :rtype: Iterator[str]
         """
-        Create exit code.
 
-        :param status: main check status
-        :type status: str
-        :return: exit code
-        :rtype: int
+        connection = self._connect(server=server, port=port)  # type: ignore
+        # multi-byte characters can be split between chunks
+        decoder = codecs.getincrementaldecoder("utf8")(self._get_errors())  # type: ignore  # noqa: E501
+
+        try:
+            chunk = connection.recv(CheckHDDTemp.CHUNK_SIZE)
+            while chunk:
+                yield decoder.decode(chunk)
+                chunk = connection.recv(CheckHDDTemp.CHUNK_SIZE)
+            yield decoder.decode(b"", True)
+        finally:
+            connection.close()
+
+
+class CircuitOpenError(socket.error):
+    """
+    Server is not connected because of its circuit breaker is open.
+    """
+
+
+class CircuitBreaker(object):
+    """
+    Per server circuit breaker persisted across plugin invocations.
+
+    After "threshold" consecutive failures server circuit opens and server
+    is reported failed without connecting, after "cooldown" seconds single
+    probe is allowed (half-open): success closes circuit, failure opens it again.
+    Probe is claimed in state file right away, so concurrent checks don't probe
+    server too, unless probe isn't finished within another "cooldown" seconds.
+    """
+
+    FILENAME = "check_hddtemp-breaker.json"
+
+    def __init__(self, path, threshold, cooldown):
+        """
+        Set up circuit breaker.
+
+        :param path: state file path
+        :type path: str
+        :param threshold: consecutive failures count to open circuit
+        :type threshold: int
+        :param cooldown: time before probing server with open circuit in seconds
+        :type cooldown: float
         """
 
-        return self.EXIT_CODES.get(status, self.DEFAULT_EXIT_CODE)
+        self.path = path
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.state = None
+        self.changed = set()
+        self.lock = threading.Lock()
 
-    def _get_output(self, data, status):
+    @staticmethod
+    def _get_key(server, port):
         """
-        Create human readable HDD's statuses.
+        Create server state key.
 
-        :param data: devices states info
-        :type data: Dict[str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]  # noqa: E501
-        :param status: main check status
-        :type status: str
-        :return: human readable HDD's statuses
+        :param server: server name or address
+        :type server: str
+        :param port: port number
+        :type port: int
+        :return: server state key
         :rtype: str
         """
 
-        output = ""
-        # sort devices data by priority
-        data = OrderedDict(
-            sorted(data.items(), key=lambda item: (item[1]["priority"], item[0]))
-        )
+        return "{server}:{port}".format(server=server, port=port)
 
-        # create output
-        devices = ", ".join(
-            [
-                str(self.OUTPUT_TEMPLATES[data[device]["template"]]["text"]).format(
-                    **data[device]["data"]
+    def _get_state(self):
+        """
+        Get servers state loading it from state file on first use.
+
+        :return: servers failures counts and circuits opening times
+        :rtype: Dict[str, Dict[str, Union[int, float, None]]]
+        """
+
+        if self.state is None:
+            try:
+                with io.open(self.path, encoding="utf8") as state:
+                    self.state = json.loads(state.read())
+            except (EnvironmentError, ValueError):  # missing or broken state file
+                self.state = {}
+
+        return self.state
+
+    def allow(self, server, port):
+        """
+        Check server can be connected.
+
+        :param server: server name or address
+        :type server: str
+        :param port: port number
+        :type port: int
+        :raises CircuitOpenError: server circuit is open or it's probed already
+        """
+
+        key = self._get_key(server=server, port=port)  # type: ignore
+        now = time.time()
+
+        with self.lock:
+            info = self._get_state().get(key)  # type: ignore
+
+            if info is None or info["opened"] is None:
+                return
+
+            remaining = info["opened"] + self.cooldown - now
+
+            if remaining > 0:
+                raise CircuitOpenError(
+                    "circuit breaker is open after {failures} failures, next probe in {remaining:.0f}s".format(  # noqa: E501
+                        failures=info["failures"], remaining=remaining
+                    )
+                )
+            if not self._claim(key=key, info=info, now=now):  # type: ignore
+                raise CircuitOpenError(
+                    "circuit breaker is half-open after {failures} failures, server is probed already".format(  # noqa: E501
+                        failures=info["failures"]
+                    )
                 )
-                for device in data.keys()
-            ]
-        )
 
-        # create full status string with main status for multiple devices
-        # and all devices states with performance data (optional)
-        output = (
-            "{status}: {data} | {performance-data}\n".format(
-                **{
-                    "status": status.upper(),
-                    "data": devices,
-                    "performance-data": "; ".join(
-                        [
-                            self.PERFORMANCE_DATA_TEMPLATE.format(
-                                **data[device]["data"]
-                            )
-                            for device in data.keys()
-                        ]
-                    ),
-                }
+    def _is_probed(self, info, now):
+        """
+        Check server half-open probe is in progress.
+
+        :param info: server failures count, circuit opening and probe start times
+        :type info: Any
+        :param now: current time
+        :type now: float
+        :return: probe is in progress
+        :rtype: bool
+        """
+
+        if not isinstance(info, dict) or info.get("probing") is None:
+            return False
+
+        return bool(info["probing"] + self.cooldown > now)
+
+    def _claim(self, key, info, now):
+        """
+        Claim server half-open probe unless it's claimed already.
+
+        Claim is written to state file at once to be seen by concurrent checks,
+        state file errors are ignored and probe is claimed by this check only.
+
+        :param key: server state key
+        :type key: str
+        :param info: server failures count, circuit opening and probe start times
+        :type info: Dict[str, Union[int, float, None]]
+        :param now: current time
+        :type now: float
+        :return: probe is claimed
+        :rtype: bool
+        """
+
+        if self._is_probed(info=info, now=now):  # type: ignore
+            return False
+
+        claimed = []
+
+        def merge(state):
+            """
+            Claim probe in state saved by concurrent checks.
+
+            :param state: saved servers state, or None if it's missing or broken
+            :type state: Optional[Dict[str, Dict[str, Union[int, float, None]]]]
+            :return: servers state with claimed probe
+            :rtype: Dict[str, Dict[str, Union[int, float, None]]]
+            """
+
+            state = state if isinstance(state, dict) else {}
+
+            if not self._is_probed(info=state.get(key), now=now):  # type: ignore
+                state[key] = dict(info, probing=now)
+                claimed.append(key)
+
+            return state
+
+        try:
+            update_json_file(path=self.path, merge=merge)  # type: ignore
+        except EnvironmentError:
+            claimed.append(key)
+        if claimed:
+            info["probing"] = now
+
+        return bool(claimed)
+
+    def failure(self, server, port):
+        """
+        Count server failure and open its circuit on reaching threshold.
+
+        :param server: server name or address
+        :type server: str
+        :param port: port number
+        :type port: int
+        """
+
+        with self.lock:
+            info = self._get_state().setdefault(  # type: ignore
+                self._get_key(server=server, port=port),  # type: ignore
+                {"failures": 0, "opened": None},
+            )
+            info["failures"] += 1
+            info.pop("probing", None)  # probe is over
+            if info["failures"] >= self.threshold:
+                info["opened"] = time.time()
+            self.changed.add(self._get_key(server=server, port=port))  # type: ignore
+
+    def success(self, server, port):
+        """
+        Close server circuit.
+
+        :param server: server name or address
+        :type server: str
+        :param port: port number
+        :type port: int
+        """
+
+        key = self._get_key(server=server, port=port)  # type: ignore
+
+        with self.lock:
+            if self._get_state().pop(key, None):  # type: ignore
+                self.changed.add(key)
+
+    def _merge(self, state):
+        """
+        Merge changed servers state into state saved by concurrent checks.
+
+        :param state: saved servers state, or None if it's missing or broken
+        :type state: Optional[Dict[str, Dict[str, Union[int, float, None]]]]
+        :return: merged servers state
+        :rtype: Dict[str, Dict[str, Union[int, float, None]]]
+        """
+
+        state = state if isinstance(state, dict) else {}
+
+        for key in self.changed:
+            if key in self.state:  # type: ignore
+                state[key] = self.state[key]  # type: ignore
+            else:  # circuit is closed
+                state.pop(key, None)
+
+        return state
+
+    def save(self):
+        """
+        Write changed servers state to state file.
+
+        State file errors are ignored: circuit breaker must never affect check result.
+        """
+
+        if not self.changed:
+            return
+
+        try:
+            update_json_file(path=self.path, merge=self._merge)  # type: ignore
+        except EnvironmentError:
+            return
+
+        self.changed = set()
+
+
+class LatencyTracker(object):
+    """
+    Per server response latency history persisted across plugin invocations.
+
+    Latency exponentially weighted moving average and recent samples are kept,
+    server timeout is chosen from them within minimum and maximum bounds.
+    """
+
+    FILENAME = "check_hddtemp-latency.json"
+    ALPHA = 0.2  # moving average smoothing factor
+    WINDOW = 100  # recent latency samples count
+    PERCENTILE = 99
+    MARGIN = 1.5  # timeout to observed latency ratio
+
+    def __init__(self, path, minimum, maximum):
+        """
+        Set up latency tracker.
+
+        :param path: state file path
+        :type path: str
+        :param minimum: minimum timeout in seconds
+        :type minimum: float
+        :param maximum: maximum timeout in seconds
+        :type maximum: float
+        """
+
+        self.path = path
+        self.minimum = minimum
+        self.maximum = maximum
+        self.state = None
+        self.changed = set()
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _get_key(server, port):
+        """
+        Create server state key.
+
+        :param server: server name or address
+        :type server: str
+        :param port: port number
+        :type port: int
+        :return: server state key
+        :rtype: str
+        """
+
+        return "{server}:{port}".format(server=server, port=port)
+
+    def _get_state(self):
+        """
+        Get servers state loading it from state file on first use.
+
+        :return: servers latency moving averages and recent samples
+        :rtype: Dict[str, Dict[str, Union[float, List[float]]]]
+        """
+
+        if self.state is None:
+            try:
+                with io.open(self.path, encoding="utf8") as state:
+                    self.state = json.loads(state.read())
+            except (EnvironmentError, ValueError):  # missing or broken state file
+                self.state = {}
+
+        return self.state
+
+    @classmethod
+    def get_percentile(cls, samples):
+        """
+        Get latency samples percentile (nearest rank).
+
+        :param samples: latency samples
+        :type samples: List[float]
+        :return: latency percentile
+        :rtype: float
+        """
+
+        ordered = sorted(samples)
+
+        return ordered[max(0, -(-len(ordered) * cls.PERCENTILE // 100) - 1)]
+
+    def get_timeout(self, server, port, default):
+        """
+        Choose server timeout from its latency history.
+
+        :param server: server name or address
+        :type server: str
+        :param port: port number
+        :type port: int
+        :param default: timeout for server without history in seconds
+        :type default: float
+        :return: timeout in seconds
+        :rtype: float
+        """
+
+        with self.lock:
+            info = self._get_state().get(self._get_key(server=server, port=port))  # type: ignore  # noqa: E501
+
+        timeout = default
+
+        if info:
+            latency = max(info["average"], self.get_percentile(samples=info["samples"]))  # type: ignore  # noqa: E501
+            timeout = latency * self.MARGIN
+
+        return min(max(timeout, self.minimum), self.maximum)
+
+    def observe(self, server, port, latency, timeout=False):
+        """
+        Add server response latency sample.
+
+        Timed out request is counted with latency equal to its timeout
+        multiplied by margin, so too small timeout grows up to maximum.
+
+        :param server: server name or address
+        :type server: str
+        :param port: port number
+        :type port: int
+        :param latency: response latency in seconds
+        :type latency: float
+        :param timeout: request timed out
+        :type timeout: bool
+        """
+
+        if timeout:
+            latency = max(latency, self.minimum) * self.MARGIN
+
+        key = self._get_key(server=server, port=port)  # type: ignore
+
+        with self.lock:
+            info = self._get_state().setdefault(  # type: ignore
+                key, {"average": latency, "samples": []}
             )
-            if self.options.performance
-            else "{status}: {data}\n".format(
-                **{"status": status.upper(), "data": devices}
+            info["average"] = round(
+                self.ALPHA * latency + (1 - self.ALPHA) * info["average"], 6
             )
-        )
+            info["samples"] = info["samples"][1 - self.WINDOW :] + [  # noqa: E203
+                round(latency, 6)
+            ]
+            self.changed.add(key)
 
-        return output
+    def _merge(self, state):
+        """
+        Merge changed servers state into state saved by concurrent checks.
 
-    def check(self):
+        :param state: saved servers state, or None if it's missing or broken
+        :type state: Optional[Dict[str, Dict[str, Union[float, List[float]]]]]
+        :return: merged servers state
+        :rtype: Dict[str, Dict[str, Union[float, List[float]]]]
         """
-        Get data from server, parse server response, check and create plugin output.
 
-        :return: plugin output and exit code
-        :rtype: Tuple[str, int]
+        state = state if isinstance(state, dict) else {}
+
+        for key in self.changed:
+            state[key] = self.state[key]  # type: ignore
+
+        return state
+
+    def save(self):
+        """
+        Write changed servers state to state file.
+
+        State file errors are ignored: latency tracker must never affect check result.
         """
 
-        data = self._check_data(data=self._parse_data(data=self._get_data()))  # type: ignore  # noqa: E501
-        status = self._get_status(data=data)  # type: ignore
-        code = self._get_code(status=status)  # type: ignore
+        if not self.changed:
+            return
+
+        try:
+            update_json_file(path=self.path, merge=self._merge)  # type: ignore
+        except EnvironmentError:
+            return
 
-        return self._get_output(data=data, status=status), code  # type: ignore
+        self.changed = set()
 
 
 def main():
@@ -476,9 +3799,10 @@ def main():
     """
 
     checker = CheckHDDTemp()  # type: ignore
-    output, code = checker.check()  # type: ignore
-    sys.stdout.write(output)
-    sys.exit(code)
+
+    for chunk in checker.stream():  # type: ignore
+        sys.stdout.write(chunk)
+    sys.exit(checker.code)
 
 
 if __name__ == "__main__":
@@ -4,18 +4,47 @@
 # check_hddtemp.pyi
 
 
-from typing import List, Dict, Union, Tuple  # pylint: disable=W0611
+from typing import (  # pylint: disable=W0611
+    IO,
+    Any,
+    Set,
+    Dict,
+    List,
+    Tuple,
+    Type,
+    Union,
+    Counter,
+    Callable,
+    Iterable,
+    Iterator,
+    Optional,
+)
 
+import socket
+import threading
 from argparse import Namespace
 
 
 __all__: List[str] = ...
 
 
+ORJSON: bool = ...
 VERSION: Tuple[int, int, int] = ...
 __version__: str = ...
 
 
+def json_dumps(obj: Any) -> str: ...
+def update_json_file(path: str, merge: Callable[[Any], Any]) -> None: ...
+
+
+SOURCES_ENTRY_POINTS_GROUP: str = ...
+SOURCES: Dict[str, str] = ...
+
+
+def get_sources() -> Dict[str, str]: ...
+def load_source(name: str) -> Type[Source]: ...
+
+
 class CheckHDDTemp(object):
 
     HDDTEMP_SLEEPING: str = ...
@@ -31,25 +60,372 @@ class CheckHDDTemp(object):
     PRIORITY_OK: int = ...
     PRIORITY_SLEEPING: int = ...
     PRIORITY_TO_STATUS: Dict[int, str] = ...
+    STATUS_TO_PRIORITY: Dict[str, int] = ...
+    TEMPLATE_ERROR: str = ...
+    TEMPLATE_MALFORMED: str = ...
+    TEMPLATE_NEW: str = ...
+    TEMPLATE_REPLACED: str = ...
+    TEMPLATE_REMOVED: str = ...
+    TEMPLATE_PEER: str = ...
     OUTPUT_TEMPLATES: Dict[str, Dict[str, Union[str, int]]] = ...
     DEFAULT_EXIT_CODE: int = ...
     EXIT_CODES: Dict[str, int] = ...
+    PEER_MAD_MIN: float = ...
+    INVENTORY_OVERRIDES: List[str] = ...
+    HOST_TEMPLATE: str = ...
     PERFORMANCE_DATA_TEMPLATE: str = ...
+    NAGIOS_PERFORMANCE_DATA_TEMPLATE: str = ...
+    PERFORMANCE_LABEL_TEMPLATE: str = ...
+    PERFORMANCE_PLAIN: str = ...
+    PERFORMANCE_NAGIOS: str = ...
+    PERFORMANCE_SUMMARY: str = ...
+    PERFORMANCE_FORMATS: List[str] = ...
+    PERFORMANCE_UNKNOWN: str = ...
+    TRUNCATED_TEMPLATE: str = ...
+    COUNTER_TEMPLATE: str = ...
+    TIMING_TEMPLATE: str = ...
+    FORMAT_TEXT: str = ...
+    FORMAT_JSON: str = ...
+    FORMAT_NDJSON: str = ...
+    FORMATS: List[str] = ...
+    CHUNK_SIZE: int = ...
+    RECORD_SIZE_MAX: int = ...
+    SPOOL_SIZE: int = ...
     options: Namespace = ...
-    def __init__(self) -> None: ...
+    code: int = ...
+    timings: Dict[str, float] = ...
+    started: float = ...
+    performance_file: Optional[IO[str]] = ...
+    performance_lock: threading.Lock = ...
+    def __init__(self, args: Optional[List[str]] = ...) -> None: ...
+    @staticmethod
+    def _get_options(args: Optional[List[str]] = ...) -> Namespace: ...
+    @staticmethod
+    def _get_servers(servers: str, port: int) -> List[Tuple[str, str, int]]: ...
     @staticmethod
-    def _get_options() -> Namespace: ...
+    def _get_model_thresholds(rules: List[str]) -> List[Tuple[str, int, int]]: ...
+    def _fetch(self, server: str, port: int) -> str: ...
+    def _fetch_source(self, server: str, port: int) -> str: ...
+    def _observe(
+        self,
+        server: str,
+        port: int,
+        started: float,
+        error: Optional[Exception] = ...,
+    ) -> None: ...
+    def _iter_fetch(self, server: str, port: int) -> Iterator[str]: ...
+    def _iter_fetch_guarded(self, server: str, port: int) -> Iterator[str]: ...
     def _get_data(self) -> str: ...
+    def _parse(self, data: str) -> Dict[str, Dict[str, str]]: ...
+    def _iter_records(self, chunks: Iterable[str]) -> Iterator[str]: ...
+    def _parse_record(self, record: str) -> Tuple[str, Dict[str, str]]: ...
+    def _iter_parsed(self, records: Iterable[str]) -> Iterator[Tuple[str, Dict[str, str]]]: ...
+    @staticmethod
+    def _get_fingerprint(response: str) -> int: ...
     def _parse_data(self, data: str) -> Dict[str, Dict[str, str]]: ...
     def _check_data(
         self, data: Dict[str, Dict[str, str]]
     ) -> Dict[str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]: ...
+    def _check_peers(
+        self,
+        data: Dict[str, Dict[str, str]],
+        states: Dict[str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]],
+    ) -> Dict[str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]: ...
+    def _get_peer_outliers(
+        self, temperatures: List[int]
+    ) -> Tuple[float, List[float], List[bool]]: ...
+    @staticmethod
+    def _get_median(values: List[Union[int, float]]) -> float: ...
+    def _get_peer_limit(self, mad: float) -> float: ...
+    def _get_device_state(
+        self, device: str, info: Optional[Dict[str, str]]
+    ) -> Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]: ...
+    def _get_thresholds(self, model: Optional[str]) -> Tuple[int, int]: ...
     def _get_status(
         self, data: Dict[str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]
     ) -> str: ...
     def _get_code(self, status: str) -> int: ...
+    def _set_code(self, status: str) -> None: ...
+    def _get_timings(self) -> Dict[str, float]: ...
+    def _get_performance_timings(self) -> List[str]: ...
+    def _resolve(self) -> None: ...
     def _get_output(self, data: Dict[str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]], status: str) -> str: ...
+    def _iter_output(self, data: Dict[str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]], status: str) -> Iterator[str]: ...
+    def _get_output_text(self, data: Dict[str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]], status: str) -> str: ...
+    def _get_limited(
+        self, head: str, texts: List[str], performance: List[str]
+    ) -> str: ...
+    def _get_text(
+        self, info: Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]
+    ) -> str: ...
+    def _get_performance(
+        self, info: Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]
+    ) -> str: ...
+    def _get_performance_label(self, host: Optional[str], name: str) -> str: ...
+    def _get_performance_item(
+        self,
+        label: str,
+        value: Union[None, int, float, str],
+        warning: int,
+        critical: int,
+    ) -> str: ...
+    @staticmethod
+    def _add_statistics(
+        statistics: Dict[str, List[Any]],
+        host: str,
+        info: Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]],
+    ) -> None: ...
+    def _get_performance_summary(
+        self, statistics: Dict[str, List[Any]]
+    ) -> List[str]: ...
+    def _render(
+        self, info: Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]
+    ) -> Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]: ...
+    def _check_cached(
+        self,
+        response: str,
+        label: Optional[str] = ...,
+        data: Optional[Dict[str, Dict[str, str]]] = ...,
+    ) -> Dict[str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]: ...
+    def _get_record(
+        self, info: Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]
+    ) -> Dict[str, Union[None, int, str]]: ...
+    def _get_output_json(self, data: Dict[str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]], status: str) -> str: ...
+    def _iter_output_ndjson(self, data: Dict[str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]], status: str) -> Iterator[str]: ...
+    def _get_error_states(
+        self, label: str, error: Exception
+    ) -> Dict[str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]: ...
+    def _check_response(
+        self, label: str, response: str
+    ) -> Dict[str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]: ...
+    def _check_inventory(
+        self,
+        label: str,
+        data: Dict[str, Dict[str, str]],
+        states: Dict[str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]],
+    ) -> Dict[str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]: ...
+    def _check_snapshot(
+        self, label: str
+    ) -> Optional[
+        Dict[str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]
+    ]: ...
+    def _check_host(
+        self, server: Tuple[str, str, int]
+    ) -> Tuple[
+        str, Dict[str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]
+    ]: ...
+    def _check_hosts(
+        self, check: Optional[Callable[[Tuple[str, str, int]], Any]] = ...
+    ) -> Iterator[Any]: ...
+    def _iter_host_states(
+        self, server: Tuple[str, str, int]
+    ) -> Iterator[
+        Tuple[str, str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]
+    ]: ...
+    def _iter_spooled(
+        self,
+        states: Iterable[
+            Tuple[
+                str, str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]
+            ]
+        ],
+        counter: Counter[str],
+        spool: IO[bytes],
+        lock: threading.Lock,
+    ) -> Iterator[
+        Tuple[str, str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]
+    ]: ...
+    def _spool(
+        self, fragments: List[str], spool: IO[bytes], lock: threading.Lock
+    ) -> None: ...
+    def _get_worst(
+        self,
+        states: Iterable[
+            Tuple[
+                str, str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]
+            ]
+        ],
+    ) -> List[
+        Tuple[str, str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]
+    ]: ...
+    def _check_host_bounded(
+        self, server: Tuple[str, str, int], spool: IO[bytes], lock: threading.Lock
+    ) -> Tuple[
+        str,
+        Counter[str],
+        List[
+            Tuple[
+                str, str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]
+            ]
+        ],
+    ]: ...
+    def _iter_merged(
+        self,
+        results: Iterable[
+            Tuple[
+                str,
+                Counter[str],
+                List[
+                    Tuple[
+                        str,
+                        str,
+                        Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]],
+                    ]
+                ],
+            ]
+        ],
+        summary: Dict[str, Counter[str]],
+    ) -> Iterator[
+        Tuple[str, str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]
+    ]: ...
+    def _iter_spool(self, spool: IO[bytes]) -> Iterator[str]: ...
+    def _iter_spool_performance(
+        self, spool: IO[bytes], limit: int
+    ) -> Iterator[str]: ...
+    def _iter_bounded(self) -> Iterator[str]: ...
+    def _iter_states(
+        self,
+        results: Iterable[
+            Tuple[
+                str,
+                Dict[
+                    str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]
+                ],
+            ]
+        ],
+        summary: Dict[str, Counter[str]],
+    ) -> Iterator[
+        Tuple[str, str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]
+    ]: ...
+    @staticmethod
+    def _get_worst_key(
+        item: Tuple[
+            str, str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]
+        ]
+    ) -> Tuple[int, int, str, str]: ...
+    def _get_summary_status(self, summary: Dict[str, Counter[str]]) -> str: ...
+    def _get_counters(self, counter: Counter[str]) -> str: ...
+    def _iter_aggregated(self) -> Iterator[str]: ...
+    def _iter_output_aggregated(
+        self,
+        worst: List[
+            Tuple[
+                str, str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]
+            ]
+        ],
+        summary: Dict[str, Counter[str]],
+        status: str,
+        spooled: bool = ...,
+    ) -> Iterator[str]: ...
+    def _get_output_aggregated(
+        self,
+        worst: List[
+            Tuple[
+                str, str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]
+            ]
+        ],
+        summary: Dict[str, Counter[str]],
+        status: str,
+        spooled: bool = ...,
+    ) -> str: ...
+    def _open_performance_file(self) -> None: ...
+    def _write_performance(
+        self,
+        host: str,
+        info: Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]],
+    ) -> None: ...
+    def _close_performance_file(self) -> None: ...
+    def _forward(
+        self,
+        host: str,
+        data: Dict[str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]],
+    ) -> None: ...
+    def _submit(
+        self,
+        host: str,
+        device: str,
+        info: Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]],
+    ) -> None: ...
+    def _flush_sinks(self) -> None: ...
+    def stream(self) -> Iterator[str]: ...
     def check(self) -> Tuple[str, int]: ...
 
 
+class Source(object):
+
+    options: Namespace = ...
+    def __init__(self, options: Namespace) -> None: ...
+    def fetch(self, server: str, port: int) -> str: ...
+    def _get_timeout(self, server: str, port: int) -> float: ...
+    def iter_fetch(self, server: str, port: int) -> Iterator[str]: ...
+
+
+class HDDTempSource(Source):
+
+    ATTEMPT_DELAY: float = ...
+    def _get_errors(self) -> str: ...
+    def _connect(self, server: str, port: int) -> socket.socket: ...
+    def _race(
+        self, addresses: List[Tuple[int, Tuple[Any, ...]]], timeout: float
+    ) -> socket.socket: ...
+
+
+class CircuitOpenError(OSError): ...
+
+
+class CircuitBreaker(object):
+
+    FILENAME: str = ...
+    path: str = ...
+    threshold: int = ...
+    cooldown: float = ...
+    state: Optional[Dict[str, Dict[str, Union[int, float, None]]]] = ...
+    changed: Set[str] = ...
+    lock: threading.Lock = ...
+    def __init__(self, path: str, threshold: int, cooldown: float) -> None: ...
+    @staticmethod
+    def _get_key(server: str, port: int) -> str: ...
+    def _get_state(self) -> Dict[str, Dict[str, Union[int, float, None]]]: ...
+    def allow(self, server: str, port: int) -> None: ...
+    def _is_probed(self, info: Any, now: float) -> bool: ...
+    def _claim(
+        self, key: str, info: Dict[str, Union[int, float, None]], now: float
+    ) -> bool: ...
+    def failure(self, server: str, port: int) -> None: ...
+    def success(self, server: str, port: int) -> None: ...
+    def _merge(
+        self, state: Optional[Dict[str, Dict[str, Union[int, float, None]]]]
+    ) -> Dict[str, Dict[str, Union[int, float, None]]]: ...
+    def save(self) -> None: ...
+
+
+class LatencyTracker(object):
+
+    FILENAME: str = ...
+    ALPHA: float = ...
+    WINDOW: int = ...
+    PERCENTILE: int = ...
+    MARGIN: float = ...
+    path: str = ...
+    minimum: float = ...
+    maximum: float = ...
+    state: Optional[Dict[str, Dict[str, Union[float, List[float]]]]] = ...
+    changed: Set[str] = ...
+    lock: threading.Lock = ...
+    def __init__(self, path: str, minimum: float, maximum: float) -> None: ...
+    @staticmethod
+    def _get_key(server: str, port: int) -> str: ...
+    def _get_state(self) -> Dict[str, Dict[str, Union[float, List[float]]]]: ...
+    @classmethod
+    def get_percentile(cls, samples: List[float]) -> float: ...
+    def get_timeout(self, server: str, port: int, default: float) -> float: ...
+    def observe(
+        self, server: str, port: int, latency: float, timeout: bool = ...
+    ) -> None: ...
+    def _merge(
+        self, state: Optional[Dict[str, Dict[str, Union[float, List[float]]]]]
+    ) -> Dict[str, Dict[str, Union[float, List[float]]]]: ...
+    def save(self) -> None: ...
+
+
 def main() -> None: ...
@@ -0,0 +1,1272 @@
+#!/usr/bin/env python
+
+# -*- coding: utf-8 -*-
+
+# nagios-check-hddtemp
+# check_hddtemp_poller.py
+
+# Copyright (c) 2011-2021 Alexei Andrushievich <vint21h@vint21h.pp.ua>
+# Check HDD temperature Nagios plugin [https://github.com/vint21h/nagios-check-hddtemp/]
+#
+# This file is part of nagios-check-hddtemp.
+#
+# nagios-check-hddtemp is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+import sys
+import time
+import zlib
+import heapq
+import struct
+import asyncio
+import multiprocessing
+from collections import Counter
+from argparse import ArgumentParser
+from concurrent.futures import ThreadPoolExecutor
+
+from check_hddtemp_state import Snapshot
+from check_hddtemp import CheckHDDTemp, HDDTempSource, CircuitOpenError, json_dumps
+
+
+try:
+    import resource
+except ImportError:  # not Unix
+    resource = None  # type: ignore
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+
+__all__ = [
+    "Host",
+    "Scheduler",
+    "ShardedScheduler",
+    "decode_states",
+    "decode_stats",
+    "encode_states",
+    "encode_stats",
+    "connect",
+    "fetch",
+    "get_concurrency",
+    "get_loop",
+    "main",
+    "raise_files_limit",
+    "work",
+]
+
+
+LOOPS = ["auto", "asyncio", "uvloop"]
+RESERVED_FILES = 32  # standard streams, state files, event loop internals
+DEFAULT_FILES_LIMIT = 65536  # used instead of unlimited hard limit
+# worker to parent binary frames, see "encode_states" and "encode_stats"
+STATES_FRAME = b"S"
+STATS_FRAME = b"T"
+FRAME_HEADER = struct.Struct("!cHH")  # type, label length, devices count
+# template, priority, flags, temperature, warning and critical thresholds,
+# device, scale and text lengths
+DEVICE_RECORD = struct.Struct("!BbBiiiHHH")
+TEMPLATES = sorted(CheckHDDTemp.OUTPUT_TEMPLATES.keys())
+TEMPERATURE_INT, TEMPERATURE_TEXT, TEMPERATURE_NONE = 0, 1, 2
+FLAG_ERROR = 4  # text is error message, low bits are temperature kind
+STATS = ["polls", "hits", "errors", "open", "skipped", "active"]
+STATS_RECORD = struct.Struct("!c{count}I".format(count=len(STATS)))
+SLEEP_SMOOTHING = 0.3  # weight of latest sleep episode in learned duration
+
+
+async def connect(addresses, delay=HDDTempSource.ATTEMPT_DELAY):
+    """
+    Connect to first address accepting connection ("happy eyeballs").
+
+    Next address connection attempt starts after delay or right after previous
+    attempt failure, pending attempts are cancelled after first successful one.
+
+    :param addresses: addresses families and socket addresses in preferred order
+    :type addresses: List[Tuple[int, Tuple[Any, ...]]]
+    :param delay: connection attempt delay in seconds
+    :type delay: float
+    :return: connection reader and writer
+    :rtype: Tuple[asyncio.StreamReader, asyncio.StreamWriter]
+    :raises OSError: no address can be connected
+    """
+
+    queue = list(addresses)
+    pending = set()  # type: ignore
+    connection = None
+    error = OSError("server has no addresses")  # type: BaseException
+
+    try:
+        while connection is None and (queue or pending):
+            if queue:
+                _, address = queue.pop(0)
+                pending.add(
+                    asyncio.ensure_future(
+                        asyncio.open_connection(host=address[0], port=address[1])
+                    )
+                )
+            done, pending = await asyncio.wait(
+                pending,
+                timeout=delay if queue else None,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            for attempt in done:
+                if attempt.exception() is not None:
+                    error = attempt.exception()  # type: ignore
+                elif connection is None:
+                    connection = attempt.result()
+                else:
+                    attempt.result()[1].close()
+    finally:
+        for attempt in pending:
+            attempt.cancel()
+
+    if connection is None:
+        raise error
+
+    return connection
+
+
+async def fetch(host, port, timeout, errors="strict", addresses=None):
+    """
+    Get and return data from hddtemp server.
+
+    :param host: server name or address
+    :type host: str
+    :param port: port number
+    :type port: int
+    :param timeout: connection and receiving data timeout
+    :type timeout: float
+    :param errors: response decoding errors handling scheme
+    :type errors: str
+    :param addresses: server resolved addresses, resolving error, or None to resolve it on connection
+    :type addresses: Union[None, Exception, List[Tuple[int, Tuple[Any, ...]]]]
+    :return: data from hddtemp server
+    :rtype: str
+    """  # noqa: E501
+
+    async def receive():
+        """
+        Connect to server and read its whole response.
+
+        :return: data from hddtemp server
+        :rtype: bytes
+        """
+
+        if isinstance(addresses, Exception):
+            raise addresses
+        reader, writer = await (
+            asyncio.open_connection(host=host, port=port)
+            if addresses is None
+            else connect(addresses=addresses)  # type: ignore
+        )
+
+        try:
+            return await reader.read()
+        finally:
+            writer.close()
+
+    # connecting and receiving data share single timeout
+    response = await asyncio.wait_for(receive(), timeout=timeout)  # type: ignore
+
+    return response.decode("utf8", errors)
+
+
+def get_loop(name="auto"):
+    """
+    Create event loop, faster uvloop one if installed and not disabled.
+
+    :param name: event loop implementation name ("auto", "asyncio" or "uvloop")
+    :type name: str
+    :return: event loop
+    :rtype: asyncio.AbstractEventLoop
+    :raises ImportError: uvloop requested, but not installed
+    """
+
+    if name == "uvloop" and uvloop is None:
+        raise ImportError("uvloop is not installed")
+    if name != "asyncio" and uvloop is not None:
+        return uvloop.new_event_loop()
+
+    return asyncio.new_event_loop()
+
+
+def raise_files_limit(limit=None):
+    """
+    Raise open files soft limit within hard limit.
+
+    :param limit: wanted open files limit, or None to raise it up to hard limit
+    :type limit: Optional[int]
+    :return: open files soft limit, or None if it can't be detected
+    :rtype: Optional[int]
+    """
+
+    if resource is None:
+        return None  # type: ignore
+
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    # unlimited hard limit must be kept: it can't be raised back once lowered
+    ceiling = hard
+    if ceiling == resource.RLIM_INFINITY:
+        ceiling = max(soft, DEFAULT_FILES_LIMIT, limit or 0)
+    if soft == resource.RLIM_INFINITY:
+        soft = ceiling
+    wanted = min(limit or ceiling, ceiling)
+
+    if wanted > soft:
+        try:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (wanted, hard))
+        except (ValueError, OSError):
+            return soft
+        soft = wanted
+
+    return soft
+
+
+def get_concurrency(limit, concurrency=None):
+    """
+    Size in-flight connections count by open files limit.
+
+    :param limit: open files limit, or None if it can't be detected
+    :type limit: Optional[int]
+    :param concurrency: wanted in-flight connections count, or None for maximum
+    :type concurrency: Optional[int]
+    :return: in-flight connections count
+    :rtype: int
+    """
+
+    if limit is None:
+        return concurrency or 64
+
+    maximum = max(1, limit - RESERVED_FILES)
+
+    return min(concurrency, maximum) if concurrency else maximum
+
+
+def encode_states(label, states):
+    """
+    Pack server devices states to compact binary frame.
+
+    Frame is header with server label followed by fixed-width device records,
+    every record is followed by its device name, scale and text (error message
+    or non-numeric temperature).
+
+    :param label: server label
+    :type label: str
+    :param states: server devices states info
+    :type states: Dict[str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]  # noqa: E501
+    :return: binary frame
+    :rtype: bytes
+    """
+
+    name = label.encode("utf8")
+    chunks = [FRAME_HEADER.pack(STATES_FRAME, len(name), len(states)), name]
+
+    for device, info in states.items():
+        data = info["data"]
+        temperature = data["temperature"]
+        text = data.get("error", "")
+        flags = FLAG_ERROR if "error" in data else 0
+        if temperature is None:
+            flags, temperature = flags | TEMPERATURE_NONE, 0
+        elif not isinstance(temperature, int):
+            flags, temperature, text = TEMPERATURE_TEXT, 0, temperature
+        device, scale, text = [
+            value.encode("utf8") for value in [device, data["scale"] or "", text]
+        ]
+        chunks.extend(
+            [
+                DEVICE_RECORD.pack(
+                    TEMPLATES.index(info["template"]),
+                    info["priority"],
+                    flags,
+                    temperature,
+                    data["warning"],
+                    data["critical"],
+                    len(device),
+                    len(scale),
+                    len(text),
+                ),
+                device,
+                scale,
+                text,
+            ]
+        )
+
+    return b"".join(chunks)
+
+
+def decode_states(frame):
+    """
+    Unpack server devices states from binary frame.
+
+    :param frame: binary frame
+    :type frame: bytes
+    :return: server label and devices states info
+    :rtype: Tuple[str, Dict[str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]]  # noqa: E501
+    """
+
+    _, size, count = FRAME_HEADER.unpack_from(frame)
+    offset = FRAME_HEADER.size + size
+    label = frame[FRAME_HEADER.size : offset].decode("utf8")  # noqa: E203
+    states = {}
+
+    for _ in range(count):
+        (
+            template,
+            priority,
+            flags,
+            temperature,
+            warning,
+            critical,
+            *sizes,
+        ) = DEVICE_RECORD.unpack_from(frame, offset)
+        offset += DEVICE_RECORD.size
+        values = []
+        for size in sizes:
+            values.append(frame[offset : offset + size].decode("utf8"))  # noqa: E203
+            offset += size
+        device, scale, text = values
+        kind = flags & ~FLAG_ERROR
+        data = {
+            "device": device,
+            "temperature": {
+                TEMPERATURE_INT: temperature,
+                TEMPERATURE_TEXT: text,
+                TEMPERATURE_NONE: None,
+            }[kind],
+            "scale": None if kind == TEMPERATURE_NONE else scale,
+            # per model thresholds are known only to worker
+            "warning": warning,
+            "critical": critical,
+        }
+        if flags & FLAG_ERROR:
+            data["error"] = text
+        data["host"] = label
+        states[device] = {
+            "template": TEMPLATES[template],
+            "priority": priority,
+            "data": data,
+        }
+
+    return label, states
+
+
+def encode_stats(stats):
+    """
+    Pack worker polling statistics to binary frame.
+
+    :param stats: polling statistics
+    :type stats: Counter[str]
+    :return: binary frame
+    :rtype: bytes
+    """
+
+    return STATS_RECORD.pack(STATS_FRAME, *[stats[name] for name in STATS])
+
+
+def decode_stats(frame):
+    """
+    Unpack worker polling statistics from binary frame.
+
+    :param frame: binary frame
+    :type frame: bytes
+    :return: polling statistics
+    :rtype: Counter[str]
+    """
+
+    return Counter(dict(zip(STATS, STATS_RECORD.unpack(frame)[1:])))
+
+
+class Host(object):
+    """
+    Scheduled server state.
+    """
+
+    def __init__(self, label, host, port, interval, phase):
+        """
+        Set up scheduled server state.
+
+        :param label: server label
+        :type label: str
+        :param host: server name or address
+        :type host: str
+        :param port: port number
+        :type port: int
+        :param interval: polling interval in seconds
+        :type interval: float
+        :param phase: polling phase offset in seconds
+        :type phase: float
+        """
+
+        self.label = label
+        self.host = host
+        self.port = port
+        self.interval = interval
+        self.phase = phase
+        self.task = None
+        self.states = {}
+        self.status = None
+        self.runs = 0
+        self.skipped = 0
+        self.fingerprint = None
+        self.hits = 0
+        self.output = None  # rendered states cache, reset when states changed
+        self.frame = None  # last states binary frame received from worker
+        self.awake = {}  # devices last awake temperatures, scales and timestamps
+        self.asleep = {}  # timestamps of devices falling asleep
+        self.episodes = {}  # devices learned sleep episodes durations
+
+
+class Scheduler(object):
+    """
+    Poll servers with check stages on evenly spread jittered schedule (Python 3 only).
+    """
+
+    def __init__(  # pylint: disable=R0913
+        self,
+        checker,
+        interval=60.0,
+        concurrency=64,
+        min_interval=None,
+        max_interval=None,
+        backoff=2.0,
+        callback=None,
+    ):
+        """
+        Set up scheduler.
+
+        :param checker: checker with servers list and check options
+        :type checker: CheckHDDTemp
+        :param interval: base polling interval in seconds
+        :type interval: float
+        :param concurrency: maximum count of servers polled concurrently
+        :type concurrency: int
+        :param min_interval: polling interval for servers with warning or worse status
+        :type min_interval: Optional[float]
+        :param max_interval: maximum polling interval for servers with sleeping devices
+        :type max_interval: Optional[float]
+        :param backoff: polling interval multiplier for servers with sleeping devices
+        :type backoff: float
+        :param callback: function called with server and its devices states after poll
+        :type callback: Optional[Callable[[Host, Dict[str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]], None]]  # noqa: E501
+        """
+
+        self.checker = checker
+        self.interval = interval
+        self.concurrency = concurrency
+        self.min_interval = min_interval or interval / 4
+        self.max_interval = max_interval or interval * 8
+        self.backoff = backoff
+        self.callback = callback
+        self.stats = Counter()  # type: ignore
+        self.active = 0
+        self.semaphore = None
+        self.started = None
+        self.finished = None
+        phases = self._get_phases(  # type: ignore
+            labels=[label for label, _, _ in checker.options.servers],
+            interval=interval,
+        )
+        self.hosts = [
+            Host(  # type: ignore
+                label=label,
+                host=host,
+                port=port,
+                interval=interval,
+                phase=phases[label],
+            )
+            for label, host, port in checker.options.servers
+        ]
+
+    @staticmethod
+    def _get_phases(labels, interval):
+        """
+        Spread servers evenly across interval with deterministic phase offsets.
+
+        Servers order is defined by servers labels hashes,
+        so offsets don't depend on servers list order.
+
+        :param labels: servers labels
+        :type labels: List[str]
+        :param interval: polling interval in seconds
+        :type interval: float
+        :return: servers phase offsets in seconds
+        :rtype: Dict[str, float]
+        """
+
+        ranked = sorted(
+            set(labels),
+            key=lambda label: (zlib.crc32(label.encode("utf8")) & 0xFFFFFFFF, label),
+        )
+
+        return {
+            label: interval * rank / len(ranked) for rank, label in enumerate(ranked)
+        }
+
+    @staticmethod
+    def _learn(host, states, now=None):
+        """
+        Learn server devices sleep patterns and remember their awake temperatures.
+
+        Sleep episode starts on first sleeping state of device and ends on
+        any other state, learned episode duration is smoothed moving average.
+
+        :param host: scheduled server state
+        :type host: Host
+        :param states: server devices states info
+        :type states: Dict[str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]  # noqa: E501
+        :param now: current timestamp
+        :type now: Optional[float]
+        """
+
+        now = time.time() if now is None else now
+
+        for device, info in states.items():
+            data = info["data"]
+            if info["priority"] == CheckHDDTemp.PRIORITY_SLEEPING:
+                host.asleep.setdefault(device, now)
+
+                continue
+
+            since = host.asleep.pop(device, None)
+            if since is not None:
+                duration = now - since
+                learned = host.episodes.get(device, duration)
+                host.episodes[device] = learned + SLEEP_SMOOTHING * (duration - learned)
+            if "error" not in data and isinstance(data["temperature"], int):
+                host.awake[device] = (data["temperature"], data["scale"], now)
+
+    @staticmethod
+    def _get_remaining(host, now):
+        """
+        Get time left until first server device is expected to wake up.
+
+        :param host: scheduled server state
+        :type host: Host
+        :param now: current timestamp
+        :type now: float
+        :return: time left in seconds, or None if some device sleep pattern is unknown
+        :rtype: Optional[float]
+        """
+
+        if not host.asleep:
+            return None
+        if any([device not in host.episodes for device in host.asleep]):
+            return None
+
+        return min(
+            [
+                host.episodes[device] - (now - since)
+                for device, since in host.asleep.items()
+            ]
+        )
+
+    def _adapt(self, host, states, now=None):
+        """
+        Choose server next polling interval by its devices states.
+
+        Servers with all devices sleeping are polled right when first device
+        is expected to wake up by its learned sleep pattern, polling interval
+        is multiplied by backoff until pattern is learned or if device sleeps
+        longer than expected.
+
+        :param host: scheduled server state
+        :type host: Host
+        :param states: server devices states info
+        :type states: Dict[str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]  # noqa: E501
+        :param now: current timestamp
+        :type now: Optional[float]
+        :return: polling interval in seconds
+        :rtype: float
+        """
+
+        priorities = [info["priority"] for info in states.values()]
+
+        if min(priorities) <= CheckHDDTemp.PRIORITY_WARNING:
+            return self.min_interval
+        if all(priority == CheckHDDTemp.PRIORITY_SLEEPING for priority in priorities):
+            remaining = self._get_remaining(  # type: ignore
+                host=host, now=time.time() if now is None else now
+            )
+            if remaining is None or remaining <= 0:
+                return min(host.interval * self.backoff, self.max_interval)
+
+            return min(max(remaining, self.interval), self.max_interval)
+
+        return self.interval
+
+    @staticmethod
+    def get_awake(host, now=None):
+        """
+        Get last awake temperatures of server sleeping devices with their age.
+
+        :param host: scheduled server state
+        :type host: Host
+        :param now: current timestamp
+        :type now: Optional[float]
+        :return: sleeping devices names and last awake temperatures info
+        :rtype: Dict[str, Dict[str, Union[int, str, float]]]
+        """
+
+        now = time.time() if now is None else now
+
+        return {
+            device: {
+                "temperature": temperature,
+                "scale": scale,
+                "age": round(now - timestamp, 3),
+            }
+            for device, (temperature, scale, timestamp) in host.awake.items()
+            if device in host.asleep
+        }
+
+    async def _poll(self, host):
+        """
+        Poll server and check its response.
+
+        :param host: scheduled server state
+        :type host: Host
+        """
+
+        options = self.checker.options
+        breaker, latency = options.breaker, options.latency
+        timeout = (
+            latency.get_timeout(
+                server=host.host, port=host.port, default=options.timeout
+            )
+            if latency is not None
+            else options.timeout
+        )
+
+        async with self.semaphore:  # type: ignore
+            self.active += 1
+            self.stats["active"] = max(self.stats["active"], self.active)
+            started = time.time()
+            try:
+                if breaker is not None:
+                    breaker.allow(server=host.host, port=host.port)
+                response = await fetch(  # type: ignore
+                    host=host.host,
+                    port=host.port,
+                    timeout=timeout,
+                    errors="replace" if options.tolerant else "strict",
+                    addresses=options.addresses.get((host.host, host.port)),
+                )
+            except CircuitOpenError as error:
+                self.stats["open"] += 1
+                states = self.checker._get_error_states(label=host.label, error=error)
+            except (EOFError, OSError, UnicodeError, asyncio.TimeoutError) as error:
+                self.stats["errors"] += 1
+                if breaker is not None:
+                    breaker.failure(server=host.host, port=host.port)
+                if latency is not None:
+                    latency.observe(
+                        server=host.host,
+                        port=host.port,
+                        latency=time.time() - started,
+                        timeout=isinstance(error, asyncio.TimeoutError),
+                    )
+                states = self.checker._get_error_states(label=host.label, error=error)
+            else:
+                if breaker is not None:
+                    breaker.success(server=host.host, port=host.port)
+                if latency is not None:
+                    latency.observe(
+                        server=host.host, port=host.port, latency=time.time() - started
+                    )
+                if options.board is not None:  # share response with checks
+                    options.board.put(
+                        server=host.host, port=host.port, response=response
+                    )
+                fingerprint = self.checker._get_fingerprint(response=response)
+                # unchanged response, so reuse its previous check results
+                if fingerprint == host.fingerprint:
+                    host.hits += 1
+                    self.stats["hits"] += 1
+                    states = host.states
+                else:
+                    states = self.checker._check_response(
+                        label=host.label, response=response
+                    )
+                host.fingerprint = fingerprint
+            finally:
+                self.active -= 1
+
+        if states is not host.states:
+            host.output = None
+        if "" in states:  # server error
+            host.fingerprint = None
+        host.runs += 1
+        host.states = states
+        host.status = self.checker._get_status(data=states)
+        self._learn(host=host, states=states)  # type: ignore
+        host.interval = self._adapt(host=host, states=states)  # type: ignore
+        self.stats["polls"] += 1
+
+        if self.callback:
+            self.callback(host, states)
+
+    def get_hit_rates(self):
+        """
+        Get servers unchanged responses rates.
+
+        :return: servers labels and unchanged responses rates
+        :rtype: Dict[str, float]
+        """
+
+        return {
+            host.label: float(host.hits) / host.runs if host.runs else 0.0
+            for host in self.hosts
+        }
+
+    def get_status(self):
+        """
+        Get main status of all polled servers.
+
+        :return: main status
+        :rtype: str
+        """
+
+        priorities = [
+            CheckHDDTemp.STATUS_TO_PRIORITY[host.status]
+            for host in self.hosts
+            if host.status is not None
+        ]
+
+        if not priorities:
+            return CheckHDDTemp.STATUS_UNKNOWN
+
+        return CheckHDDTemp.PRIORITY_TO_STATUS[min(priorities)]
+
+    def get_rate(self):
+        """
+        Get achieved polling rate.
+
+        :return: polled servers per second
+        :rtype: float
+        """
+
+        if self.started is None or self.finished is None:
+            return 0.0
+
+        return self.stats["polls"] / max(self.finished - self.started, 1e-9)
+
+    async def sweep(self):
+        """
+        Poll all servers once as fast as concurrency limit allows.
+        """
+
+        loop = asyncio.get_event_loop()
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+        self.started = loop.time()
+
+        try:
+            await asyncio.gather(*[self._poll(host=host) for host in self.hosts])  # type: ignore  # noqa: E501
+        finally:
+            self.finished = loop.time()
+            if self.checker.options.breaker is not None:
+                self.checker.options.breaker.save()
+            if self.checker.options.latency is not None:
+                self.checker.options.latency.save()
+
+    async def run(self, duration=None):
+        """
+        Poll servers until duration is over, or forever.
+
+        :param duration: scheduler running time in seconds, or None to run forever
+        :type duration: Optional[float]
+        """
+
+        loop = asyncio.get_event_loop()
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+        start = self.started = loop.time()
+        deadline = start + duration if duration is not None else None
+        queue = [(start + host.phase, index) for index, host in enumerate(self.hosts)]
+        heapq.heapify(queue)
+
+        try:
+            while queue:
+                when, index = queue[0]
+                if deadline is not None and when >= deadline:
+                    break
+                delay = when - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                host = self.hosts[index]
+                if host.task is not None and not host.task.done():
+                    # previous fetch still in flight, skip tick
+                    host.skipped += 1
+                    self.stats["skipped"] += 1
+                else:
+                    host.task = loop.create_task(self._poll(host=host))  # type: ignore  # noqa: E501
+                heapq.heapreplace(queue, (when + host.interval, index))
+        finally:
+            pending = [
+                host.task
+                for host in self.hosts
+                if host.task is not None and not host.task.done()
+            ]
+            if pending:
+                await asyncio.wait(pending)
+            self.finished = loop.time()
+            if self.checker.options.breaker is not None:
+                self.checker.options.breaker.save()
+            if self.checker.options.latency is not None:
+                self.checker.options.latency.save()
+
+
+def work(args, servers, connection, once=False, duration=None, loop="auto", **kwargs):
+    """
+    Poll servers shard and send devices states to parent process as binary frames.
+
+    :param args: check options
+    :type args: List[str]
+    :param servers: servers shard with labels, addresses and ports
+    :type servers: List[Tuple[str, str, int]]
+    :param connection: parent process pipe connection
+    :type connection: multiprocessing.connection.Connection
+    :param once: poll all servers once instead of polling them on schedule
+    :type once: bool
+    :param duration: scheduler running time in seconds, or None to run forever
+    :type duration: Optional[float]
+    :param loop: event loop implementation name
+    :type loop: str
+    :param kwargs: scheduler options
+    :type kwargs: Dict[str, Any]
+    """
+
+    checker = CheckHDDTemp(args=args)  # type: ignore
+    checker.options.servers = servers
+    if checker.options.resolve:
+        checker._resolve()  # type: ignore
+
+    def callback(host, states):
+        """
+        Send server devices states to parent process.
+
+        :param host: scheduled server state
+        :type host: Host
+        :param states: server devices states info
+        :type states: Dict[str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]  # noqa: E501
+        """
+
+        if host.output is None:
+            host.output = encode_states(label=host.label, states=states)  # type: ignore  # noqa: E501
+        connection.send_bytes(host.output)
+
+    scheduler = Scheduler(checker=checker, callback=callback, **kwargs)  # type: ignore  # noqa: E501
+    event_loop = get_loop(name=loop)  # type: ignore
+
+    try:
+        event_loop.run_until_complete(
+            scheduler.sweep()  # type: ignore
+            if once
+            else scheduler.run(duration=duration)  # type: ignore
+        )
+    except KeyboardInterrupt:
+        pass
+    finally:
+        event_loop.close()
+        connection.send_bytes(encode_stats(stats=scheduler.stats))  # type: ignore
+        connection.close()
+
+
+class ShardedScheduler(Scheduler):
+    """
+    Poll servers partitioned across worker processes, each with own event loop.
+
+    Workers send devices states back as compact binary frames,
+    main status is aggregated in parent process.
+    """
+
+    def __init__(self, checker, args, processes, loop="auto", **kwargs):
+        """
+        Set up sharded scheduler.
+
+        :param checker: checker with servers list and check options
+        :type checker: CheckHDDTemp
+        :param args: check options passed to workers
+        :type args: List[str]
+        :param processes: worker processes count
+        :type processes: int
+        :param loop: workers event loop implementation name
+        :type loop: str
+        :param kwargs: scheduler options
+        :type kwargs: Dict[str, Any]
+        """
+
+        super(ShardedScheduler, self).__init__(checker=checker, **kwargs)  # type: ignore  # noqa: E501
+        self.args = args
+        self.processes = min(processes, len(self.hosts))
+        self.loop = loop
+        self.settings = dict(
+            interval=self.interval,
+            concurrency=self.concurrency,
+            min_interval=self.min_interval,
+            max_interval=self.max_interval,
+            backoff=self.backoff,
+        )
+        self.labels = {host.label: host for host in self.hosts}
+
+    def _get_shards(self):
+        """
+        Partition servers across worker processes.
+
+        :return: servers shards with labels, addresses and ports
+        :rtype: List[List[Tuple[str, str, int]]]
+        """
+
+        servers = self.checker.options.servers
+
+        return [
+            servers[index :: self.processes]  # noqa: E203
+            for index in range(self.processes)
+        ]
+
+    def _receive(self, frame):
+        """
+        Update server state from worker binary frame.
+
+        Unchanged frames aren't decoded again, previous states are reused.
+
+        :param frame: binary frame
+        :type frame: bytes
+        """
+
+        if frame[:1] == STATS_FRAME:
+            self.stats.update(decode_stats(frame=frame))  # type: ignore
+
+            return
+
+        _, size, _ = FRAME_HEADER.unpack_from(frame)
+        label = frame[FRAME_HEADER.size : FRAME_HEADER.size + size]  # noqa: E203
+        host = self.labels[label.decode("utf8")]
+
+        if frame == host.frame:
+            host.hits += 1
+        else:
+            _, host.states = decode_states(frame=frame)  # type: ignore
+            host.status = self.checker._get_status(data=host.states)
+            host.output = None
+            host.frame = frame
+        host.runs += 1
+        self._learn(host=host, states=host.states)  # type: ignore
+
+        if self.callback:
+            self.callback(host, host.states)
+
+    async def _collect(self, connection, executor):
+        """
+        Receive worker binary frames until worker is done.
+
+        :param connection: worker pipe connection
+        :type connection: multiprocessing.connection.Connection
+        :param executor: blocking receiving executor
+        :type executor: ThreadPoolExecutor
+        """
+
+        loop = asyncio.get_event_loop()
+
+        try:
+            while True:
+                try:
+                    frame = await loop.run_in_executor(executor, connection.recv_bytes)
+                except EOFError:
+                    break
+                self._receive(frame=frame)  # type: ignore
+        finally:
+            connection.close()
+
+    async def _spawn(self, once, duration):
+        """
+        Start worker processes and collect their results.
+
+        :param once: poll all servers once instead of polling them on schedule
+        :type once: bool
+        :param duration: scheduler running time in seconds, or None to run forever
+        :type duration: Optional[float]
+        """
+
+        loop = asyncio.get_event_loop()
+        workers, connections = [], []
+        self.started = loop.time()
+
+        for shard in self._get_shards():  # type: ignore
+            reader, writer = multiprocessing.Pipe(duplex=False)
+            worker = multiprocessing.Process(
+                target=work,
+                args=(self.args, shard, writer),
+                kwargs=dict(
+                    self.settings, once=once, duration=duration, loop=self.loop
+                ),
+                daemon=True,
+            )
+            worker.start()
+            writer.close()
+            workers.append(worker)
+            connections.append(reader)
+
+        executor = ThreadPoolExecutor(max_workers=len(connections))
+
+        try:
+            await asyncio.gather(
+                *[
+                    self._collect(connection=connection, executor=executor)  # type: ignore  # noqa: E501
+                    for connection in connections
+                ]
+            )
+        finally:
+            self.finished = loop.time()
+            executor.shutdown(wait=False)
+            for worker in workers:
+                worker.join(timeout=1.0)
+                if worker.is_alive():
+                    worker.terminate()
+
+    async def sweep(self):
+        """
+        Poll all servers once as fast as workers allow.
+        """
+
+        await self._spawn(once=True, duration=None)  # type: ignore
+
+    async def run(self, duration=None):
+        """
+        Poll servers until duration is over, or forever.
+
+        :param duration: scheduler running time in seconds, or None to run forever
+        :type duration: Optional[float]
+        """
+
+        await self._spawn(once=False, duration=duration)  # type: ignore
+
+
+def main():
+    """
+    Program main: collect devices states on schedule and print them as NDJSON.
+    """
+
+    parser = ArgumentParser(
+        description="Check HDD temperature collector, all other options are passed to check",  # noqa: E501
+        add_help=False,
+    )
+    parser.add_argument(
+        "--interval",
+        action="store",
+        type=float,
+        dest="interval",
+        default=60.0,
+        metavar="SECONDS",
+        help="base polling interval",
+    )
+    parser.add_argument(
+        "--min-interval",
+        action="store",
+        type=float,
+        dest="min_interval",
+        default=None,
+        metavar="SECONDS",
+        help="polling interval for servers with warning or worse status",
+    )
+    parser.add_argument(
+        "--max-interval",
+        action="store",
+        type=float,
+        dest="max_interval",
+        default=None,
+        metavar="SECONDS",
+        help="maximum polling interval for servers with all devices sleeping",
+    )
+    parser.add_argument(
+        "--concurrency",
+        action="store",
+        type=int,
+        dest="concurrency",
+        default=None,
+        metavar="COUNT",
+        help="maximum count of servers polled concurrently, sized by open files limit by default",  # noqa: E501
+    )
+    parser.add_argument(
+        "--loop",
+        action="store",
+        type=str,
+        dest="loop",
+        choices=LOOPS,
+        default="auto",
+        metavar="LOOP",
+        help="event loop implementation, one of {loops}, uvloop is used if installed by default".format(  # noqa: E501
+            loops=", ".join(LOOPS)
+        ),
+    )
+    parser.add_argument(
+        "--processes",
+        action="store",
+        type=int,
+        dest="processes",
+        default=1,
+        metavar="COUNT",
+        help="worker processes count, every worker polls own servers shard with own event loop",  # noqa: E501
+    )
+    parser.add_argument(
+        "--once",
+        action="store_true",
+        default=False,
+        dest="once",
+        help="poll all servers once and exit",
+    )
+    parser.add_argument(
+        "--snapshot",
+        action="store",
+        type=str,
+        dest="snapshot",
+        default="",
+        metavar="PATH",
+        help="write servers devices states binary snapshot for checks",
+    )
+    parser.add_argument(
+        "--snapshot-interval",
+        action="store",
+        type=float,
+        dest="snapshot_interval",
+        default=10.0,
+        metavar="SECONDS",
+        help="minimum interval between snapshot writes",
+    )
+    parser.add_argument(
+        "--duration",
+        action="store",
+        type=float,
+        dest="duration",
+        default=None,
+        metavar="SECONDS",
+        help="collector running time, forever by default",
+    )
+    options, args = parser.parse_known_args()
+    checker = CheckHDDTemp(args=args)  # type: ignore
+
+    if options.processes < 1:
+        parser.error(message="Worker processes count must be positive")
+    if not isinstance(checker.options.source, HDDTempSource):
+        parser.error(message="Only hddtemp servers can be polled")
+    # workers resolve own servers shards
+    if checker.options.resolve and options.processes == 1:
+        checker._resolve()  # type: ignore
+
+    try:
+        loop = get_loop(name=options.loop)  # type: ignore
+    except ImportError as error:
+        parser.error(message="Event loop can't be created: {error}".format(error=error))
+
+    dumped = time.time()
+
+    def dump():
+        """
+        Write polled servers devices states snapshot.
+        """
+
+        nonlocal dumped
+
+        dumped = time.time()
+        Snapshot.dump(  # type: ignore
+            path=options.snapshot,
+            results=[
+                (host.label, host.states) for host in scheduler.hosts if host.states
+            ],  # noqa: E501
+        )
+
+    def callback(host, states):
+        """
+        Print server devices states as NDJSON and write snapshot from time to time.
+
+        :param host: scheduled server state
+        :type host: Host
+        :param states: server devices states info
+        :type states: Dict[str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]  # noqa: E501
+        """
+
+        awake = scheduler.get_awake(host=host)  # type: ignore
+
+        if host.output is None or awake:
+            records = []
+            for device, info in states.items():
+                record = checker._get_record(info=info)  # type: ignore
+                if device in awake:  # last awake temperature ages on every poll
+                    record["awake"] = awake[device]
+                records.append(record)
+            output = "".join(
+                [
+                    "{document}\n".format(document=json_dumps(dict(record, type="device")))  # type: ignore  # noqa: E501
+                    for record in records
+                ]
+            )
+            host.output = None if awake else output
+        else:
+            output = host.output
+        sys.stdout.write(output)
+        sys.stdout.flush()
+
+        if options.snapshot and time.time() - dumped >= options.snapshot_interval:
+            dump()  # type: ignore
+
+    kwargs = dict(
+        checker=checker,
+        interval=options.interval,
+        concurrency=get_concurrency(  # type: ignore
+            limit=raise_files_limit(), concurrency=options.concurrency  # type: ignore
+        ),
+        min_interval=options.min_interval,
+        max_interval=options.max_interval,
+        callback=callback,
+    )
+    scheduler = (
+        ShardedScheduler(  # type: ignore
+            args=args, processes=options.processes, loop=options.loop, **kwargs
+        )
+        if options.processes > 1
+        else Scheduler(**kwargs)  # type: ignore
+    )
+
+    try:
+        loop.run_until_complete(
+            scheduler.sweep()  # type: ignore
+            if options.once
+            else scheduler.run(duration=options.duration)  # type: ignore
+        )
+    except KeyboardInterrupt:
+        pass
+    finally:
+        loop.close()
+
+    if options.snapshot:
+        dump()  # type: ignore
+    sys.stdout.write(
+        "{document}\n".format(
+            document=json_dumps(  # type: ignore
+                {
+                    "type": "stats",
+                    "polls": scheduler.stats["polls"],
+                    "hits": scheduler.stats["hits"],
+                    "errors": scheduler.stats["errors"],
+                    "rate": round(scheduler.get_rate(), 3),  # type: ignore
+                    "status": scheduler.get_status(),  # type: ignore
+                    "hosts": scheduler.get_hit_rates(),  # type: ignore
+                }
+            )
+        )
+    )
+
+
+if __name__ == "__main__":
+
+    main()  # type: ignore
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+
+# nagios-check-hddtemp
+# check_hddtemp_poller.pyi
+
+
+import struct
+import asyncio
+import multiprocessing.connection
+from typing import (  # pylint: disable=W0611
+    Any,
+    Dict,
+    List,
+    Tuple,
+    Union,
+    Counter,
+    Callable,
+    Optional,
+)
+from concurrent.futures import ThreadPoolExecutor
+
+from check_hddtemp import CheckHDDTemp
+
+
+__all__: List[str] = ...
+
+LOOPS: List[str] = ...
+RESERVED_FILES: int = ...
+DEFAULT_FILES_LIMIT: int = ...
+STATES_FRAME: bytes = ...
+STATS_FRAME: bytes = ...
+FRAME_HEADER: struct.Struct = ...
+DEVICE_RECORD: struct.Struct = ...
+TEMPLATES: List[str] = ...
+TEMPERATURE_INT: int = ...
+TEMPERATURE_TEXT: int = ...
+TEMPERATURE_NONE: int = ...
+FLAG_ERROR: int = ...
+STATS: List[str] = ...
+STATS_RECORD: struct.Struct = ...
+SLEEP_SMOOTHING: float = ...
+
+
+async def connect(
+    addresses: List[Tuple[int, Tuple[Any, ...]]], delay: float = ...
+) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]: ...
+async def fetch(
+    host: str,
+    port: int,
+    timeout: float,
+    errors: str = ...,
+    addresses: Union[None, Exception, List[Tuple[int, Tuple[Any, ...]]]] = ...,
+) -> str: ...
+def get_loop(name: str = ...) -> asyncio.AbstractEventLoop: ...
+def raise_files_limit(limit: Optional[int] = ...) -> Optional[int]: ...
+def get_concurrency(limit: Optional[int], concurrency: Optional[int] = ...) -> int: ...
+def encode_states(
+    label: str,
+    states: Dict[str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]],
+) -> bytes: ...
+def decode_states(
+    frame: bytes,
+) -> Tuple[
+    str, Dict[str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]
+]: ...
+def encode_stats(stats: Counter[str]) -> bytes: ...
+def decode_stats(frame: bytes) -> Counter[str]: ...
+
+
+class Host(object):
+
+    label: str = ...
+    host: str = ...
+    port: int = ...
+    interval: float = ...
+    phase: float = ...
+    task: Optional[asyncio.Task[None]] = ...
+    states: Dict[str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]] = ...
+    status: Optional[str] = ...
+    runs: int = ...
+    skipped: int = ...
+    fingerprint: Optional[int] = ...
+    hits: int = ...
+    output: Optional[Union[str, bytes]] = ...
+    frame: Optional[bytes] = ...
+    awake: Dict[str, Tuple[int, str, float]] = ...
+    asleep: Dict[str, float] = ...
+    episodes: Dict[str, float] = ...
+    def __init__(
+        self, label: str, host: str, port: int, interval: float, phase: float
+    ) -> None: ...
+
+
+class Scheduler(object):
+
+    checker: CheckHDDTemp = ...
+    interval: float = ...
+    concurrency: int = ...
+    min_interval: float = ...
+    max_interval: float = ...
+    backoff: float = ...
+    callback: Optional[
+        Callable[
+            [
+                Host,
+                Dict[
+                    str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]
+                ],
+            ],
+            None,
+        ]
+    ] = ...
+    stats: Counter[str] = ...
+    active: int = ...
+    semaphore: Optional[asyncio.Semaphore] = ...
+    started: Optional[float] = ...
+    finished: Optional[float] = ...
+    hosts: List[Host] = ...
+    def __init__(
+        self,
+        checker: CheckHDDTemp,
+        interval: float = ...,
+        concurrency: int = ...,
+        min_interval: Optional[float] = ...,
+        max_interval: Optional[float] = ...,
+        backoff: float = ...,
+        callback: Optional[
+            Callable[
+                [
+                    Host,
+                    Dict[
+                        str,
+                        Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]],
+                    ],
+                ],
+                None,
+            ]
+        ] = ...,
+    ) -> None: ...
+    @staticmethod
+    def _get_phases(labels: List[str], interval: float) -> Dict[str, float]: ...
+    @staticmethod
+    def _learn(
+        host: Host,
+        states: Dict[str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]],
+        now: Optional[float] = ...,
+    ) -> None: ...
+    @staticmethod
+    def _get_remaining(host: Host, now: float) -> Optional[float]: ...
+    def _adapt(
+        self,
+        host: Host,
+        states: Dict[str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]],
+        now: Optional[float] = ...,
+    ) -> float: ...
+    @staticmethod
+    def get_awake(
+        host: Host, now: Optional[float] = ...
+    ) -> Dict[str, Dict[str, Union[int, str, float]]]: ...
+    async def _poll(self, host: Host) -> None: ...
+    def get_hit_rates(self) -> Dict[str, float]: ...
+    def get_status(self) -> str: ...
+    def get_rate(self) -> float: ...
+    async def sweep(self) -> None: ...
+    async def run(self, duration: Optional[float] = ...) -> None: ...
+
+
+def work(
+    args: List[str],
+    servers: List[Tuple[str, str, int]],
+    connection: multiprocessing.connection.Connection,
+    once: bool = ...,
+    duration: Optional[float] = ...,
+    loop: str = ...,
+    **kwargs: Any,
+) -> None: ...
+
+
+class ShardedScheduler(Scheduler):
+
+    args: List[str] = ...
+    processes: int = ...
+    loop: str = ...
+    settings: Dict[str, Any] = ...
+    labels: Dict[str, Host] = ...
+    def __init__(
+        self,
+        checker: CheckHDDTemp,
+        args: List[str],
+        processes: int,
+        loop: str = ...,
+        **kwargs: Any,
+    ) -> None: ...
+    def _get_shards(self) -> List[List[Tuple[str, str, int]]]: ...
+    def _receive(self, frame: bytes) -> None: ...
+    async def _collect(
+        self,
+        connection: multiprocessing.connection.Connection,
+        executor: ThreadPoolExecutor,
+    ) -> None: ...
+    async def _spawn(self, once: bool, duration: Optional[float]) -> None: ...
+
+
+def main() -> None: ...
@@ -0,0 +1,263 @@
+#!/usr/bin/env python
+
+# -*- coding: utf-8 -*-
+
+# nagios-check-hddtemp
+# check_hddtemp_replay.py
+
+# Copyright (c) 2011-2021 Alexei Andrushievich <vint21h@vint21h.pp.ua>
+# Check HDD temperature Nagios plugin [https://github.com/vint21h/nagios-check-hddtemp/]
+#
+# This file is part of nagios-check-hddtemp.
+#
+# nagios-check-hddtemp is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+from __future__ import unicode_literals
+
+import io
+import sys
+import time
+import difflib
+from collections import Counter
+from argparse import ArgumentParser
+
+from check_hddtemp_state import Capture
+from check_hddtemp import CheckHDDTemp, json_dumps
+
+
+try:
+    import ujson as json
+except ImportError:
+    import json
+
+
+__all__ = [
+    "diff",
+    "load",
+    "load_outputs",
+    "main",
+    "replay",
+]
+
+
+OUTPUT_TYPE = "output"
+DIFF_TYPE = "diff"
+STATS_TYPE = "stats"
+
+
+def load(path):
+    """
+    Read recorded responses from capture file ordered by their timestamps.
+
+    Concurrent plugin invocations append their records in completion order,
+    so records are sorted to be replayed in recording order.
+
+    :param path: capture file path
+    :type path: str
+    :return: responses timestamps, servers labels and raw responses
+    :rtype: List[Tuple[float, str, str]]
+    """
+
+    return sorted(Capture.load(path=path), key=lambda record: record[0])  # type: ignore  # noqa: E501
+
+
+def replay(checker, records, stats, speed=0.0):
+    """
+    Run recorded responses through check pipeline and yield outputs.
+
+    :param checker: checker with check options
+    :type checker: CheckHDDTemp
+    :param records: responses timestamps, servers labels and raw responses
+    :type records: List[Tuple[float, str, str]]
+    :param stats: replay statistics updated with records count, check time and statuses counts  # noqa: E501
+    :type stats: Counter[str]
+    :param speed: replay speed relative to recording, 0 for maximum speed
+    :type speed: float
+    :return: outputs records
+    :rtype: Iterator[Dict[str, Union[float, str]]]
+    """
+
+    started = time.time()
+
+    for timestamp, host, response in records:
+        if speed > 0:  # keep recorded intervals between responses
+            delay = (timestamp - records[0][0]) / speed - (time.time() - started)
+            if delay > 0:
+                time.sleep(delay)
+        start = time.time()
+        data = checker._check_response(label=host, response=response)
+        status = checker._get_status(data=data)
+        output = checker._get_output(data=data, status=status)
+        stats["busy"] += time.time() - start
+        stats["records"] += 1
+        stats[status] += 1
+
+        yield {
+            "type": OUTPUT_TYPE,
+            "time": timestamp,
+            "host": host,
+            "status": status,
+            "output": output,
+        }
+
+
+def load_outputs(path):
+    """
+    Read outputs records of previous replay.
+
+    :param path: previous replay NDJSON output file path
+    :type path: str
+    :return: outputs records by their timestamps and servers labels
+    :rtype: Dict[Tuple[float, str], Dict[str, Union[float, str]]]
+    """
+
+    outputs = {}
+
+    with io.open(path, encoding="utf8") as replayed:
+        for line in replayed:
+            record = json.loads(line)
+            if record.get("type") == OUTPUT_TYPE:
+                outputs[(record["time"], record["host"])] = record
+
+    return outputs
+
+
+def diff(baseline, record):
+    """
+    Compare output record with the same record of previous replay.
+
+    :param baseline: previous replay outputs records
+    :type baseline: Dict[Tuple[float, str], Dict[str, Union[float, str]]]
+    :param record: output record
+    :type record: Dict[str, Union[float, str]]
+    :return: unified diff of outputs, empty if they are equal or record is missing in previous replay  # noqa: E501
+    :rtype: str
+    """
+
+    previous = baseline.get((record["time"], record["host"]))
+
+    if previous is None or previous["output"] == record["output"]:
+        return ""
+
+    name = "{host}@{time}".format(host=record["host"], time=record["time"])
+
+    return "".join(
+        difflib.unified_diff(
+            previous["output"].splitlines(True),
+            record["output"].splitlines(True),
+            fromfile="baseline/{name}".format(name=name),
+            tofile="replay/{name}".format(name=name),
+        )
+    )
+
+
+def main():
+    """
+    Program main: replay recorded responses and print outputs as NDJSON.
+    """
+
+    parser = ArgumentParser(
+        description="Check HDD temperature capture replay, all other options are passed to check",  # noqa: E501
+        add_help=False,
+    )
+    parser.add_argument(
+        "--capture",
+        action="store",
+        type=str,
+        dest="capture",
+        default="",
+        metavar="PATH",
+        help="capture file recorded by check with --record option",
+    )
+    parser.add_argument(
+        "--speed",
+        action="store",
+        type=float,
+        dest="speed",
+        default=0.0,
+        metavar="FACTOR",
+        help="replay speed relative to recording: 1 is real time, 0 is maximum speed (default)",  # noqa: E501
+    )
+    parser.add_argument(
+        "--baseline",
+        action="store",
+        type=str,
+        dest="baseline",
+        default="",
+        metavar="PATH",
+        help="NDJSON output of previous replay to show outputs differences with",
+    )
+    options, args = parser.parse_known_args()
+
+    if not options.capture:
+        parser.error(message="Required capture file option missing")
+    if options.speed < 0:
+        parser.error(message="Replay speed option value must not be negative")
+
+    # servers are taken from capture, so check doesn't need them
+    checker = CheckHDDTemp(args=["-s", "replay"] + args)  # type: ignore
+
+    try:
+        records = load(path=options.capture)  # type: ignore
+        baseline = load_outputs(path=options.baseline) if options.baseline else {}  # type: ignore  # noqa: E501
+    except (EnvironmentError, EOFError, ValueError, KeyError) as error:
+        parser.error(message="Capture can't be read: {error}".format(error=error))
+
+    stats = Counter()  # type: ignore
+    started = time.time()
+
+    for record in replay(  # type: ignore
+        checker=checker, records=records, stats=stats, speed=options.speed
+    ):
+        sys.stdout.write("{document}\n".format(document=json_dumps(record)))  # type: ignore  # noqa: E501
+        changes = diff(baseline=baseline, record=record)  # type: ignore
+        if changes:
+            stats["changed"] += 1
+            sys.stdout.write(
+                "{document}\n".format(
+                    document=json_dumps(  # type: ignore
+                        {
+                            "type": DIFF_TYPE,
+                            "time": record["time"],
+                            "host": record["host"],
+                            "diff": changes,
+                        }
+                    )
+                )
+            )
+
+    sys.stdout.write(
+        "{document}\n".format(
+            document=json_dumps(  # type: ignore
+                {
+                    "type": STATS_TYPE,
+                    "records": stats["records"],
+                    "elapsed": round(time.time() - started, 3),
+                    "rate": round(stats["records"] / max(stats["busy"], 1e-9), 3),
+                    "changed": stats["changed"],
+                    "statuses": {
+                        status: stats[status]
+                        for status in CheckHDDTemp.STATUS_TO_PRIORITY
+                        if stats[status]
+                    },
+                }
+            )
+        )
+    )
+
+
+if __name__ == "__main__":
+
+    main()  # type: ignore
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+
+# nagios-check-hddtemp
+# check_hddtemp_replay.pyi
+
+
+from typing import (  # pylint: disable=W0611
+    Dict,
+    List,
+    Tuple,
+    Union,
+    Counter,
+    Iterator,
+)
+
+from check_hddtemp import CheckHDDTemp
+
+
+__all__: List[str] = ...
+
+OUTPUT_TYPE: str = ...
+DIFF_TYPE: str = ...
+STATS_TYPE: str = ...
+
+
+def load(path: str) -> List[Tuple[float, str, str]]: ...
+def replay(
+    checker: CheckHDDTemp,
+    records: List[Tuple[float, str, str]],
+    stats: Counter[str],
+    speed: float = ...,
+) -> Iterator[Dict[str, Union[float, str]]]: ...
+def load_outputs(path: str) -> Dict[Tuple[float, str], Dict[str, Union[float, str]]]: ...
+def diff(
+    baseline: Dict[Tuple[float, str], Dict[str, Union[float, str]]],
+    record: Dict[str, Union[float, str]],
+) -> str: ...
+def main() -> None: ...
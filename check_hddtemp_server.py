@@ -0,0 +1,386 @@
+#!/usr/bin/env python
+
+# -*- coding: utf-8 -*-
+
+# nagios-check-hddtemp
+# check_hddtemp_server.py
+
+# Copyright (c) 2011-2021 Alexei Andrushievich <vint21h@vint21h.pp.ua>
+# Check HDD temperature Nagios plugin [https://github.com/vint21h/nagios-check-hddtemp/]
+#
+# This file is part of nagios-check-hddtemp.
+#
+# nagios-check-hddtemp is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+import sys
+import random
+import asyncio
+import threading
+from collections import Counter
+from argparse import ArgumentParser
+
+
+__all__ = [
+    "FakeHDDTempServer",
+    "main",
+]
+
+
+class FakeHDDTempServer(object):
+    """
+    Fake hddtemp server simulating many hosts (Python 3 only).
+
+    Every listening address is a separate simulated host with its own
+    deterministic set of devices.
+    """
+
+    MODELS = [
+        "ST4000NM0035-1V4107",
+        "WDC WD40EFRX-68N32N0",
+        "HGST HUS726040ALE610",
+        "Samsung SSD 860 EVO 500GB",
+    ]
+
+    def __init__(
+        self,
+        devices=4,
+        separator="|",
+        temperature=(25, 45),
+        sleeping=0.0,
+        unknown=0.0,
+        fahrenheit=0.0,
+        latency=0.0,
+        jitter=0.0,
+        resets=0.0,
+        chunk=0,
+        seed=0,
+    ):
+        """
+        Set up simulation parameters.
+
+        :param devices: devices count per host
+        :type devices: int
+        :param separator: hddtemp separator
+        :type separator: str
+        :param temperature: devices temperatures range (in Celsius)
+        :type temperature: Tuple[int, int]
+        :param sleeping: probability of device to be sleeping ("SLP")
+        :type sleeping: float
+        :param unknown: probability of device temperature to be unknown ("UNK")
+        :type unknown: float
+        :param fahrenheit: probability of device temperature to be in Fahrenheit
+        :type fahrenheit: float
+        :param latency: response latency in seconds
+        :type latency: float
+        :param jitter: maximum random deviation from response latency in seconds
+        :type jitter: float
+        :param resets: probability of connection reset instead of response
+        :type resets: float
+        :param chunk: write response by chunks of this size, or 0 to write at once
+        :type chunk: int
+        :param seed: random seed for devices generation
+        :type seed: int
+        """
+
+        self.devices = devices
+        self.separator = separator
+        self.temperature = temperature
+        self.sleeping = sleeping
+        self.unknown = unknown
+        self.fahrenheit = fahrenheit
+        self.latency = latency
+        self.jitter = jitter
+        self.resets = resets
+        self.chunk = chunk
+        self.seed = seed
+        self.stats = Counter()  # type: ignore
+        self.servers = []
+        self.loop = None
+        self.thread = None
+        self.random = random.Random(seed)  # nosec: B311
+
+    def response(self, host):
+        """
+        Create hddtemp response for simulated host.
+
+        :param host: simulated host address and port
+        :type host: Tuple[str, int]
+        :return: hddtemp response
+        :rtype: bytes
+        """
+
+        generator = random.Random(  # nosec: B311
+            "{seed}:{host}:{port}".format(seed=self.seed, host=host[0], port=host[1])
+        )
+        chunks = []
+
+        for index in range(self.devices):
+            device = self._get_device_suffix(index=index)  # type: ignore
+            temperature, scale = generator.randint(*self.temperature), "C"
+            chance = generator.random()
+            if chance < self.sleeping:
+                temperature, scale = "SLP", "*"  # type: ignore
+            elif chance < self.sleeping + self.unknown:
+                temperature, scale = "UNK", "*"  # type: ignore
+            elif generator.random() < self.fahrenheit:
+                temperature, scale = temperature * 9 // 5 + 32, "F"
+            chunks.append(
+                self.separator.join(
+                    [
+                        "",
+                        "/dev/sd{device}".format(device=device),
+                        generator.choice(self.MODELS),
+                        str(temperature),
+                        scale,
+                        "",
+                    ]
+                )
+            )
+
+        return "".join(chunks).encode("utf8")
+
+    @staticmethod
+    def _get_device_suffix(index):
+        """
+        Create linux-like device name suffix ("a", ..., "z", "aa", ...).
+
+        :param index: device index
+        :type index: int
+        :return: device name suffix
+        :rtype: str
+        """
+
+        suffix = ""
+        index += 1
+
+        while index:
+            index, remainder = divmod(index - 1, 26)
+            suffix = chr(ord("a") + remainder) + suffix
+
+        return suffix
+
+    async def _handle(self, reader, writer):
+        """
+        Serve hddtemp client connection.
+
+        :param reader: client stream reader
+        :type reader: asyncio.StreamReader
+        :param writer: client stream writer
+        :type writer: asyncio.StreamWriter
+        """
+
+        self.stats["connections"] += 1
+        delay = self.latency + self.random.uniform(-self.jitter, self.jitter)
+
+        try:
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if self.random.random() < self.resets:
+                self.stats["resets"] += 1
+                writer.transport.abort()
+
+                return
+
+            host = writer.get_extra_info("sockname")[:2]
+            data = self.response(host=host)  # type: ignore
+            size = self.chunk or len(data)
+            for offset in range(0, len(data), size):
+                writer.write(data[offset : offset + size])  # noqa: E203
+                await writer.drain()
+                if self.chunk:
+                    self.stats["chunks"] += 1
+                    await asyncio.sleep(0)
+            self.stats["responses"] += 1
+        except ConnectionError:
+            self.stats["errors"] += 1
+        finally:
+            writer.close()
+
+    async def start(self, host="127.0.0.1", port=0, count=1, addresses=None):
+        """
+        Start simulated hosts listening on consecutive ports or on addresses list.
+
+        :param host: listening address
+        :type host: str
+        :param port: first listening port, or 0 to choose random free ports
+        :type port: int
+        :param count: simulated hosts count
+        :type count: int
+        :param addresses: listening addresses list, overrides host and count
+        :type addresses: Optional[List[str]]
+        :return: simulated hosts addresses and ports
+        :rtype: List[Tuple[str, int]]
+        """
+
+        hosts = (
+            [(address, port) for address in addresses]
+            if addresses
+            else [(host, port + index if port else 0) for index in range(count)]
+        )
+        result = []
+
+        for address, listen in hosts:
+            server = await asyncio.start_server(self._handle, host=address, port=listen)
+            self.servers.append(server)
+            result.append(tuple(server.sockets[0].getsockname()[:2]))
+
+        return result
+
+    async def stop(self):
+        """
+        Stop all simulated hosts.
+        """
+
+        for server in self.servers:
+            server.close()
+            await server.wait_closed()
+
+        self.servers = []
+
+    def start_in_thread(self, host="127.0.0.1", port=0, count=1, addresses=None):
+        """
+        Start simulated hosts in background thread with own event loop.
+
+        :param host: listening address
+        :type host: str
+        :param port: first listening port, or 0 to choose random free ports
+        :type port: int
+        :param count: simulated hosts count
+        :type count: int
+        :param addresses: listening addresses list, overrides host and count
+        :type addresses: Optional[List[str]]
+        :return: simulated hosts addresses and ports
+        :rtype: List[Tuple[str, int]]
+        """
+
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+
+        start = self.start(  # type: ignore
+            host=host, port=port, count=count, addresses=addresses
+        )
+
+        return asyncio.run_coroutine_threadsafe(start, self.loop).result()
+
+    def stop_in_thread(self):
+        """
+        Stop simulated hosts started in background thread.
+        """
+
+        stop = self.stop()  # type: ignore
+        asyncio.run_coroutine_threadsafe(stop, self.loop).result()  # type: ignore
+        self.loop.call_soon_threadsafe(self.loop.stop)  # type: ignore
+        self.thread.join()  # type: ignore
+        self.loop.close()  # type: ignore
+
+
+def main():
+    """
+    Program main.
+    """
+
+    parser = ArgumentParser(description="Fake hddtemp server for load-testing")
+    parser.add_argument(
+        "-H", "--host", dest="host", default="127.0.0.1", help="listening address"
+    )
+    parser.add_argument(
+        "-p", "--port", dest="port", type=int, default=17634, help="first port"
+    )
+    parser.add_argument(
+        "-n", "--count", dest="count", type=int, default=1, help="hosts count"
+    )
+    parser.add_argument(
+        "-a",
+        "--addresses",
+        dest="addresses",
+        default="",
+        help="comma separated listening addresses list, one simulated host per address",  # noqa: E501
+    )
+    parser.add_argument(
+        "-d", "--devices", dest="devices", type=int, default=4, help="devices per host"
+    )
+    parser.add_argument(
+        "-S", "--separator", dest="separator", default="|", help="hddtemp separator"
+    )
+    parser.add_argument(
+        "--sleeping", type=float, default=0.0, help="sleeping device probability"
+    )
+    parser.add_argument(
+        "--unknown", type=float, default=0.0, help="unknown temperature probability"
+    )
+    parser.add_argument(
+        "--fahrenheit", type=float, default=0.0, help="Fahrenheit scale probability"
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="response latency in seconds"
+    )
+    parser.add_argument(
+        "--jitter", type=float, default=0.0, help="response latency jitter in seconds"
+    )
+    parser.add_argument(
+        "--resets", type=float, default=0.0, help="connection reset probability"
+    )
+    parser.add_argument(
+        "--chunk", type=int, default=0, help="partial writes chunk size in bytes"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    options = parser.parse_args()
+    server = FakeHDDTempServer(  # type: ignore
+        devices=options.devices,
+        separator=options.separator,
+        sleeping=options.sleeping,
+        unknown=options.unknown,
+        fahrenheit=options.fahrenheit,
+        latency=options.latency,
+        jitter=options.jitter,
+        resets=options.resets,
+        chunk=options.chunk,
+        seed=options.seed,
+    )
+    loop = asyncio.new_event_loop()
+    hosts = loop.run_until_complete(
+        server.start(  # type: ignore
+            host=options.host,
+            port=options.port,
+            count=options.count,
+            addresses=[
+                address.strip()
+                for address in options.addresses.split(",")
+                if address.strip()
+            ],
+        )
+    )
+    sys.stdout.write(
+        "{count} fake hddtemp hosts listening: {first} ... {last}\n".format(
+            count=len(hosts),
+            first="{0}:{1}".format(*hosts[0]),
+            last="{0}:{1}".format(*hosts[-1]),
+        )
+    )
+    sys.stdout.flush()
+
+    try:
+        loop.run_forever()
+    except KeyboardInterrupt:
+        sys.stdout.write("{stats}\n".format(stats=dict(server.stats)))
+    finally:
+        loop.run_until_complete(server.stop())  # type: ignore
+        loop.close()
+
+
+if __name__ == "__main__":
+
+    main()  # type: ignore
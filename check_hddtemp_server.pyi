@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+
+# nagios-check-hddtemp
+# check_hddtemp_server.pyi
+
+
+import asyncio
+import threading
+from typing import (  # pylint: disable=W0611
+    List,
+    Tuple,
+    Counter,
+    Optional,
+)
+
+
+__all__: List[str] = ...
+
+
+class FakeHDDTempServer(object):
+
+    MODELS: List[str] = ...
+    devices: int = ...
+    separator: str = ...
+    temperature: Tuple[int, int] = ...
+    sleeping: float = ...
+    unknown: float = ...
+    fahrenheit: float = ...
+    latency: float = ...
+    jitter: float = ...
+    resets: float = ...
+    chunk: int = ...
+    seed: int = ...
+    stats: Counter[str] = ...
+    servers: List[asyncio.AbstractServer] = ...
+    loop: Optional[asyncio.AbstractEventLoop] = ...
+    thread: Optional[threading.Thread] = ...
+    def __init__(
+        self,
+        devices: int = ...,
+        separator: str = ...,
+        temperature: Tuple[int, int] = ...,
+        sleeping: float = ...,
+        unknown: float = ...,
+        fahrenheit: float = ...,
+        latency: float = ...,
+        jitter: float = ...,
+        resets: float = ...,
+        chunk: int = ...,
+        seed: int = ...,
+    ) -> None: ...
+    def response(self, host: Tuple[str, int]) -> bytes: ...
+    @staticmethod
+    def _get_device_suffix(index: int) -> str: ...
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None: ...
+    async def start(
+        self,
+        host: str = ...,
+        port: int = ...,
+        count: int = ...,
+        addresses: Optional[List[str]] = ...,
+    ) -> List[Tuple[str, int]]: ...
+    async def stop(self) -> None: ...
+    def start_in_thread(
+        self,
+        host: str = ...,
+        port: int = ...,
+        count: int = ...,
+        addresses: Optional[List[str]] = ...,
+    ) -> List[Tuple[str, int]]: ...
+    def stop_in_thread(self) -> None: ...
+
+
+def main() -> None: ...
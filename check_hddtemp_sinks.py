@@ -0,0 +1,727 @@
+#!/usr/bin/env python
+
+# -*- coding: utf-8 -*-
+
+# nagios-check-hddtemp
+# check_hddtemp_sinks.py
+
+# Copyright (c) 2011-2021 Alexei Andrushievich <vint21h@vint21h.pp.ua>
+# Check HDD temperature Nagios plugin [https://github.com/vint21h/nagios-check-hddtemp/]
+#
+# This file is part of nagios-check-hddtemp.
+#
+# nagios-check-hddtemp is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import unicode_literals
+
+import os
+import re
+import time
+import base64
+import socket
+from collections import Counter, deque
+
+from check_hddtemp import CheckHDDTemp, json_dumps
+
+
+__all__ = [
+    "GraphiteSink",
+    "IcingaSink",
+    "InfluxSink",
+    "MetricsSink",
+    "StatsDSink",
+]
+
+
+class MetricsSink(object):
+    """
+    Push devices temperatures to metrics server bypassing Nagios performance data.
+    """
+
+    SCHEME = ""
+    DEFAULT_PORT = 0
+    PACKET_SIZE = 1432  # fits into single Ethernet frame with IP and UDP headers
+
+    def __init__(self, host, port, prefix):
+        """
+        Set up sink.
+
+        :param host: metrics server name or address
+        :type host: str
+        :param port: metrics server port number
+        :type port: int
+        :param prefix: metrics names prefix
+        :type prefix: str
+        """
+
+        self.host = host
+        self.port = port
+        self.prefix = prefix
+        self.lines = []
+        self.address = None
+
+    @staticmethod
+    def from_url(url, prefix):
+        """
+        Create sink from URL like "statsd://localhost:8125".
+
+        :param url: metrics server URL
+        :type url: str
+        :param prefix: metrics names prefix
+        :type prefix: str
+        :return: sink
+        :rtype: MetricsSink
+        :raises ValueError: unknown URL scheme or port number can't be parsed
+        """
+
+        scheme, _, address = url.partition("://")
+        sinks = dict(
+            (sink.SCHEME, sink) for sink in [StatsDSink, GraphiteSink, InfluxSink]
+        )
+
+        if scheme not in sinks or not address:
+            raise ValueError("unknown metrics sink '{url}'".format(url=url))
+        sink = sinks[scheme]
+        _, host, port = CheckHDDTemp._get_servers(  # type: ignore
+            servers=address.rstrip("/"), port=sink.DEFAULT_PORT
+        )[0]
+
+        return sink(host=host, port=port, prefix=prefix)  # type: ignore
+
+    @staticmethod
+    def _get_name(value):
+        """
+        Create metric name part safe for dot-separated metrics names.
+
+        :param value: server label or device name
+        :type value: str
+        :return: metric name part
+        :rtype: str
+        """
+
+        return re.sub(r"[^A-Za-z0-9_-]+", "_", value).strip("_")
+
+    def _format(self, host, device, temperature, scale, timestamp):
+        """
+        Create metric line.
+
+        :param host: server label
+        :type host: str
+        :param device: device name
+        :type device: str
+        :param temperature: device temperature
+        :type temperature: int
+        :param scale: device temperature scale
+        :type scale: str
+        :param timestamp: metric timestamp
+        :type timestamp: int
+        :return: metric line
+        :rtype: str
+        :raises NotImplementedError: must be implemented in sink
+        """
+
+        raise NotImplementedError
+
+    def add(self, host, device, temperature, scale, timestamp):
+        """
+        Add device temperature to sending buffer.
+
+        :param host: server label
+        :type host: str
+        :param device: device name
+        :type device: str
+        :param temperature: device temperature
+        :type temperature: int
+        :param scale: device temperature scale
+        :type scale: str
+        :param timestamp: metric timestamp
+        :type timestamp: int
+        """
+
+        self.lines.append(
+            self._format(  # type: ignore
+                host=host,
+                device=device,
+                temperature=temperature,
+                scale=scale,
+                timestamp=timestamp,
+            )
+        )
+
+    def _get_packets(self):
+        """
+        Coalesce buffered metric lines into as few packets as possible.
+
+        :return: packets payloads
+        :rtype: List[bytes]
+        """
+
+        packets, packet = [], b""
+
+        for line in self.lines:
+            line = "{line}\n".format(line=line).encode("utf8")
+            if packet and len(packet) + len(line) > self.PACKET_SIZE:
+                packets.append(packet)
+                packet = b""
+            packet += line
+        if packet:
+            packets.append(packet)
+
+        return packets
+
+    @staticmethod
+    def _get_timeout(deadline):
+        """
+        Get time left to send packets.
+
+        :param deadline: sending deadline timestamp
+        :type deadline: float
+        :return: time left in seconds
+        :rtype: float
+        :raises socket.timeout: deadline passed
+        """
+
+        timeout = deadline - time.time()
+        if timeout <= 0:
+            raise socket.timeout("timed out")
+
+        return timeout
+
+    def _get_address(self, kind):
+        """
+        Get metrics server address, resolved once for sink lifetime.
+
+        Resolving can't be bounded by timeout, so it isn't repeated on every flush.
+
+        :param kind: socket type
+        :type kind: int
+        :return: address family, socket type, protocol and socket address
+        :rtype: Tuple[int, int, int, Tuple[Any, ...]]
+        """
+
+        if self.address is None:
+            family, kind, proto, _, address = socket.getaddrinfo(
+                self.host, self.port, 0, kind
+            )[0]
+            self.address = (family, kind, proto, address)
+
+        return self.address
+
+    def _connect(self, kind, deadline):
+        """
+        Create socket connected to metrics server.
+
+        :param kind: socket type
+        :type kind: int
+        :param deadline: sending deadline timestamp
+        :type deadline: float
+        :return: connected socket
+        :rtype: socket.socket
+        """
+
+        family, kind, proto, address = self._get_address(kind=kind)  # type: ignore
+        connection = socket.socket(family, kind, proto)
+
+        try:
+            connection.settimeout(self._get_timeout(deadline=deadline))  # type: ignore
+            connection.connect(address)
+        except socket.error:
+            connection.close()
+            raise
+
+        return connection
+
+    def _send(self, packets, deadline):
+        """
+        Send packets to metrics server.
+
+        :param packets: packets payloads
+        :type packets: List[bytes]
+        :param deadline: sending deadline timestamp
+        :type deadline: float
+        """
+
+        connection = self._connect(  # type: ignore
+            kind=socket.SOCK_STREAM, deadline=deadline
+        )
+
+        try:
+            connection.settimeout(self._get_timeout(deadline=deadline))  # type: ignore
+            connection.sendall(b"".join(packets))
+        finally:
+            connection.close()
+
+    def flush(self, timeout):
+        """
+        Send buffered metric lines to metrics server and clear buffer.
+
+        Address resolving, connecting and sending share single time budget.
+
+        :param timeout: sending time budget in seconds
+        :type timeout: float
+        """
+
+        deadline = time.time() + timeout
+        packets = self._get_packets()  # type: ignore
+        self.lines = []
+
+        if not packets:
+            return
+        try:
+            self._send(packets=packets, deadline=deadline)  # type: ignore
+        except socket.error:
+            self.address = None  # server may have moved, resolve it again next time
+            raise
+
+
+class StatsDSink(MetricsSink):
+    """
+    Push devices temperatures as StatsD gauges over UDP.
+    """
+
+    SCHEME = "statsd"
+    DEFAULT_PORT = 8125
+
+    def _format(self, host, device, temperature, scale, timestamp):
+        """
+        Create StatsD gauge line.
+
+        :param host: server label
+        :type host: str
+        :param device: device name
+        :type device: str
+        :param temperature: device temperature
+        :type temperature: int
+        :param scale: device temperature scale
+        :type scale: str
+        :param timestamp: metric timestamp
+        :type timestamp: int
+        :return: metric line
+        :rtype: str
+        """
+
+        return "{prefix}.{host}.{device}:{temperature}|g".format(
+            prefix=self.prefix,
+            host=self._get_name(value=host),  # type: ignore
+            device=self._get_name(value=device),  # type: ignore
+            temperature=temperature,
+        )
+
+    def _send(self, packets, deadline):
+        """
+        Send packets to StatsD server.
+
+        :param packets: packets payloads
+        :type packets: List[bytes]
+        :param deadline: sending deadline timestamp
+        :type deadline: float
+        """
+
+        connection = self._connect(  # type: ignore
+            kind=socket.SOCK_DGRAM, deadline=deadline
+        )
+
+        try:
+            for packet in packets:
+                timeout = self._get_timeout(deadline=deadline)  # type: ignore
+                connection.settimeout(timeout)
+                connection.send(packet)
+        finally:
+            connection.close()
+
+
+class GraphiteSink(MetricsSink):
+    """
+    Push devices temperatures to Graphite using plaintext protocol over TCP.
+    """
+
+    SCHEME = "graphite"
+    DEFAULT_PORT = 2003
+
+    def _format(self, host, device, temperature, scale, timestamp):
+        """
+        Create Graphite plaintext protocol line.
+
+        :param host: server label
+        :type host: str
+        :param device: device name
+        :type device: str
+        :param temperature: device temperature
+        :type temperature: int
+        :param scale: device temperature scale
+        :type scale: str
+        :param timestamp: metric timestamp
+        :type timestamp: int
+        :return: metric line
+        :rtype: str
+        """
+
+        return "{prefix}.{host}.{device} {temperature} {timestamp}".format(
+            prefix=self.prefix,
+            host=self._get_name(value=host),  # type: ignore
+            device=self._get_name(value=device),  # type: ignore
+            temperature=temperature,
+            timestamp=timestamp,
+        )
+
+
+class InfluxSink(MetricsSink):
+    """
+    Push devices temperatures using InfluxDB line protocol over TCP.
+    """
+
+    SCHEME = "influx"
+    DEFAULT_PORT = 8094
+
+    @staticmethod
+    def _escape(value):
+        """
+        Escape InfluxDB line protocol tag value.
+
+        :param value: tag value
+        :type value: str
+        :return: escaped tag value
+        :rtype: str
+        """
+
+        return re.sub(r"([ ,=])", r"\\\1", value)
+
+    def _format(self, host, device, temperature, scale, timestamp):
+        """
+        Create InfluxDB line protocol line.
+
+        :param host: server label
+        :type host: str
+        :param device: device name
+        :type device: str
+        :param temperature: device temperature
+        :type temperature: int
+        :param scale: device temperature scale
+        :type scale: str
+        :param timestamp: metric timestamp
+        :type timestamp: int
+        :return: metric line
+        :rtype: str
+        """
+
+        return "{prefix},host={host},device={device},scale={scale} temperature={temperature}i {timestamp}".format(  # noqa: E501
+            prefix=self._escape(value=self.prefix),  # type: ignore
+            host=self._escape(value=host),  # type: ignore
+            device=self._escape(value=device),  # type: ignore
+            scale=self._escape(value=scale),  # type: ignore
+            temperature=temperature,
+            timestamp=timestamp * 1000000000,
+        )
+
+
+class IcingaSink(object):
+    """
+    Submit devices states to Icinga 2 API as passive check results.
+
+    Icinga 2 API processes single check result per request, so buffered results
+    are submitted concurrently by workers sharing results queue, every worker
+    reuses own keep-alive connection. Failed requests are retried with
+    exponential backoff, overloaded API responses ("429" and "503") slow worker
+    down for "Retry-After" seconds, buffer keeps limited count of latest results.
+    """
+
+    ENDPOINT = "/v1/actions/process-check-result"
+    DEFAULT_PORT = 5665
+    SCHEMES = ["http", "https"]
+    CHECK_SOURCE = "check_hddtemp"
+    RETRY_STATUSES = [429, 500, 502, 503, 504]
+    BACKOFF = 0.05  # first retry delay in seconds, doubled on every next retry
+    MAX_BACKOFF = 1.0
+    # delivered, rejected by API, failed after retries and dropped from buffer
+    OUTCOME_DELIVERED, OUTCOME_REJECTED, OUTCOME_FAILED, OUTCOME_DROPPED = [
+        "delivered",
+        "rejected",
+        "failed",
+        "dropped",
+    ]
+
+    def __init__(  # pylint: disable=R0913
+        self,
+        url,
+        user,
+        password,
+        service,
+        concurrency=8,
+        retries=3,
+        queue=10000,
+        ca=None,
+    ):
+        """
+        Set up sink.
+
+        :param url: Icinga 2 API URL like "https://icinga.local:5665"
+        :type url: str
+        :param user: API user name
+        :type user: str
+        :param password: API user password
+        :type password: str
+        :param service: service object name template with "{host}", "{device}" and "{name}" placeholders  # noqa: E501
+        :type service: str
+        :param concurrency: maximum count of concurrent requests
+        :type concurrency: int
+        :param retries: failed request retries count
+        :type retries: int
+        :param queue: maximum count of buffered results
+        :type queue: int
+        :param ca: CA certificate file path, system defaults are used if not set
+        :type ca: Optional[str]
+        :raises ValueError: unknown URL scheme, port number or service template can't be parsed  # noqa: E501
+        """
+
+        scheme, _, address = url.partition("://")
+
+        if scheme not in self.SCHEMES or not address:
+            raise ValueError("unknown Icinga 2 API URL '{url}'".format(url=url))
+        try:
+            service.format(host="nas", device="/dev/sda", name="sda")
+        except (KeyError, IndexError, ValueError) as error:
+            raise ValueError(
+                "service template '{service}' is invalid: {error}".format(
+                    service=service, error=error
+                )
+            )
+
+        _, self.host, self.port = CheckHDDTemp._get_servers(  # type: ignore
+            servers=address.rstrip("/"), port=self.DEFAULT_PORT
+        )[0]
+        self.scheme = scheme
+        self.service = service
+        self.concurrency = max(concurrency, 1)
+        self.retries = max(retries, 0)
+        self.queue = queue
+        # HTTP client and TLS modules are slow to import, only this sink needs them
+        try:
+            import http.client as httplib  # pylint: disable=C0415
+        except ImportError:  # Python 2
+            import httplib  # type: ignore  # pylint: disable=C0415
+        self.errors = (EnvironmentError, httplib.HTTPException)
+        self.connection = httplib.HTTPConnection
+        self.context = None
+        if scheme == "https":
+            import ssl  # pylint: disable=C0415
+
+            self.connection = httplib.HTTPSConnection  # type: ignore
+            self.context = ssl.create_default_context(cafile=ca)
+        credentials = "{user}:{password}".format(user=user, password=password)
+        self.headers = {
+            "Accept": "application/json",
+            "Content-Type": "application/json",
+            "Authorization": "Basic {credentials}".format(
+                credentials=base64.b64encode(credentials.encode("utf8")).decode("ascii")
+            ),
+        }
+        self.results = deque(maxlen=queue)  # type: ignore
+        self.stats = Counter()  # type: ignore
+
+    def add(self, host, device, code, text, performance):
+        """
+        Add device check result to submission buffer.
+
+        Oldest buffered result is dropped if buffer is full.
+
+        :param host: server label
+        :type host: str
+        :param device: device name
+        :type device: str
+        :param code: device state exit code
+        :type code: int
+        :param text: device state human readable text
+        :type text: str
+        :param performance: device state performance data
+        :type performance: str
+        """
+
+        if len(self.results) >= self.queue:
+            self.stats[self.OUTCOME_DROPPED] += 1
+        self.results.append(
+            json_dumps(  # type: ignore
+                {
+                    "type": "Service",
+                    "service": self.service.format(
+                        host=host, device=device, name=os.path.basename(device)
+                    ),
+                    "exit_status": code,
+                    "plugin_output": text,
+                    "performance_data": [performance],
+                    "check_source": self.CHECK_SOURCE,
+                }
+            ).encode("utf8")
+        )
+
+    def _connect(self, timeout):
+        """
+        Create API connection, it's opened on first request.
+
+        :param timeout: connection timeout in seconds
+        :type timeout: float
+        :return: API connection
+        :rtype: httplib.HTTPConnection
+        """
+
+        if self.context is not None:
+            return self.connection(  # type: ignore
+                self.host, self.port, timeout=timeout, context=self.context
+            )
+
+        return self.connection(self.host, self.port, timeout=timeout)
+
+    def _post(self, connection, body, timeout):
+        """
+        Post check result reading whole response to keep connection reusable.
+
+        :param connection: API connection
+        :type connection: httplib.HTTPConnection
+        :param body: check result JSON document
+        :type body: bytes
+        :param timeout: request timeout in seconds
+        :type timeout: float
+        :return: response status and "Retry-After" header value
+        :rtype: Tuple[int, Optional[str]]
+        """
+
+        connection.timeout = timeout
+        if connection.sock is None:
+            connection.connect()
+            # headers and body are sent separately, don't wait for delayed ACK
+            connection.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)  # type: ignore  # noqa: E501
+        else:  # kept alive
+            connection.sock.settimeout(timeout)
+        connection.request("POST", self.ENDPOINT, body=body, headers=self.headers)
+        response = connection.getresponse()
+        response.read()
+
+        return response.status, response.getheader("Retry-After")
+
+    def _get_delay(self, attempt, retry):
+        """
+        Get delay before retrying failed request.
+
+        :param attempt: failed attempt number starting from zero
+        :type attempt: int
+        :param retry: "Retry-After" header value in seconds
+        :type retry: Optional[str]
+        :return: delay in seconds
+        :rtype: float
+        """
+
+        try:
+            return max(float(retry), 0.0)
+        except (TypeError, ValueError):  # missing or HTTP date
+            return min(self.BACKOFF * 2**attempt, self.MAX_BACKOFF)
+
+    def _submit(self, connection, body, deadline):
+        """
+        Submit check result retrying failed requests until deadline.
+
+        :param connection: API connection or None to create new one
+        :type connection: Optional[httplib.HTTPConnection]
+        :param body: check result JSON document
+        :type body: bytes
+        :param deadline: submission deadline timestamp
+        :type deadline: float
+        :return: API connection to reuse or None if it was closed and submission outcome  # noqa: E501
+        :rtype: Tuple[Optional[httplib.HTTPConnection], str]
+        """
+
+        for attempt in range(self.retries + 1):
+            timeout = deadline - time.time()
+            if timeout <= 0:
+                break
+
+            status, retry = None, None
+            try:
+                if connection is None:
+                    connection = self._connect(timeout=timeout)  # type: ignore
+                status, retry = self._post(  # type: ignore
+                    connection=connection, body=body, timeout=timeout
+                )
+            except self.errors:
+                if connection is not None:
+                    connection.close()
+                connection = None
+            if status is not None and status < 300:
+                return connection, self.OUTCOME_DELIVERED
+            if status is not None and status not in self.RETRY_STATUSES:
+                return connection, self.OUTCOME_REJECTED
+            if attempt < self.retries:
+                delay = self._get_delay(attempt=attempt, retry=retry)  # type: ignore
+                time.sleep(max(min(delay, deadline - time.time()), 0))
+
+        return connection, self.OUTCOME_FAILED
+
+    def _deliver(self, results, deadline):
+        """
+        Submit check results from shared queue until it's empty.
+
+        :param results: check results JSON documents queue
+        :type results: Deque[bytes]
+        :param deadline: submission deadline timestamp
+        :type deadline: float
+        :return: submission outcomes counts
+        :rtype: Counter[str]
+        """
+
+        stats, connection = Counter(), None  # type: ignore
+
+        try:
+            while True:
+                try:
+                    body = results.popleft()
+                except IndexError:
+                    break
+                connection, outcome = self._submit(  # type: ignore
+                    connection=connection, body=body, deadline=deadline
+                )
+                stats[outcome] += 1
+        finally:
+            if connection is not None:
+                connection.close()
+
+        return stats
+
+    def flush(self, timeout):
+        """
+        Submit buffered check results to API within time budget and clear buffer.
+
+        :param timeout: submission time budget in seconds
+        :type timeout: float
+        """
+
+        from multiprocessing.pool import ThreadPool  # pylint: disable=C0415
+
+        results, self.results = self.results, deque(maxlen=self.queue)
+
+        if not results:
+            return
+
+        deadline = time.time() + timeout
+        workers = min(self.concurrency, len(results))
+        pool = ThreadPool(processes=workers)
+
+        try:
+            tasks = [
+                pool.apply_async(
+                    self._deliver, kwds=dict(results=results, deadline=deadline)
+                )
+                for _ in range(workers)
+            ]
+            for task in tasks:
+                self.stats.update(task.get())
+        finally:
+            pool.terminate()
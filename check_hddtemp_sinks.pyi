@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+
+# nagios-check-hddtemp
+# check_hddtemp_sinks.pyi
+
+
+from typing import (  # pylint: disable=W0611
+    Any,
+    Dict,
+    List,
+    Deque,
+    Type,
+    Tuple,
+    Counter,
+    Optional,
+)
+
+import ssl
+import socket
+import http.client
+
+
+__all__: List[str] = ...
+
+
+class MetricsSink(object):
+
+    SCHEME: str = ...
+    DEFAULT_PORT: int = ...
+    PACKET_SIZE: int = ...
+    host: str = ...
+    port: int = ...
+    prefix: str = ...
+    lines: List[str] = ...
+    address: Optional[Tuple[int, int, int, Tuple[Any, ...]]] = ...
+    def __init__(self, host: str, port: int, prefix: str) -> None: ...
+    @staticmethod
+    def from_url(url: str, prefix: str) -> MetricsSink: ...
+    @staticmethod
+    def _get_name(value: str) -> str: ...
+    def _format(
+        self, host: str, device: str, temperature: int, scale: str, timestamp: int
+    ) -> str: ...
+    def add(
+        self, host: str, device: str, temperature: int, scale: str, timestamp: int
+    ) -> None: ...
+    def _get_packets(self) -> List[bytes]: ...
+    @staticmethod
+    def _get_timeout(deadline: float) -> float: ...
+    def _get_address(self, kind: int) -> Tuple[int, int, int, Tuple[Any, ...]]: ...
+    def _connect(self, kind: int, deadline: float) -> socket.socket: ...
+    def _send(self, packets: List[bytes], deadline: float) -> None: ...
+    def flush(self, timeout: float) -> None: ...
+
+
+class StatsDSink(MetricsSink): ...
+
+
+class GraphiteSink(MetricsSink): ...
+
+
+class InfluxSink(MetricsSink):
+    @staticmethod
+    def _escape(value: str) -> str: ...
+
+
+class IcingaSink(object):
+
+    ENDPOINT: str = ...
+    DEFAULT_PORT: int = ...
+    SCHEMES: List[str] = ...
+    CHECK_SOURCE: str = ...
+    RETRY_STATUSES: List[int] = ...
+    BACKOFF: float = ...
+    MAX_BACKOFF: float = ...
+    OUTCOME_DELIVERED: str = ...
+    OUTCOME_REJECTED: str = ...
+    OUTCOME_FAILED: str = ...
+    OUTCOME_DROPPED: str = ...
+    host: str = ...
+    port: int = ...
+    scheme: str = ...
+    service: str = ...
+    concurrency: int = ...
+    retries: int = ...
+    queue: int = ...
+    errors: Tuple[Type[Exception], ...] = ...
+    connection: Type[http.client.HTTPConnection] = ...
+    context: Optional[ssl.SSLContext] = ...
+    headers: Dict[str, str] = ...
+    results: Deque[bytes] = ...
+    stats: Counter[str] = ...
+    def __init__(
+        self,
+        url: str,
+        user: str,
+        password: str,
+        service: str,
+        concurrency: int = ...,
+        retries: int = ...,
+        queue: int = ...,
+        ca: Optional[str] = ...,
+    ) -> None: ...
+    def add(
+        self, host: str, device: str, code: int, text: str, performance: str
+    ) -> None: ...
+    def _connect(self, timeout: float) -> http.client.HTTPConnection: ...
+    def _post(
+        self, connection: http.client.HTTPConnection, body: bytes, timeout: float
+    ) -> Tuple[int, Optional[str]]: ...
+    def _get_delay(self, attempt: int, retry: Optional[str]) -> float: ...
+    def _submit(
+        self,
+        connection: Optional[http.client.HTTPConnection],
+        body: bytes,
+        deadline: float,
+    ) -> Tuple[Optional[http.client.HTTPConnection], str]: ...
+    def _deliver(self, results: Deque[bytes], deadline: float) -> Counter[str]: ...
+    def flush(self, timeout: float) -> None: ...
@@ -0,0 +1,279 @@
+#!/usr/bin/env python
+
+# -*- coding: utf-8 -*-
+
+# nagios-check-hddtemp
+# check_hddtemp_sources.py
+
+# Copyright (c) 2011-2021 Alexei Andrushievich <vint21h@vint21h.pp.ua>
+# Check HDD temperature Nagios plugin [https://github.com/vint21h/nagios-check-hddtemp/]
+#
+# This file is part of nagios-check-hddtemp.
+#
+# nagios-check-hddtemp is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+from __future__ import unicode_literals
+
+import io
+import os
+import re
+import time
+from multiprocessing.pool import ThreadPool
+
+from check_hddtemp import Source, CheckHDDTemp, HDDTempSource
+
+
+__all__ = [
+    "CacheSource",
+    "FanOutSource",
+    "FileSource",
+    "SysfsSource",
+]
+
+
+class FileSource(Source):
+    """
+    Get devices data from file with saved hddtemp server response (fixture).
+
+    Server address option is used as file path.
+    """
+
+    def fetch(self, server, port):
+        """
+        Read and return saved hddtemp server response.
+
+        :param server: file path
+        :type server: str
+        :param port: port number (unused)
+        :type port: int
+        :return: saved hddtemp server response
+        :rtype: str
+        """
+
+        with io.open(server, encoding="utf8") as response:
+
+            return response.read()
+
+
+class SysfsSource(Source):
+    """
+    Get local devices data from Linux "drivetemp" hwmon driver without hddtemp server.
+
+    Server address option is used only as devices states label.
+    """
+
+    ROOT = "/sys"
+    DRIVER = "drivetemp"
+
+    @staticmethod
+    def _read(path):
+        """
+        Read and return sysfs attribute value.
+
+        :param path: sysfs attribute path
+        :type path: str
+        :return: sysfs attribute value
+        :rtype: str
+        """
+
+        with io.open(path, encoding="utf8") as attribute:
+
+            return attribute.read().strip()
+
+    def fetch(self, server, port):
+        """
+        Create hddtemp server response from hwmon devices temperatures.
+
+        :param server: server label (unused)
+        :type server: str
+        :param port: port number (unused)
+        :type port: int
+        :return: data in hddtemp server response format
+        :rtype: str
+        """
+
+        separator = self.options.separator
+        hwmon = os.path.join(self.ROOT, "class", "hwmon")
+        records = []
+
+        for name in sorted(os.listdir(hwmon)):
+            path = os.path.join(hwmon, name)
+            try:
+                if self._read(path=os.path.join(path, "name")) != self.DRIVER:  # type: ignore  # noqa: E501
+                    continue
+                devices = os.listdir(os.path.join(path, "device", "block"))
+                model = self._read(path=os.path.join(path, "device", "model"))  # type: ignore  # noqa: E501
+            except EnvironmentError:  # not a drive or drive gone
+                continue
+            try:
+                value = self._read(path=os.path.join(path, "temp1_input"))  # type: ignore  # noqa: E501
+                temperature = str(int(value) // 1000)  # millidegrees Celsius
+            except (EnvironmentError, ValueError):  # sleeping drive or read error
+                temperature = CheckHDDTemp.HDDTEMP_UNKNOWN
+            for device in devices:
+                records.append(
+                    separator.join(
+                        [
+                            "",
+                            "/dev/{device}".format(device=device),
+                            model.replace(separator, " "),
+                            temperature,
+                            "C",
+                            "",
+                        ]
+                    )
+                )
+
+        return "".join(records)
+
+
+class CacheSource(Source):
+    """
+    Get devices data from hddtemp server caching responses in state directory.
+
+    Cached response is returned while it is younger than cache lifetime,
+    so frequent checks of the same server don't query it every time.
+    """
+
+    def _get_path(self, server, port):
+        """
+        Create server cached response file path.
+
+        :param server: server name or address
+        :type server: str
+        :param port: port number
+        :type port: int
+        :return: cached response file path
+        :rtype: str
+        """
+
+        return os.path.join(
+            self.options.state_dir,
+            "check_hddtemp-{name}.cache".format(
+                name=re.sub(
+                    r"[^A-Za-z0-9_.-]+",
+                    "_",
+                    "{server}_{port}".format(server=server, port=port),
+                )
+            ),
+        )
+
+    def fetch(self, server, port):
+        """
+        Get and return cached or fresh data from hddtemp server.
+
+        :param server: server name or address
+        :type server: str
+        :param port: port number
+        :type port: int
+        :return: data from hddtemp server
+        :rtype: str
+        """
+
+        path = self._get_path(server=server, port=port)  # type: ignore
+
+        try:
+            if time.time() - os.path.getmtime(path) < self.options.cache_ttl:
+                with io.open(path, encoding="utf8") as cache:
+
+                    return cache.read()
+        except EnvironmentError:  # not cached yet
+            pass
+
+        source = HDDTempSource(options=self.options)  # type: ignore
+        response = source.fetch(server=server, port=port)  # type: ignore
+        temporary = "{path}.{pid}".format(path=path, pid=os.getpid())
+
+        # cache is optional, so its errors are ignored
+        try:
+            with io.open(temporary, "w", encoding="utf8") as cache:
+                cache.write(response)
+            os.rename(temporary, path)  # atomic replace for concurrent checks
+        except EnvironmentError:  # pragma: no cover
+            pass
+
+        return response
+
+
+class FanOutSource(Source):
+    """
+    Concurrently get devices data from several hddtemp servers as from single one.
+
+    Server address option is "+" separated servers list ("nas1+nas2[:PORT]"),
+    devices names in merged response are prefixed by server ("nas1:/dev/sda").
+    """
+
+    HOSTS_SEPARATOR = "+"
+
+    def _prefix(self, server, response):
+        """
+        Prefix devices names in hddtemp server response by server.
+
+        :param server: server name or address
+        :type server: str
+        :param response: hddtemp server response
+        :type response: str
+        :return: hddtemp server response with prefixed devices names
+        :rtype: str
+        """
+
+        separator = self.options.separator
+
+        return "".join(
+            [
+                "{separator}{server}:{record}{separator}".format(
+                    separator=separator, server=server, record=record
+                )
+                for record in [
+                    record.strip(separator) for record in response.split(separator * 2)
+                ]
+                if record
+            ]
+        )
+
+    def fetch(self, server, port):
+        """
+        Get data from all servers concurrently and return merged response.
+
+        :param server: "+" separated servers names or addresses
+        :type server: str
+        :param port: port number
+        :type port: int
+        :return: merged hddtemp servers response
+        :rtype: str
+        :raises ValueError: empty servers list
+        """
+
+        servers = [
+            host.strip() for host in server.split(self.HOSTS_SEPARATOR) if host.strip()
+        ]
+        if not servers:
+            raise ValueError("Fan-out servers list is empty")
+        source = HDDTempSource(options=self.options)  # type: ignore
+        pool = ThreadPool(processes=min(self.options.jobs, len(servers)))
+
+        try:
+            responses = pool.map(
+                lambda host: source.fetch(server=host, port=port), servers  # type: ignore  # noqa: E501
+            )
+        finally:
+            pool.terminate()
+
+        return "".join(
+            [
+                self._prefix(server=host, response=response)  # type: ignore
+                for host, response in zip(servers, responses)
+            ]
+        )
@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+
+# nagios-check-hddtemp
+# check_hddtemp_sources.pyi
+
+
+from typing import List  # pylint: disable=W0611
+
+from check_hddtemp import Source
+
+
+__all__: List[str] = ...
+
+
+class FileSource(Source):
+    def fetch(self, server: str, port: int) -> str: ...
+
+
+class SysfsSource(Source):
+
+    ROOT: str = ...
+    DRIVER: str = ...
+    @staticmethod
+    def _read(path: str) -> str: ...
+    def fetch(self, server: str, port: int) -> str: ...
+
+
+class CacheSource(Source):
+    def _get_path(self, server: str, port: int) -> str: ...
+    def fetch(self, server: str, port: int) -> str: ...
+
+
+class FanOutSource(Source):
+
+    HOSTS_SEPARATOR: str = ...
+    def _prefix(self, server: str, response: str) -> str: ...
+    def fetch(self, server: str, port: int) -> str: ...
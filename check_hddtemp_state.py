@@ -0,0 +1,1253 @@
+#!/usr/bin/env python
+
+# -*- coding: utf-8 -*-
+
+# nagios-check-hddtemp
+# check_hddtemp_state.py
+
+# Copyright (c) 2011-2021 Alexei Andrushievich <vint21h@vint21h.pp.ua>
+# Check HDD temperature Nagios plugin [https://github.com/vint21h/nagios-check-hddtemp/]
+#
+# This file is part of nagios-check-hddtemp.
+#
+# nagios-check-hddtemp is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import unicode_literals
+
+import io
+import os
+import gzip
+import mmap
+import time
+import zlib
+import socket
+import struct
+import threading
+from collections import OrderedDict
+from multiprocessing.pool import ThreadPool
+
+from check_hddtemp import json_dumps, update_json_file
+
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None  # type: ignore
+try:
+    import ujson as json
+except ImportError:
+    import json
+
+
+__all__ = [
+    "Capture",
+    "Inventory",
+    "Resolver",
+    "ResultBoard",
+    "ResultCache",
+    "Snapshot",
+]
+
+
+class Resolver(object):
+    """
+    Concurrent servers names resolver with addresses cache shared by plugin invocations.
+
+    Addresses are ordered as RFC 8305 ("happy eyeballs") requires: address
+    family preferred by system resolver goes first, then families alternate.
+    """
+
+    FILENAME = "check_hddtemp-dns.json"
+
+    def __init__(self, path, ttl, jobs):
+        """
+        Set up resolver.
+
+        :param path: addresses cache file path
+        :type path: str
+        :param ttl: addresses cache lifetime in seconds, or 0 to not cache
+        :type ttl: float
+        :param jobs: count of names resolved concurrently
+        :type jobs: int
+        """
+
+        self.path = path
+        self.ttl = ttl
+        self.jobs = jobs
+
+    @staticmethod
+    def _get_key(server, port):
+        """
+        Create server addresses cache key.
+
+        :param server: server name or address
+        :type server: str
+        :param port: port number
+        :type port: int
+        :return: server addresses cache key
+        :rtype: str
+        """
+
+        return "{server}:{port}".format(server=server, port=port)
+
+    @staticmethod
+    def _interleave(addresses):
+        """
+        Order addresses alternating address families starting with first one.
+
+        :param addresses: addresses families and socket addresses in resolver order
+        :type addresses: List[Tuple[int, Tuple[Any, ...]]]
+        :return: addresses families and socket addresses in connecting order
+        :rtype: List[Tuple[int, Tuple[Any, ...]]]
+        """
+
+        families = OrderedDict()  # type: ignore
+
+        for family, address in addresses:
+            families.setdefault(family, []).append((family, address))
+
+        queues = list(families.values())
+
+        return [
+            queue[index]
+            for index in range(max([len(queue) for queue in queues] or [0]))
+            for queue in queues
+            if index < len(queue)
+        ]
+
+    def _lookup(self, server):
+        """
+        Resolve server name.
+
+        :param server: server name or address and port
+        :type server: Tuple[str, int]
+        :return: server and its addresses in connecting order or resolving error
+        :rtype: Tuple[Tuple[str, int], Union[List[Tuple[int, Tuple[Any, ...]]], socket.error]]  # noqa: E501
+        """
+
+        host, port = server
+
+        try:
+            infos = socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)
+        except (socket.error, UnicodeError) as error:
+            return server, socket.error(
+                "name {host} can't be resolved: {error}".format(host=host, error=error)
+            )
+
+        addresses = []
+
+        for family, _, _, _, address in infos:
+            if (int(family), tuple(address)) not in addresses:
+                addresses.append((int(family), tuple(address)))
+
+        return server, self._interleave(addresses=addresses)  # type: ignore
+
+    def _load(self):
+        """
+        Load addresses cache from cache file.
+
+        :return: servers addresses and their expiration times
+        :rtype: Dict[str, Dict[str, Union[float, List[List[Any]]]]]
+        """
+
+        try:
+            with io.open(self.path, encoding="utf8") as cache:
+
+                return json.loads(cache.read())
+        except (EnvironmentError, ValueError):  # missing or broken cache file
+            return {}
+
+    def _save(self, cache):
+        """
+        Merge resolved addresses into cache file dropping expired ones.
+
+        Cache file errors are ignored: resolving must work without cache.
+
+        :param cache: resolved servers addresses and their expiration times
+        :type cache: Dict[str, Dict[str, Union[float, List[List[Any]]]]]
+        """
+
+        now = time.time()
+
+        def merge(saved):
+            """
+            Merge resolved addresses into addresses cached by concurrent checks.
+
+            :param saved: cached addresses, or None if cache is missing or broken
+            :type saved: Optional[Dict[str, Dict[str, Union[float, List[List[Any]]]]]]
+            :return: not expired addresses
+            :rtype: Dict[str, Dict[str, Union[float, List[List[Any]]]]]
+            """
+
+            merged = saved if isinstance(saved, dict) else {}
+            merged.update(cache)
+
+            return {
+                key: entry
+                for key, entry in merged.items()
+                if isinstance(entry, dict) and entry.get("expires", 0) > now
+            }
+
+        try:
+            update_json_file(path=self.path, merge=merge)  # type: ignore
+        except EnvironmentError:
+            pass
+
+    def resolve(self, servers):
+        """
+        Resolve servers names missing in cache concurrently.
+
+        :param servers: servers names or addresses and ports
+        :type servers: List[Tuple[str, int]]
+        :return: servers and their addresses in connecting order or resolving errors
+        :rtype: Dict[Tuple[str, int], Union[List[Tuple[int, Tuple[Any, ...]]], socket.error]]  # noqa: E501
+        """
+
+        cache = self._load() if self.ttl > 0 else {}  # type: ignore
+        now = time.time()
+        result = {}
+        missing = []
+
+        for server in OrderedDict.fromkeys(servers):
+            entry = cache.get(self._get_key(*server))  # type: ignore
+            if entry and entry["expires"] > now:
+                result[server] = [
+                    (family, tuple(address)) for family, address in entry["addresses"]
+                ]
+            else:
+                missing.append(server)
+
+        if not missing:
+            return result
+
+        pool = ThreadPool(processes=min(self.jobs, len(missing)))
+
+        try:
+            lookups = pool.map(self._lookup, missing)
+        finally:
+            pool.terminate()
+
+        resolved = {}
+
+        for server, addresses in lookups:
+            result[server] = addresses
+            if not isinstance(addresses, Exception):  # errors are not cached
+                resolved[self._get_key(*server)] = {  # type: ignore
+                    "expires": now + self.ttl,
+                    "addresses": [
+                        [family, list(address)] for family, address in addresses
+                    ],
+                }
+
+        if self.ttl > 0:
+            self._save(cache=resolved)  # type: ignore
+
+        return result
+
+
+class ResultCache(object):
+    """
+    Bounded LRU cache of checked responses devices states persisted across invocations.
+
+    Entries are keyed by server response fingerprint and every option affecting
+    devices states, so plugin invocations differing only in devices subset
+    share entries. Aggregated servers entries are keyed by server label too.
+    """
+
+    FILENAME = "check_hddtemp-results.json"
+
+    def __init__(self, path, size):
+        """
+        Set up result cache.
+
+        :param path: cache file path
+        :type path: str
+        :param size: maximum entries count
+        :type size: int
+        """
+
+        self.path = path
+        self.size = size
+        self.entries = None
+        self.changed = OrderedDict()
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def get_key(fingerprint, options, host=None):
+        """
+        Create cache entry key.
+
+        :param fingerprint: server response fingerprint
+        :type fingerprint: int
+        :param options: check options
+        :type options: Namespace
+        :param host: server label in aggregated mode, or None for single server check
+        :type host: Optional[str]
+        :return: cache entry key
+        :rtype: str
+        """
+
+        parts = [
+            "" if host is None else host,
+            fingerprint,
+            options.separator,
+            options.warning,
+            options.critical,
+            int(options.tolerant),
+            options.performance_format,
+            options.peer_deviation,
+            options.peer_mad,
+            options.peer_minimum,
+        ]
+
+        for rule in options.model_thresholds:
+            parts.extend(rule)
+
+        return ":".join([str(part) for part in parts])
+
+    def _get_entries(self):
+        """
+        Get cache entries loading them from cache file on first use.
+
+        :return: cache entries from least to most recently used
+        :rtype: OrderedDict[str, Dict[str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]]  # noqa: E501
+        """
+
+        if self.entries is None:
+            try:
+                with io.open(self.path, encoding="utf8") as cache:
+                    # list of pairs keeps entries order with any JSON decoder
+                    self.entries = OrderedDict(
+                        (key, states) for key, states in json.loads(cache.read())
+                    )
+            except (EnvironmentError, ValueError, TypeError):  # missing or broken
+                self.entries = OrderedDict()
+
+        return self.entries
+
+    def get(self, key):
+        """
+        Get cached devices states marking entry as most recently used.
+
+        :param key: cache entry key
+        :type key: str
+        :return: devices states info or None if not cached
+        :rtype: Optional[Dict[str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]]  # noqa: E501
+        """
+
+        with self.lock:
+            entries = self._get_entries()  # type: ignore
+            states = entries.pop(key, None)
+
+            if states is not None:
+                if entries:  # not most recent before
+                    self.changed.pop(key, None)
+                    self.changed[key] = None
+                entries[key] = states
+
+        return states
+
+    def put(self, key, states):
+        """
+        Cache devices states evicting least recently used entries.
+
+        :param key: cache entry key
+        :type key: str
+        :param states: devices states info
+        :type states: Dict[str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]  # noqa: E501
+        """
+
+        with self.lock:
+            entries = self._get_entries()  # type: ignore
+            entries.pop(key, None)
+            entries[key] = states
+
+            while len(entries) > self.size:
+                entries.popitem(last=False)
+
+            self.changed.pop(key, None)
+            self.changed[key] = None
+
+    def _merge(self, entries):
+        """
+        Merge used cache entries into cache entries saved by concurrent checks.
+
+        :param entries: saved cache entries, or None if they are missing or broken
+        :type entries: Optional[List[List[Union[str, Dict[str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]]]]]  # noqa: E501
+        :return: merged cache entries from least to most recently used
+        :rtype: List[Tuple[str, Dict[str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]]]  # noqa: E501
+        """
+
+        try:
+            merged = OrderedDict((key, states) for key, states in entries)
+        except (TypeError, ValueError):  # missing or broken
+            merged = OrderedDict()
+
+        for key in self.changed:
+            if key in self.entries:  # type: ignore
+                merged.pop(key, None)
+                merged[key] = self.entries[key]  # type: ignore
+
+        while len(merged) > self.size:
+            merged.popitem(last=False)
+
+        return list(merged.items())
+
+    def save(self):
+        """
+        Write changed cache entries to cache file.
+
+        Cache file errors are ignored: result cache must never affect check result.
+        """
+
+        if not self.changed:
+            return
+
+        try:
+            update_json_file(path=self.path, merge=self._merge)  # type: ignore
+        except EnvironmentError:
+            return
+
+        self.changed = OrderedDict()
+
+
+class Snapshot(object):
+    """
+    Versioned compact binary snapshot of servers devices states.
+
+    Little-endian layout: header, hosts index sorted by label, fixed-width
+    devices records, strings index and strings data. Devices names, scales,
+    templates and messages are stored once in strings table. Snapshot file
+    is memory mapped and single server devices states are found by binary
+    search over hosts index, so nothing else is parsed.
+    """
+
+    MAGIC = b"HDTS"
+    VERSION = 1
+    # magic, version, reserved, timestamp, hosts, records and strings counts
+    HEADER = struct.Struct(str("<4sHHdIII"))
+    # label string, first record, records count
+    HOST = struct.Struct(str("<III"))
+    # device, scale, template and text strings, temperature, warning, critical,
+    # priority, flags
+    RECORD = struct.Struct(str("<IIIIihhbB2x"))
+    # offset and length in strings data
+    STRING = struct.Struct(str("<II"))
+    NONE = 0xFFFFFFFF  # no string
+    TEMPERATURE_INT, TEMPERATURE_TEXT, TEMPERATURE_NONE = 0, 1, 2
+    FLAG_ERROR = 4  # text is error message, low bits are temperature kind
+
+    def __init__(self, path):
+        """
+        Set up snapshot reader.
+
+        :param path: snapshot file path
+        :type path: str
+        """
+
+        self.path = path
+        self.data = None
+        self.timestamp = None
+        self.counts = None
+
+    @classmethod
+    def dump(cls, path, results, timestamp=None):
+        """
+        Write servers devices states snapshot.
+
+        Snapshot file errors are ignored: snapshot must never affect polling.
+
+        :param path: snapshot file path
+        :type path: str
+        :param results: servers labels and devices states info
+        :type results: Iterable[Tuple[str, Dict[str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]]]  # noqa: E501
+        :param timestamp: snapshot creation time, or None for current time
+        :type timestamp: Optional[float]
+        """
+
+        strings, ids = [], {}  # type: ignore
+
+        def store(value):
+            """
+            Add string to strings table once.
+
+            :param value: string
+            :type value: Optional[str]
+            :return: string id
+            :rtype: int
+            """
+
+            if value is None:
+                return cls.NONE
+            if value not in ids:
+                ids[value] = len(strings)
+                strings.append(value.encode("utf8"))
+
+            return ids[value]
+
+        hosts, records = [], []  # type: ignore
+
+        for label, states in sorted(results, key=lambda item: item[0].encode("utf8")):
+            hosts.append(cls.HOST.pack(store(label), len(records), len(states)))  # type: ignore  # noqa: E501
+            for device, info in states.items():
+                data = info["data"]
+                temperature, text = data["temperature"], data.get("error")
+                flags = cls.FLAG_ERROR if "error" in data else cls.TEMPERATURE_INT
+                if temperature is None:
+                    flags, temperature = flags | cls.TEMPERATURE_NONE, 0
+                elif not isinstance(temperature, int):
+                    flags, temperature, text = cls.TEMPERATURE_TEXT, 0, temperature
+                records.append(
+                    cls.RECORD.pack(
+                        store(device),  # type: ignore
+                        store(data["scale"]),  # type: ignore
+                        store(info["template"]),  # type: ignore
+                        store(text),  # type: ignore
+                        temperature,
+                        data["warning"],
+                        data["critical"],
+                        info["priority"],
+                        flags,
+                    )
+                )
+
+        offset, index = 0, []
+
+        for value in strings:
+            index.append(cls.STRING.pack(offset, len(value)))
+            offset += len(value)
+
+        header = cls.HEADER.pack(
+            cls.MAGIC,
+            cls.VERSION,
+            0,
+            time.time() if timestamp is None else timestamp,
+            len(hosts),
+            len(records),
+            len(strings),
+        )
+        temporary = "{path}.{pid}".format(path=path, pid=os.getpid())
+
+        try:
+            with io.open(temporary, "wb") as snapshot:
+                for chunk in [[header], hosts, records, index, strings]:
+                    snapshot.write(b"".join(chunk))
+            os.rename(temporary, path)  # atomic replace for concurrent readers
+        except EnvironmentError:
+            return
+
+    def _open(self):
+        """
+        Map snapshot file to memory.
+
+        :raises ValueError: unsupported snapshot format
+        """
+
+        with io.open(self.path, "rb") as snapshot:
+            self.data = mmap.mmap(snapshot.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, _, self.timestamp, hosts, records, strings = (
+            self.HEADER.unpack_from(self.data)
+        )
+
+        if magic != self.MAGIC or version != self.VERSION:
+            raise ValueError("unsupported snapshot format")
+
+        self.counts = (hosts, records, strings)
+
+    def _get_string(self, index):
+        """
+        Get string from strings table.
+
+        :param index: string id
+        :type index: int
+        :return: string
+        :rtype: Optional[str]
+        """
+
+        if index == self.NONE:
+            return None
+
+        hosts, records, strings = self.counts  # type: ignore
+        table = self.HEADER.size + hosts * self.HOST.size + records * self.RECORD.size
+        offset, length = self.STRING.unpack_from(
+            self.data, table + index * self.STRING.size  # type: ignore
+        )
+        offset += table + strings * self.STRING.size
+
+        return self.data[offset : offset + length].decode("utf8")  # type: ignore  # noqa: E203, E501
+
+    def _get_state(self, label, index):
+        """
+        Get device state info from devices record.
+
+        :param label: server label
+        :type label: str
+        :param index: devices record index
+        :type index: int
+        :return: device name and device state info
+        :rtype: Tuple[str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]  # noqa: E501
+        """
+
+        hosts, _, _ = self.counts  # type: ignore
+        (
+            device,
+            scale,
+            template,
+            text,
+            temperature,
+            warning,
+            critical,
+            priority,
+            flags,
+        ) = self.RECORD.unpack_from(
+            self.data,  # type: ignore
+            self.HEADER.size + hosts * self.HOST.size + index * self.RECORD.size,
+        )
+        device, text = self._get_string(index=device), self._get_string(index=text)  # type: ignore  # noqa: E501
+        kind = flags & ~self.FLAG_ERROR
+        data = {
+            "device": device,
+            "temperature": {
+                self.TEMPERATURE_INT: temperature,
+                self.TEMPERATURE_TEXT: text,
+                self.TEMPERATURE_NONE: None,
+            }[kind],
+            "scale": self._get_string(index=scale),  # type: ignore
+            "warning": warning,
+            "critical": critical,
+        }
+        if flags & self.FLAG_ERROR:
+            data["error"] = text
+        data["host"] = label
+
+        return device, {
+            "template": self._get_string(index=template),  # type: ignore
+            "priority": priority,
+            "data": data,
+        }
+
+    def get(self, label):
+        """
+        Look up server devices states.
+
+        :param label: server label
+        :type label: str
+        :return: devices states info or None if server isn't in snapshot
+        :rtype: Optional[Dict[str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]]  # noqa: E501
+        :raises ValueError: unsupported snapshot format
+        """
+
+        if self.data is None:
+            self._open()  # type: ignore
+
+        key = label.encode("utf8")
+        low, high = 0, self.counts[0]  # type: ignore
+
+        while low < high:
+            middle = (low + high) // 2
+            name, first, count = self.HOST.unpack_from(
+                self.data, self.HEADER.size + middle * self.HOST.size  # type: ignore
+            )
+            value = self._get_string(index=name).encode("utf8")  # type: ignore
+            if value < key:
+                low = middle + 1
+            elif value > key:
+                high = middle
+            else:
+                return OrderedDict(
+                    self._get_state(label=label, index=index)  # type: ignore
+                    for index in range(first, first + count)
+                )
+
+        return None
+
+    def close(self):
+        """
+        Unmap snapshot file.
+        """
+
+        if self.data is not None:
+            self.data.close()
+            self.data = None
+
+
+class Inventory(object):
+    """
+    Servers devices inventory persisted across invocations.
+
+    Little-endian layout: header and fixed-width records with server label,
+    device, model, previous model, first seen, last seen and change times and
+    change kind. Inventory file is indexed once per invocation, then changed
+    records are rewritten in place and new ones are appended, so update cost
+    doesn't depend on inventory history. Names longer than record fields are
+    truncated.
+    """
+
+    FILENAME = "check_hddtemp-inventory.bin"
+    MAGIC = b"HDTI"
+    VERSION = 1
+    # magic, version, reserved
+    HEADER = struct.Struct(str("<4sHH"))
+    # server label, device, model, previous model, first seen, last seen,
+    # change times, change kind
+    RECORD = struct.Struct(str("<64s64s48s48sdddB7x"))
+    LAST_SEEN = struct.Struct(str("<d"))
+    LAST_SEEN_OFFSET = struct.calcsize(str("<64s64s48s48sd"))
+    LABEL_SIZE, MODEL_SIZE = 64, 48
+    CHANGES = ["", "new", "replaced", "removed"]
+    CHANGE_NONE, CHANGE_NEW, CHANGE_REPLACED, CHANGE_REMOVED = range(4)
+
+    def __init__(self, path, hold):
+        """
+        Set up inventory.
+
+        :param path: inventory file path
+        :type path: str
+        :param hold: devices changes reporting time in seconds
+        :type hold: float
+        """
+
+        self.path = path
+        self.hold = hold
+        self.index = None
+        self.size = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _pack(value, size):
+        """
+        Encode string truncating it to record field size by characters boundary.
+
+        :param value: string
+        :type value: str
+        :param size: record field size
+        :type size: int
+        :return: encoded string
+        :rtype: bytes
+        """
+
+        return value.encode("utf8")[:size].decode("utf8", "ignore").encode("utf8")
+
+    def _open(self):
+        """
+        Open and lock inventory file indexing records appended since last use.
+
+        Lock is held until inventory file is closed, so concurrent checks
+        don't append records at the same offset. Without fcntl (Windows)
+        lock isn't taken.
+
+        :return: inventory file
+        :rtype: BinaryIO
+        """
+
+        # not truncating, as concurrent check may be creating it too
+        inventory = io.open(os.open(self.path, os.O_RDWR | os.O_CREAT, 0o666), "r+b")
+
+        if fcntl is not None:
+            try:
+                fcntl.flock(inventory.fileno(), fcntl.LOCK_EX)
+            except EnvironmentError:
+                inventory.close()
+
+                raise
+
+        header = inventory.read(self.HEADER.size)
+        end = inventory.seek(0, io.SEEK_END)
+
+        try:
+            magic, version, _ = self.HEADER.unpack(header)
+        except struct.error:  # missing
+            magic, version = None, None
+
+        if (magic, version) != (self.MAGIC, self.VERSION):  # missing or broken
+            inventory.seek(0)
+            inventory.truncate()
+            inventory.write(self.HEADER.pack(self.MAGIC, self.VERSION, 0))
+            self.index = None
+        elif end < self.size:  # replaced
+            self.index = None
+        if self.index is None:
+            self.index, self.size = {}, self.HEADER.size
+
+        inventory.seek(self.size)
+        data = inventory.read()
+
+        for offset in range(0, len(data) - self.RECORD.size + 1, self.RECORD.size):
+            label, name, model, previous, first, last, changed, kind = (
+                self.RECORD.unpack_from(data, offset)
+            )
+            self.index.setdefault(label.rstrip(b"\0"), {})[name.rstrip(b"\0")] = [
+                self.size + offset,
+                model.rstrip(b"\0"),
+                previous.rstrip(b"\0"),
+                first,
+                last,
+                changed,
+                kind,
+            ]
+        self.size += len(data) - len(data) % self.RECORD.size
+
+        return inventory
+
+    def update(self, host, models, timestamp=None, seen=None):
+        """
+        Update server devices inventory from devices found in server response.
+
+        Devices of server seen for the first time aren't reported as new.
+        Devices seen without model (malformed records) aren't reported as removed,
+        only their last seen time is changed.
+        Inventory file errors are ignored: inventory must never affect check result.
+
+        :param host: server label
+        :type host: str
+        :param models: devices names and models found in server response
+        :type models: Dict[str, str]
+        :param timestamp: server response time, or None for current time
+        :type timestamp: Optional[float]
+        :param seen: devices names found in server response without model
+        :type seen: Optional[Iterable[str]]
+        :return: changed devices names with change kind, model and previous model
+        :rtype: Dict[str, Tuple[str, str, str]]
+        """
+
+        now = time.time() if timestamp is None else timestamp
+        label = self._pack(value=host, size=self.LABEL_SIZE)  # type: ignore
+
+        with self.lock:
+            try:
+                with self._open() as inventory:  # type: ignore
+                    devices = self.index.setdefault(label, {})  # type: ignore
+                    names, fresh = {}, not devices
+
+                    def write(name, entry):
+                        """
+                        Write device record in place.
+
+                        :param name: encoded device name
+                        :type name: bytes
+                        :param entry: device record offset and fields
+                        :type entry: List[Union[int, float, bytes]]
+                        """
+
+                        inventory.seek(entry[0])
+                        inventory.write(self.RECORD.pack(label, name, *entry[1:]))
+
+                    for device, model in models.items():
+                        name = self._pack(value=device, size=self.LABEL_SIZE)  # type: ignore  # noqa: E501
+                        model = self._pack(value=model, size=self.MODEL_SIZE)  # type: ignore  # noqa: E501
+                        names[name] = device
+                        entry = devices.get(name)
+                        if entry is None:
+                            kind = self.CHANGE_NONE if fresh else self.CHANGE_NEW
+                            entry = [self.size, model, b"", now, now, now, kind]
+                            self.size += self.RECORD.size
+                            devices[name] = entry
+                        elif entry[1] != model or entry[6] == self.CHANGE_REMOVED:
+                            kind = (
+                                self.CHANGE_NEW
+                                if entry[1] == model
+                                else self.CHANGE_REPLACED
+                            )
+                            entry[1:] = [model, entry[1], now, now, now, kind]
+                        else:  # only last seen time is changed
+                            entry[4] = now
+                            inventory.seek(entry[0] + self.LAST_SEEN_OFFSET)
+                            inventory.write(self.LAST_SEEN.pack(now))
+                            continue
+                        write(name=name, entry=entry)  # type: ignore
+
+                    for device in seen or []:
+                        name = self._pack(value=device, size=self.LABEL_SIZE)  # type: ignore  # noqa: E501
+                        entry = devices.get(name)
+                        if entry is None or name in names:
+                            continue
+                        names[name] = device
+                        if entry[6] != self.CHANGE_REMOVED:
+                            entry[4] = now
+                            inventory.seek(entry[0] + self.LAST_SEEN_OFFSET)
+                            inventory.write(self.LAST_SEEN.pack(now))
+
+                    for name, entry in devices.items():
+                        if name not in names and entry[6] != self.CHANGE_REMOVED:
+                            entry[5:] = [now, self.CHANGE_REMOVED]
+                            write(name=name, entry=entry)  # type: ignore
+            except (EnvironmentError, struct.error):
+                self.index = None  # index may be out of sync with inventory file
+
+                return {}
+
+            return {
+                names.get(name, name.decode("utf8", "ignore")): (
+                    self.CHANGES[entry[6]],
+                    entry[1].decode("utf8", "ignore"),
+                    entry[2].decode("utf8", "ignore"),
+                )
+                for name, entry in devices.items()
+                if entry[6] != self.CHANGE_NONE and now - entry[5] < self.hold
+            }
+
+
+class ResultBoard(object):
+    """
+    Memory mapped board of servers responses shared by concurrent checks.
+
+    Board file has fixed count of fixed-size slots found by server key hash
+    with linear probing. Every slot is guarded by sequence counter (seqlock):
+    writer makes it odd, writes record and makes it even again, readers never
+    block and copy record again if counter is odd or changed meanwhile, record
+    checksum catches concurrent writers. Torn, stale and too large records are
+    treated as missing, so check falls back to fetching server directly.
+    """
+
+    MAGIC = b"HDTB"
+    VERSION = 1
+    # magic, version, reserved, slots count
+    HEADER = struct.Struct(str("<4sHHI"))
+    # sequence and checksum of record body
+    GUARD = struct.Struct(str("<II"))
+    # record body: timestamp, response length and key followed by response
+    BODY = struct.Struct(str("<dI64s"))
+    SEQUENCE = struct.Struct(str("<I"))
+    SLOT_SIZE = 4096
+    OFFSET = 4096  # slots start at page boundary
+    KEY_SIZE = 64
+    PROBES = 8  # slots checked for server key
+    RETRIES = 4  # record copying attempts before giving up
+
+    def __init__(self, path, slots):
+        """
+        Set up result board.
+
+        :param path: board file path
+        :type path: str
+        :param slots: slots count for new board file
+        :type slots: int
+        """
+
+        self.path = path
+        self.slots = slots
+        self.data = None
+
+    @classmethod
+    def _get_key(cls, server, port):
+        """
+        Create server slot key.
+
+        :param server: server name or address
+        :type server: str
+        :param port: port number
+        :type port: int
+        :return: server slot key
+        :rtype: bytes
+        """
+
+        return "{server}:{port}".format(server=server, port=port).encode("utf8")[
+            : cls.KEY_SIZE
+        ]
+
+    def _create(self):
+        """
+        Create empty board file replacing missing or broken one.
+        """
+
+        temporary = "{path}.{pid}".format(path=self.path, pid=os.getpid())
+
+        with io.open(temporary, "wb") as board:
+            board.write(self.HEADER.pack(self.MAGIC, self.VERSION, 0, self.slots))
+            board.truncate(self.OFFSET + self.slots * self.SLOT_SIZE)  # sparse
+        os.rename(temporary, self.path)  # atomic replace for concurrent checks
+
+    def _open(self):
+        """
+        Map board file to memory creating it if needed.
+
+        Slots count of existing board file is used.
+        """
+
+        for _ in range(2):
+            try:
+                with io.open(self.path, "r+b") as board:
+                    magic, version, _, slots = self.HEADER.unpack(
+                        board.read(self.HEADER.size)
+                    )
+                    size = board.seek(0, io.SEEK_END)
+                    if all(
+                        [
+                            magic == self.MAGIC,
+                            version == self.VERSION,
+                            size == self.OFFSET + slots * self.SLOT_SIZE,
+                            slots > 0,
+                        ]
+                    ):
+                        self.slots = slots
+                        self.data = mmap.mmap(board.fileno(), size)
+
+                        return
+            except (EnvironmentError, struct.error):  # missing or broken
+                pass
+            self._create()  # type: ignore
+
+    def _get_data(self):
+        """
+        Get mapped board file, mapping it on first use.
+
+        :return: mapped board file, or None if it isn't available
+        :rtype: Optional[mmap.mmap]
+        """
+
+        if self.data is None:
+            try:
+                self._open()  # type: ignore
+            except (EnvironmentError, ValueError):
+                return None
+
+        return self.data
+
+    def _iter_slots(self, key):
+        """
+        Yield server key slots offsets in probing order.
+
+        :param key: server slot key
+        :type key: bytes
+        :return: slots offsets
+        :rtype: Iterator[int]
+        """
+
+        start = zlib.crc32(key) & 0xFFFFFFFF
+
+        for probe in range(min(self.PROBES, self.slots)):
+            yield self.OFFSET + (start + probe) % self.slots * self.SLOT_SIZE
+
+    def _read(self, data, offset):
+        """
+        Copy consistent slot record without locking.
+
+        :param data: mapped board file
+        :type data: mmap.mmap
+        :param offset: slot offset
+        :type offset: int
+        :return: record timestamp, key and response, or None if record is torn
+        :rtype: Optional[Tuple[float, bytes, bytes]]
+        """
+
+        for _ in range(self.RETRIES):
+            sequence = self.SEQUENCE.unpack_from(data, offset)[0]
+            if sequence == 0:  # never written
+                return 0.0, b"", b""
+            if sequence % 2:  # writing in progress
+                continue
+            record = data[offset : offset + self.SLOT_SIZE]  # noqa: E203
+            if self.SEQUENCE.unpack_from(data, offset)[0] != sequence:
+                continue
+            _, checksum = self.GUARD.unpack_from(record)
+            timestamp, length, key = self.BODY.unpack_from(record, self.GUARD.size)
+            start = self.GUARD.size + self.BODY.size
+            if start + length > self.SLOT_SIZE:
+                continue
+            body = record[self.GUARD.size : start + length]  # noqa: E203
+            if zlib.crc32(body) & 0xFFFFFFFF != checksum:  # concurrent writers
+                continue
+
+            return timestamp, key.rstrip(b"\0"), body[self.BODY.size :]  # noqa: E203
+
+        return None
+
+    def get(self, server, port, age):
+        """
+        Get fresh server response from board.
+
+        :param server: server name or address
+        :type server: str
+        :param port: port number
+        :type port: int
+        :param age: maximum response age in seconds
+        :type age: float
+        :return: server response, or None if it isn't on board, stale or torn
+        :rtype: Optional[str]
+        """
+
+        data = self._get_data()  # type: ignore
+
+        if data is None:
+            return None
+
+        key = self._get_key(server=server, port=port)  # type: ignore
+
+        for offset in self._iter_slots(key=key):  # type: ignore
+            record = self._read(data=data, offset=offset)  # type: ignore
+            if record is None:  # torn, so fetch server directly
+                return None
+            timestamp, name, response = record
+            if not name:  # empty slot ends probing
+                return None
+            if name == key:
+                if time.time() - timestamp > age:
+                    return None
+
+                return response.decode("utf8")
+
+        return None
+
+    def put(self, server, port, response, timestamp=None):
+        """
+        Write server response to its slot.
+
+        Responses too large for slot are skipped. Least recently written slot
+        is reused if all server key slots are taken by other servers.
+
+        :param server: server name or address
+        :type server: str
+        :param port: port number
+        :type port: int
+        :param response: server response
+        :type response: str
+        :param timestamp: response time, or None for current time
+        :type timestamp: Optional[float]
+        """
+
+        data = self._get_data()  # type: ignore
+        payload = response.encode("utf8")
+        size = self.GUARD.size + self.BODY.size + len(payload)
+
+        if data is None or size > self.SLOT_SIZE:
+            return
+
+        key = self._get_key(server=server, port=port)  # type: ignore
+        target, oldest = 0, None
+
+        for offset in self._iter_slots(key=key):  # type: ignore
+            written, _, name = self.BODY.unpack_from(data, offset + self.GUARD.size)
+            if name.rstrip(b"\0") in [b"", key]:
+                target = offset
+                break
+            if oldest is None or written < oldest:
+                target, oldest = offset, written
+
+        header = self.BODY.pack(
+            time.time() if timestamp is None else timestamp, len(payload), key
+        )
+        body = header + payload
+        sequence = self.SEQUENCE.unpack_from(data, target)[0]
+        sequence += 2 if sequence % 2 else 1  # odd while writing
+
+        data[target : target + self.SEQUENCE.size] = self.SEQUENCE.pack(  # noqa: E203
+            sequence & 0xFFFFFFFF
+        )
+        data[target + self.SEQUENCE.size : target + size] = (  # noqa: E203
+            self.SEQUENCE.pack(zlib.crc32(body) & 0xFFFFFFFF) + body
+        )
+        data[target : target + self.SEQUENCE.size] = self.SEQUENCE.pack(  # noqa: E203
+            (sequence + 1) & 0xFFFFFFFF or 2  # zero marks never written slot
+        )
+
+    def close(self):
+        """
+        Unmap board file.
+        """
+
+        if self.data is not None:
+            self.data.close()
+            self.data = None
+
+
+class Capture(object):
+    """
+    Compressed capture of raw servers responses with timestamps.
+
+    Capture file is concatenation of gzip members, every member holds NDJSON
+    records of single plugin run appended to file by single write, so
+    concurrent plugin invocations don't interleave their records.
+    """
+
+    COMPRESSION = 6
+    GZIP_BITS = 31  # deflate window with gzip header and trailer
+
+    def __init__(self, path):
+        """
+        Set up capture.
+
+        :param path: capture file path
+        :type path: str
+        """
+
+        self.path = path
+        self.records = []
+
+    def add(self, host, response, timestamp=None):
+        """
+        Add server response to capture buffer.
+
+        :param host: server label
+        :type host: str
+        :param response: raw server response
+        :type response: str
+        :param timestamp: response timestamp, now by default
+        :type timestamp: Optional[float]
+        """
+
+        self.records.append(
+            {
+                "time": time.time() if timestamp is None else timestamp,
+                "host": host,
+                "response": response,
+            }
+        )
+
+    def save(self):
+        """
+        Append buffered responses to capture file as single gzip member.
+
+        Capture file errors are ignored.
+        """
+
+        if not self.records:
+            return
+
+        data = "".join(
+            [
+                "{document}\n".format(document=json_dumps(record))  # type: ignore
+                for record in self.records
+            ]
+        ).encode("utf8")
+        self.records = []
+        compressor = zlib.compressobj(self.COMPRESSION, zlib.DEFLATED, self.GZIP_BITS)
+        member = compressor.compress(data) + compressor.flush()
+
+        try:
+            descriptor = os.open(
+                self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644
+            )
+            try:
+                os.write(descriptor, member)
+            finally:
+                os.close(descriptor)
+        except EnvironmentError:
+            return
+
+    @staticmethod
+    def load(path):
+        """
+        Read recorded responses from capture file in recording order.
+
+        :param path: capture file path
+        :type path: str
+        :return: responses timestamps, servers labels and raw responses
+        :rtype: Iterator[Tuple[float, str, str]]
+        """
+
+        with gzip.open(path, "rb") as capture:
+            for line in capture:
+                record = json.loads(line.decode("utf8"))
+                yield record["time"], record["host"], record["response"]
@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+
+# nagios-check-hddtemp
+# check_hddtemp_state.pyi
+
+
+from typing import (  # pylint: disable=W0611
+    IO,
+    Any,
+    Dict,
+    List,
+    Tuple,
+    Union,
+    Iterable,
+    Iterator,
+    Optional,
+    OrderedDict,
+)
+
+import mmap
+import struct
+import threading
+from argparse import Namespace
+
+
+__all__: List[str] = ...
+
+
+class Resolver(object):
+
+    FILENAME: str = ...
+    path: str = ...
+    ttl: float = ...
+    jobs: int = ...
+    def __init__(self, path: str, ttl: float, jobs: int) -> None: ...
+    @staticmethod
+    def _get_key(server: str, port: int) -> str: ...
+    @staticmethod
+    def _interleave(addresses: List[Tuple[int, Tuple[Any, ...]]]) -> List[Tuple[int, Tuple[Any, ...]]]: ...
+    def _lookup(self, server: Tuple[str, int]) -> Tuple[Tuple[str, int], Union[List[Tuple[int, Tuple[Any, ...]]], OSError]]: ...
+    def _load(self) -> Dict[str, Dict[str, Union[float, List[List[Any]]]]]: ...
+    def _save(self, cache: Dict[str, Dict[str, Union[float, List[List[Any]]]]]) -> None: ...
+    def resolve(self, servers: List[Tuple[str, int]]) -> Dict[Tuple[str, int], Union[List[Tuple[int, Tuple[Any, ...]]], OSError]]: ...
+
+
+class ResultCache(object):
+
+    FILENAME: str = ...
+    path: str = ...
+    size: int = ...
+    entries: Optional[OrderedDict[str, Dict[str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]]] = ...
+    changed: OrderedDict[str, None] = ...
+    lock: threading.Lock = ...
+    def __init__(self, path: str, size: int) -> None: ...
+    @staticmethod
+    def get_key(
+        fingerprint: int, options: Namespace, host: Optional[str] = ...
+    ) -> str: ...
+    def _get_entries(self) -> OrderedDict[str, Dict[str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]]: ...
+    def get(self, key: str) -> Optional[Dict[str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]]: ...
+    def put(self, key: str, states: Dict[str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]) -> None: ...
+    def _merge(self, entries: Optional[List[List[Union[str, Dict[str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]]]]]) -> List[Tuple[str, Dict[str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]]]: ...
+    def save(self) -> None: ...
+
+
+class Snapshot(object):
+
+    MAGIC: bytes = ...
+    VERSION: int = ...
+    HEADER: struct.Struct = ...
+    HOST: struct.Struct = ...
+    RECORD: struct.Struct = ...
+    STRING: struct.Struct = ...
+    NONE: int = ...
+    TEMPERATURE_INT: int = ...
+    TEMPERATURE_TEXT: int = ...
+    TEMPERATURE_NONE: int = ...
+    FLAG_ERROR: int = ...
+    path: str = ...
+    data: Optional[mmap.mmap] = ...
+    timestamp: Optional[float] = ...
+    counts: Optional[Tuple[int, int, int]] = ...
+    def __init__(self, path: str) -> None: ...
+    @classmethod
+    def dump(
+        cls,
+        path: str,
+        results: Iterable[
+            Tuple[
+                str,
+                Dict[str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]],
+            ]
+        ],
+        timestamp: Optional[float] = ...,
+    ) -> None: ...
+    def _open(self) -> None: ...
+    def _get_string(self, index: int) -> Optional[str]: ...
+    def _get_state(
+        self, label: str, index: int
+    ) -> Tuple[str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]: ...
+    def get(
+        self, label: str
+    ) -> Optional[
+        Dict[str, Dict[str, Union[str, int, Dict[str, Union[None, int, str]]]]]
+    ]: ...
+    def close(self) -> None: ...
+
+
+class Inventory(object):
+
+    FILENAME: str = ...
+    MAGIC: bytes = ...
+    VERSION: int = ...
+    HEADER: struct.Struct = ...
+    RECORD: struct.Struct = ...
+    LAST_SEEN: struct.Struct = ...
+    LAST_SEEN_OFFSET: int = ...
+    LABEL_SIZE: int = ...
+    MODEL_SIZE: int = ...
+    CHANGES: List[str] = ...
+    CHANGE_NONE: int = ...
+    CHANGE_NEW: int = ...
+    CHANGE_REPLACED: int = ...
+    CHANGE_REMOVED: int = ...
+    path: str = ...
+    hold: float = ...
+    index: Optional[Dict[bytes, Dict[bytes, List[Union[int, float, bytes]]]]] = ...
+    size: int = ...
+    lock: threading.Lock = ...
+    def __init__(self, path: str, hold: float) -> None: ...
+    @staticmethod
+    def _pack(value: str, size: int) -> bytes: ...
+    def _open(self) -> IO[bytes]: ...
+    def update(
+        self,
+        host: str,
+        models: Dict[str, str],
+        timestamp: Optional[float] = ...,
+        seen: Optional[Iterable[str]] = ...,
+    ) -> Dict[str, Tuple[str, str, str]]: ...
+
+
+class ResultBoard(object):
+
+    MAGIC: bytes = ...
+    VERSION: int = ...
+    HEADER: struct.Struct = ...
+    GUARD: struct.Struct = ...
+    BODY: struct.Struct = ...
+    SEQUENCE: struct.Struct = ...
+    SLOT_SIZE: int = ...
+    OFFSET: int = ...
+    KEY_SIZE: int = ...
+    PROBES: int = ...
+    RETRIES: int = ...
+    path: str = ...
+    slots: int = ...
+    data: Optional[mmap.mmap] = ...
+    def __init__(self, path: str, slots: int) -> None: ...
+    @classmethod
+    def _get_key(cls, server: str, port: int) -> bytes: ...
+    def _create(self) -> None: ...
+    def _open(self) -> None: ...
+    def _get_data(self) -> Optional[mmap.mmap]: ...
+    def _iter_slots(self, key: bytes) -> Iterator[int]: ...
+    def _read(
+        self, data: mmap.mmap, offset: int
+    ) -> Optional[Tuple[float, bytes, bytes]]: ...
+    def get(self, server: str, port: int, age: float) -> Optional[str]: ...
+    def put(
+        self,
+        server: str,
+        port: int,
+        response: str,
+        timestamp: Optional[float] = ...,
+    ) -> None: ...
+    def close(self) -> None: ...
+
+
+class Capture(object):
+
+    COMPRESSION: int = ...
+    GZIP_BITS: int = ...
+    path: str = ...
+    records: List[Dict[str, Union[float, str]]] = ...
+    def __init__(self, path: str) -> None: ...
+    def add(
+        self, host: str, response: str, timestamp: Optional[float] = ...
+    ) -> None: ...
+    def save(self) -> None: ...
+    @staticmethod
+    def load(path: str) -> Iterator[Tuple[float, str, str]]: ...
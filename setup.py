@@ -6,7 +6,15 @@
 # setup.py
 
 
-from setuptools import setup, find_packages
+import os
+import sys
+import stat
+import shutil
+import zipfile
+import tempfile
+import py_compile
+
+from setuptools import Command, setup, find_packages
 
 
 VERSION = (1, 5, 1)
@@ -17,12 +25,116 @@ DATA = [
     "COPYING",
     "AUTHORS",
 ]
+ZIPAPP_MODULES = [
+    "check_hddtemp",
+    "check_hddtemp_sinks",
+    "check_hddtemp_sources",
+    "check_hddtemp_state",
+]
+ZIPAPP_MAIN = """# -*- coding: utf-8 -*-
+
+import check_hddtemp
+
+
+check_hddtemp.main()
+"""
+
+
+class BdistZipapp(Command):
+    """
+    Build self-contained zipapp with precompiled optimized bytecode only.
+    """
+
+    description = "build self-contained zipapp with precompiled bytecode"
+    user_options = [
+        ("dist-dir=", "d", "directory to put final built distributions in"),
+        ("python=", "p", "zipapp shebang interpreter, build interpreter by default"),
+        ("optimize=", "O", "bytecode optimization level: 0, 1 or 2"),
+    ]
+
+    def initialize_options(self):
+        """
+        Set default options values.
+        """
+
+        self.dist_dir = None
+        self.python = None
+        self.optimize = None
+
+    def finalize_options(self):
+        """
+        Finalize options values.
+        """
+
+        self.dist_dir = self.dist_dir or "dist"
+        self.python = self.python or "/usr/bin/env python{major}.{minor}".format(
+            major=sys.version_info[0], minor=sys.version_info[1]
+        )
+        self.optimize = int(2 if self.optimize is None else self.optimize)
+
+    def run(self):
+        """
+        Compile modules to legacy-layout ".pyc" files and pack them to zipapp.
+
+        Bytecode is bound to interpreter version used to build zipapp,
+        so it must be built with the same Python version as used on poller.
+        """
+
+        staging = tempfile.mkdtemp()
+        target = os.path.join(
+            self.dist_dir, "check_hddtemp-{version}.pyz".format(version=__version__)
+        )
+        sources = [
+            ("{module}.py".format(module=module), module) for module in ZIPAPP_MODULES
+        ]
+
+        try:
+            main = os.path.join(staging, "__main__.py")
+            with open(main, "w") as source:
+                source.write(ZIPAPP_MAIN)
+            sources.append((main, "__main__"))
+            self.mkpath(self.dist_dir)
+            with open(target, "wb") as archive:
+                archive.write("#!{python}\n".format(python=self.python).encode("utf-8"))
+                with zipfile.ZipFile(archive, "w") as bundle:
+                    for source, module in sources:
+                        compiled = os.path.join(
+                            staging, "{module}.pyc".format(module=module)
+                        )
+                        py_compile.compile(
+                            source,
+                            cfile=compiled,
+                            dfile="{module}.py".format(module=module),
+                            doraise=True,
+                            optimize=self.optimize,
+                        )
+                        bundle.write(
+                            compiled, arcname="{module}.pyc".format(module=module)
+                        )
+            os.chmod(
+                target,
+                os.stat(target).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH,
+            )
+        finally:
+            shutil.rmtree(staging)
+
+        self.announce("created {target}".format(target=target), level=2)
+
 
 setup(
     name="nagios-check-hddtemp",
     version=__version__,
     packages=find_packages(exclude=["tests.*", "tests"]),
     scripts=["check_hddtemp.py"],
+    py_modules=[
+        "check_hddtemp",
+        "check_hddtemp_poller",
+        "check_hddtemp_replay",
+        "check_hddtemp_server",
+        "check_hddtemp_sinks",
+        "check_hddtemp_sources",
+        "check_hddtemp_state",
+    ],
     package_data={"nagios-check-hddtemp": DATA},
     data_files=[("share/doc/nagios-check-hddtemp/", DATA)],
     author="Alexei Andrushievich",
@@ -39,6 +151,7 @@ setup(
     include_package_data=True,
     python_requires=">=2.7",
     test_suite="tests",
+    cmdclass={"bdist_zipapp": BdistZipapp},
     keywords=["nagios", "hddtemp", "check-hddtemp", "plugin", "check-hddtemp-plugin"],
     classifiers=[
         "Development Status :: 5 - Production/Stable",
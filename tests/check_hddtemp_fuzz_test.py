@@ -0,0 +1,265 @@
+# -*- coding: utf-8 -*-
+
+# nagios-check-hddtemp
+# tests/check_hddtemp_fuzz_test.py
+
+
+from __future__ import unicode_literals
+
+import random
+
+import pytest
+
+from check_hddtemp import CheckHDDTemp
+
+
+__all__ = [
+    "generate",
+    "get_checker",
+    "get_valid",
+    "test__parse__fuzz",
+    "test__parse__fuzz__embedded_separators",
+    "test__parse__fuzz__truncated",
+    "test__parse__fuzz__garbage",
+    "test__parse__fuzz__huge",
+    "test__iter_records__fuzz",
+]
+
+
+CASES = 200
+# device names and models can't contain alphanumeric separators,
+# empty models are not generated: they look like records separator
+SEPARATORS = ["|", "!", "#", ";", "@", "~", "^", "||", "#!", "\t"]
+MODELS = [
+    "ST4000NM0035-1V4107",
+    "WDC WD40EFRX-68N32N0",
+    "HGST HUS726040ALE610",
+    "Samsung SSD 860 EVO 500GB",
+]
+
+
+def generate(generator, separator, count, corrupt=0.0):
+    """
+    Create random hddtemp server response and its expected parsed data.
+
+    Corrupted devices records have separator embedded in model name
+    and are missing in expected parsed data.
+
+    :param generator: random numbers generator
+    :type generator: random.Random
+    :param separator: hddtemp separator
+    :type separator: str
+    :param count: devices count
+    :type count: int
+    :param corrupt: probability of device record to be corrupted
+    :type corrupt: float
+    :return: hddtemp server response and expected parsed data
+    :rtype: Tuple[str, Dict[str, Dict[str, str]]]
+    """
+
+    records, expected = [], {}
+
+    for index in range(count):
+        device = "/dev/sd{index}".format(index=index)
+        model = generator.choice(MODELS)
+        temperature, scale = generator.choice(
+            [
+                (str(generator.randint(0, 99)), "C"),
+                (str(generator.randint(32, 210)), "F"),
+                (CheckHDDTemp.HDDTEMP_SLEEPING, "*"),
+                (CheckHDDTemp.HDDTEMP_UNKNOWN, "*"),
+            ]
+        )
+        if generator.random() < corrupt:
+            model = "{model}{separator}REV".format(model=model, separator=separator)
+        else:
+            expected[device] = {
+                "model": model,
+                "temperature": temperature,
+                "scale": scale,
+            }
+        records.append(separator.join(["", device, model, temperature, scale, ""]))
+
+    return "".join(records), expected
+
+
+def get_valid(result):
+    """
+    Remove malformed devices records from parsed data.
+
+    :param result: structured data parsed from hddtemp server response
+    :type result: Dict[str, Dict[str, str]]
+    :return: structured data of valid devices records
+    :rtype: Dict[str, Dict[str, str]]
+    """
+
+    return {device: info for device, info in result.items() if "error" not in info}
+
+
+def get_checker(separator, tolerant=False):
+    """
+    Create checker with requested separator.
+
+    :param separator: hddtemp separator
+    :type separator: str
+    :param tolerant: report malformed devices records instead of failing
+    :type tolerant: bool
+    :return: checker
+    :rtype: CheckHDDTemp
+    """
+
+    args = ["-s", "127.0.0.1", "-S", separator]
+
+    return CheckHDDTemp(args=args + ["-T"] if tolerant else args)
+
+
+def test__parse__fuzz():
+    """
+    Test "_parse" method must parse any valid response with any separator.
+    """
+
+    generator = random.Random(0)  # nosec: B311
+
+    for _ in range(CASES):
+        separator = generator.choice(SEPARATORS)
+        response, expected = generate(
+            generator=generator,
+            separator=separator,
+            count=generator.randint(1, 64),
+        )
+
+        assert (  # nosec: B101
+            get_checker(separator=separator)._parse(data=response) == expected
+        )
+
+
+def test__parse__fuzz__embedded_separators():
+    """
+    Test "_parse" method must fail on separators embedded in models names
+    or report such records as malformed in tolerant mode.
+    """
+
+    generator = random.Random(1)  # nosec: B311
+
+    for _ in range(CASES):
+        separator = generator.choice(SEPARATORS)
+        response, expected = generate(
+            generator=generator,
+            separator=separator,
+            count=generator.randint(2, 64),
+            corrupt=0.3,
+        )
+        count = response.count(separator * 2) + 1
+
+        if len(expected) < count:
+            with pytest.raises(ValueError):
+                get_checker(separator=separator)._parse(data=response)
+        if expected:
+            result = get_checker(separator=separator, tolerant=True)._parse(
+                data=response
+            )
+
+            assert get_valid(result=result) == expected  # nosec: B101
+            assert len(result) == count  # nosec: B101
+
+
+def test__parse__fuzz__truncated():
+    """
+    Test "_parse" method must never return wrong data for truncated response.
+    """
+
+    generator = random.Random(2)  # nosec: B311
+
+    for _ in range(CASES):
+        separator = generator.choice(SEPARATORS)
+        response, expected = generate(
+            generator=generator,
+            separator=separator,
+            count=generator.randint(1, 16),
+        )
+        response = response[: generator.randint(0, len(response) - 1)]
+        checker = get_checker(separator=separator, tolerant=True)
+
+        try:
+            result = checker._parse(data=response)
+        except ValueError:
+            continue
+
+        valid = get_valid(result=result)
+
+        # only incomplete tail record can be malformed
+        assert len(valid) >= response.count(separator * 2)  # nosec: B101
+        assert len(result) - len(valid) <= 1  # nosec: B101
+        for device, info in valid.items():
+
+            assert expected[device] == info  # nosec: B101
+
+
+def test__parse__fuzz__garbage():
+    """
+    Test "_parse" method must fail only with parsing error on random garbage.
+    """
+
+    generator = random.Random(3)  # nosec: B311
+
+    for _ in range(CASES):
+        separator = generator.choice(SEPARATORS)
+        data = bytes(
+            bytearray(
+                generator.randint(0, 255) for _ in range(generator.randint(0, 256))
+            )
+        )
+        response = data.decode("utf8", "replace")
+
+        for tolerant in [False, True]:
+            try:
+                result = get_checker(separator=separator, tolerant=tolerant)._parse(
+                    data=response
+                )
+            except ValueError:
+                continue
+
+            assert all([len(info) == 3 for info in result.values()])  # nosec: B101
+
+
+def test__parse__fuzz__huge():
+    """
+    Test "_parse" method must parse huge response reporting corrupted records.
+    """
+
+    generator = random.Random(4)  # nosec: B311
+    response, expected = generate(
+        generator=generator, separator="|", count=100000, corrupt=0.01
+    )
+    result = get_checker(separator="|", tolerant=True)._parse(data=response)
+
+    assert get_valid(result=result) == expected  # nosec: B101
+    assert len(result) == 100000  # nosec: B101
+
+
+def test__iter_records__fuzz():
+    """
+    Test "_iter_records" method must split response the same way however chunked.
+    """
+
+    generator = random.Random(5)  # nosec: B311
+
+    for _ in range(CASES):
+        separator = generator.choice(SEPARATORS)
+        response, _ = generate(
+            generator=generator,
+            separator=separator,
+            count=generator.randint(1, 64),
+        )
+        offsets = sorted(
+            generator.randint(0, len(response)) for _ in range(generator.randint(0, 8))
+        )
+        chunks = [
+            response[start:end]
+            for start, end in zip([0] + offsets, offsets + [len(response)])
+        ]
+        checker = get_checker(separator=separator)
+
+        records = list(checker._iter_records(chunks=chunks))
+
+        assert records == response.split(separator * 2)  # nosec: B101
@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+
+# nagios-check-hddtemp
+# tests/check_hddtemp_fuzz_test.pyi
+
+from typing import Dict, List, Tuple  # pylint: disable=W0611
+
+import random
+
+from check_hddtemp import CheckHDDTemp
+
+__all__: List[str] = ...
+
+CASES: int = ...
+SEPARATORS: List[str] = ...
+MODELS: List[str] = ...
+
+def generate(
+    generator: random.Random, separator: str, count: int, corrupt: float = ...
+) -> Tuple[str, Dict[str, Dict[str, str]]]: ...
+def get_valid(result: Dict[str, Dict[str, str]]) -> Dict[str, Dict[str, str]]: ...
+def get_checker(separator: str, tolerant: bool = ...) -> CheckHDDTemp: ...
+def test__parse__fuzz() -> None: ...
+def test__parse__fuzz__embedded_separators() -> None: ...
+def test__parse__fuzz__truncated() -> None: ...
+def test__parse__fuzz__garbage() -> None: ...
+def test__parse__fuzz__huge() -> None: ...
+def test__iter_records__fuzz() -> None: ...
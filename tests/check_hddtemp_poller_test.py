@@ -0,0 +1,653 @@
+# -*- coding: utf-8 -*-
+
+# nagios-check-hddtemp
+# tests/check_hddtemp_poller_test.py
+
+
+from __future__ import unicode_literals
+
+import time
+import socket
+import asyncio
+import resource
+from collections import Counter
+
+import pytest
+
+
+try:
+    from pytest_mock.plugin import MockerFixture  # pylint: disable=W0611  # noqa: F401
+except ImportError:
+    from pytest_mock.plugin import (  # type: ignore  # pylint: disable=W0611  # noqa: F401,E501
+        MockFixture as MockerFixture,
+    )
+
+from check_hddtemp import CheckHDDTemp
+from check_hddtemp_server import FakeHDDTempServer
+from check_hddtemp_poller import (
+    Host,
+    Scheduler,
+    ShardedScheduler,
+    main,
+    fetch,
+    get_loop,
+    decode_stats,
+    encode_stats,
+    decode_states,
+    encode_states,
+    get_concurrency,
+    raise_files_limit,
+)
+
+
+__all__ = [
+    "test__adapt",
+    "test__adapt__sleeping",
+    "test__adapt__sleeping__learned",
+    "test__learn",
+    "test_get_awake",
+    "test__adapt__warning",
+    "test__get_phases",
+    "test_fetch",
+    "test_run",
+    "test_run__network_error",
+    "test_run__skip_in_flight",
+    "test_run__unchanged_responses",
+    "test_run__breaker",
+    "test_get_loop",
+    "test_raise_files_limit",
+    "test_get_concurrency",
+    "test_sweep",
+    "test_encode_states",
+    "test_encode_stats",
+    "test_sharded_scheduler__sweep",
+    "test_sharded_scheduler__run",
+    "test_raise_files_limit__unlimited",
+    "test_fetch__addresses",
+    "test_fetch__timeout",
+    "test_main__source",
+    "test_encode_states__model_threshold",
+]
+
+
+def test_fetch():
+    """Test "fetch" function must return data from server."""
+
+    server = FakeHDDTempServer(devices=2)
+    hosts = server.start_in_thread()
+    loop = asyncio.new_event_loop()
+
+    try:
+        result = loop.run_until_complete(
+            fetch(host=hosts[0][0], port=hosts[0][1], timeout=1)
+        )
+    finally:
+        loop.close()
+        server.stop_in_thread()
+
+    assert result == server.response(host=hosts[0]).decode("utf8")  # nosec: B101
+
+
+def test_fetch__addresses():
+    """Test "fetch" function must connect to first resolved address accepting connection."""  # noqa: E501
+
+    server = FakeHDDTempServer(devices=2)
+    hosts = server.start_in_thread()
+    closed = socket.socket()
+    closed.bind(("127.0.0.1", 0))
+    addresses = [
+        (socket.AF_INET, closed.getsockname()),
+        (socket.AF_INET, (hosts[0][0], hosts[0][1])),
+    ]
+    closed.close()
+    loop = asyncio.new_event_loop()
+
+    try:
+        result = loop.run_until_complete(
+            fetch(host="nas.lan", port=7634, timeout=1, addresses=addresses)
+        )
+        with pytest.raises(socket.gaierror):
+            loop.run_until_complete(
+                fetch(
+                    host="nas.lan",
+                    port=7634,
+                    timeout=1,
+                    addresses=socket.gaierror("Name not known"),
+                )
+            )
+    finally:
+        loop.close()
+        server.stop_in_thread()
+
+    assert result == server.response(host=hosts[0]).decode("utf8")  # nosec: B101
+
+
+def test_fetch__timeout(mocker):
+    """
+    Test "fetch" function must share timeout between connecting and receiving data.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    """
+
+    server = FakeHDDTempServer(devices=2, latency=0.15)
+    hosts = server.start_in_thread()
+    open_connection = asyncio.open_connection
+
+    async def connect(*args, **kwargs):
+        """
+        Connect to server slowly.
+
+        :param args: connection args
+        :type args: List[Any]
+        :param kwargs: connection kwargs
+        :type kwargs: Dict[str, Any]
+        :return: connection reader and writer
+        :rtype: Tuple[asyncio.StreamReader, asyncio.StreamWriter]
+        """
+
+        await asyncio.sleep(0.15)
+
+        return await open_connection(*args, **kwargs)
+
+    mocker.patch("asyncio.open_connection", connect)
+    loop = asyncio.new_event_loop()
+
+    try:
+        with pytest.raises(asyncio.TimeoutError):
+            loop.run_until_complete(
+                fetch(host=hosts[0][0], port=hosts[0][1], timeout=0.25)
+            )
+    finally:
+        loop.close()
+        time.sleep(0.2)  # let server finish pending response
+        server.stop_in_thread()
+
+
+def test__get_phases():
+    """Test "_get_phases" method must spread servers evenly and deterministically."""
+
+    labels = ["host{index}".format(index=index) for index in range(10)]
+    result = Scheduler._get_phases(labels=labels, interval=60.0)
+
+    assert sorted(result.values()) == [  # nosec: B101
+        6.0 * index for index in range(10)
+    ]
+    assert result == Scheduler._get_phases(  # nosec: B101
+        labels=list(reversed(labels)), interval=60.0
+    )
+
+
+def test__adapt():
+    """Test "_adapt" method must return base interval for normal servers."""
+
+    checker = CheckHDDTemp(args=["-s", "127.0.0.1"])
+    scheduler = Scheduler(checker=checker, interval=60.0)
+    host = scheduler.hosts[0]
+    states = checker._check_data(
+        data={"/dev/sda": {"model": "HARD DRIVE", "temperature": "27", "scale": "C"}}
+    )
+    host.interval = 120.0
+
+    assert scheduler._adapt(host=host, states=states) == 60.0  # nosec: B101
+
+
+def test__adapt__warning():
+    """Test "_adapt" method must speed up polling for servers near critical."""
+
+    checker = CheckHDDTemp(args=["-s", "127.0.0.1"])
+    scheduler = Scheduler(checker=checker, interval=60.0, min_interval=10.0)
+    states = checker._check_data(
+        data={
+            "/dev/sda": {"model": "HARD DRIVE", "temperature": "27", "scale": "C"},
+            "/dev/sdb": {"model": "HARD DRIVE", "temperature": "42", "scale": "C"},
+        }
+    )
+
+    assert (  # nosec: B101
+        scheduler._adapt(host=scheduler.hosts[0], states=states) == 10.0
+    )
+
+
+def test__adapt__sleeping():
+    """Test "_adapt" method must slow down polling for sleeping servers."""
+
+    checker = CheckHDDTemp(args=["-s", "127.0.0.1"])
+    scheduler = Scheduler(checker=checker, interval=60.0, max_interval=200.0)
+    host = Host(label="a", host="a", port=7634, interval=60.0, phase=0.0)
+    states = checker._check_data(
+        data={"/dev/sda": {"model": "HARD DRIVE", "temperature": "SLP", "scale": "*"}}
+    )
+    result = []
+    for _ in range(3):
+        host.interval = scheduler._adapt(host=host, states=states)
+        result.append(host.interval)
+
+    assert result == [120.0, 200.0, 200.0]  # nosec: B101
+
+
+def test__learn():
+    """Test "_learn" method must learn devices sleep episodes durations."""
+
+    checker = CheckHDDTemp(args=["-s", "127.0.0.1"])
+    host = Host(label="a", host="a", port=7634, interval=60.0, phase=0.0)
+    awake, asleep = [
+        checker._check_data(
+            data={
+                "/dev/sda": {
+                    "model": "HARD DRIVE",
+                    "temperature": temperature,
+                    "scale": scale,
+                }
+            }
+        )
+        for temperature, scale in [("27", "C"), ("SLP", "*")]
+    ]
+
+    for now, states in [(0.0, awake), (10.0, asleep), (50.0, asleep), (110.0, awake)]:
+        Scheduler._learn(host=host, states=states, now=now)
+
+    assert host.episodes == {"/dev/sda": 100.0}  # nosec: B101
+    assert host.awake == {"/dev/sda": (27, "C", 110.0)}  # nosec: B101
+    assert host.asleep == {}  # nosec: B101
+
+    for now, states in [(200.0, asleep), (300.0, awake)]:
+        Scheduler._learn(host=host, states=states, now=now)
+
+    assert host.episodes == {"/dev/sda": 100.0}  # nosec: B101
+
+    for now, states in [(400.0, asleep), (600.0, awake)]:
+        Scheduler._learn(host=host, states=states, now=now)
+
+    assert host.episodes == {"/dev/sda": 130.0}  # nosec: B101
+
+
+def test__adapt__sleeping__learned():
+    """Test "_adapt" method must poll sleeping servers when devices should wake up."""
+
+    checker = CheckHDDTemp(args=["-s", "127.0.0.1"])
+    scheduler = Scheduler(checker=checker, interval=60.0, max_interval=480.0)
+    host = Host(label="a", host="a", port=7634, interval=60.0, phase=0.0)
+    states = checker._check_data(
+        data={
+            "/dev/sda": {"model": "HARD DRIVE", "temperature": "SLP", "scale": "*"},
+            "/dev/sdb": {"model": "HARD DRIVE", "temperature": "SLP", "scale": "*"},
+        }
+    )
+    host.asleep = {"/dev/sda": 0.0, "/dev/sdb": 100.0}
+    host.episodes = {"/dev/sda": 400.0, "/dev/sdb": 1000.0}
+
+    assert scheduler._adapt(host=host, states=states, now=100.0) == 300.0  # nosec: B101
+    assert scheduler._adapt(host=host, states=states, now=380.0) == 60.0  # nosec: B101
+    assert scheduler._adapt(host=host, states=states, now=500.0) == 120.0  # nosec: B101
+
+    del host.episodes["/dev/sdb"]
+
+    assert scheduler._adapt(host=host, states=states, now=100.0) == 120.0  # nosec: B101
+
+
+def test_get_awake():
+    """Test "get_awake" method must return last awake temperatures of sleeping devices."""  # noqa: E501
+
+    host = Host(label="a", host="a", port=7634, interval=60.0, phase=0.0)
+    host.awake = {"/dev/sda": (27, "C", 100.0), "/dev/sdb": (30, "C", 150.0)}
+    host.asleep = {"/dev/sda": 120.0}
+
+    assert Scheduler.get_awake(host=host, now=160.5) == {  # nosec: B101
+        "/dev/sda": {"temperature": 27, "scale": "C", "age": 60.5}
+    }
+
+
+def test_run():
+    """Test "run" method must poll all servers with concurrency limit."""
+
+    server = FakeHDDTempServer(devices=2, latency=0.2)
+    hosts = server.start_in_thread(count=6)
+    checker = CheckHDDTemp(
+        args=["-s", ",".join("{0}:{1}".format(*host) for host in hosts)]
+    )
+    result = []
+    scheduler = Scheduler(
+        checker=checker,
+        interval=0.3,
+        concurrency=2,
+        callback=lambda host, states: result.append((host.label, len(states))),
+    )
+    loop = asyncio.new_event_loop()
+
+    try:
+        loop.run_until_complete(scheduler.run(duration=0.29))
+    finally:
+        loop.close()
+        server.stop_in_thread()
+
+    assert sorted(result) == sorted(  # nosec: B101
+        (host.label, 2) for host in scheduler.hosts
+    )
+    assert scheduler.stats["active"] == 2  # nosec: B101
+    assert all(host.runs == 1 for host in scheduler.hosts)  # nosec: B101
+
+
+def test_run__skip_in_flight():
+    """Test "run" method must skip server tick if its previous poll in flight."""
+
+    server = FakeHDDTempServer(devices=1, latency=0.25)
+    hosts = server.start_in_thread()
+    checker = CheckHDDTemp(args=["-s", "{0}:{1}".format(*hosts[0])])
+    scheduler = Scheduler(checker=checker, interval=0.1)
+    loop = asyncio.new_event_loop()
+
+    try:
+        loop.run_until_complete(scheduler.run(duration=0.15))
+    finally:
+        loop.close()
+        server.stop_in_thread()
+
+    assert scheduler.hosts[0].runs == 1  # nosec: B101
+    assert scheduler.hosts[0].skipped == 1  # nosec: B101
+
+
+def test_run__network_error():
+    """Test "run" method must create server error state on network errors."""
+
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    port = listener.getsockname()[1]
+    listener.close()
+    checker = CheckHDDTemp(args=["-s", "127.0.0.1:{port}".format(port=port)])
+    scheduler = Scheduler(checker=checker, interval=1.0)
+    loop = asyncio.new_event_loop()
+
+    try:
+        loop.run_until_complete(scheduler.run(duration=0.5))
+    finally:
+        loop.close()
+
+    assert scheduler.hosts[0].status == "unknown"  # nosec: B101
+    assert scheduler.hosts[0].states[""]["template"] == "error"  # nosec: B101
+    assert scheduler.stats["errors"] == 1  # nosec: B101
+
+
+def test_run__unchanged_responses(mocker):
+    """
+    Test "run" method must reuse check results for unchanged responses.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    """
+
+    server = FakeHDDTempServer(devices=2)
+    hosts = server.start_in_thread(count=2)
+    checker = CheckHDDTemp(
+        args=["-s", ",".join("{0}:{1}".format(*host) for host in hosts)]
+    )
+    check_response = mocker.spy(checker, "_check_response")
+    scheduler = Scheduler(checker=checker, interval=0.1)
+    loop = asyncio.new_event_loop()
+
+    try:
+        loop.run_until_complete(scheduler.run(duration=0.35))
+    finally:
+        loop.close()
+        server.stop_in_thread()
+
+    assert check_response.call_count == 2  # nosec: B101
+    assert all(host.runs >= 3 for host in scheduler.hosts)  # nosec: B101
+    assert all(host.hits == host.runs - 1 for host in scheduler.hosts)  # nosec: B101
+    assert scheduler.stats["hits"] == scheduler.stats["polls"] - 2  # nosec: B101
+    assert all(  # nosec: B101
+        [rate > 0.5 for rate in scheduler.get_hit_rates().values()]
+    )
+
+
+def test_run__breaker(tmpdir):
+    """
+    Test "run" method must not connect to servers with open circuit.
+
+    :param tmpdir: temporary directory
+    :type tmpdir: py.path.local
+    """
+
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    port = listener.getsockname()[1]
+    listener.close()
+    checker = CheckHDDTemp(
+        args=[
+            "-s",
+            "127.0.0.1:{port}".format(port=port),
+            "--state-dir",
+            str(tmpdir),
+            "--breaker-threshold",
+            "1",
+        ]
+    )
+    scheduler = Scheduler(checker=checker, interval=0.05)
+    loop = asyncio.new_event_loop()
+
+    try:
+        loop.run_until_complete(scheduler.run(duration=0.2))
+    finally:
+        loop.close()
+
+    assert scheduler.stats["errors"] == 1  # nosec: B101
+    assert scheduler.stats["open"] >= 2  # nosec: B101
+    assert tmpdir.join("check_hddtemp-breaker.json").check()  # nosec: B101
+
+
+def test_get_loop(mocker):
+    """
+    Test "get_loop" function must create uvloop event loop only if installed.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    """
+
+    mocker.patch("check_hddtemp_poller.uvloop", None)
+    loop = get_loop()
+    loop.close()
+
+    assert isinstance(loop, asyncio.AbstractEventLoop)  # nosec: B101
+
+    with pytest.raises(ImportError):
+        get_loop(name="uvloop")
+
+    uvloop = mocker.patch("check_hddtemp_poller.uvloop")
+
+    assert get_loop() is uvloop.new_event_loop.return_value  # nosec: B101
+
+    loop = get_loop(name="asyncio")
+    loop.close()
+
+    assert loop is not uvloop.new_event_loop.return_value  # nosec: B101
+
+
+def test_main__source(mocker):
+    """
+    Test "main" function must reject sources other than hddtemp server.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    """
+
+    mocker.patch(
+        "sys.argv", ["check_hddtemp_poller.py", "-s", "nas.lan", "--source", "sysfs"]
+    )
+    error = mocker.patch("argparse.ArgumentParser.error", side_effect=SystemExit)
+
+    with pytest.raises(SystemExit):
+        main()
+
+    error.assert_called_once_with(  # nosec: B101
+        message="Only hddtemp servers can be polled"
+    )
+
+
+def test_raise_files_limit(mocker):
+    """
+    Test "raise_files_limit" function must raise soft limit within hard limit.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    """
+
+    mocker.patch("resource.getrlimit", return_value=(1024, 4096))
+    setrlimit = mocker.patch("resource.setrlimit")
+
+    assert raise_files_limit() == 4096  # nosec: B101
+    assert raise_files_limit(limit=2048) == 2048  # nosec: B101
+    assert raise_files_limit(limit=512) == 1024  # nosec: B101
+    assert setrlimit.call_count == 2  # nosec: B101
+
+    setrlimit.side_effect = ValueError("not allowed")
+
+    assert raise_files_limit() == 1024  # nosec: B101
+
+
+def test_raise_files_limit__unlimited(mocker):
+    """
+    Test "raise_files_limit" function must keep unlimited hard limit.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    """
+
+    infinity = resource.RLIM_INFINITY
+    mocker.patch("resource.getrlimit", return_value=(1024, infinity))
+    setrlimit = mocker.patch("resource.setrlimit")
+
+    assert raise_files_limit() == 65536  # nosec: B101
+    setrlimit.assert_called_once_with(  # nosec: B101
+        resource.RLIMIT_NOFILE, (65536, infinity)
+    )
+
+
+def test_get_concurrency():
+    """Test "get_concurrency" function must size concurrency by open files limit."""
+
+    assert get_concurrency(limit=None) == 64  # nosec: B101
+    assert get_concurrency(limit=None, concurrency=8) == 8  # nosec: B101
+    assert get_concurrency(limit=1056) == 1024  # nosec: B101
+    assert get_concurrency(limit=1056, concurrency=8) == 8  # nosec: B101
+    assert get_concurrency(limit=1056, concurrency=4096) == 1024  # nosec: B101
+    assert get_concurrency(limit=16) == 1  # nosec: B101
+
+
+def test_sweep():
+    """Test "sweep" method must poll all servers once and measure polling rate."""
+
+    server = FakeHDDTempServer(devices=2, latency=0.05)
+    hosts = server.start_in_thread(count=8)
+    checker = CheckHDDTemp(
+        args=["-s", ",".join("{0}:{1}".format(*host) for host in hosts)]
+    )
+    scheduler = Scheduler(checker=checker, concurrency=4)
+    loop = asyncio.new_event_loop()
+
+    try:
+        loop.run_until_complete(scheduler.sweep())
+    finally:
+        loop.close()
+        server.stop_in_thread()
+
+    assert all(host.runs == 1 for host in scheduler.hosts)  # nosec: B101
+    assert scheduler.stats["active"] == 4  # nosec: B101
+    assert 0 < scheduler.get_rate() < 8 / 0.09  # nosec: B101
+
+
+def test_encode_states():
+    """Test "encode_states" function result must be decoded to the same states."""
+
+    checker = CheckHDDTemp(args=["-s", "127.0.0.1", "-T"])
+    states = checker._check_response(
+        label="nas",
+        response="|/dev/sda|HARD DRIVE|27|C||/dev/sdb|HARD DRIVE|SLP|*||/dev/sdc|HARD DRIVE|UNK|*||/dev/sdd|HARD DRIVE|50|F||/dev/sde|X|",  # noqa: E501
+    )
+    error = checker._get_error_states(label="nas", error=OSError("refused"))
+
+    assert decode_states(  # nosec: B101
+        frame=encode_states(label="nas", states=states)
+    ) == ("nas", states)
+    assert decode_states(  # nosec: B101
+        frame=encode_states(label="nas", states=error)
+    ) == ("nas", error)
+
+
+def test_encode_states__model_threshold():
+    """Test "encode_states" function must keep devices models thresholds."""
+
+    checker = CheckHDDTemp(args=["-s", "127.0.0.1", "--model-threshold", "*SSD*:60:70"])
+    states = checker._check_response(
+        label="nas",
+        response="|/dev/sda|HARD DRIVE|27|C||/dev/sdb|Samsung SSD 860|55|C|",
+    )
+    _, result = decode_states(frame=encode_states(label="nas", states=states))
+
+    assert result == states  # nosec: B101
+    assert result["/dev/sdb"]["data"]["warning"] == 60  # nosec: B101
+    assert result["/dev/sdb"]["data"]["critical"] == 70  # nosec: B101
+
+
+def test_encode_stats():
+    """Test "encode_stats" function result must be decoded to the same statistics."""
+
+    stats = Counter({"polls": 10, "hits": 7, "errors": 1, "active": 4})
+    result = decode_stats(frame=encode_stats(stats=stats))
+
+    assert result == stats  # nosec: B101
+    assert result["open"] == 0  # nosec: B101
+
+
+def test_sharded_scheduler__sweep():
+    """Test "ShardedScheduler.sweep" method must poll all servers in workers."""
+
+    server = FakeHDDTempServer(devices=2)
+    hosts = server.start_in_thread(count=5)
+    args = ["-s", ",".join("{0}:{1}".format(*host) for host in hosts), "-w", "50"]
+    result = []
+    scheduler = ShardedScheduler(
+        checker=CheckHDDTemp(args=args),
+        args=args,
+        processes=2,
+        callback=lambda host, states: result.append((host.label, len(states))),
+    )
+    loop = asyncio.new_event_loop()
+
+    try:
+        loop.run_until_complete(scheduler.sweep())
+    finally:
+        loop.close()
+        server.stop_in_thread()
+
+    assert [len(shard) for shard in scheduler._get_shards()] == [3, 2]  # nosec: B101
+    assert sorted(result) == sorted(  # nosec: B101
+        (host.label, 2) for host in scheduler.hosts
+    )
+    assert scheduler.stats["polls"] == 5  # nosec: B101
+    assert all(host.runs == 1 for host in scheduler.hosts)  # nosec: B101
+    assert scheduler.get_status() == CheckHDDTemp.STATUS_OK  # nosec: B101
+    assert scheduler.get_rate() > 0  # nosec: B101
+
+
+def test_sharded_scheduler__run():
+    """
+    Test "ShardedScheduler.run" method must reuse states of unchanged frames.
+    """
+
+    server = FakeHDDTempServer(devices=2)
+    hosts = server.start_in_thread(count=2)
+    args = ["-s", ",".join("{0}:{1}".format(*host) for host in hosts)]
+    scheduler = ShardedScheduler(
+        checker=CheckHDDTemp(args=args), args=args, processes=2, interval=0.1
+    )
+    loop = asyncio.new_event_loop()
+
+    try:
+        loop.run_until_complete(scheduler.run(duration=0.35))
+    finally:
+        loop.close()
+        server.stop_in_thread()
+
+    assert all(host.runs >= 3 for host in scheduler.hosts)  # nosec: B101
+    assert all(host.hits == host.runs - 1 for host in scheduler.hosts)  # nosec: B101
+    assert scheduler.stats["hits"] == scheduler.stats["polls"] - 2  # nosec: B101
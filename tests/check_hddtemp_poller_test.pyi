@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+
+# nagios-check-hddtemp
+# tests/check_hddtemp_poller_test.pyi
+
+from typing import List  # pylint: disable=W0611
+
+from py.path import local
+
+try:
+    from pytest_mock.plugin import MockerFixture  # pylint: disable=W0611  # noqa: F401
+except ImportError:
+    from pytest_mock.plugin import (  # type: ignore  # pylint: disable=W0611  # noqa: F401,E501
+        MockFixture as MockerFixture,
+    )
+
+__all__: List[str] = ...
+
+def test__adapt() -> None: ...
+def test__adapt__sleeping() -> None: ...
+def test__adapt__sleeping__learned() -> None: ...
+def test__learn() -> None: ...
+def test_get_awake() -> None: ...
+def test__adapt__warning() -> None: ...
+def test__get_phases() -> None: ...
+def test_fetch() -> None: ...
+def test_run() -> None: ...
+def test_run__network_error() -> None: ...
+def test_run__skip_in_flight() -> None: ...
+def test_run__unchanged_responses(mocker: MockerFixture) -> None: ...
+def test_run__breaker(tmpdir: local) -> None: ...
+def test_get_loop(mocker: MockerFixture) -> None: ...
+def test_raise_files_limit(mocker: MockerFixture) -> None: ...
+def test_get_concurrency() -> None: ...
+def test_sweep() -> None: ...
+def test_encode_states() -> None: ...
+def test_encode_stats() -> None: ...
+def test_sharded_scheduler__sweep() -> None: ...
+def test_sharded_scheduler__run() -> None: ...
+def test_raise_files_limit__unlimited(mocker: MockerFixture) -> None: ...
+def test_fetch__addresses() -> None: ...
+def test_fetch__timeout(mocker: MockerFixture) -> None: ...
+def test_main__source(mocker: MockerFixture) -> None: ...
+def test_encode_states__model_threshold() -> None: ...
@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+
+# nagios-check-hddtemp
+# tests/check_hddtemp_replay_test.py
+
+
+from __future__ import unicode_literals
+
+import json
+from collections import Counter
+
+
+try:
+    from pytest_mock.plugin import MockerFixture  # pylint: disable=W0611  # noqa: F401
+except ImportError:
+    from pytest_mock.plugin import (  # type: ignore  # pylint: disable=W0611  # noqa: F401,E501
+        MockFixture as MockerFixture,
+    )
+
+from check_hddtemp import CheckHDDTemp
+from check_hddtemp_state import Capture
+from check_hddtemp_replay import diff, load, main, replay
+
+
+__all__ = [
+    "test_load",
+    "test_replay",
+    "test_replay__real_time",
+    "test_diff",
+    "test_main",
+]
+
+
+RECORDS = [
+    (10.0, "nas1", "|/dev/sda|HARD DRIVE|27|C|"),
+    (11.0, "nas2", "|/dev/sda|HARD DRIVE|SLP|*|"),
+    (12.0, "nas1", "|/dev/sda|HARD DRIVE|42|C|"),
+    (13.0, "nas2", "|/dev/sda|HARD DRIVE|UNK|*|"),
+]
+
+
+def test_load(tmpdir):
+    """
+    Test "load" function must return capture records ordered by timestamps.
+
+    :param tmpdir: temporary directory
+    :type tmpdir: py.path.local
+    """
+
+    path = str(tmpdir.join("capture.gz"))
+    for timestamp, host, response in reversed(RECORDS):
+        capture = Capture(path=path)
+        capture.add(host=host, response=response, timestamp=timestamp)
+        capture.save()
+
+    assert load(path=path) == RECORDS  # nosec: B101
+
+
+def test_replay():
+    """Test "replay" function must check recorded responses at maximum speed."""
+
+    stats = Counter()  # type: ignore
+    result = list(
+        replay(
+            checker=CheckHDDTemp(args=["-s", "replay"]), records=RECORDS, stats=stats
+        )
+    )
+
+    assert [record["status"] for record in result] == [  # nosec: B101
+        "ok",
+        "sleeping",
+        "warning",
+        "unknown",
+    ]
+    assert result[0] == {  # nosec: B101
+        "type": "output",
+        "time": 10.0,
+        "host": "nas1",
+        "status": "ok",
+        "output": "OK: device /dev/sda is functional and stable 27C\n",
+    }
+    assert stats["records"] == 4  # nosec: B101
+    assert stats["ok"] == 1  # nosec: B101
+    assert stats["busy"] > 0  # nosec: B101
+
+
+def test_replay__real_time(mocker):
+    """
+    Test "replay" function must keep recorded intervals between responses.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    """
+
+    sleep = mocker.patch("time.sleep")
+    mocker.patch("time.time", return_value=100.0)
+
+    list(
+        replay(
+            checker=CheckHDDTemp(args=["-s", "replay"]),
+            records=RECORDS,
+            stats=Counter(),
+            speed=2.0,
+        )
+    )
+
+    assert [call[0][0] for call in sleep.call_args_list] == [  # nosec: B101
+        0.5,
+        1.0,
+        1.5,
+    ]
+
+
+def test_diff():
+    """Test "diff" function must show outputs differences with previous replay."""
+
+    record = {"time": 10.0, "host": "nas1", "output": "WARNING: hot\n"}
+    baseline = {(10.0, "nas1"): dict(record, output="OK: stable\n")}
+
+    assert diff(baseline=baseline, record=record) == "".join(  # nosec: B101
+        [
+            "--- baseline/nas1@10.0\n",
+            "+++ replay/nas1@10.0\n",
+            "@@ -1 +1 @@\n",
+            "-OK: stable\n",
+            "+WARNING: hot\n",
+        ]
+    )
+    assert diff(baseline={}, record=record) == ""  # nosec: B101
+    assert diff(baseline={(10.0, "nas1"): record}, record=record) == ""  # nosec: B101
+
+
+def test_main(mocker, tmpdir, capsys):
+    """
+    Test "main" function must print outputs, differences and replay statistics.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    :param tmpdir: temporary directory
+    :type tmpdir: py.path.local
+    :param capsys: standard streams capture
+    :type capsys: CaptureFixture[str]
+    """
+
+    capture = Capture(path=str(tmpdir.join("capture.gz")))
+    for timestamp, host, response in RECORDS:
+        capture.add(host=host, response=response, timestamp=timestamp)
+    capture.save()
+    baseline = tmpdir.join("baseline.ndjson")
+
+    mocker.patch(
+        "sys.argv", ["check_hddtemp_replay.py", "--capture", capture.path, "-w", "50"]
+    )
+    main()
+    baseline.write(capsys.readouterr().out)
+    mocker.patch(
+        "sys.argv",
+        [
+            "check_hddtemp_replay.py",
+            "--capture",
+            capture.path,
+            "--baseline",
+            str(baseline),
+        ],
+    )
+    main()
+    result = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    changes = [record for record in result if record["type"] == "diff"]
+
+    assert (
+        len([record for record in result if record["type"] == "output"]) == 4
+    )  # nosec: B101  # noqa: E501
+    assert [(record["host"], record["time"]) for record in changes] == [  # nosec: B101
+        ("nas1", 12.0)
+    ]
+    assert (
+        "+WARNING: device /dev/sda temperature 42C" in changes[0]["diff"]
+    )  # nosec: B101  # noqa: E501
+    assert result[-1]["type"] == "stats"  # nosec: B101
+    assert result[-1]["records"] == 4  # nosec: B101
+    assert result[-1]["changed"] == 1  # nosec: B101
+    assert result[-1]["statuses"] == {  # nosec: B101
+        "ok": 1,
+        "sleeping": 1,
+        "warning": 1,
+        "unknown": 1,
+    }
@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+
+# nagios-check-hddtemp
+# tests/check_hddtemp_replay_test.pyi
+
+from typing import List, Tuple  # pylint: disable=W0611
+
+from _pytest.capture import CaptureFixture
+from py.path import local
+
+try:
+    from pytest_mock.plugin import MockerFixture  # pylint: disable=W0611  # noqa: F401
+except ImportError:
+    from pytest_mock.plugin import (  # type: ignore  # pylint: disable=W0611  # noqa: F401,E501
+        MockFixture as MockerFixture,
+    )
+
+__all__: List[str] = ...
+
+RECORDS: List[Tuple[float, str, str]] = ...
+
+def test_load(tmpdir: local) -> None: ...
+def test_replay() -> None: ...
+def test_replay__real_time(mocker: MockerFixture) -> None: ...
+def test_diff() -> None: ...
+def test_main(
+    mocker: MockerFixture, tmpdir: local, capsys: CaptureFixture[str]
+) -> None: ...
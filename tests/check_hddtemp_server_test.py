@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+
+# nagios-check-hddtemp
+# tests/check_hddtemp_server_test.py
+
+
+from __future__ import unicode_literals
+
+import socket
+import telnetlib
+
+import pytest
+
+from check_hddtemp_server import FakeHDDTempServer
+
+
+__all__ = [
+    "test__get_device_suffix",
+    "test_response",
+    "test_response__separator",
+    "test_response__sleeping",
+    "test_response__unknown",
+    "test_response__fahrenheit",
+    "test_start_in_thread",
+    "test_start_in_thread__addresses",
+    "test_start_in_thread__partial_writes",
+    "test_start_in_thread__resets",
+]
+
+
+def test__get_device_suffix():
+    """Test "_get_device_suffix" method must return linux-like device suffix."""
+
+    assert [  # nosec: B101
+        FakeHDDTempServer._get_device_suffix(index=index) for index in [0, 25, 26, 27]
+    ] == ["a", "z", "aa", "ab"]
+
+
+def test_response():
+    """Test "response" method must return deterministic hddtemp response."""
+
+    server = FakeHDDTempServer(devices=3, temperature=(30, 30))
+    result = server.response(host=("127.0.0.1", 7634)).decode("utf8")
+
+    assert result.startswith("|/dev/sda|")  # nosec: B101
+    assert result.count("|30|C|") == 3  # nosec: B101
+    assert result == server.response(host=("127.0.0.1", 7634)).decode(  # nosec: B101
+        "utf8"
+    )
+
+
+def test_response__separator():
+    """Test "response" method must use custom separator."""
+
+    server = FakeHDDTempServer(devices=2, separator="#", temperature=(30, 30))
+    result = server.response(host=("127.0.0.1", 7634)).decode("utf8")
+
+    assert "|" not in result  # nosec: B101
+    assert result.startswith("#/dev/sda#")  # nosec: B101
+    assert result.count("#30#C#") == 2  # nosec: B101
+
+
+def test_response__sleeping():
+    """Test "response" method must return sleeping devices."""
+
+    server = FakeHDDTempServer(devices=2, sleeping=1.0)
+    result = server.response(host=("127.0.0.1", 7634)).decode("utf8")
+
+    assert result.count("|SLP|*|") == 2  # nosec: B101
+
+
+def test_response__unknown():
+    """Test "response" method must return devices with unknown temperature."""
+
+    server = FakeHDDTempServer(devices=2, unknown=1.0)
+    result = server.response(host=("127.0.0.1", 7634)).decode("utf8")
+
+    assert result.count("|UNK|*|") == 2  # nosec: B101
+
+
+def test_response__fahrenheit():
+    """Test "response" method must return temperature in Fahrenheit."""
+
+    server = FakeHDDTempServer(devices=1, fahrenheit=1.0, temperature=(30, 30))
+    result = server.response(host=("127.0.0.1", 7634)).decode("utf8")
+
+    assert result.endswith("|86|F|")  # nosec: B101
+
+
+def test_start_in_thread():
+    """Test "start_in_thread" method must start simulated hosts."""
+
+    server = FakeHDDTempServer(devices=2)
+    hosts = server.start_in_thread(count=3)
+
+    try:
+        responses = [telnetlib.Telnet(host, port, 1).read_all() for host, port in hosts]
+    finally:
+        server.stop_in_thread()
+
+    assert len(set(hosts)) == 3  # nosec: B101
+    assert responses == [server.response(host=host) for host in hosts]  # nosec: B101
+    assert server.stats["responses"] == 3  # nosec: B101
+
+
+def test_start_in_thread__addresses():
+    """Test "start_in_thread" method must start simulated host per address."""
+
+    server = FakeHDDTempServer(devices=1)
+    hosts = server.start_in_thread(addresses=["127.0.0.1", "localhost"], count=10)
+    server.stop_in_thread()
+
+    assert len(hosts) == 2  # nosec: B101
+
+
+def test_start_in_thread__partial_writes():
+    """Test "start_in_thread" method must write response by chunks."""
+
+    server = FakeHDDTempServer(devices=2, chunk=3)
+    hosts = server.start_in_thread()
+
+    try:
+        result = telnetlib.Telnet(hosts[0][0], hosts[0][1], 1).read_all()
+    finally:
+        server.stop_in_thread()
+
+    assert result == server.response(host=hosts[0])  # nosec: B101
+    assert server.stats["chunks"] == -(-len(result) // 3)  # nosec: B101
+
+
+def test_start_in_thread__resets():
+    """Test "start_in_thread" method must reset connections."""
+
+    server = FakeHDDTempServer(devices=2, resets=1.0)
+    hosts = server.start_in_thread()
+
+    try:
+        with pytest.raises((EOFError, socket.error)):
+            result = telnetlib.Telnet(hosts[0][0], hosts[0][1], 1).read_all()
+            if not result:
+                raise EOFError()
+    finally:
+        server.stop_in_thread()
+
+    assert server.stats["resets"] == 1  # nosec: B101
@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+
+# nagios-check-hddtemp
+# tests/check_hddtemp_server_test.pyi
+
+from typing import List  # pylint: disable=W0611
+
+__all__: List[str] = ...
+
+def test__get_device_suffix() -> None: ...
+def test_response() -> None: ...
+def test_response__separator() -> None: ...
+def test_response__sleeping() -> None: ...
+def test_response__unknown() -> None: ...
+def test_response__fahrenheit() -> None: ...
+def test_start_in_thread() -> None: ...
+def test_start_in_thread__addresses() -> None: ...
+def test_start_in_thread__partial_writes() -> None: ...
+def test_start_in_thread__resets() -> None: ...
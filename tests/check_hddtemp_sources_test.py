@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+
+# nagios-check-hddtemp
+# tests/check_hddtemp_sources_test.py
+
+
+from __future__ import unicode_literals
+
+import io
+import os
+import socket
+
+import pytest
+
+
+try:
+    from pytest_mock.plugin import MockerFixture  # pylint: disable=W0611  # noqa: F401
+except ImportError:
+    from pytest_mock.plugin import (  # type: ignore  # pylint: disable=W0611  # noqa: F401,E501
+        MockFixture as MockerFixture,
+    )
+
+from check_hddtemp import CheckHDDTemp, HDDTempSource
+from check_hddtemp_sources import FileSource, CacheSource, SysfsSource, FanOutSource
+
+
+__all__ = [
+    "test_file_source",
+    "test_file_source__check",
+    "test_sysfs_source",
+    "test_cache_source",
+    "test_cache_source__expired",
+    "test_fan_out_source",
+    "test_fan_out_source__check",
+    "test_fan_out_source__empty_servers_list",
+    "test_fan_out_source__check__empty_servers_list",
+]
+
+
+def write(path, value):
+    """
+    Write file creating its directories.
+
+    :param path: file path
+    :type path: str
+    :param value: file content
+    :type value: str
+    """
+
+    if not os.path.exists(os.path.dirname(path)):
+        os.makedirs(os.path.dirname(path))
+
+    with io.open(path, "w", encoding="utf8") as attribute:
+        attribute.write(value)
+
+
+def test_file_source(tmpdir):
+    """
+    Test "FileSource.fetch" method must return saved hddtemp server response.
+
+    :param tmpdir: temporary directory
+    :type tmpdir: py.path.local
+    """
+
+    path = str(tmpdir.join("response"))
+    write(path=path, value="|/dev/sda|HARD DRIVE|27|C|")
+    checker = CheckHDDTemp(args=["-s", path, "--source", "file"])
+    result = checker.options.source.fetch(server=path, port=7634)
+
+    assert isinstance(checker.options.source, FileSource)  # nosec: B101
+    assert result == "|/dev/sda|HARD DRIVE|27|C|"  # nosec: B101
+
+
+def test_file_source__check(tmpdir):
+    """
+    Test "check" method must check saved hddtemp servers responses.
+
+    :param tmpdir: temporary directory
+    :type tmpdir: py.path.local
+    """
+
+    write(path=str(tmpdir.join("a")), value="|/dev/sda|HARD DRIVE|27|C|")
+    servers = ",".join([str(tmpdir.join("a")), str(tmpdir.join("b"))])
+    checker = CheckHDDTemp(args=["-s", servers, "--source", "file", "-f", "json"])
+    result, code = checker.check()
+
+    assert '"template":"ok"' in result  # nosec: B101
+    assert '"template":"error"' in result  # nosec: B101
+    assert code == 3  # nosec: B101
+
+
+def test_sysfs_source(mocker, tmpdir):
+    """
+    Test "SysfsSource.fetch" method must create response from hwmon drives.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    :param tmpdir: temporary directory
+    :type tmpdir: py.path.local
+    """
+
+    hwmon = tmpdir.join("class", "hwmon")
+    write(path=str(hwmon.join("hwmon0", "name")), value="drivetemp\n")
+    write(path=str(hwmon.join("hwmon0", "temp1_input")), value="27000\n")
+    write(path=str(hwmon.join("hwmon0", "device", "model")), value="HARD|DRIVE\n")
+    os.makedirs(str(hwmon.join("hwmon0", "device", "block", "sda")))
+    write(path=str(hwmon.join("hwmon1", "name")), value="coretemp\n")
+    write(path=str(hwmon.join("hwmon2", "name")), value="drivetemp\n")
+    write(path=str(hwmon.join("hwmon2", "device", "model")), value="SSD\n")
+    os.makedirs(str(hwmon.join("hwmon2", "device", "block", "sdb")))
+    mocker.patch.object(SysfsSource, "ROOT", str(tmpdir))
+    checker = CheckHDDTemp(args=["-s", "localhost", "--source", "sysfs"])
+    result = checker.options.source.fetch(server="localhost", port=7634)
+
+    assert result == "|/dev/sda|HARD DRIVE|27|C||/dev/sdb|SSD|UNK|C|"  # nosec: B101
+
+
+def test_cache_source(mocker, tmpdir):
+    """
+    Test "CacheSource.fetch" method must return cached response while it is fresh.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    :param tmpdir: temporary directory
+    :type tmpdir: py.path.local
+    """
+
+    fetch = mocker.patch.object(
+        HDDTempSource, "fetch", return_value="|/dev/sda|HARD DRIVE|27|C|"
+    )
+    checker = CheckHDDTemp(
+        args=["-s", "127.0.0.1", "--source", "cache", "--state-dir", str(tmpdir)]
+    )
+    first = checker.options.source.fetch(server="127.0.0.1", port=7634)
+    second = checker.options.source.fetch(server="127.0.0.1", port=7634)
+
+    assert isinstance(checker.options.source, CacheSource)  # nosec: B101
+    assert first == second == "|/dev/sda|HARD DRIVE|27|C|"  # nosec: B101
+    assert tmpdir.join("check_hddtemp-127.0.0.1_7634.cache").check()  # nosec: B101
+    fetch.assert_called_once_with(server="127.0.0.1", port=7634)
+
+
+def test_cache_source__expired(mocker, tmpdir):
+    """
+    Test "CacheSource.fetch" method must get fresh response if cached one expired.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    :param tmpdir: temporary directory
+    :type tmpdir: py.path.local
+    """
+
+    fetch = mocker.patch.object(
+        HDDTempSource,
+        "fetch",
+        side_effect=["|/dev/sda|HARD DRIVE|27|C|", "|/dev/sda|HARD DRIVE|28|C|"],
+    )
+    checker = CheckHDDTemp(
+        args=[
+            "-s",
+            "127.0.0.1",
+            "--source",
+            "cache",
+            "--state-dir",
+            str(tmpdir),
+            "--cache-ttl",
+            "0",
+        ]
+    )
+    checker.options.source.fetch(server="127.0.0.1", port=7634)
+    result = checker.options.source.fetch(server="127.0.0.1", port=7634)
+
+    assert result == "|/dev/sda|HARD DRIVE|28|C|"  # nosec: B101
+    assert fetch.call_count == 2  # nosec: B101
+
+
+def test_fan_out_source(mocker):
+    """
+    Test "FanOutSource.fetch" method must merge servers responses.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    """
+
+    responses = {
+        "a": "|/dev/sda|HARD DRIVE|27|C||/dev/sdb|HARD DRIVE|SLP|*|",
+        "b": "|/dev/sda|HARD DRIVE|42|C|",
+    }
+    mocker.patch.object(
+        HDDTempSource,
+        "fetch",
+        side_effect=lambda server, port: responses[server],
+    )
+    checker = CheckHDDTemp(args=["-s", "a+b", "--source", "fanout"])
+    expected = "|a:/dev/sda|HARD DRIVE|27|C||a:/dev/sdb|HARD DRIVE|SLP|*||b:/dev/sda|HARD DRIVE|42|C|"  # noqa: E501
+    result = checker.options.source.fetch(server="a+b", port=7634)
+
+    assert isinstance(checker.options.source, FanOutSource)  # nosec: B101
+    assert result == expected  # nosec: B101
+
+
+def test_fan_out_source__check(mocker):
+    """
+    Test "check" method must return error if any of fan-out servers failed.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    """
+
+    def fetch(server, port):
+        """
+        Return fake server response.
+
+        :param server: server name or address
+        :type server: str
+        :param port: port number
+        :type port: int
+        :return: fake server response
+        :rtype: str
+        :raises timeout: fake network error
+        """
+
+        if server == "b":
+            raise socket.timeout("timed out")
+
+        return "|/dev/sda|HARD DRIVE|27|C|"
+
+    mocker.patch.object(HDDTempSource, "fetch", side_effect=fetch)
+    checker = CheckHDDTemp(args=["-s", "a+b", "--source", "fanout", "-q"])
+
+    with pytest.raises(SystemExit):
+        checker.check()
+
+
+def test_fan_out_source__empty_servers_list():
+    """Test "FanOutSource.fetch" method must raise error for empty servers list."""
+
+    checker = CheckHDDTemp(args=["-s", "+", "--source", "fanout"])
+
+    with pytest.raises(ValueError, match="Fan-out servers list is empty"):
+        checker.options.source.fetch(server="+", port=7634)
+
+
+def test_fan_out_source__check__empty_servers_list(capsys):
+    """
+    Test "check" method must exit with unknown status for empty servers list.
+
+    :param capsys: standard streams capture
+    :type capsys: CaptureFixture[str]
+    """
+
+    checker = CheckHDDTemp(args=["-s", "+", "--source", "fanout"])
+
+    with pytest.raises(SystemExit) as exit_info:
+        checker.check()
+
+    expected = "ERROR: Server communication problem. Fan-out servers list is empty\n"
+
+    assert exit_info.value.code == 3  # nosec: B101
+    assert capsys.readouterr().out == expected  # nosec: B101
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+
+# nagios-check-hddtemp
+# tests/check_hddtemp_sources_test.pyi
+
+from typing import List  # pylint: disable=W0611
+
+from _pytest.capture import CaptureFixture
+from py.path import local
+
+try:
+    from pytest_mock.plugin import MockerFixture  # pylint: disable=W0611  # noqa: F401
+except ImportError:
+    from pytest_mock.plugin import (  # type: ignore  # pylint: disable=W0611  # noqa: F401,E501
+        MockFixture as MockerFixture,
+    )
+
+__all__: List[str] = ...
+
+def write(path: str, value: str) -> None: ...
+def test_file_source(tmpdir: local) -> None: ...
+def test_file_source__check(tmpdir: local) -> None: ...
+def test_sysfs_source(mocker: MockerFixture, tmpdir: local) -> None: ...
+def test_cache_source(mocker: MockerFixture, tmpdir: local) -> None: ...
+def test_cache_source__expired(mocker: MockerFixture, tmpdir: local) -> None: ...
+def test_fan_out_source(mocker: MockerFixture) -> None: ...
+def test_fan_out_source__check(mocker: MockerFixture) -> None: ...
+def test_fan_out_source__empty_servers_list() -> None: ...
+def test_fan_out_source__check__empty_servers_list(
+    capsys: CaptureFixture[str],
+) -> None: ...
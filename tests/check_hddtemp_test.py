@@ -6,7 +6,15 @@
 
 from __future__ import unicode_literals
 
+import os
+import re
+import sys
+import json
+import time
+import fcntl
 import socket
+import importlib
+import threading
 from io import StringIO
 from argparse import Namespace
 
@@ -21,7 +29,33 @@ except ImportError:
         MockFixture as MockerFixture,
     )
 
-from check_hddtemp import CheckHDDTemp, main
+from check_hddtemp_sinks import (
+    IcingaSink,
+    InfluxSink,
+    StatsDSink,
+    MetricsSink,
+    GraphiteSink,
+)
+from check_hddtemp_state import (
+    Capture,
+    Resolver,
+    Snapshot,
+    Inventory,
+    ResultBoard,
+    ResultCache,
+)
+from check_hddtemp import (
+    Source,
+    CheckHDDTemp,
+    HDDTempSource,
+    CircuitBreaker,
+    LatencyTracker,
+    CircuitOpenError,
+    main,
+    json_dumps,
+    get_sources,
+    load_source,
+)
 
 
 __all__ = [
@@ -76,6 +110,105 @@ __all__ = [
     "test__get_code__warning",
     "test__get_code__unknown_device",
     "test__get_code__unknown_device_temperature",
+    "test__get_options__format",
+    "test__get_output__json",
+    "test__get_output__ndjson",
+    "test_check__json",
+    "test_json_dumps",
+    "test__get_servers",
+    "test__get_options__servers_parsing_error",
+    "test__parse__parsing_error",
+    "test__check_host__network_error",
+    "test_check__aggregated",
+    "test_check__aggregated__worst",
+    "test_check__aggregated__ndjson",
+    "test_metrics_sink_from_url",
+    "test__get_options__sink_parsing_error",
+    "test_statsd_sink",
+    "test_statsd_sink__packets",
+    "test_graphite_sink",
+    "test_influx_sink",
+    "test__flush_sinks__error",
+    "test_check__sinks",
+    "test__iter_fetch",
+    "test__iter_records",
+    "test__iter_records__too_short_error",
+    "test__iter_records__too_long_error",
+    "test__get_options__bounded_without_worst",
+    "test_check__bounded",
+    "test_check__bounded__ndjson",
+    "test_check__bounded__memory",
+    "test_get_sources",
+    "test_load_source",
+    "test__get_options__list_sources",
+    "test__get_options__unknown_source",
+    "test__get_fingerprint",
+    "test_circuit_breaker__save",
+    "test_circuit_breaker",
+    "test_check__breaker",
+    "test_check__breaker__single_server",
+    "test_resolver__interleave",
+    "test_resolver__resolve",
+    "test_resolver__resolve__expired",
+    "test_resolver__resolve__error",
+    "test_hddtemp_source__race",
+    "test_check__resolve",
+    "test_check__timings",
+    "test__get_data__decoding_error",
+    "test__get_data__tolerant",
+    "test__parse__tolerant",
+    "test__parse__tolerant__no_valid_records",
+    "test__get_options__empty_separator",
+    "test_check__bounded__tolerant",
+    "test_check__tolerant",
+    "test_check__tolerant__json",
+    "test__parse__tolerant__truncated_name",
+    "test_result_cache",
+    "test_result_cache__save",
+    "test_check__result_cache",
+    "test_snapshot",
+    "test_snapshot__broken",
+    "test_check__snapshot",
+    "test_latency_tracker",
+    "test_latency_tracker__get_percentile",
+    "test__get_options__timeout",
+    "test_check__adaptive_timeout",
+    "test_inventory",
+    "test_inventory__in_place",
+    "test__get_options__model_threshold",
+    "test_check__inventory",
+    "test_check__aggregated__performance_format",
+    "test__get_performance_label",
+    "test__get_limited",
+    "test_check__performance_file",
+    "test__check_peers",
+    "test__get_options__peers",
+    "test_result_board",
+    "test_result_board__torn",
+    "test_check__result_board",
+    "test_icinga_sink",
+    "test_icinga_sink__retry",
+    "test_icinga_sink__connection_error",
+    "test__get_options__icinga_parsing_error",
+    "test_check__icinga",
+    "test_capture",
+    "test_check__record",
+    "test_circuit_breaker__save__concurrent",
+    "test_latency_tracker__save__concurrent",
+    "test_result_cache__save__concurrent",
+    "test_resolver__resolve__concurrent",
+    "test_inventory__concurrent",
+    "test_check__adaptive_timeout__single_server",
+    "test_check__snapshot__model_threshold",
+    "test__get_options__peers__numpy",
+    "test_check__result_cache__aggregated",
+    "test_check__result_cache__inventory",
+    "test_check__icinga__deadline",
+    "test_graphite_sink__deadline",
+    "test_check__aggregated__performance_summary__model_threshold",
+    "test_check__bounded__output_limit",
+    "test_circuit_breaker__probe",
+    "test_check__inventory__malformed",
 ]
 
 
@@ -1591,3 +1724,2817 @@ def test_main(mocker):
 
     assert out.getvalue() == expected  # nosec: B101
     assert excinfo.value.args == (0,)  # nosec: B101
+
+
+def test__get_options__format(mocker):
+    """
+    Test "_get_options" method must return text output format by default.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    """
+
+    mocker.patch("sys.argv", ["check_hddtemp.py", "-s", "127.0.0.1", "-p", "7634"])
+    checker = CheckHDDTemp()
+
+    assert checker.options.format == "text"  # nosec: B101
+
+
+def test__get_output__json(mocker):
+    """
+    Test "_get_output" method must return JSON document with devices states.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    """
+
+    data = {
+        "/dev/sda": {
+            "template": "ok",
+            "priority": 4,
+            "data": {
+                "device": "/dev/sda",
+                "temperature": 27,
+                "scale": "C",
+                "warning": 40,
+                "critical": 65,
+            },
+        },
+        "/dev/sdb": {
+            "template": "critical",
+            "priority": 1,
+            "data": {
+                "device": "/dev/sdb",
+                "temperature": 69,
+                "scale": "C",
+                "warning": 40,
+                "critical": 65,
+            },
+        },
+    }
+    mocker.patch(
+        "sys.argv",
+        ["check_hddtemp.py", "-s", "127.0.0.1", "-p", "7634", "-f", "json"],
+    )
+    checker = CheckHDDTemp()
+    status = checker._get_status(data=data)
+    result = json.loads(checker._get_output(data=data, status=status))
+
+    assert result["status"] == "critical"  # nosec: B101
+    assert result["code"] == 2  # nosec: B101
+    assert [device["device"] for device in result["devices"]] == [  # nosec: B101
+        "/dev/sdb",
+        "/dev/sda",
+    ]
+    assert result["devices"][0] == {  # nosec: B101
+        "template": "critical",
+        "status": "critical",
+        "priority": 1,
+        "device": "/dev/sdb",
+        "temperature": 69,
+        "scale": "C",
+        "warning": 40,
+        "critical": 65,
+    }
+
+
+def test__get_output__ndjson(mocker):
+    """
+    Test "_get_output" method must return one JSON document per line.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    """
+
+    data = {
+        "/dev/sda": {
+            "template": "ok",
+            "priority": 4,
+            "data": {
+                "device": "/dev/sda",
+                "temperature": 27,
+                "scale": "C",
+                "warning": 40,
+                "critical": 65,
+            },
+        },
+        "/dev/sdb": {
+            "template": "sleeping",
+            "priority": 5,
+            "data": {
+                "device": "/dev/sdb",
+                "temperature": "SLP",
+                "scale": "*",
+                "warning": 40,
+                "critical": 65,
+            },
+        },
+    }
+    mocker.patch(
+        "sys.argv",
+        ["check_hddtemp.py", "-s", "127.0.0.1", "-p", "7634", "-f", "ndjson"],
+    )
+    checker = CheckHDDTemp()
+    status = checker._get_status(data=data)
+    result = [
+        json.loads(line)
+        for line in checker._get_output(data=data, status=status).splitlines()
+    ]
+
+    assert [line["type"] for line in result] == [  # nosec: B101
+        "device",
+        "device",
+        "status",
+    ]
+    assert result[1]["temperature"] == "SLP"  # nosec: B101
+    assert result[2] == {"type": "status", "status": "ok", "code": 0}  # nosec: B101
+
+
+def test_check__json(mocker):
+    """
+    Test "check" method must return JSON document and exit code.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    """
+
+    mocker.patch(
+        "sys.argv",
+        ["check_hddtemp.py", "-s", "127.0.0.1", "-p", "7634", "--format", "json"],
+    )
+    mocker.patch("telnetlib.Telnet.open")
+    mocker.patch(
+        "telnetlib.Telnet.read_all",
+        lambda data: b"|/dev/sda|HARD DRIVE|27|C||/dev/sdb|HARD DRIVE|42|C|",
+    )
+    checker = CheckHDDTemp()
+    result, code = checker.check()
+
+    assert json.loads(result)["status"] == "warning"  # nosec: B101
+    assert code == 1  # nosec: B101
+
+
+def test_json_dumps(mocker):
+    """
+    Test "json_dumps" function must fall back to standard library encoder.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    """
+
+    mocker.patch("check_hddtemp.ORJSON", False)
+    mocker.patch("check_hddtemp.json", json)
+
+    assert json_dumps({"device": "/dev/sda"}) == '{"device":"/dev/sda"}'  # nosec: B101
+
+
+def test__get_servers():
+    """Test "_get_servers" method must split servers option to servers list."""
+
+    result = CheckHDDTemp._get_servers(
+        servers="127.0.0.1, nas.example.com:7635,[::1]:7636,,::1", port=7634
+    )
+
+    assert result == [  # nosec: B101
+        ("127.0.0.1", "127.0.0.1", 7634),
+        ("nas.example.com:7635", "nas.example.com", 7635),
+        ("[::1]:7636", "::1", 7636),
+        ("::1", "::1", 7634),
+    ]
+
+
+def test__get_options__servers_parsing_error(mocker):
+    """
+    Test "_get_options" method must exit with server option parsing error.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    """
+
+    out = StringIO()
+    mocker.patch("sys.argv", ["check_hddtemp.py", "-s", "127.0.0.1:port"])
+
+    with pytest.raises(SystemExit):
+        with contextlib2.redirect_stderr(out):
+            CheckHDDTemp()
+
+    assert (  # nosec: B101
+        "Server address option can't be parsed" in out.getvalue().strip()
+    )
+
+
+def test__parse__parsing_error(mocker):
+    """
+    Test "_parse" method must raise parsing error.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    """
+
+    mocker.patch("sys.argv", ["check_hddtemp.py", "-s", "127.0.0.1", "-p", "7634"])
+    checker = CheckHDDTemp()
+
+    with pytest.raises(ValueError, match="Server response for device"):
+        checker._parse(data="|/dev/sda|HARD DRIVE|C|")
+
+
+def test__check_host__network_error(mocker):
+    """
+    Test "_check_host" method must return server error state instead of exit.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    """
+
+    mocker.patch(
+        "sys.argv", ["check_hddtemp.py", "-s", "127.0.0.1,127.0.0.2", "-p", "7634"]
+    )
+    mocker.patch.object(CheckHDDTemp, "_fetch", side_effect=socket.error("refused"))
+    checker = CheckHDDTemp()
+    host, result = checker._check_host(server=("127.0.0.2", "127.0.0.2", 7634))
+
+    assert host == "127.0.0.2"  # nosec: B101
+    assert result[""]["template"] == "error"  # nosec: B101
+    assert result[""]["priority"] == 3  # nosec: B101
+    assert result[""]["data"]["error"] == "refused"  # nosec: B101
+    assert result[""]["data"]["host"] == "127.0.0.2"  # nosec: B101
+
+
+def test_check__aggregated(mocker):
+    """
+    Test "check" method must return aggregated servers statuses.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    """
+
+    expected = "CRITICAL: 1 CRITICAL, 1 WARNING, 1 UNKNOWN, 1 OK devices on 1 CRITICAL, 1 WARNING, 1 UNKNOWN hosts; a: device /dev/sdb temperature 69C exceeds critical temperature threshold 65C, b: device /dev/sda temperature 42C exceeds warning temperature threshold 40C, c: server c check failed: timed out, a: device /dev/sda is functional and stable 27C | a:/dev/sdb=69; b:/dev/sda=42; c:=None; a:/dev/sda=27\n"  # noqa: E501
+    responses = {
+        "a": "|/dev/sda|HARD DRIVE|27|C||/dev/sdb|HARD DRIVE|69|C|",
+        "b": "|/dev/sda|HARD DRIVE|42|C|",
+    }
+
+    def fetch(server, port):
+        """
+        Return fake server response.
+
+        :param server: server name or address
+        :type server: str
+        :param port: port number
+        :type port: int
+        :return: fake server response
+        :rtype: str
+        :raises timeout: fake network error
+        """
+
+        if server not in responses:
+            raise socket.timeout("timed out")
+
+        return responses[server]
+
+    mocker.patch("sys.argv", ["check_hddtemp.py", "-s", "a,b,c", "-P"])
+    mocker.patch.object(CheckHDDTemp, "_fetch", side_effect=fetch)
+    checker = CheckHDDTemp()
+    result, code = checker.check()
+
+    assert result == expected  # nosec: B101
+    assert code == 2  # nosec: B101
+
+
+def test_check__aggregated__worst(mocker):
+    """
+    Test "check" method must return only worst devices with statuses counters.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    """
+
+    expected = "WARNING: 2 WARNING, 1 OK, 1 SLEEPING devices on 2 WARNING hosts; b: device /dev/sda temperature 44C exceeds warning temperature threshold 40C\n"  # noqa: E501
+    responses = {
+        "a": "|/dev/sda|HARD DRIVE|27|C||/dev/sdb|HARD DRIVE|42|C|",
+        "b": "|/dev/sda|HARD DRIVE|44|C||/dev/sdb|HARD DRIVE|SLP|*|",
+    }
+    mocker.patch("sys.argv", ["check_hddtemp.py", "-s", "a,b", "-W", "1"])
+    mocker.patch.object(
+        CheckHDDTemp,
+        "_fetch",
+        side_effect=lambda server, port: responses[server],
+    )
+    checker = CheckHDDTemp()
+    result, code = checker.check()
+
+    assert result == expected  # nosec: B101
+    assert code == 1  # nosec: B101
+
+
+def test_check__aggregated__ndjson(mocker):
+    """
+    Test "check" method must stream one JSON document per device of all servers.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    """
+
+    responses = {
+        "a": "|/dev/sda|HARD DRIVE|27|C||/dev/sdb|HARD DRIVE|42|C|",
+        "b": "|/dev/sda|HARD DRIVE|SLP|*|",
+    }
+    mocker.patch("sys.argv", ["check_hddtemp.py", "-s", "a,b", "-f", "ndjson"])
+    mocker.patch.object(
+        CheckHDDTemp,
+        "_fetch",
+        side_effect=lambda server, port: responses[server],
+    )
+    checker = CheckHDDTemp()
+    result, code = checker.check()
+    lines = [json.loads(line) for line in result.splitlines()]
+
+    assert sorted(  # nosec: B101
+        (line["host"], line["device"]) for line in lines[:-1]
+    ) == [("a", "/dev/sda"), ("a", "/dev/sdb"), ("b", "/dev/sda")]
+    assert lines[-1] == {  # nosec: B101
+        "type": "status",
+        "status": "warning",
+        "code": 1,
+        "hosts": {"warning": 1, "sleeping": 1},
+        "devices": {"ok": 1, "warning": 1, "sleeping": 1},
+    }
+    assert code == 1  # nosec: B101
+
+
+def test_metrics_sink_from_url():
+    """Test "MetricsSink.from_url" method must create sink by URL scheme."""
+
+    statsd = MetricsSink.from_url(url="statsd://127.0.0.1", prefix="hddtemp")
+    graphite = MetricsSink.from_url(url="graphite://[::1]:2004/", prefix="hddtemp")
+    influx = MetricsSink.from_url(url="influx://localhost", prefix="hddtemp")
+
+    assert isinstance(statsd, StatsDSink)  # nosec: B101
+    assert (statsd.host, statsd.port) == ("127.0.0.1", 8125)  # nosec: B101
+    assert isinstance(graphite, GraphiteSink)  # nosec: B101
+    assert (graphite.host, graphite.port) == ("::1", 2004)  # nosec: B101
+    assert isinstance(influx, InfluxSink)  # nosec: B101
+    assert (influx.host, influx.port) == ("localhost", 8094)  # nosec: B101
+
+    with pytest.raises(ValueError):
+        MetricsSink.from_url(url="carbon://localhost", prefix="hddtemp")
+
+
+def test__get_options__sink_parsing_error(mocker):
+    """
+    Test "_get_options" method must exit with sink option parsing error.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    """
+
+    out = StringIO()
+    mocker.patch("sys.argv", ["check_hddtemp.py", "-s", "127.0.0.1", "-m", "http://x"])
+
+    with pytest.raises(SystemExit):
+        with contextlib2.redirect_stderr(out):
+            CheckHDDTemp()
+
+    assert "Sink option can't be parsed" in out.getvalue().strip()  # nosec: B101
+
+
+def test_statsd_sink():
+    """Test "StatsDSink" must send coalesced gauges over UDP."""
+
+    listener = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    listener.bind(("127.0.0.1", 0))
+    listener.settimeout(1)
+    sink = StatsDSink(host="127.0.0.1", port=listener.getsockname()[1], prefix="hdd")
+    sink.add(host="nas.lan", device="/dev/sda", temperature=27, scale="C", timestamp=0)
+    sink.add(host="nas.lan", device="/dev/sdb", temperature=42, scale="C", timestamp=0)
+    sink.flush(timeout=1)
+    result = listener.recv(65535)
+    listener.close()
+
+    expected = b"hdd.nas_lan.dev_sda:27|g\nhdd.nas_lan.dev_sdb:42|g\n"
+
+    assert result == expected  # nosec: B101
+    assert sink.lines == []  # nosec: B101
+
+
+def test_statsd_sink__packets():
+    """Test "StatsDSink" must split metrics into packets fitting into MTU."""
+
+    sink = StatsDSink(host="127.0.0.1", port=8125, prefix="hddtemp")
+    for index in range(200):
+        sink.add(
+            host="nas",
+            device="/dev/sd{index}".format(index=index),
+            temperature=27,
+            scale="C",
+            timestamp=1,
+        )
+    packets = sink._get_packets()
+
+    assert len(packets) == 4  # nosec: B101
+    assert all(len(packet) <= sink.PACKET_SIZE for packet in packets)  # nosec: B101
+    assert b"".join(packets).count(b"\n") == 200  # nosec: B101
+
+
+def test_graphite_sink():
+    """Test "GraphiteSink" must send plaintext protocol lines over TCP."""
+
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(1)
+    sink = GraphiteSink(host="127.0.0.1", port=listener.getsockname()[1], prefix="hdd")
+    sink.add(host="nas", device="/dev/sda", temperature=27, scale="C", timestamp=10)
+    sink.flush(timeout=1)
+    connection, _ = listener.accept()
+    result = connection.recv(65535)
+    connection.close()
+    listener.close()
+
+    assert result == b"hdd.nas.dev_sda 27 10\n"  # nosec: B101
+
+
+def test_graphite_sink__deadline(mocker):
+    """
+    Test "GraphiteSink" must resolve server once and share time budget between steps.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    """
+
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(2)
+    getaddrinfo = mocker.spy(socket, "getaddrinfo")
+    get_timeout = mocker.spy(MetricsSink, "_get_timeout")
+    sink = GraphiteSink(host="127.0.0.1", port=listener.getsockname()[1], prefix="hdd")
+    for _ in range(2):
+        sink.add(host="nas", device="/dev/sda", temperature=27, scale="C", timestamp=0)
+        sink.flush(timeout=1)
+    timeout = get_timeout.spy_return
+    mocker.patch("check_hddtemp_sinks.time").time.side_effect = [0.0, 2.0]
+    sink.add(host="nas", device="/dev/sda", temperature=27, scale="C", timestamp=0)
+
+    with pytest.raises(socket.timeout):
+        sink.flush(timeout=1)
+
+    listener.close()
+
+    assert getaddrinfo.call_count == 1  # nosec: B101
+    assert get_timeout.call_count == 5  # nosec: B101
+    assert 0 < timeout < 1  # nosec: B101
+    assert sink.address is None  # nosec: B101
+
+
+def test_influx_sink():
+    """Test "InfluxSink" must create line protocol lines with escaped tags."""
+
+    sink = InfluxSink(host="127.0.0.1", port=8094, prefix="hddtemp")
+    sink.add(host="nas 1", device="/dev/sda", temperature=27, scale="C", timestamp=10)
+
+    assert sink.lines == [  # nosec: B101
+        "hddtemp,host=nas\\ 1,device=/dev/sda,scale=C temperature=27i 10000000000"
+    ]
+
+
+def test__flush_sinks__error(mocker):
+    """
+    Test "_flush_sinks" method must ignore sinks errors.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    """
+
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    port = listener.getsockname()[1]
+    listener.close()
+    mocker.patch(
+        "sys.argv",
+        [
+            "check_hddtemp.py",
+            "-s",
+            "127.0.0.1",
+            "-m",
+            "graphite://127.0.0.1:{port}".format(port=port),
+        ],
+    )
+    checker = CheckHDDTemp()
+    checker.options.sinks[0].add(
+        host="nas", device="/dev/sda", temperature=27, scale="C", timestamp=10
+    )
+    checker._flush_sinks()
+
+    assert checker.options.sinks[0].lines == []  # nosec: B101
+
+
+def test_check__sinks(mocker):
+    """
+    Test "check" method must push numeric devices temperatures to sinks.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    """
+
+    listener = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    listener.bind(("127.0.0.1", 0))
+    listener.settimeout(1)
+    mocker.patch(
+        "sys.argv",
+        [
+            "check_hddtemp.py",
+            "-s",
+            "127.0.0.1",
+            "-m",
+            "statsd://127.0.0.1:{port}".format(port=listener.getsockname()[1]),
+        ],
+    )
+    mocker.patch("telnetlib.Telnet.open")
+    mocker.patch(
+        "telnetlib.Telnet.read_all",
+        lambda data: b"|/dev/sda|HARD DRIVE|27|C||/dev/sdb|HARD DRIVE|SLP|*|",
+    )
+    checker = CheckHDDTemp()
+    _, code = checker.check()
+    result = listener.recv(65535)
+    listener.close()
+
+    assert result == b"hddtemp.127_0_0_1.dev_sda:27|g\n"  # nosec: B101
+    assert code == 0  # nosec: B101
+
+
+def test__iter_fetch(mocker):
+    """
+    Test "_iter_fetch" method must yield decoded server response chunks.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    """
+
+    mocker.patch("sys.argv", ["check_hddtemp.py", "-s", "127.0.0.1"])
+    connection = mocker.MagicMock()
+    connection.recv.side_effect = [b"|/dev/sda|\xc3", b"\xa9|27|C|", b""]
+    create_connection = mocker.patch(
+        "socket.create_connection", return_value=connection
+    )
+    checker = CheckHDDTemp()
+    result = "".join(checker._iter_fetch(server="127.0.0.1", port=7634))
+
+    assert result == "|/dev/sda|\xe9|27|C|"  # nosec: B101
+    create_connection.assert_called_once_with(("127.0.0.1", 7634), 1)
+    connection.close.assert_called_once_with()
+
+
+def test__iter_records(mocker):
+    """
+    Test "_iter_records" method must split response chunks to devices records.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    """
+
+    mocker.patch("sys.argv", ["check_hddtemp.py", "-s", "127.0.0.1"])
+    checker = CheckHDDTemp()
+    chunks = ["|/dev/sda|HARD DRIVE|27|C|", "|/dev/s", "db|HARD DRIVE|SLP|*|"]
+    result = list(checker._iter_records(chunks=chunks))
+
+    assert result == [  # nosec: B101
+        "|/dev/sda|HARD DRIVE|27|C",
+        "/dev/sdb|HARD DRIVE|SLP|*|",
+    ]
+
+
+def test__iter_records__too_short_error(mocker):
+    """
+    Test "_iter_records" method must raise error for empty response.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    """
+
+    mocker.patch("sys.argv", ["check_hddtemp.py", "-s", "127.0.0.1"])
+    checker = CheckHDDTemp()
+
+    with pytest.raises(ValueError, match="Server response too short"):
+        list(checker._iter_records(chunks=["", ""]))
+
+
+def test__iter_records__too_long_error(mocker):
+    """
+    Test "_iter_records" method must raise error for device record exceeding limit.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    """
+
+    mocker.patch("sys.argv", ["check_hddtemp.py", "-s", "127.0.0.1"])
+    checker = CheckHDDTemp()
+
+    with pytest.raises(ValueError, match="Server response device record too long"):
+        list(checker._iter_records(chunks=["|/dev/sda|", "X" * 4096]))
+
+
+def test__get_options__bounded_without_worst(mocker):
+    """
+    Test "_get_options" method must exit with memory-bounded mode options error.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    """
+
+    out = StringIO()
+    mocker.patch("sys.argv", ["check_hddtemp.py", "-s", "127.0.0.1", "-B"])
+
+    with pytest.raises(SystemExit):
+        with contextlib2.redirect_stderr(out):
+            CheckHDDTemp()
+
+    assert (  # nosec: B101
+        "Memory-bounded mode requires worst devices count option value"
+        in out.getvalue().strip()
+    )
+
+
+def test_check__bounded(mocker):
+    """
+    Test "check" method must return aggregated servers statuses in memory-bounded mode.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    """
+
+    expected = "CRITICAL: 2 CRITICAL, 1 WARNING, 1 UNKNOWN, 1 OK devices on 2 CRITICAL, 1 UNKNOWN hosts; a: device /dev/sdb temperature 69C exceeds critical temperature threshold 65C, b: device /dev/sda temperature 66C exceeds critical temperature threshold 65C\n| a:/dev/sda=27; a:/dev/sdb=69; b:/dev/sda=66; b:/dev/sdb=42; c:=None\n"  # noqa: E501
+    responses = {
+        "a": ["|/dev/sda|HARD DRIVE|27|C||/dev/", "sdb|HARD DRIVE|69|C|"],
+        "b": ["|/dev/sda|HARD DRIVE|66|C||/dev/sdb|HARD DRIVE|42|C|"],
+    }
+
+    def fetch(server, port):
+        """
+        Return fake server response chunks.
+
+        :param server: server name or address
+        :type server: str
+        :param port: port number
+        :type port: int
+        :return: fake server response chunks
+        :rtype: List[str]
+        :raises timeout: fake network error
+        """
+
+        if server not in responses:
+            raise socket.timeout("timed out")
+
+        return responses[server]
+
+    mocker.patch(
+        "sys.argv",
+        ["check_hddtemp.py", "-s", "a,b,c", "-B", "-W", "2", "-P", "-j", "1"],
+    )
+    mocker.patch.object(CheckHDDTemp, "_iter_fetch", side_effect=fetch)
+    checker = CheckHDDTemp()
+    result, code = checker.check()
+
+    assert result == expected  # nosec: B101
+    assert code == 2  # nosec: B101
+
+
+def test_check__bounded__ndjson(mocker):
+    """
+    Test "check" method must stream devices states of requested devices and errors.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    """
+
+    mocker.patch(
+        "sys.argv",
+        [
+            "check_hddtemp.py",
+            "-s",
+            "a",
+            "-B",
+            "-f",
+            "ndjson",
+            "-d",
+            "/dev/sdb,/dev/sdc",
+        ],
+    )
+    mocker.patch.object(
+        CheckHDDTemp,
+        "_iter_fetch",
+        return_value=["|/dev/sda|HARD DRIVE|27|C||/dev/sdb|HARD DRIVE|42|C||broken"],
+    )
+    checker = CheckHDDTemp()
+    result, code = checker.check()
+    lines = [json.loads(line) for line in result.splitlines()]
+
+    assert [  # nosec: B101
+        (line["template"], line["device"]) for line in lines[:-1]
+    ] == [("warning", "/dev/sdb"), ("error", "")]
+    assert lines[-1] == {  # nosec: B101
+        "type": "status",
+        "status": "warning",
+        "code": 1,
+        "hosts": {"warning": 1},
+        "devices": {"warning": 1, "unknown": 1},
+    }
+    assert code == 1  # nosec: B101
+
+
+def test_check__bounded__memory(mocker):
+    """
+    Test "check" method memory usage peak must not grow with devices count.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    """
+
+    tracemalloc = pytest.importorskip("tracemalloc")
+
+    def fetch(count):
+        """
+        Create fake server response chunks generator.
+
+        :param count: devices count
+        :type count: int
+        :return: fake server response chunks generator
+        :rtype: Callable[[str, int], Iterator[str]]
+        """
+
+        def chunks(server, port):
+            """
+            Yield fake server response chunks.
+
+            :param server: server name or address
+            :type server: str
+            :param port: port number
+            :type port: int
+            :return: fake server response chunks
+            :rtype: Iterator[str]
+            """
+
+            for offset in range(0, count, 100):
+                yield "".join(
+                    [
+                        "|/dev/sd{index}|HARD DRIVE|{temperature}|C|".format(
+                            index=index, temperature=20 + index % 50
+                        )
+                        for index in range(offset, offset + 100)
+                    ]
+                )
+
+        return chunks
+
+    def measure(count):
+        """
+        Measure check memory usage peak.
+
+        :param count: devices count per server
+        :type count: int
+        :return: memory usage peak in bytes
+        :rtype: int
+        """
+
+        mocker.patch.object(CheckHDDTemp, "_iter_fetch", side_effect=fetch(count))
+        checker = CheckHDDTemp(args=["-s", "a,b", "-B", "-W", "10", "-P", "-j", "1"])
+        tracemalloc.start()
+        try:
+            for _ in checker.stream():
+                continue
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        return peak
+
+    # spool is kept in memory until reaching its size limit
+    # and is read by chunks, so both sizes must exceed them
+    mocker.patch.object(CheckHDDTemp, "SPOOL_SIZE", 4096)
+    measure(count=1000)  # warm up
+    small = measure(count=5000)
+    large = measure(count=50000)
+
+    assert large < small * 1.1  # nosec: B101
+
+
+def test_get_sources(mocker):
+    """
+    Test "get_sources" function must return built-in and installed sources.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    """
+
+    entry_point = mocker.MagicMock(value="package.module:Source")
+    entry_point.name = "custom"
+    installed = mocker.MagicMock()
+    installed.select.return_value = [entry_point]
+    mocker.patch("importlib.metadata.entry_points", return_value=installed)
+    result = get_sources()
+
+    assert result["custom"] == "package.module:Source"  # nosec: B101
+    assert result["hddtemp"] == "check_hddtemp:HDDTempSource"  # nosec: B101
+    assert sorted(result.keys()) == [  # nosec: B101
+        "cache",
+        "custom",
+        "fanout",
+        "file",
+        "hddtemp",
+        "sysfs",
+    ]
+    installed.select.assert_called_once_with(group="check_hddtemp.sources")
+
+
+def test_load_source():
+    """Test "load_source" function must import source class by its name."""
+
+    assert load_source(name="hddtemp") is HDDTempSource  # nosec: B101
+    assert issubclass(load_source(name="file"), Source)  # nosec: B101
+
+    with pytest.raises(KeyError):
+        load_source(name="unknown")
+
+
+def test__get_options__list_sources(mocker):
+    """
+    Test "_get_options" method must list sources without importing them.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    """
+
+    out = StringIO()
+    mocker.patch("sys.argv", ["check_hddtemp.py", "--list-sources"])
+    mocker.patch.dict("sys.modules")
+    sys.modules.pop("check_hddtemp_sources", None)
+
+    with pytest.raises(SystemExit):
+        with contextlib2.redirect_stderr(out):
+            CheckHDDTemp()
+
+    assert "fanout\nfile\nhddtemp\nsysfs\n" in out.getvalue()  # nosec: B101
+    assert "check_hddtemp_sources" not in sys.modules  # nosec: B101
+
+
+def test__get_options__unknown_source(mocker):
+    """
+    Test "_get_options" method must exit with unknown source error.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    """
+
+    out = StringIO()
+    mocker.patch(
+        "sys.argv", ["check_hddtemp.py", "-s", "127.0.0.1", "--source", "unknown"]
+    )
+
+    with pytest.raises(SystemExit):
+        with contextlib2.redirect_stderr(out):
+            CheckHDDTemp()
+
+    assert "Source can't be loaded" in out.getvalue().strip()  # nosec: B101
+
+
+def test__get_fingerprint():
+    """Test "_get_fingerprint" method must distinguish changed responses."""
+
+    first = CheckHDDTemp._get_fingerprint(response="|/dev/sda|HARD DRIVE|27|C|")
+    second = CheckHDDTemp._get_fingerprint(response="|/dev/sda|HARD DRIVE|28|C|")
+
+    assert first == CheckHDDTemp._get_fingerprint(  # nosec: B101
+        response="|/dev/sda|HARD DRIVE|27|C|"
+    )
+    assert first != second  # nosec: B101
+    assert first >> 32 == 26  # nosec: B101
+
+
+def test_circuit_breaker(mocker, tmpdir):
+    """
+    Test "CircuitBreaker" must open circuit after failures and probe it later.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    :param tmpdir: temporary directory
+    :type tmpdir: py.path.local
+    """
+
+    mocker.patch("time.time", return_value=1000.0)
+    breaker = CircuitBreaker(
+        path=str(tmpdir.join("breaker.json")), threshold=2, cooldown=60.0
+    )
+    breaker.failure(server="nas", port=7634)
+    breaker.allow(server="nas", port=7634)
+    breaker.failure(server="nas", port=7634)
+
+    with pytest.raises(CircuitOpenError, match="open after 2 failures"):
+        breaker.allow(server="nas", port=7634)
+
+    mocker.patch("time.time", return_value=1061.0)
+    breaker.allow(server="nas", port=7634)  # half-open probe
+    breaker.failure(server="nas", port=7634)
+
+    with pytest.raises(CircuitOpenError, match="open after 3 failures"):
+        breaker.allow(server="nas", port=7634)
+
+    breaker.success(server="nas", port=7634)
+    breaker.allow(server="nas", port=7634)
+
+    assert breaker.state == {}  # nosec: B101
+
+
+def test_circuit_breaker__probe(mocker, tmpdir):
+    """
+    Test "CircuitBreaker" must allow single half-open probe for concurrent checks.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    :param tmpdir: temporary directory
+    :type tmpdir: py.path.local
+    """
+
+    path = str(tmpdir.join("breaker.json"))
+    mocker.patch("time.time", return_value=1000.0)
+    breaker = CircuitBreaker(path=path, threshold=1, cooldown=60.0)
+    breaker.failure(server="nas", port=7634)
+    breaker.save()
+    concurrent = CircuitBreaker(path=path, threshold=1, cooldown=60.0)
+    concurrent.allow(server="backup", port=7634)  # loads state before probe
+    mocker.patch("time.time", return_value=1061.0)
+    breaker.allow(server="nas", port=7634)  # half-open probe
+
+    with pytest.raises(CircuitOpenError, match="probed already"):
+        breaker.allow(server="nas", port=7634)
+    with pytest.raises(CircuitOpenError, match="probed already"):
+        concurrent.allow(server="nas", port=7634)
+
+    breaker.failure(server="nas", port=7634)
+    breaker.save()
+    mocker.patch("time.time", return_value=1122.0)
+    CircuitBreaker(path=path, threshold=1, cooldown=60.0).allow(
+        server="nas", port=7634
+    )  # probe after failed one
+
+    mocker.patch("time.time", return_value=1183.0)
+    concurrent.allow(server="nas", port=7634)  # unfinished probe expired
+
+
+def test_circuit_breaker__save(tmpdir):
+    """
+    Test "CircuitBreaker.save" method must persist servers state.
+
+    :param tmpdir: temporary directory
+    :type tmpdir: py.path.local
+    """
+
+    path = str(tmpdir.join("breaker.json"))
+    breaker = CircuitBreaker(path=path, threshold=1, cooldown=60.0)
+    breaker.failure(server="nas", port=7634)
+    breaker.save()
+    loaded = CircuitBreaker(path=path, threshold=1, cooldown=60.0)
+
+    with pytest.raises(CircuitOpenError):
+        loaded.allow(server="nas", port=7634)
+
+    tmpdir.join("breaker.json").write("broken")
+    broken = CircuitBreaker(path=path, threshold=1, cooldown=60.0)
+    broken.allow(server="nas", port=7634)
+
+    assert broken.state == {}  # nosec: B101
+
+
+def test_circuit_breaker__save__concurrent(tmpdir):
+    """
+    Test "CircuitBreaker.save" method must keep state saved by concurrent checks.
+
+    :param tmpdir: temporary directory
+    :type tmpdir: py.path.local
+    """
+
+    path = str(tmpdir.join("breaker.json"))
+    first = CircuitBreaker(path=path, threshold=1, cooldown=60.0)
+    second = CircuitBreaker(path=path, threshold=1, cooldown=60.0)
+    first.failure(server="nas", port=7634)
+    second.failure(server="backup", port=7634)
+    first.save()
+    second.save()
+
+    assert sorted(json.loads(tmpdir.join("breaker.json").read())) == [  # nosec: B101
+        "backup:7634",
+        "nas:7634",
+    ]
+
+    first.success(server="nas", port=7634)
+    first.save()
+
+    assert list(json.loads(tmpdir.join("breaker.json").read())) == [  # nosec: B101
+        "backup:7634"
+    ]
+
+
+def test_check__breaker(mocker, tmpdir):
+    """
+    Test "check" method must not connect to servers with open circuit.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    :param tmpdir: temporary directory
+    :type tmpdir: py.path.local
+    """
+
+    def fetch(server, port):
+        """
+        Return fake server response.
+
+        :param server: server name or address
+        :type server: str
+        :param port: port number
+        :type port: int
+        :return: fake server response
+        :rtype: str
+        :raises timeout: fake network error
+        """
+
+        if server == "b":
+            raise socket.timeout("timed out")
+
+        return "|/dev/sda|HARD DRIVE|27|C|"
+
+    args = ["-s", "a,b", "--state-dir", str(tmpdir), "--breaker-threshold", "1"]
+    source = mocker.patch.object(HDDTempSource, "fetch", side_effect=fetch)
+    CheckHDDTemp(args=args).check()
+    source.reset_mock()
+    result, code = CheckHDDTemp(args=args).check()
+
+    assert "b: server b check failed: circuit breaker is open" in result  # nosec: B101
+    assert code == 3  # nosec: B101
+    source.assert_called_once_with(server="a", port=7634)
+
+
+def test_check__breaker__single_server(mocker, tmpdir):
+    """
+    Test "check" method must save circuit breaker state on server failure exit.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    :param tmpdir: temporary directory
+    :type tmpdir: py.path.local
+    """
+
+    args = ["-s", "nas", "--state-dir", str(tmpdir), "--breaker-threshold", "1"]
+    mocker.patch.object(HDDTempSource, "fetch", side_effect=socket.timeout("timed out"))
+    out = StringIO()
+
+    with pytest.raises(SystemExit):
+        with contextlib2.redirect_stdout(out):
+            CheckHDDTemp(args=args).check()
+    with pytest.raises(SystemExit):
+        with contextlib2.redirect_stdout(out):
+            CheckHDDTemp(args=args).check()
+
+    assert tmpdir.join("check_hddtemp-breaker.json").check()  # nosec: B101
+    assert "circuit breaker is open after 1 failures" in out.getvalue()  # nosec: B101
+
+
+def test_resolver__interleave():
+    """
+    Test "_interleave" method must alternate address families starting with first.
+    """
+
+    addresses = [
+        (socket.AF_INET6, ("::1", 7634, 0, 0)),
+        (socket.AF_INET6, ("::2", 7634, 0, 0)),
+        (socket.AF_INET6, ("::3", 7634, 0, 0)),
+        (socket.AF_INET, ("127.0.0.1", 7634)),
+    ]
+    expected = [
+        (socket.AF_INET6, ("::1", 7634, 0, 0)),
+        (socket.AF_INET, ("127.0.0.1", 7634)),
+        (socket.AF_INET6, ("::2", 7634, 0, 0)),
+        (socket.AF_INET6, ("::3", 7634, 0, 0)),
+    ]
+
+    assert Resolver._interleave(addresses=addresses) == expected  # nosec: B101
+    assert Resolver._interleave(addresses=[]) == []  # nosec: B101
+
+
+def test_resolver__resolve(mocker, tmpdir):
+    """
+    Test "resolve" method must share resolved addresses between invocations.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    :param tmpdir: temporary directory
+    :type tmpdir: py.path.local
+    """
+
+    path = str(tmpdir.join(Resolver.FILENAME))
+    getaddrinfo = mocker.patch(
+        "socket.getaddrinfo",
+        return_value=[
+            (socket.AF_INET, socket.SOCK_STREAM, 6, "", ("127.0.0.1", 7634)),
+            (socket.AF_INET, socket.SOCK_STREAM, 6, "", ("127.0.0.1", 7634)),
+            (socket.AF_INET6, socket.SOCK_STREAM, 6, "", ("::1", 7634, 0, 0)),
+        ],
+    )
+    expected = {
+        ("localhost", 7634): [
+            (socket.AF_INET, ("127.0.0.1", 7634)),
+            (socket.AF_INET6, ("::1", 7634, 0, 0)),
+        ]
+    }
+    servers = [("localhost", 7634), ("localhost", 7634)]
+    result = Resolver(path=path, ttl=60, jobs=4).resolve(servers=servers)
+    cached = Resolver(path=path, ttl=60, jobs=4).resolve(servers=servers)
+
+    assert result == expected  # nosec: B101
+    assert cached == expected  # nosec: B101
+    getaddrinfo.assert_called_once_with("localhost", 7634, 0, socket.SOCK_STREAM)
+
+
+def test_resolver__resolve__concurrent(mocker, tmpdir):
+    """
+    Test "resolve" method must keep addresses cached by concurrent invocations.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    :param tmpdir: temporary directory
+    :type tmpdir: py.path.local
+    """
+
+    path = str(tmpdir.join(Resolver.FILENAME))
+    mocker.patch(
+        "socket.getaddrinfo",
+        return_value=[
+            (socket.AF_INET, socket.SOCK_STREAM, 6, "", ("127.0.0.1", 7634)),
+        ],
+    )
+    first = Resolver(path=path, ttl=60, jobs=4)
+    second = Resolver(path=path, ttl=60, jobs=4)
+    mocker.patch.object(second, "_load", return_value={})  # loaded before first
+    first.resolve(servers=[("nas", 7634)])
+    second.resolve(servers=[("wan", 7634)])
+
+    assert sorted(json.loads(tmpdir.join(Resolver.FILENAME).read())) == [  # nosec: B101
+        "nas:7634",
+        "wan:7634",
+    ]
+
+
+def test_resolver__resolve__expired(mocker, tmpdir):
+    """
+    Test "resolve" method must resolve names again without cache.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    :param tmpdir: temporary directory
+    :type tmpdir: py.path.local
+    """
+
+    path = str(tmpdir.join(Resolver.FILENAME))
+    getaddrinfo = mocker.patch(
+        "socket.getaddrinfo",
+        return_value=[(socket.AF_INET, socket.SOCK_STREAM, 6, "", ("127.0.0.1", 7634))],
+    )
+    Resolver(path=path, ttl=0, jobs=4).resolve(servers=[("localhost", 7634)])
+    Resolver(path=path, ttl=0, jobs=4).resolve(servers=[("localhost", 7634)])
+
+    assert getaddrinfo.call_count == 2  # nosec: B101
+    assert not os.path.exists(path)  # nosec: B101
+
+
+def test_resolver__resolve__error(mocker, tmpdir):
+    """
+    Test "resolve" method must return resolving errors without caching them.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    :param tmpdir: temporary directory
+    :type tmpdir: py.path.local
+    """
+
+    path = str(tmpdir.join(Resolver.FILENAME))
+    mocker.patch("socket.getaddrinfo", side_effect=socket.gaierror("Name not known"))
+    result = Resolver(path=path, ttl=60, jobs=4).resolve(servers=[("nowhere", 7634)])
+
+    assert isinstance(result[("nowhere", 7634)], socket.error)  # nosec: B101
+    assert "name nowhere can't be resolved: Name not known" in str(  # nosec: B101
+        result[("nowhere", 7634)]
+    )
+    assert tmpdir.join(Resolver.FILENAME).read() == "{}"  # nosec: B101
+
+
+def test_hddtemp_source__race():
+    """
+    Test "_race" method must skip refused addresses and connect to listening one.
+    """
+
+    closed = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    closed.bind(("127.0.0.1", 0))
+    refused = closed.getsockname()
+    closed.close()
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(1)
+    source = HDDTempSource(options=CheckHDDTemp._get_options(args=["-s", "127.0.0.1"]))
+
+    try:
+        connection = source._race(
+            addresses=[
+                (socket.AF_INET, refused),
+                (socket.AF_INET, listener.getsockname()),
+            ],
+            timeout=1.0,
+        )
+        assert connection.getpeername() == listener.getsockname()  # nosec: B101
+        connection.close()
+        with pytest.raises(socket.error):
+            source._race(addresses=[(socket.AF_INET, refused)], timeout=1.0)
+    finally:
+        listener.close()
+
+
+def test_check__resolve(tmpdir):
+    """
+    Test "check" method must connect to resolved server addresses and show timings.
+
+    :param tmpdir: temporary directory
+    :type tmpdir: py.path.local
+    """
+
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(1)
+
+    def serve():
+        """
+        Send fake server response to single client.
+        """
+
+        connection, _ = listener.accept()
+        connection.sendall(b"|/dev/sda|HARD DRIVE|27|C|")
+        connection.close()
+
+    thread = threading.Thread(target=serve)
+    thread.start()
+    args = [
+        "-s",
+        "localhost:{port}".format(port=listener.getsockname()[1]),
+        "--resolve",
+        "--timings",
+        "--state-dir",
+        str(tmpdir),
+        "-f",
+        "json",
+    ]
+
+    try:
+        result, code = CheckHDDTemp(args=args).check()
+    finally:
+        thread.join()
+        listener.close()
+    document = json.loads(result)
+
+    assert code == 0  # nosec: B101
+    assert document["devices"][0]["temperature"] == 27  # nosec: B101
+    assert list(document["timings"].keys()) == ["resolve", "check"]  # nosec: B101
+    assert tmpdir.join(Resolver.FILENAME).check()  # nosec: B101
+
+
+def test_check__timings(mocker):
+    """
+    Test "check" method must show stages timings as performance data.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    """
+
+    mocker.patch.object(
+        HDDTempSource, "fetch", return_value="|/dev/sda|HARD DRIVE|27|C|"
+    )
+    result, code = CheckHDDTemp(args=["-s", "a,b", "--timings"]).check()
+    single, _ = CheckHDDTemp(args=["-s", "a", "-P", "--timings"]).check()
+
+    assert code == 0  # nosec: B101
+    assert re.search(r" \| check=\d+\.\d{6}s\n$", result)  # nosec: B101
+    assert re.search(r" \| /dev/sda=27; check=\d+\.\d{6}s\n$", single)  # nosec: B101
+
+
+def test__get_data__decoding_error(mocker):
+    """
+    Test "_get_data" method must exit with server response decoding error.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    """
+
+    out = StringIO()
+    mocker.patch("sys.argv", ["check_hddtemp.py", "-s", "127.0.0.1"])
+    mocker.patch("telnetlib.Telnet.open")
+    mocker.patch("telnetlib.Telnet.read_all", lambda data: b"|/dev/sda|\xff|27|C|")
+    checker = CheckHDDTemp()
+
+    with pytest.raises(SystemExit):
+        with contextlib2.redirect_stdout(out):
+            checker._get_data()
+
+    assert (  # nosec: B101
+        "ERROR: Server communication problem" in out.getvalue().strip()
+    )
+
+
+def test__get_data__tolerant(mocker):
+    """
+    Test "_get_data" method must replace undecodable bytes in tolerant mode.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    """
+
+    mocker.patch("sys.argv", ["check_hddtemp.py", "-s", "127.0.0.1", "-T"])
+    mocker.patch("telnetlib.Telnet.open")
+    mocker.patch("telnetlib.Telnet.read_all", lambda data: b"|/dev/sda|\xff|27|C|")
+    checker = CheckHDDTemp()
+    result = checker._get_data()
+
+    assert result == "|/dev/sda|�|27|C|"  # nosec: B101
+
+
+def test__parse__tolerant(mocker):
+    """
+    Test "_parse" method must report malformed devices records in tolerant mode.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    """
+
+    expected = {
+        "/dev/sda": {"model": "HARD DRIVE", "temperature": "27", "scale": "C"},
+        "/dev/sdb": {"error": "5 data items instead of 4"},
+        "/dev/sdc": {"error": "1 data items instead of 4"},
+    }
+    mocker.patch("sys.argv", ["check_hddtemp.py", "-s", "127.0.0.1", "-T"])
+    checker = CheckHDDTemp()
+    result = checker._parse(
+        data="|/dev/sda|HARD DRIVE|27|C||/dev/sdb|HARD|DRIVE|27|C||/dev/sdc|"
+    )
+
+    assert result == expected  # nosec: B101
+
+
+def test__parse__tolerant__no_valid_records(mocker):
+    """
+    Test "_parse" method must raise error if all devices records are malformed.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    """
+
+    mocker.patch("sys.argv", ["check_hddtemp.py", "-s", "127.0.0.1", "-T"])
+    checker = CheckHDDTemp()
+
+    with pytest.raises(ValueError) as error:
+        checker._parse(data="|/dev/sda|HARD|DRIVE|27|C||/dev/sdb|")
+
+    assert "Server response has no valid devices records" in str(  # nosec: B101
+        error.value
+    )
+
+
+def test__get_options__empty_separator(mocker):
+    """
+    Test "_get_options" method must exit with empty separator error.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    """
+
+    out = StringIO()
+    mocker.patch("sys.argv", ["check_hddtemp.py", "-s", "127.0.0.1", "-S", ""])
+
+    with pytest.raises(SystemExit):
+        with contextlib2.redirect_stderr(out):
+            CheckHDDTemp()
+
+    assert (  # nosec: B101
+        "Separator option value must not be empty" in out.getvalue().strip()
+    )
+
+
+def test_check__bounded__tolerant(mocker):
+    """
+    Test "check" method must report malformed devices records in memory-bounded mode.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    """
+
+    expected = "UNKNOWN: 2 UNKNOWN, 2 OK devices on 2 UNKNOWN hosts; a: device /dev/sdb record can't be parsed: 5 data items instead of 4\n"  # noqa: E501
+    mocker.patch(
+        "sys.argv",
+        ["check_hddtemp.py", "-s", "a,b", "-B", "-W", "1", "-T"],
+    )
+    mocker.patch.object(
+        CheckHDDTemp,
+        "_iter_fetch",
+        return_value=["|/dev/sda|HARD DRIVE|27|C||/dev/sdb|HARD|DRIVE|2", "7|C|"],
+    )
+    checker = CheckHDDTemp()
+    result, code = checker.check()
+
+    assert result == expected  # nosec: B101
+    assert code == 3  # nosec: B101
+
+
+def test_check__tolerant(mocker):
+    """
+    Test "check" method must check valid devices records and report malformed ones.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    """
+
+    expected = "CRITICAL: device /dev/sdc temperature 69C exceeds critical temperature threshold 65C, device /dev/sdb record can't be parsed: 5 data items instead of 4, device /dev/sda is functional and stable 27C\n"  # noqa: E501
+    mocker.patch.object(
+        CheckHDDTemp,
+        "_get_data",
+        return_value="|/dev/sda|HARD DRIVE|27|C||/dev/sdb|HARD|DRIVE|27|C||/dev/sdc|HARD DRIVE|69|C|",  # noqa: E501
+    )
+    result, code = CheckHDDTemp(args=["-s", "127.0.0.1", "-T"]).check()
+
+    assert result == expected  # nosec: B101
+    assert code == 2  # nosec: B101
+
+
+def test_check__tolerant__json(mocker):
+    """
+    Test "check" method must return malformed devices records parsing errors as JSON.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    """
+
+    mocker.patch.object(
+        CheckHDDTemp,
+        "_get_data",
+        return_value="|/dev/sda|HARD DRIVE|27|C||/dev/sdb|HARD|DRIVE|27|C|",
+    )
+    result, code = CheckHDDTemp(args=["-s", "127.0.0.1", "-T", "-f", "json"]).check()
+    document = json.loads(result)
+
+    assert code == 3  # nosec: B101
+    assert document["devices"][0] == {  # nosec: B101
+        "template": "malformed",
+        "status": "unknown",
+        "priority": 3,
+        "device": "/dev/sdb",
+        "temperature": None,
+        "scale": None,
+        "warning": 40,
+        "critical": 65,
+        "error": "5 data items instead of 4",
+    }
+    assert document["devices"][1]["status"] == "ok"  # nosec: B101
+
+
+def test__parse__tolerant__truncated_name(mocker):
+    """
+    Test "_parse" method must not replace valid device by malformed one with same name.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    """
+
+    expected = {"/dev/sd1": {"model": "HARD DRIVE", "temperature": "27", "scale": "C"}}
+    mocker.patch("sys.argv", ["check_hddtemp.py", "-s", "127.0.0.1", "-T"])
+    checker = CheckHDDTemp()
+    result = checker._parse(data="|/dev/sd1|HARD DRIVE|27|C||/dev/sd1")
+
+    assert result == expected  # nosec: B101
+
+
+def test_result_cache(tmpdir):
+    """
+    Test "ResultCache" must evict least recently used entries.
+
+    :param tmpdir: temporary directory
+    :type tmpdir: py.path.local
+    """
+
+    cache = ResultCache(path=str(tmpdir.join("results.json")), size=2)
+    cache.put(key="a", states={"/dev/sda": {"priority": 4}})
+    cache.put(key="b", states={"/dev/sdb": {"priority": 4}})
+    cache.get(key="a")
+    cache.put(key="c", states={"/dev/sdc": {"priority": 4}})
+
+    assert cache.get(key="b") is None  # nosec: B101
+    assert list(cache.entries.keys()) == ["a", "c"]  # nosec: B101
+
+
+def test_result_cache__save(tmpdir):
+    """
+    Test "ResultCache.save" method must persist entries with their order.
+
+    :param tmpdir: temporary directory
+    :type tmpdir: py.path.local
+    """
+
+    path = str(tmpdir.join("results.json"))
+    cache = ResultCache(path=path, size=2)
+    cache.put(key="b", states={"/dev/sdb": {"priority": 4}})
+    cache.put(key="a", states={"/dev/sda": {"priority": 4}})
+    cache.save()
+    loaded = ResultCache(path=path, size=2)
+
+    assert loaded.get(key="b") == {"/dev/sdb": {"priority": 4}}  # nosec: B101
+    assert list(loaded.entries.keys()) == ["a", "b"]  # nosec: B101
+
+    tmpdir.join("results.json").write("broken")
+    broken = ResultCache(path=path, size=2)
+
+    assert broken.get(key="a") is None  # nosec: B101
+
+
+def test_result_cache__save__concurrent(tmpdir):
+    """
+    Test "ResultCache.save" method must keep entries saved by concurrent checks.
+
+    :param tmpdir: temporary directory
+    :type tmpdir: py.path.local
+    """
+
+    path = str(tmpdir.join("results.json"))
+    first = ResultCache(path=path, size=2)
+    second = ResultCache(path=path, size=2)
+    first.put(key="a", states={"/dev/sda": {"priority": 4}})
+    second.put(key="b", states={"/dev/sdb": {"priority": 4}})
+    second.put(key="c", states={"/dev/sdc": {"priority": 4}})
+    first.save()
+    second.save()
+    loaded = ResultCache(path=path, size=2)
+
+    assert list(loaded._get_entries().keys()) == ["b", "c"]  # nosec: B101
+
+    loaded.get(key="b")
+    first.put(key="d", states={"/dev/sdd": {"priority": 4}})
+    first.save()
+    loaded.save()
+
+    assert list(
+        ResultCache(path=path, size=2)._get_entries().keys()
+    ) == [  # nosec: B101
+        "d",
+        "b",
+    ]
+
+
+def test_check__result_cache(mocker, tmpdir):
+    """
+    Test "check" method must reuse cached devices states and rendered output
+    for other devices subset with same thresholds.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    :param tmpdir: temporary directory
+    :type tmpdir: py.path.local
+    """
+
+    args = ["-s", "127.0.0.1", "--state-dir", str(tmpdir), "--result-cache", "4"]
+    mocker.patch.object(
+        HDDTempSource,
+        "fetch",
+        return_value="|/dev/sda|HARD DRIVE|27|C||/dev/sdb|HARD DRIVE|50|C|",
+    )
+    mocker.patch("sys.argv", ["check_hddtemp.py"] + args + ["-d", "/dev/sda"])
+    out = StringIO()
+
+    with pytest.raises(SystemExit):
+        with contextlib2.redirect_stdout(out):
+            main()
+
+    state = mocker.spy(CheckHDDTemp, "_get_device_state")
+    mocker.patch(
+        "sys.argv", ["check_hddtemp.py"] + args + ["-d", "/dev/sdb,/dev/sdc", "-P"]
+    )
+    out = StringIO()
+
+    with pytest.raises(SystemExit):
+        with contextlib2.redirect_stdout(out):
+            main()
+
+    expected = "WARNING: device /dev/sdb temperature 50C exceeds warning temperature threshold 40C, device /dev/sdc temperature info not found in server response or can't be recognized by hddtemp | /dev/sdb=50; /dev/sdc=None"  # noqa: E501
+
+    assert out.getvalue().strip() == expected  # nosec: B101
+    assert state.call_count == 1  # nosec: B101
+    assert state.call_args[1] == {"device": "/dev/sdc", "info": None}  # nosec: B101
+    mocker.patch("sys.argv", ["check_hddtemp.py"] + args + ["-w", "20"])
+    out = StringIO()
+
+    with pytest.raises(SystemExit):
+        with contextlib2.redirect_stdout(out):
+            main()
+
+    assert "/dev/sda temperature 27C exceeds warning" in out.getvalue()  # nosec: B101
+    entries = json.loads(tmpdir.join(ResultCache.FILENAME).read())
+
+    assert len(entries) == 2  # nosec: B101
+
+
+def test_check__result_cache__aggregated(mocker, tmpdir):
+    """
+    Test "check" method must reuse cached devices states of aggregated servers
+    keeping their performance data qualified by server label.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    :param tmpdir: temporary directory
+    :type tmpdir: py.path.local
+    """
+
+    responses = {
+        "a": "|/dev/sda|HARD DRIVE|27|C|",
+        "b": "|/dev/sda|HARD DRIVE|27|C|",
+    }
+    mocker.patch.object(
+        HDDTempSource, "fetch", side_effect=lambda server, port: responses[server]
+    )
+    args = ["-s", "a,b", "-j", "1", "--state-dir", str(tmpdir), "--result-cache", "4"]
+    result, _ = CheckHDDTemp(args=args + ["-P"]).check()
+    parse = mocker.spy(CheckHDDTemp, "_parse")
+
+    assert CheckHDDTemp(args=args + ["-P"]).check() == (result, 0)  # nosec: B101
+    assert (
+        result.split("| ")[1].strip() == "a:/dev/sda=27; b:/dev/sda=27"
+    )  # nosec: B101  # noqa: E501
+    assert parse.call_count == 0  # nosec: B101
+
+
+def test_check__result_cache__inventory(mocker, tmpdir):
+    """
+    Test "check" method must parse server response once with inventory
+    and result cache.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    :param tmpdir: temporary directory
+    :type tmpdir: py.path.local
+    """
+
+    mocker.patch.object(
+        HDDTempSource, "fetch", return_value="|/dev/sda|HARD DRIVE|27|C|"
+    )
+    args = ["-s", "nas", "--state-dir", str(tmpdir), "--result-cache", "4"]
+    parse = mocker.spy(CheckHDDTemp, "_parse")
+
+    for _ in range(2):
+        assert CheckHDDTemp(args=args + ["--inventory"]).check() == (  # nosec: B101
+            "OK: device /dev/sda is functional and stable 27C\n",
+            0,
+        )
+
+    assert parse.call_count == 2  # nosec: B101
+
+
+def test_snapshot(tmpdir):
+    """
+    Test "Snapshot" must look up servers devices states written by "dump" method.
+
+    :param tmpdir: temporary directory
+    :type tmpdir: py.path.local
+    """
+
+    checker = CheckHDDTemp(args=["-s", "127.0.0.1", "-T"])
+    path = str(tmpdir.join("snapshot.bin"))
+    results = [
+        (
+            "nas{index}".format(index=index),
+            checker._check_response(
+                label="nas{index}".format(index=index),
+                response="|/dev/sda|HARD DRIVE|{index}|C||/dev/sdb|HARD DRIVE|SLP|*||/dev/sdc|X|".format(  # noqa: E501
+                    index=index
+                ),
+            ),
+        )
+        for index in range(10)
+    ]
+    results.append(
+        ("nas", checker._get_error_states(label="nas", error=OSError("refused")))
+    )
+    Snapshot.dump(path=path, results=results, timestamp=1000.0)
+    snapshot = Snapshot(path=path)
+
+    for label, states in results:
+
+        assert snapshot.get(label=label) == states  # nosec: B101
+
+    assert snapshot.get(label="nas10") is None  # nosec: B101
+    assert snapshot.timestamp == 1000.0  # nosec: B101
+
+    snapshot.close()
+
+
+def test_snapshot__broken(tmpdir):
+    """
+    Test "Snapshot.get" method must fail on missing or unsupported snapshot.
+
+    :param tmpdir: temporary directory
+    :type tmpdir: py.path.local
+    """
+
+    with pytest.raises(EnvironmentError):
+        Snapshot(path=str(tmpdir.join("missing.bin"))).get(label="nas")
+
+    tmpdir.join("snapshot.bin").write("HDTS" + "\0" * 60)
+
+    with pytest.raises(ValueError, match="unsupported snapshot format"):
+        Snapshot(path=str(tmpdir.join("snapshot.bin"))).get(label="nas")
+
+
+def test_check__snapshot(mocker, tmpdir):
+    """
+    Test "check" method must check devices found in fresh snapshot
+    with current thresholds instead of connecting to server.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    :param tmpdir: temporary directory
+    :type tmpdir: py.path.local
+    """
+
+    path = str(tmpdir.join("snapshot.bin"))
+    checker = CheckHDDTemp(args=["-s", "nas"])
+    Snapshot.dump(
+        path=path,
+        results=[
+            (
+                "nas",
+                checker._check_response(
+                    label="nas", response="|/dev/sda|HARD DRIVE|42|C|"
+                ),
+            )
+        ],
+        timestamp=1000.0,
+    )
+    source = mocker.patch.object(
+        HDDTempSource, "fetch", return_value="|/dev/sda|HARD DRIVE|27|C|"
+    )
+    mocker.patch("time.time", return_value=1100.0)
+    args = ["-s", "nas", "--snapshot", path, "-w", "45", "-d", "/dev/sda,/dev/sdb"]
+
+    assert CheckHDDTemp(args=args).check() == (  # nosec: B101
+        "UNKNOWN: device /dev/sdb temperature info not found in server response or can't be recognized by hddtemp, device /dev/sda is functional and stable 42C\n",  # noqa: E501
+        3,
+    )
+    assert source.call_count == 0  # nosec: B101
+
+    mocker.patch("time.time", return_value=1400.0)
+
+    assert CheckHDDTemp(args=args[:-2]).check() == (  # nosec: B101
+        "OK: device /dev/sda is functional and stable 27C\n",
+        0,
+    )
+    assert source.call_count == 1  # nosec: B101
+
+
+def test_check__snapshot__model_threshold(mocker, tmpdir):
+    """
+    Test "check" method must connect to server instead of using snapshot
+    when model thresholds are used.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    :param tmpdir: temporary directory
+    :type tmpdir: py.path.local
+    """
+
+    path = str(tmpdir.join("snapshot.bin"))
+    checker = CheckHDDTemp(args=["-s", "nas"])
+    Snapshot.dump(
+        path=path,
+        results=[
+            (
+                "nas",
+                checker._check_response(
+                    label="nas", response="|/dev/sda|HARD DRIVE|42|C|"
+                ),
+            )
+        ],
+    )
+    source = mocker.patch.object(
+        HDDTempSource, "fetch", return_value="|/dev/sda|HARD DRIVE|42|C|"
+    )
+    args = ["-s", "nas", "--snapshot", path, "--model-threshold", "HARD*:40:60"]
+
+    assert CheckHDDTemp(args=args).check() == (  # nosec: B101
+        "WARNING: device /dev/sda temperature 42C exceeds warning temperature threshold 40C\n",  # noqa: E501
+        1,
+    )
+    assert source.call_count == 1  # nosec: B101
+
+
+def test_latency_tracker(mocker, tmpdir):
+    """
+    Test "LatencyTracker" must choose server timeout from its latency history.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    :param tmpdir: temporary directory
+    :type tmpdir: py.path.local
+    """
+
+    path = str(tmpdir.join("latency.json"))
+    tracker = LatencyTracker(path=path, minimum=0.1, maximum=5.0)
+
+    assert (
+        tracker.get_timeout(server="nas", port=7634, default=1.0) == 1.0
+    )  # nosec: B101  # noqa: E501
+    assert (
+        tracker.get_timeout(server="nas", port=7634, default=9.0) == 5.0
+    )  # nosec: B101  # noqa: E501
+
+    for _ in range(10):
+        tracker.observe(server="nas", port=7634, latency=0.01)
+
+    assert (
+        tracker.get_timeout(server="nas", port=7634, default=1.0) == 0.1
+    )  # nosec: B101  # noqa: E501
+
+    for latency in [0.2] * 10 + [1.0]:
+        tracker.observe(server="nas", port=7634, latency=latency)
+
+    assert (
+        tracker.get_timeout(server="nas", port=7634, default=1.0) == 1.5
+    )  # nosec: B101  # noqa: E501
+
+    tracker.observe(server="wan", port=7634, latency=3.0, timeout=True)
+
+    assert (
+        tracker.get_timeout(server="wan", port=7634, default=1.0) == 5.0
+    )  # nosec: B101  # noqa: E501
+
+    tracker.save()
+    loaded = LatencyTracker(path=path, minimum=0.1, maximum=5.0)
+
+    assert (
+        loaded.get_timeout(server="nas", port=7634, default=1.0) == 1.5
+    )  # nosec: B101  # noqa: E501
+    assert len(loaded._get_state()["nas:7634"]["samples"]) == 21  # nosec: B101
+
+
+def test_latency_tracker__save__concurrent(tmpdir):
+    """
+    Test "LatencyTracker.save" method must keep state saved by concurrent checks.
+
+    :param tmpdir: temporary directory
+    :type tmpdir: py.path.local
+    """
+
+    path = str(tmpdir.join("latency.json"))
+    first = LatencyTracker(path=path, minimum=0.1, maximum=5.0)
+    second = LatencyTracker(path=path, minimum=0.1, maximum=5.0)
+    first.observe(server="nas", port=7634, latency=0.2)
+    second.observe(server="wan", port=7634, latency=2.0)
+    first.save()
+    second.save()
+    loaded = LatencyTracker(path=path, minimum=0.1, maximum=5.0)
+
+    assert (  # nosec: B101
+        round(loaded.get_timeout(server="nas", port=7634, default=1.0), 6) == 0.3
+    )
+    assert (  # nosec: B101
+        round(loaded.get_timeout(server="wan", port=7634, default=1.0), 6) == 3.0
+    )
+
+
+def test_latency_tracker__get_percentile():
+    """Test "get_percentile" method must return nearest rank percentile."""
+
+    samples = [float(value) for value in range(200)]
+
+    assert LatencyTracker.get_percentile(samples=[0.3]) == 0.3  # nosec: B101
+    assert LatencyTracker.get_percentile(samples=samples) == 197.0  # nosec: B101
+    assert (  # nosec: B101
+        LatencyTracker.get_percentile(samples=[1.0] * 99 + [50.0]) == 1.0
+    )
+
+
+def test__get_options__timeout(mocker):
+    """
+    Test "_get_options" method must accept fractional timeout and check bounds.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    """
+
+    options = CheckHDDTemp._get_options(args=["-s", "127.0.0.1", "-t", "0.25"])
+
+    assert options.timeout == 0.25  # nosec: B101
+
+    for args, message in [
+        (["-t", "0"], "Timeout options values must be positive"),
+        (
+            ["--min-timeout", "2", "--max-timeout", "1"],
+            "Minimum timeout option value must not be greater than maximum timeout option value",  # noqa: E501
+        ),
+    ]:
+        out = StringIO()
+        mocker.patch("sys.argv", ["check_hddtemp.py", "-s", "127.0.0.1"] + args)
+
+        with pytest.raises(SystemExit):
+            with contextlib2.redirect_stderr(out):
+                CheckHDDTemp()
+
+        assert message in out.getvalue().strip()  # nosec: B101
+
+
+def test_check__adaptive_timeout(mocker, tmpdir):
+    """
+    Test "check" method must connect to server with timeout from its history.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    :param tmpdir: temporary directory
+    :type tmpdir: py.path.local
+    """
+
+    tracker = LatencyTracker(
+        path=str(tmpdir.join(LatencyTracker.FILENAME)), minimum=0.1, maximum=10.0
+    )
+    tracker.observe(server="127.0.0.1", port=7634, latency=0.2)
+    tracker.save()
+    telnet = mocker.patch("telnetlib.Telnet")
+    telnet.return_value.read_all.return_value = b"|/dev/sda|HARD DRIVE|27|C|"
+    args = ["-s", "127.0.0.1", "--adaptive-timeout", "--state-dir", str(tmpdir)]
+
+    assert CheckHDDTemp(args=args).check() == (  # nosec: B101
+        "OK: device /dev/sda is functional and stable 27C\n",
+        0,
+    )
+    assert telnet.call_args[0] == (  # nosec: B101
+        "127.0.0.1",
+        7634,
+        pytest.approx(0.3),
+    )
+
+    state = json.loads(tmpdir.join(LatencyTracker.FILENAME).read())
+
+    assert len(state["127.0.0.1:7634"]["samples"]) == 2  # nosec: B101
+
+
+def test_check__adaptive_timeout__single_server(mocker, tmpdir):
+    """
+    Test "check" method must save latency history on server failure exit.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    :param tmpdir: temporary directory
+    :type tmpdir: py.path.local
+    """
+
+    args = ["-s", "nas", "--state-dir", str(tmpdir), "--adaptive-timeout"]
+    mocker.patch.object(HDDTempSource, "fetch", side_effect=socket.timeout("timed out"))
+
+    with pytest.raises(SystemExit):
+        with contextlib2.redirect_stdout(StringIO()):
+            CheckHDDTemp(args=args).check()
+
+    state = json.loads(tmpdir.join(LatencyTracker.FILENAME).read())
+
+    assert len(state["nas:7634"]["samples"]) == 1  # nosec: B101
+
+
+def test_inventory(tmpdir):
+    """
+    Test "Inventory.update" method must report new, replaced and removed devices
+    during hold time.
+
+    :param tmpdir: temporary directory
+    :type tmpdir: py.path.local
+    """
+
+    inventory = Inventory(path=str(tmpdir.join("inventory.bin")), hold=60.0)
+
+    for host, models, timestamp, expected in [
+        ("host", {"/dev/sda": "A", "/dev/sdb": "B"}, 0.0, {}),
+        (
+            "host",
+            {"/dev/sda": "A", "/dev/sdb": "C"},
+            10.0,
+            {"/dev/sdb": ("replaced", "C", "B")},
+        ),
+        (
+            "host",
+            {"/dev/sdb": "C", "/dev/sdc": "D"},
+            20.0,
+            {
+                "/dev/sda": ("removed", "A", ""),
+                "/dev/sdb": ("replaced", "C", "B"),
+                "/dev/sdc": ("new", "D", ""),
+            },
+        ),
+        (
+            "host",
+            {"/dev/sdb": "C", "/dev/sdc": "D"},
+            75.0,
+            {"/dev/sda": ("removed", "A", ""), "/dev/sdc": ("new", "D", "")},
+        ),
+        ("other", {"/dev/sda": "E"}, 75.0, {}),
+    ]:
+        changes = inventory.update(host=host, models=models, timestamp=timestamp)
+
+        assert changes == expected  # nosec: B101
+
+
+def test_inventory__in_place(tmpdir):
+    """
+    Test "Inventory" must rewrite known devices records in place
+    and reload them in other invocations.
+
+    :param tmpdir: temporary directory
+    :type tmpdir: py.path.local
+    """
+
+    path = tmpdir.join("inventory.bin")
+    inventory = Inventory(path=str(path), hold=60.0)
+    inventory.update(host="host", models={"/dev/sda": "A"}, timestamp=0.0)
+    size = path.size()
+    inventory.update(host="host", models={"/dev/sda": "A"}, timestamp=10.0)
+
+    assert path.size() == size  # nosec: B101
+    assert size == Inventory.HEADER.size + Inventory.RECORD.size  # nosec: B101
+
+    loaded = Inventory(path=str(path), hold=60.0)
+
+    changes = loaded.update(host="host", models={"/dev/sda": "B"}, timestamp=20.0)
+
+    assert changes == {"/dev/sda": ("replaced", "B", "A")}  # nosec: B101
+    assert loaded.index[b"host"][b"/dev/sda"][3:5] == [20.0, 20.0]  # nosec: B101
+    assert path.size() == size  # nosec: B101
+
+    path.write("broken")
+    broken = Inventory(path=str(path), hold=60.0)
+
+    changes = broken.update(host="host", models={"/dev/sda": "B"}, timestamp=30.0)
+
+    assert changes == {}  # nosec: B101
+    assert path.size() == size  # nosec: B101
+
+
+def test_inventory__concurrent(mocker, tmpdir):
+    """
+    Test "Inventory.update" method must append records under inventory file lock
+    after indexing records appended by concurrent checks.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    :param tmpdir: temporary directory
+    :type tmpdir: py.path.local
+    """
+
+    path = tmpdir.join("inventory.bin")
+    flock = mocker.patch("fcntl.flock", wraps=fcntl.flock)
+    first = Inventory(path=str(path), hold=60.0)
+    second = Inventory(path=str(path), hold=60.0)
+    first.update(host="nas", models={"/dev/sda": "A"}, timestamp=0.0)
+    second.update(host="wan", models={"/dev/sda": "B"}, timestamp=0.0)
+    first.update(host="nas", models={"/dev/sda": "A", "/dev/sdb": "C"}, timestamp=0.0)
+    loaded = Inventory(path=str(path), hold=60.0)
+    loaded.update(host="wan", models={"/dev/sda": "B"}, timestamp=10.0)
+
+    assert flock.call_count == 4  # nosec: B101
+    assert (
+        path.size() == Inventory.HEADER.size + 3 * Inventory.RECORD.size
+    )  # nosec: B101  # noqa: E501
+    assert sorted(loaded.index[b"nas"]) == [b"/dev/sda", b"/dev/sdb"]  # nosec: B101
+
+
+def test__get_options__model_threshold(mocker):
+    """
+    Test "_get_options" method must parse model threshold options.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    """
+
+    options = CheckHDDTemp._get_options(
+        args=["-s", "127.0.0.1", "--model-threshold", "Samsung SSD*:50:70"]
+    )
+
+    assert options.model_thresholds == [("Samsung SSD*", 50, 70)]  # nosec: B101
+
+    for rule in ["50:70", "SSD:70:50", "SSD:hot:70"]:
+        out = StringIO()
+        mocker.patch(
+            "sys.argv",
+            ["check_hddtemp.py", "-s", "127.0.0.1", "--model-threshold", rule],
+        )
+
+        with pytest.raises(SystemExit):
+            with contextlib2.redirect_stderr(out):
+                CheckHDDTemp()
+
+        assert "Model threshold option can't be parsed" in out.getvalue()  # nosec: B101
+
+
+def test_check__inventory(mocker, tmpdir):
+    """
+    Test "check" method must report replaced and removed devices
+    and use model thresholds.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    :param tmpdir: temporary directory
+    :type tmpdir: py.path.local
+    """
+
+    args = [
+        "-s",
+        "127.0.0.1",
+        "--state-dir",
+        str(tmpdir),
+        "--inventory",
+        "--result-cache",
+        "4",
+        "--model-threshold",
+        "SSD*:20:30",
+    ]
+    fetch = mocker.patch.object(
+        HDDTempSource,
+        "fetch",
+        return_value="|/dev/sda|HARD DRIVE|27|C||/dev/sdb|HARD DRIVE|35|C|",
+    )
+    mocker.patch("sys.argv", ["check_hddtemp.py"] + args)
+    out = StringIO()
+
+    with pytest.raises(SystemExit):
+        with contextlib2.redirect_stdout(out):
+            main()
+
+    assert out.getvalue().startswith("OK: ")  # nosec: B101
+
+    fetch.return_value = "|/dev/sda|SSD DRIVE|27|C|"
+    out = StringIO()
+
+    with pytest.raises(SystemExit):
+        with contextlib2.redirect_stdout(out):
+            main()
+
+    expected = "WARNING: device /dev/sda temperature 27C exceeds warning temperature threshold 20C, device /dev/sdb HARD DRIVE was removed"  # noqa: E501
+
+    assert out.getvalue().strip() == expected  # nosec: B101
+
+    fetch.return_value = "|/dev/sda|SSD DRIVE|15|C|"
+    mocker.patch("sys.argv", ["check_hddtemp.py"] + args + ["-d", "/dev/sda"])
+    out = StringIO()
+
+    with pytest.raises(SystemExit):
+        with contextlib2.redirect_stdout(out):
+            main()
+
+    expected = "WARNING: device /dev/sda HARD DRIVE was replaced by SSD DRIVE"
+
+    assert out.getvalue().strip() == expected  # nosec: B101
+
+
+def test_check__inventory__malformed(mocker, tmpdir):
+    """
+    Test "check" method must not report device with malformed record as removed.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    :param tmpdir: temporary directory
+    :type tmpdir: py.path.local
+    """
+
+    args = ["-s", "127.0.0.1", "--state-dir", str(tmpdir), "--inventory", "-T"]
+    good = "|/dev/sda|HARD DRIVE|27|C||/dev/sdb|HARD DRIVE|35|C|"
+    fetch = mocker.patch.object(HDDTempSource, "fetch", return_value=good)
+    results = []
+
+    for response in [good, "|/dev/sda|HARD DRIVE|27|C||/dev/sdb|X|", good]:
+        fetch.return_value = response
+        results.append(CheckHDDTemp(args=args).check())
+
+    assert "was removed" not in results[1][0]  # nosec: B101
+    assert results[2] == (  # nosec: B101
+        "OK: device /dev/sda is functional and stable 27C, device /dev/sdb is functional and stable 35C\n",  # noqa: E501
+        0,
+    )
+
+
+def test_check__aggregated__performance_format(mocker):
+    """
+    Test "check" method must return host-qualified Nagios performance data
+    and servers temperatures summary.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    """
+
+    responses = {
+        "a": "|/dev/sda|HARD DRIVE|27|C||/dev/sdb|HARD DRIVE|69|C|",
+        "b": "|/dev/sda|HARD DRIVE|42|C||/dev/sdb|HARD DRIVE|SLP|*|",
+    }
+    mocker.patch.object(
+        CheckHDDTemp, "_fetch", side_effect=lambda server, port: responses[server]
+    )
+    mocker.patch.object(
+        CheckHDDTemp,
+        "_iter_fetch",
+        side_effect=lambda server, port: iter([responses[server]]),
+    )
+    summary = "a:min=27;40;65 a:avg=48.0;40;65 a:max=69;40;65 b:min=42;40;65 b:avg=42.0;40;65 b:max=42;40;65"  # noqa: E501
+
+    for args, expected in [
+        (
+            ["--performance-format", "nagios"],
+            "a:/dev/sdb=69;40;65 b:/dev/sda=42;40;65 a:/dev/sda=27;40;65 b:/dev/sdb=U;40;65",  # noqa: E501
+        ),
+        (
+            ["--performance-format", "nagios", "-B", "-W", "1"],
+            "a:/dev/sda=27;40;65 a:/dev/sdb=69;40;65 b:/dev/sda=42;40;65 b:/dev/sdb=U;40;65",  # noqa: E501
+        ),
+        (["--performance-format", "summary"], summary),
+        (["--performance-format", "summary", "-B", "-W", "1"], summary),
+    ]:
+        checker = CheckHDDTemp(args=["-s", "a,b", "-P", "-j", "1"] + args)
+        result, _ = checker.check()
+
+        assert result.split("| ")[1].strip() == expected  # nosec: B101
+
+
+def test_check__aggregated__performance_summary__model_threshold(mocker):
+    """
+    Test "check" method must use devices models thresholds in servers temperatures summary.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    """  # noqa: E501
+
+    responses = {
+        "a": "|/dev/sda|HARD DRIVE|27|C||/dev/sdb|Samsung SSD 860|55|C|",
+        "b": "|/dev/sda|HARD DRIVE|SLP|*|",
+    }
+    mocker.patch.object(
+        CheckHDDTemp, "_fetch", side_effect=lambda server, port: responses[server]
+    )
+    mocker.patch.object(
+        CheckHDDTemp,
+        "_iter_fetch",
+        side_effect=lambda server, port: iter([responses[server]]),
+    )
+    expected = "a:min=27;40;65 a:avg=41.0;40;65 a:max=55;60;70 b:min=U;40;65 b:avg=U;40;65 b:max=U;40;65"  # noqa: E501
+
+    options = ["-s", "a,b", "-P", "-j", "1", "--performance-format", "summary"]
+
+    for args in [[], ["-B", "-W", "1"]]:
+        checker = CheckHDDTemp(
+            args=options + ["--model-threshold", "*SSD*:60:70"] + args
+        )
+        result, _ = checker.check()
+
+        assert result.split("| ")[1].strip() == expected  # nosec: B101
+
+
+def test_check__bounded__output_limit(mocker):
+    """
+    Test "check" method must keep spooled performance data within output limit.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    """
+
+    responses = {
+        "a": "|/dev/sda|HARD DRIVE|27|C||/dev/sdb|HARD DRIVE|29|C|",
+        "b": "|/dev/sda|HARD DRIVE|31|C||/dev/sdb|HARD DRIVE|33|C|",
+    }
+    mocker.patch.object(
+        CheckHDDTemp,
+        "_iter_fetch",
+        side_effect=lambda server, port: iter([responses[server]]),
+    )
+    checker = CheckHDDTemp(
+        args=["-s", "a,b", "-B", "-W", "1", "-P", "-j", "1", "--output-limit", "130"]
+    )
+    result, code = checker.check()
+
+    assert len(result.encode("utf8")) <= 130  # nosec: B101
+    assert result.endswith(  # nosec: B101
+        "| a:/dev/sda=27; a:/dev/sdb=29; b:/dev/sda=31\n"
+    )
+    assert code == 0  # nosec: B101
+
+
+def test__get_performance_label():
+    """
+    Test "_get_performance_label" method must quote labels with special characters.
+    """
+
+    checker = CheckHDDTemp(args=["-s", "127.0.0.1"])
+
+    for host, name, expected in [
+        (None, "/dev/sda", "/dev/sda"),
+        ("nas", "/dev/sda", "nas:/dev/sda"),
+        ("nas", "Drive 1", "'nas:Drive 1'"),
+        ("nas", "it's", "'nas:it''s'"),
+    ]:
+        label = checker._get_performance_label(host=host, name=name)
+
+        assert label == expected  # nosec: B101
+
+
+def test__get_limited():
+    """
+    Test "_get_limited" method must drop performance data and then devices texts
+    to keep output within output limit.
+    """
+
+    checker = CheckHDDTemp(
+        args=[
+            "-s",
+            "127.0.0.1",
+            "--performance-format",
+            "nagios",
+            "--output-limit",
+            "40",
+        ]
+    )
+    texts = ["device a is hot", "device b is ok", "device c is ok"]
+
+    output = checker._get_limited(
+        head="OK: ", texts=texts[:1], performance=["a=1", "b=2"]
+    )
+
+    assert output == "OK: device a is hot | a=1 b=2\n"  # nosec: B101
+
+    output = checker._get_limited(
+        head="OK: ", texts=texts[:2], performance=["a=1", "b=2", "c=3"]
+    )
+
+    assert output == "OK: device a is hot, device b is ok\n"  # nosec: B101
+
+    output = checker._get_limited(head="OK: ", texts=texts, performance=["a=1"])
+
+    assert output == "OK: device a is hot, 2 more\n"  # nosec: B101
+    assert len(output) <= 40  # nosec: B101
+
+
+def test_check__performance_file(mocker, tmpdir):
+    """
+    Test "check" method must write every device state to performance file.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    :param tmpdir: temporary directory
+    :type tmpdir: py.path.local
+    """
+
+    path = tmpdir.join("performance.ndjson")
+    responses = {
+        "a": "|/dev/sda|HARD DRIVE|27|C||/dev/sdb|HARD DRIVE|69|C|",
+        "b": "|/dev/sda|HARD DRIVE|42|C|",
+    }
+    mocker.patch.object(
+        CheckHDDTemp, "_fetch", side_effect=lambda server, port: responses[server]
+    )
+    checker = CheckHDDTemp(
+        args=["-s", "a,b", "-W", "1", "-j", "1", "--performance-file", str(path)]
+    )
+    result, _ = checker.check()
+    records = sorted(
+        (record["host"], record["device"], record["temperature"])
+        for record in map(json.loads, path.readlines())
+    )
+    expected = [("a", "/dev/sda", 27), ("a", "/dev/sdb", 69), ("b", "/dev/sda", 42)]
+
+    assert records == expected  # nosec: B101
+    assert len(tmpdir.listdir()) == 1  # nosec: B101
+
+
+def test__check_peers():
+    """
+    Test "_check_peers" method must report ok devices deviating from peers
+    with and without NumPy.
+    """
+
+    data = {
+        "/dev/sda": {"model": "HARD DRIVE", "temperature": "30", "scale": "C"},
+        "/dev/sdb": {"model": "HARD DRIVE", "temperature": "31", "scale": "C"},
+        "/dev/sdc": {"model": "HARD DRIVE", "temperature": "29", "scale": "C"},
+        "/dev/sdd": {"model": "HARD DRIVE", "temperature": "39", "scale": "C"},
+        "/dev/sde": {"model": "HARD DRIVE", "temperature": "SLP", "scale": "*"},
+    }
+    modules = [None]
+    try:
+        import numpy
+
+        modules.append(numpy)
+    except ImportError:
+        pass
+
+    for module in modules:
+        for args, expected in [
+            (["--peer-deviation", "5"], ["/dev/sdd"]),
+            (["--peer-mad", "3"], ["/dev/sdd"]),
+            (["--peer-mad", "3", "--peer-minimum", "5"], []),
+            (["--peer-deviation", "1"], ["/dev/sdc", "/dev/sdd"]),
+            (["--peer-deviation", "5", "-d", "/dev/sda,/dev/sdd"], ["/dev/sdd"]),
+            (["--peer-deviation", "5", "-w", "35"], []),
+        ]:
+            checker = CheckHDDTemp(args=["-s", "127.0.0.1"] + args)
+            checker.options.numpy = module
+            states = checker._check_data(data=data)
+            peers = sorted(
+                device
+                for device, info in states.items()
+                if info["template"] == CheckHDDTemp.TEMPLATE_PEER
+            )
+
+            assert peers == expected  # nosec: B101
+
+        checker = CheckHDDTemp(args=["-s", "127.0.0.1", "--peer-deviation", "5"])
+        checker.options.numpy = module
+        text = checker._get_text(info=checker._check_data(data=data)["/dev/sdd"])
+        expected = "device /dev/sdd temperature 39C deviates from host median 30.5C by 8.5C"  # noqa: E501
+
+        assert text == expected  # nosec: B101
+
+
+def test__get_options__peers(mocker):
+    """
+    Test "_get_options" method must check peers comparison options values.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    """
+
+    for args in [["--peer-mad", "-1"], ["--peer-minimum", "1"]]:
+        out = StringIO()
+        mocker.patch("sys.argv", ["check_hddtemp.py", "-s", "127.0.0.1"] + args)
+
+        with pytest.raises(SystemExit):
+            with contextlib2.redirect_stderr(out):
+                CheckHDDTemp()
+
+        assert "Peer deviation options values" in out.getvalue()  # nosec: B101
+
+
+def test__get_options__peers__numpy(mocker):
+    """
+    Test "_get_options" method must import NumPy only for peers comparison.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    """
+
+    mocker.patch.dict("sys.modules", {"numpy": None})  # not installed
+    import_module = mocker.spy(importlib, "import_module")
+    checker = CheckHDDTemp(args=["-s", "127.0.0.1"])
+
+    assert checker.options.numpy is None  # nosec: B101
+    assert mocker.call("numpy") not in import_module.call_args_list  # nosec: B101
+
+    checker = CheckHDDTemp(args=["-s", "127.0.0.1", "--peer-mad", "3"])
+
+    assert checker.options.numpy is None  # nosec: B101
+    assert mocker.call("numpy") in import_module.call_args_list  # nosec: B101
+
+
+def test_result_board(tmpdir):
+    """
+    Test "ResultBoard" must share fresh servers responses between instances.
+
+    :param tmpdir: temporary directory
+    :type tmpdir: py.path.local
+    """
+
+    path = str(tmpdir.join("board.bin"))
+    now = time.time()
+    writer = ResultBoard(path=path, slots=2)
+    writer.put(server="a", port=7634, response="a27", timestamp=now - 3)
+    writer.put(server="b", port=7634, response="b42", timestamp=now - 2)
+    reader = ResultBoard(path=path, slots=16)
+
+    assert reader.get(server="a", port=7634, age=10.0) == "a27"  # nosec: B101
+    assert reader.get(server="c", port=7634, age=10.0) is None  # nosec: B101
+    assert reader.slots == 2  # nosec: B101
+
+    writer.put(server="a", port=7634, response="a28", timestamp=now - 1)
+    writer.put(server="c", port=7634, response="c30", timestamp=now)
+
+    assert reader.get(server="a", port=7634, age=10.0) == "a28"  # nosec: B101
+    assert reader.get(server="b", port=7634, age=10.0) is None  # nosec: B101
+    assert reader.get(server="c", port=7634, age=10.0) == "c30"  # nosec: B101
+    assert reader.get(server="a", port=7634, age=0.5) is None  # nosec: B101
+
+    writer.put(server="c", port=7634, response="x" * ResultBoard.SLOT_SIZE)
+
+    assert reader.get(server="c", port=7634, age=10.0) == "c30"  # nosec: B101
+    assert tmpdir.join("board.bin").size() == 3 * 4096  # nosec: B101
+
+    writer.close()
+    reader.close()
+
+
+def test_result_board__torn(tmpdir):
+    """
+    Test "ResultBoard.get" method must not return torn records.
+
+    :param tmpdir: temporary directory
+    :type tmpdir: py.path.local
+    """
+
+    board = ResultBoard(path=str(tmpdir.join("board.bin")), slots=1)
+    board.put(server="a", port=7634, response="|/dev/sda|HARD DRIVE|27|C|")
+    offset = ResultBoard.OFFSET
+
+    board.data[offset : offset + 4] = ResultBoard.SEQUENCE.pack(3)  # noqa: E203
+
+    assert board.get(server="a", port=7634, age=10.0) is None  # nosec: B101
+
+    board.data[offset : offset + 4] = ResultBoard.SEQUENCE.pack(4)  # noqa: E203
+    board.data[offset + 100] = 0
+
+    assert board.get(server="a", port=7634, age=10.0) is None  # nosec: B101
+
+    board.put(server="a", port=7634, response="|/dev/sda|HARD DRIVE|27|C|")
+
+    assert board.get(server="a", port=7634, age=10.0) is not None  # nosec: B101
+
+    board.close()
+
+
+def test_check__result_board(mocker, tmpdir):
+    """
+    Test "check" method must reuse server response from result board.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    :param tmpdir: temporary directory
+    :type tmpdir: py.path.local
+    """
+
+    fetch = mocker.patch.object(
+        HDDTempSource, "fetch", return_value="|/dev/sda|HARD DRIVE|27|C|"
+    )
+    args = ["-s", "127.0.0.1", "--board", str(tmpdir.join("board.bin"))]
+
+    expected = "OK: device /dev/sda is functional and stable 27C\n"
+
+    for _ in range(2):
+        result, _ = CheckHDDTemp(args=args + ["-d", "/dev/sda"]).check()
+
+        assert result == expected  # nosec: B101
+
+    assert fetch.call_count == 1  # nosec: B101
+
+    CheckHDDTemp(args=args + ["--board-age", "0"]).check()
+
+    assert fetch.call_count == 2  # nosec: B101
+
+
+def test_icinga_sink(icinga_api):
+    """
+    Test "IcingaSink" must submit check results over keep-alive connections.
+
+    :param icinga_api: Icinga 2 API stub
+    :type icinga_api: IcingaAPIStub
+    """
+
+    sink = IcingaSink(
+        url=icinga_api.url,
+        user="root",
+        password="secret",
+        service="{host}!hddtemp-{name}",
+        concurrency=4,
+    )
+    for index in range(2000):
+        sink.add(
+            host="nas{index}".format(index=index // 8),
+            device="/dev/sd{device}".format(device="abcdefgh"[index % 8]),
+            code=0,
+            text="device is functional and stable 27C",
+            performance="temperature=27;40;65",
+        )
+    sink.flush(timeout=10)
+    path, authorization, result = sorted(
+        icinga_api.requests, key=lambda request: request[2]["service"]
+    )[0]
+
+    assert sink.stats == {"delivered": 2000}  # nosec: B101
+    assert len(icinga_api.requests) == 2000  # nosec: B101
+    assert len(icinga_api.peers) <= 4  # nosec: B101
+    assert path == "/v1/actions/process-check-result"  # nosec: B101
+    assert authorization == "Basic cm9vdDpzZWNyZXQ="  # nosec: B101
+    assert result == {  # nosec: B101
+        "type": "Service",
+        "service": "nas0!hddtemp-sda",
+        "exit_status": 0,
+        "plugin_output": "device is functional and stable 27C",
+        "performance_data": ["temperature=27;40;65"],
+        "check_source": "check_hddtemp",
+    }
+    assert len(sink.results) == 0  # nosec: B101
+
+
+def test_icinga_sink__retry(icinga_api):
+    """
+    Test "IcingaSink" must retry failed requests and give up on rejected ones.
+
+    :param icinga_api: Icinga 2 API stub
+    :type icinga_api: IcingaAPIStub
+    """
+
+    sink = IcingaSink(
+        url=icinga_api.url,
+        user="root",
+        password="secret",
+        service="{host}!{device}",
+        concurrency=1,
+        retries=2,
+        queue=3,
+    )
+    icinga_api.statuses = [503, 500, 400, 429, 500, 503, 500]
+    for device in ["/dev/sda", "/dev/sdb", "/dev/sdc", "/dev/sdd", "/dev/sde"]:
+        sink.add(host="nas", device=device, code=0, text="ok", performance="")
+    sink.flush(timeout=10)
+
+    assert sink.stats == {  # nosec: B101
+        "dropped": 2,
+        "delivered": 1,
+        "rejected": 1,
+        "failed": 1,
+    }
+    assert [
+        request[2]["service"] for request in icinga_api.requests
+    ] == [  # nosec: B101  # noqa: E501
+        "nas!/dev/sde"
+    ]
+
+
+def test_icinga_sink__connection_error():
+    """Test "IcingaSink" must count results failed due to connection errors."""
+
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    port = listener.getsockname()[1]
+    listener.close()
+    sink = IcingaSink(
+        url="http://127.0.0.1:{port}/".format(port=port),
+        user="root",
+        password="secret",
+        service="{host}!{device}",
+        retries=1,
+    )
+    sink.add(host="nas", device="/dev/sda", code=0, text="ok", performance="")
+    sink.flush(timeout=1)
+
+    assert sink.stats == {"failed": 1}  # nosec: B101
+
+
+def test__get_options__icinga_parsing_error(mocker):
+    """
+    Test "_get_options" method must exit with Icinga 2 API option parsing error.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    """
+
+    for args in [
+        ["--icinga", "ftp://localhost"],
+        ["--icinga", "https://localhost", "--icinga-service", "{host}!{model}"],
+        ["--icinga", "https://localhost", "--icinga-concurrency", "0"],
+    ]:
+        out = StringIO()
+        mocker.patch("sys.argv", ["check_hddtemp.py", "-s", "127.0.0.1"] + args)
+
+        with pytest.raises(SystemExit):
+            with contextlib2.redirect_stderr(out):
+                CheckHDDTemp()
+
+        assert "Icinga 2 API" in out.getvalue().strip()  # nosec: B101
+
+
+def test_check__icinga(mocker, icinga_api):
+    """
+    Test "check" method must submit devices states to Icinga 2 API.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    :param icinga_api: Icinga 2 API stub
+    :type icinga_api: IcingaAPIStub
+    """
+
+    mocker.patch.object(
+        HDDTempSource,
+        "fetch",
+        return_value="|/dev/sda|HARD DRIVE|27|C||/dev/sdb|HARD DRIVE|SLP|*|",
+    )
+    checker = CheckHDDTemp(
+        args=["-s", "nas.lan", "--icinga", icinga_api.url, "--icinga-user", "root"]
+    )
+    _, code = checker.check()
+    results = sorted(
+        [request[2] for request in icinga_api.requests],
+        key=lambda result: result["service"],
+    )
+
+    assert code == 0  # nosec: B101
+    assert [  # nosec: B101
+        (result["service"], result["exit_status"], result["performance_data"])
+        for result in results
+    ] == [
+        ("nas.lan!hddtemp-sda", 0, ["temperature=27;40;65"]),
+        ("nas.lan!hddtemp-sdb", 0, ["temperature=U;40;65"]),
+    ]
+    assert (
+        results[0]["plugin_output"] == "device /dev/sda is functional and stable 27C"
+    )  # nosec: B101  # noqa: E501
+
+
+def test_check__icinga__deadline(mocker, icinga_api):
+    """
+    Test "check" method must not submit devices states to Icinga 2 API after timeout.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    :param icinga_api: Icinga 2 API stub
+    :type icinga_api: IcingaAPIStub
+    """
+
+    mocker.patch.object(
+        HDDTempSource, "fetch", return_value="|/dev/sda|HARD DRIVE|27|C|"
+    )
+    mocker.patch.object(
+        CheckHDDTemp, "_flush_sinks", side_effect=lambda: time.sleep(0.2)
+    )
+    flush = mocker.spy(IcingaSink, "flush")
+    checker = CheckHDDTemp(
+        args=[
+            "-s",
+            "nas.lan",
+            "--icinga",
+            icinga_api.url,
+            "--icinga-user",
+            "root",
+            "--icinga-timeout",
+            "0.1",
+        ]
+    )
+    _, code = checker.check()
+
+    assert code == 0  # nosec: B101
+    assert flush.call_count == 0  # nosec: B101
+    assert icinga_api.requests == []  # nosec: B101
+
+
+def test_capture(tmpdir):
+    """
+    Test "Capture" must append compressed responses records by runs.
+
+    :param tmpdir: temporary directory
+    :type tmpdir: py.path.local
+    """
+
+    path = str(tmpdir.join("capture.gz"))
+    capture = Capture(path=path)
+    capture.add(host="nas1", response="|/dev/sda|HARD DRIVE|27|C|", timestamp=10.0)
+    capture.add(host="nas2", response="|/dev/sda|HARD DRIVE|SLP|*|", timestamp=11.0)
+    capture.save()
+    capture.save()  # nothing buffered
+    capture.add(host="nas1", response="|/dev/sda|HARD DRIVE|28|C|", timestamp=70.0)
+    capture.save()
+
+    with open(path, "rb") as data:
+        magic = data.read(2)
+
+    assert magic == b"\x1f\x8b"  # nosec: B101
+    assert capture.records == []  # nosec: B101
+    assert list(Capture.load(path=path)) == [  # nosec: B101
+        (10.0, "nas1", "|/dev/sda|HARD DRIVE|27|C|"),
+        (11.0, "nas2", "|/dev/sda|HARD DRIVE|SLP|*|"),
+        (70.0, "nas1", "|/dev/sda|HARD DRIVE|28|C|"),
+    ]
+
+
+def test_check__record(mocker, tmpdir):
+    """
+    Test "check" method must record raw servers responses to capture file.
+
+    :param mocker: mock
+    :type mocker: MockerFixture
+    :param tmpdir: temporary directory
+    :type tmpdir: py.path.local
+    """
+
+    mocker.patch.object(
+        HDDTempSource, "fetch", return_value="|/dev/sda|HARD DRIVE|27|C|"
+    )
+    path = str(tmpdir.join("capture.gz"))
+
+    for servers in ["nas1", "nas1,nas2"]:
+        CheckHDDTemp(args=["-s", servers, "--record", path]).check()
+
+    result = sorted([host for _, host, _ in Capture.load(path=path)])
+
+    assert result == ["nas1", "nas1", "nas2"]  # nosec: B101
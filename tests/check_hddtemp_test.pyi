@@ -5,6 +5,10 @@
 
 from typing import List  # pylint: disable=W0611
 
+from py.path import local
+
+from tests.conftest import IcingaAPIStub
+
 try:
     from pytest_mock.plugin import MockerFixture  # pylint: disable=W0611  # noqa: F401
 except ImportError:
@@ -71,3 +75,125 @@ def test__get_code__sleeping(mocker: MockerFixture) -> None: ...
 def test__get_code__warning(mocker: MockerFixture) -> None: ...
 def test__get_code__unknown_device(mocker: MockerFixture) -> None: ...
 def test__get_code__unknown_device_temperature(mocker: MockerFixture) -> None: ...
+def test__get_options__format(mocker: MockerFixture) -> None: ...
+def test__get_output__json(mocker: MockerFixture) -> None: ...
+def test__get_output__ndjson(mocker: MockerFixture) -> None: ...
+def test_check__json(mocker: MockerFixture) -> None: ...
+def test_json_dumps(mocker: MockerFixture) -> None: ...
+def test__get_servers() -> None: ...
+def test__get_options__servers_parsing_error(mocker: MockerFixture) -> None: ...
+def test__parse__parsing_error(mocker: MockerFixture) -> None: ...
+def test__check_host__network_error(mocker: MockerFixture) -> None: ...
+def test_check__aggregated(mocker: MockerFixture) -> None: ...
+def test_check__aggregated__worst(mocker: MockerFixture) -> None: ...
+def test_check__aggregated__ndjson(mocker: MockerFixture) -> None: ...
+def test_metrics_sink_from_url() -> None: ...
+def test__get_options__sink_parsing_error(mocker: MockerFixture) -> None: ...
+def test_statsd_sink() -> None: ...
+def test_statsd_sink__packets() -> None: ...
+def test_graphite_sink() -> None: ...
+def test_influx_sink() -> None: ...
+def test__flush_sinks__error(mocker: MockerFixture) -> None: ...
+def test_check__sinks(mocker: MockerFixture) -> None: ...
+def test__iter_fetch(mocker: MockerFixture) -> None: ...
+def test__iter_records(mocker: MockerFixture) -> None: ...
+def test__iter_records__too_short_error(mocker: MockerFixture) -> None: ...
+def test__iter_records__too_long_error(mocker: MockerFixture) -> None: ...
+def test__get_options__bounded_without_worst(mocker: MockerFixture) -> None: ...
+def test_check__bounded(mocker: MockerFixture) -> None: ...
+def test_check__bounded__ndjson(mocker: MockerFixture) -> None: ...
+def test_check__bounded__memory(mocker: MockerFixture) -> None: ...
+def test_get_sources(mocker: MockerFixture) -> None: ...
+def test_load_source() -> None: ...
+def test__get_options__list_sources(mocker: MockerFixture) -> None: ...
+def test__get_options__unknown_source(mocker: MockerFixture) -> None: ...
+def test__get_fingerprint() -> None: ...
+def test_circuit_breaker(mocker: MockerFixture, tmpdir: local) -> None: ...
+def test_circuit_breaker__save(tmpdir: local) -> None: ...
+def test_check__breaker(mocker: MockerFixture, tmpdir: local) -> None: ...
+def test_check__breaker__single_server(
+    mocker: MockerFixture,
+    tmpdir: local,
+) -> None: ...
+def test_resolver__interleave() -> None: ...
+def test_resolver__resolve(mocker: MockerFixture, tmpdir: local) -> None: ...
+def test_resolver__resolve__expired(mocker: MockerFixture, tmpdir: local) -> None: ...
+def test_resolver__resolve__error(mocker: MockerFixture, tmpdir: local) -> None: ...
+def test_hddtemp_source__race() -> None: ...
+def test_check__resolve(tmpdir: local) -> None: ...
+def test_check__timings(mocker: MockerFixture) -> None: ...
+def test__get_data__decoding_error(mocker: MockerFixture) -> None: ...
+def test__get_data__tolerant(mocker: MockerFixture) -> None: ...
+def test__parse__tolerant(mocker: MockerFixture) -> None: ...
+def test__parse__tolerant__no_valid_records(mocker: MockerFixture) -> None: ...
+def test__get_options__empty_separator(mocker: MockerFixture) -> None: ...
+def test_check__bounded__tolerant(mocker: MockerFixture) -> None: ...
+def test_check__tolerant(mocker: MockerFixture) -> None: ...
+def test_check__tolerant__json(mocker: MockerFixture) -> None: ...
+def test__parse__tolerant__truncated_name(mocker: MockerFixture) -> None: ...
+def test_result_cache(tmpdir: local) -> None: ...
+def test_result_cache__save(tmpdir: local) -> None: ...
+def test_check__result_cache(mocker: MockerFixture, tmpdir: local) -> None: ...
+def test_snapshot(tmpdir: local) -> None: ...
+def test_snapshot__broken(tmpdir: local) -> None: ...
+def test_check__snapshot(mocker: MockerFixture, tmpdir: local) -> None: ...
+def test_latency_tracker(mocker: MockerFixture, tmpdir: local) -> None: ...
+def test_latency_tracker__get_percentile() -> None: ...
+def test__get_options__timeout(mocker: MockerFixture) -> None: ...
+def test_check__adaptive_timeout(mocker: MockerFixture, tmpdir: local) -> None: ...
+def test_inventory(tmpdir: local) -> None: ...
+def test_inventory__in_place(tmpdir: local) -> None: ...
+def test__get_options__model_threshold(mocker: MockerFixture) -> None: ...
+def test_check__inventory(mocker: MockerFixture, tmpdir: local) -> None: ...
+def test_check__aggregated__performance_format(mocker: MockerFixture) -> None: ...
+def test__get_performance_label() -> None: ...
+def test__get_limited() -> None: ...
+def test_check__performance_file(mocker: MockerFixture, tmpdir: local) -> None: ...
+def test__check_peers() -> None: ...
+def test__get_options__peers(mocker: MockerFixture) -> None: ...
+def test_result_board(tmpdir: local) -> None: ...
+def test_result_board__torn(tmpdir: local) -> None: ...
+def test_check__result_board(mocker: MockerFixture, tmpdir: local) -> None: ...
+def test_icinga_sink(icinga_api: IcingaAPIStub) -> None: ...
+def test_icinga_sink__retry(icinga_api: IcingaAPIStub) -> None: ...
+def test_icinga_sink__connection_error() -> None: ...
+def test__get_options__icinga_parsing_error(mocker: MockerFixture) -> None: ...
+def test_check__icinga(mocker: MockerFixture, icinga_api: IcingaAPIStub) -> None: ...
+def test_capture(tmpdir: local) -> None: ...
+def test_check__record(mocker: MockerFixture, tmpdir: local) -> None: ...
+def test_circuit_breaker__save__concurrent(tmpdir: local) -> None: ...
+def test_latency_tracker__save__concurrent(tmpdir: local) -> None: ...
+def test_result_cache__save__concurrent(tmpdir: local) -> None: ...
+def test_resolver__resolve__concurrent(
+    mocker: MockerFixture,
+    tmpdir: local,
+) -> None: ...
+def test_inventory__concurrent(mocker: MockerFixture, tmpdir: local) -> None: ...
+def test_check__adaptive_timeout__single_server(
+    mocker: MockerFixture,
+    tmpdir: local,
+) -> None: ...
+def test_check__snapshot__model_threshold(
+    mocker: MockerFixture,
+    tmpdir: local,
+) -> None: ...
+def test__get_options__peers__numpy(mocker: MockerFixture) -> None: ...
+def test_check__result_cache__aggregated(
+    mocker: MockerFixture,
+    tmpdir: local,
+) -> None: ...
+def test_check__result_cache__inventory(
+    mocker: MockerFixture,
+    tmpdir: local,
+) -> None: ...
+def test_check__icinga__deadline(
+    mocker: MockerFixture,
+    icinga_api: IcingaAPIStub,
+) -> None: ...
+def test_graphite_sink__deadline(mocker: MockerFixture) -> None: ...
+def test_check__aggregated__performance_summary__model_threshold(
+    mocker: MockerFixture,
+) -> None: ...
+def test_check__bounded__output_limit(mocker: MockerFixture) -> None: ...
+def test_circuit_breaker__probe(mocker: MockerFixture, tmpdir: local) -> None: ...
+def test_check__inventory__malformed(mocker: MockerFixture, tmpdir: local) -> None: ...
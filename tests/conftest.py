@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+
+# nagios-check-hddtemp
+# tests/conftest.py
+
+
+from __future__ import unicode_literals
+
+import sys
+import json
+import threading
+
+import pytest
+
+
+try:
+    from socketserver import ThreadingMixIn
+    from http.server import HTTPServer, BaseHTTPRequestHandler
+except ImportError:  # Python 2
+    from SocketServer import ThreadingMixIn  # type: ignore
+    from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler  # type: ignore
+
+
+__all__ = [
+    "IcingaAPIHandler",
+    "IcingaAPIStub",
+    "collect_ignore",
+    "icinga_api",
+]
+
+
+# asyncio-based companion modules are Python 3 only
+collect_ignore = (
+    []
+    if sys.version_info >= (3, 6)
+    else [
+        "check_hddtemp_poller_test.py",
+        "check_hddtemp_server_test.py",
+    ]
+)
+
+
+class IcingaAPIHandler(BaseHTTPRequestHandler):
+    """
+    Icinga 2 API stub request handler.
+    """
+
+    protocol_version = "HTTP/1.1"  # keep-alive
+    disable_nagle_algorithm = True  # respond without waiting for delayed ACK
+
+    def do_POST(self):  # noqa: N802
+        """
+        Record passive check result or respond with queued error status.
+        """
+
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        server = self.server
+
+        with server.lock:  # type: ignore
+            server.peers.add(self.client_address)  # type: ignore
+            status = server.statuses.pop(0) if server.statuses else 200  # type: ignore  # noqa: E501
+            if status == 200:
+                server.requests.append(  # type: ignore
+                    (self.path, self.headers["Authorization"], json.loads(body))
+                )
+        payload = b'{"results":[]}'
+        self.send_response(status)
+        if status == 503:
+            self.send_header("Retry-After", "0")
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        """
+        Be quiet.
+
+        :param args: message format and values
+        :type args: List[Any]
+        """
+
+
+class IcingaAPIStub(ThreadingMixIn, HTTPServer):
+    """
+    Icinga 2 API stub recording passive check results.
+    """
+
+    daemon_threads = True
+
+    def __init__(self):
+        """
+        Set up stub on random local port.
+        """
+
+        HTTPServer.__init__(self, ("127.0.0.1", 0), IcingaAPIHandler)
+        self.lock = threading.Lock()
+        self.peers = set()  # type: ignore
+        self.statuses = []  # type: ignore
+        self.requests = []  # type: ignore
+
+    @property
+    def url(self):
+        """
+        Get stub URL.
+
+        :return: stub URL
+        :rtype: str
+        """
+
+        return "http://127.0.0.1:{port}".format(port=self.server_address[1])
+
+
+@pytest.fixture()
+def icinga_api():
+    """
+    Run Icinga 2 API stub in thread.
+
+    :return: Icinga 2 API stub
+    :rtype: Iterator[IcingaAPIStub]
+    """
+
+    server = IcingaAPIStub()
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+
+# nagios-check-hddtemp
+# tests/conftest.pyi
+
+from typing import Any, Set, List, Tuple, Iterator  # pylint: disable=W0611
+
+import threading
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from socketserver import ThreadingMixIn
+
+__all__: List[str] = ...
+
+collect_ignore: List[str] = ...
+
+class IcingaAPIHandler(BaseHTTPRequestHandler):
+    def do_POST(self) -> None: ...
+    def log_message(self, *args: Any) -> None: ...
+
+class IcingaAPIStub(ThreadingMixIn, HTTPServer):
+
+    lock: threading.Lock = ...
+    peers: Set[Tuple[str, int]] = ...
+    statuses: List[int] = ...
+    requests: List[Tuple[str, str, Any]] = ...
+    def __init__(self) -> None: ...
+    @property
+    def url(self) -> str: ...
+
+def icinga_api() -> Iterator[IcingaAPIStub]: ...